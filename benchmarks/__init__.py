@@ -0,0 +1,21 @@
+"""
+Knowledge Wiki - Local Indexer Benchmarks
+==========================================
+local-indexer의 단계별 성능 측정 스크립트 모음.
+
+  python -m benchmarks.bench_indexer      # 인덱서 전체 (가상 Drive 픽스처, 단계별 처리량 + 최대 RSS, JSON 저장/비교)
+  python -m benchmarks.bench_tagging      # 자동 태깅 (청크당 시간 + 결과 동일성 검증)
+  python -m benchmarks.bench_embedding    # 로컬 임베딩 (textToVector와 동일성 + 업로드 크기)
+  python -m benchmarks.bench_vector_index # 오프라인 벡터 인덱스 (질의 지연 + IVF recall)
+  python -m benchmarks.bench_dedup        # 중복 청크 탐지 (청크 수 대비 조회 시간 + 재현율)
+  python -m benchmarks.bench_hashing      # 파일 내용 해시 (방식별 처리량 + 구 해시 충돌 사례)
+  python -m benchmarks.bench_upload       # 업로드 전송 (지연별 순차 vs 동시 업로드 처리량)
+  python -m benchmarks.bench_parsers      # 문서 파서 (이전 vs 현재 파서 처리량 / 메모리 + 결과 동일성 / 청크 크기)
+"""
+
+import os
+import sys
+
+INDEXER_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'local-indexer')
+if INDEXER_DIR not in sys.path:
+    sys.path.insert(0, INDEXER_DIR)
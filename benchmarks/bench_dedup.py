@@ -0,0 +1,122 @@
+"""
+중복 청크 탐지 벤치마크 (dedup.py + StateStore LSH)
+===================================================
+코퍼스 청크에 v2 / 최종 복사본(단어 일부 수정)을 섞어 임시 상태 DB에 차례로 넣으면서
+
+  - 서명 계산 시간 (청크당, 워커에서 실행)
+  - 대표 청크 조회 + 기록 시간 (청크당, 메인 프로세스) - 전체 청크 수가 늘어도 거의 일정해야 함
+  - 실제 단어 3-gram 자카드 유사도 기준 재현율(복사본을 찾은 비율) / 오탐(기준 미달인데 참조로 바뀐 비율)
+
+을 측정합니다.
+
+사용법 (저장소 루트에서):
+  python -m benchmarks.bench_dedup
+  python -m benchmarks.bench_dedup --chunks 50000 --copies 0.3
+"""
+
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+from benchmarks import INDEXER_DIR  # noqa: F401  (sys.path 설정)
+from benchmarks.corpus import make_chunks
+import dedup
+from config import DEDUP_MIN_CHARS, DEDUP_THRESHOLD
+from state import StateStore
+
+
+def shingles(text):
+    words = text.lower().split()
+    return {tuple(words[i:i + dedup.SHINGLE]) for i in range(max(1, len(words) - dedup.SHINGLE + 1))}
+
+
+def jaccard(a, b):
+    sa, sb = shingles(a), shingles(b)
+    return len(sa & sb) / len(sa | sb)
+
+
+def edit(rng, text, rate):
+    """단어 일부를 바꾼 복사본 (최종_수정 흉내)"""
+    words = text.split()
+    for _ in range(max(1, int(len(words) * rate))):
+        words[rng.randrange(len(words))] = rng.choice(['수정', '변경', '보완', 'v2', '최종'])
+    return ' '.join(words)
+
+
+def make_corpus(n, copies, seed):
+    """[(chunk_id, text, 원본 chunk_id 또는 None)] - 원본이 항상 복사본보다 먼저 나옴"""
+    rng = random.Random(seed)
+    originals = [text for text, _ in make_chunks(n, seed) if len(text) >= DEDUP_MIN_CHARS]
+    items = [(f'o{i:06d}', text, None) for i, text in enumerate(originals)]
+    for i in range(int(len(items) * copies)):
+        source_id, source, _ = items[rng.randrange(len(originals))]
+        rate = rng.choice([0.0, 0.005, 0.02, 0.05, 0.15])
+        items.append((f'c{i:06d}', edit(rng, source, rate) if rate else source, source_id))
+    return items
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Near-duplicate detection benchmark')
+    parser.add_argument('--chunks', type=int, default=20000, help='원본 코퍼스 크기 (짧은 청크 제외 전)')
+    parser.add_argument('--copies', type=float, default=0.3, help='원본 대비 복사본 비율')
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--json', action='store_true', help='결과를 JSON으로 출력')
+    args = parser.parse_args()
+
+    items = make_corpus(args.chunks, args.copies, args.seed)
+    texts = {chunk_id: text for chunk_id, text, _ in items}
+
+    t0 = time.perf_counter()
+    sigs = [dedup.signature(text) for _, text, _ in items]
+    sign_us = (time.perf_counter() - t0) / len(items) * 1e6
+
+    lookup_us = []          # 구간별 (누적 청크 수, 청크당 us)
+    found = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        state = StateStore(os.path.join(tmp, 'state.db'))
+        step = max(1, len(items) // 5)
+        t0 = time.perf_counter()
+        for i, ((chunk_id, text, _), sig) in enumerate(zip(items, sigs), 1):
+            canonical = state.find_duplicate(chunk_id, sig, DEDUP_THRESHOLD)
+            state.set_signature(chunk_id, 'bench', sig, canonical or '', len(text.encode('utf-8')))
+            if canonical:
+                found[chunk_id] = canonical
+            if i % step == 0:
+                lookup_us.append((i, round((time.perf_counter() - t0) / step * 1e6, 1)))
+                t0 = time.perf_counter()
+        signed, refs, ref_bytes, _ = state.dedup_totals()
+        state.close()
+
+    # 정답: 복사본과 원본의 실제 자카드 유사도가 기준 이상이면 찾아야 할 복사본
+    should = {chunk_id for chunk_id, text, source in items
+              if source and jaccard(text, texts[source]) >= DEDUP_THRESHOLD}
+    wrong = {chunk_id for chunk_id, canonical in found.items()
+             if jaccard(texts[chunk_id], texts[canonical]) < DEDUP_THRESHOLD - 0.1}
+    results = {
+        'chunks': len(items),
+        'threshold': DEDUP_THRESHOLD,
+        'sign_us_per_chunk': round(sign_us, 1),
+        'lookup_us_per_chunk': lookup_us,
+        'references': refs,
+        'reference_bytes': ref_bytes,
+        'recall': round(len(should & set(found)) / max(1, len(should)), 3),
+        'false_positive_rate': round(len(wrong) / max(1, len(found)), 4),
+    }
+
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+        return
+    print(f"[CORPUS] {len(items)} chunks (>= {DEDUP_MIN_CHARS} chars), {args.copies:.0%} copies, "
+          f"threshold {DEDUP_THRESHOLD}")
+    print(f"  signature:        {results['sign_us_per_chunk']} us/chunk")
+    print("  lookup + record:  " + ', '.join(f"{us} us @ {n:,}" for n, us in lookup_us))
+    print(f"  collapsed:        {refs:,} of {signed:,} chunks ({ref_bytes / 1e6:.1f}MB of text)")
+    print(f"  recall:           {results['recall']} (copies with true 3-gram Jaccard >= {DEDUP_THRESHOLD})")
+    print(f"  false positives:  {results['false_positive_rate']} (matched pairs below {DEDUP_THRESHOLD - 0.1:.2f})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""
+로컬 임베딩 벤치마크 (--embed-local)
+====================================
+  - 서버 textToVector를 그대로 옮긴 구현(단어마다 indexOf 루프)과 embedding.encode_vectors()의
+    결과가 같은지 확인하고 청크당 시간 비교 (그중 TermCounter 단어 세기 시간 따로)
+  - VOCAB과 src/api.ts의 일치는 local-indexer/tests/test_embedding.py에서 확인
+  - 업로드 크기: JSON 배열(서버 저장 형식) vs f16 / i8 base64 (+ 복원 오차)
+
+사용법 (저장소 루트에서):
+  python -m benchmarks.bench_embedding
+  python -m benchmarks.bench_embedding --chunks 5000 --batch 50
+"""
+
+import argparse
+import json
+import math
+import time
+
+from benchmarks.corpus import make_chunks
+import embedding
+
+
+def text_to_vector(text):
+    """src/api.ts textToVector() 이식 (비교 기준)"""
+    lower = text.lower()
+    vec = [0.0] * len(embedding.VOCAB)
+    norm = 0.0
+    for i, term in enumerate(embedding.VOCAB):
+        count = lower.count(term.lower())
+        if count > 0:
+            vec[i] = 1 + math.log(count)
+            norm += vec[i] * vec[i]
+    if norm > 0:
+        sqrt_norm = math.sqrt(norm)
+        vec = [math.floor(v / sqrt_norm * 10000 + 0.5) / 10000 for v in vec]
+    return vec
+
+
+def js_json(vec):
+    """JSON.stringify(vec) 길이 계산용 (0 -> '0', 1.0 -> '1')"""
+    return '[' + ','.join('0' if v == 0 else str(int(v)) if v.is_integer() else repr(v) for v in vec) + ']'
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local embedding benchmark')
+    parser.add_argument('--chunks', type=int, default=2000)
+    parser.add_argument('--batch', type=int, default=50, help='encode_vectors 배치 크기 (BATCH_SIZE)')
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--json', action='store_true', help='결과를 JSON으로 출력')
+    args = parser.parse_args()
+
+    import numpy as np
+
+    texts = [f'{path} {text}' for text, path in make_chunks(args.chunks, args.seed)]
+    t0 = time.perf_counter()
+    legacy = [text_to_vector(t) for t in texts]
+    legacy_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    current = np.vstack([embedding.encode_vectors(texts[i:i + args.batch])
+                         for i in range(0, len(texts), args.batch)])
+    current_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for t in texts:
+        embedding.TERMS.counts(t.lower())
+    count_s = time.perf_counter() - t0
+
+    legacy = np.array(legacy)
+    results = {
+        'chunks': len(texts),
+        'dimensions': embedding.DIM,
+        'max_abs_diff': float(np.abs(legacy - current).max()),
+        'legacy_us_per_chunk': round(legacy_s / len(texts) * 1e6, 2),
+        'current_us_per_chunk': round(current_s / len(texts) * 1e6, 2),
+        'term_count_us_per_chunk': round(count_s / len(texts) * 1e6, 2),
+        'payload_bytes_per_chunk': {
+            'json': round(sum(len(js_json(v)) for v in legacy.tolist()) / len(texts), 1),
+        },
+        'max_decode_error': {},
+    }
+    for fmt in embedding.EMBED_FORMATS:
+        packed = [embedding.pack_vector(v, fmt) for v in current]
+        results['payload_bytes_per_chunk'][fmt] = round(sum(map(len, packed)) / len(texts), 1)
+        decoded = np.array([embedding.unpack_vector(p) for p in packed])
+        results['max_decode_error'][fmt] = float(np.abs(decoded - current).max())
+
+    ok = results['max_abs_diff'] == 0
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+    else:
+        print(f"[CORPUS] {len(texts)} chunks, {embedding.DIM} dims (seed={args.seed})")
+        print(f"[VERIFY] max |textToVector - encode_vectors| = {results['max_abs_diff']}")
+        print(f"  textToVector port: {results['legacy_us_per_chunk']} us/chunk")
+        print(f"  encode_vectors:    {results['current_us_per_chunk']} us/chunk (batch {args.batch}, "
+              f"{results['legacy_us_per_chunk'] / results['current_us_per_chunk']:.1f}x)")
+        print(f"    of which TermCounter: {results['term_count_us_per_chunk']} us/chunk")
+        sizes = results['payload_bytes_per_chunk']
+        for fmt, size in sizes.items():
+            err = results['max_decode_error'].get(fmt, 0.0)
+            print(f"  {fmt:<5} {size:>8} bytes/chunk ({sizes['json'] / size:.1f}x smaller than json)  max error {err:.1e}")
+
+    raise SystemExit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
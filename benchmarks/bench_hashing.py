@@ -0,0 +1,100 @@
+"""
+파일 내용 해시 벤치마크 (filehash.py)
+======================================
+임시 파일로 해시 방식별 처리량을 비교하고, 구 해시(앞/뒤 64KB)의 충돌 사례를 확인합니다.
+
+  - legacy: v3.0 해시 (크기 + 앞/뒤 64KB SHA-256), 파일 크기와 무관하게 128KB만 읽음
+  - read:   파일 전체 BLAKE2b, 1MB 버퍼 readinto
+  - mmap:   파일 전체 BLAKE2b, mmap 한 번에 (file_hash 기본 경로)
+  - 충돌:   앞/뒤 64KB가 같고 가운데 본문만 같은 길이로 고친 PDF 두 개 (xref 오프셋도 그대로)
+
+사용법 (저장소 루트에서):
+  python -m benchmarks.bench_hashing
+  python -m benchmarks.bench_hashing --sizes 1 16 256 --repeat 5
+"""
+
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+from benchmarks import INDEXER_DIR  # noqa: F401  (sys.path 설정)
+import filehash
+
+
+def _write(path, size, seed):
+    rng = random.Random(seed)
+    with open(path, 'wb') as f:
+        left = size
+        while left:
+            n = min(left, 1 << 20)
+            f.write(rng.randbytes(n))
+            left -= n
+
+
+def _throughput(fn, path, size, repeat):
+    fn(path)        # 페이지 캐시 적재
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn(path)
+    return size * repeat / (time.perf_counter() - t0) / 1e6
+
+
+def _pdf(body_text):
+    """글꼴 / 이미지(앞)와 xref + trailer(뒤)가 같고 가운데 본문 스트림만 다른 PDF 모양 바이트"""
+    rng = random.Random(1)
+    head = b'%PDF-1.7\n' + rng.randbytes(200_000)
+    body = f'BT /F1 12 Tf ({body_text}) Tj ET'.encode('utf-8')
+    tail = rng.randbytes(200_000) + b'\nxref\n0 12\ntrailer << /Size 12 >>\nstartxref\n9\n%%EOF\n'
+    return head + body + tail
+
+
+def main():
+    parser = argparse.ArgumentParser(description='File content hash benchmark')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1, 16, 128], help='파일 크기 (MB)')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--json', action='store_true', help='결과를 JSON으로 출력')
+    args = parser.parse_args()
+
+    results = {'throughput_mb_s': [], 'collision': {}}
+    with tempfile.TemporaryDirectory() as tmp:
+        for mb in args.sizes:
+            path = os.path.join(tmp, f'{mb}.bin')
+            size = mb << 20
+            _write(path, size, mb)
+            row = {'size_mb': mb}
+            row['legacy'] = round(_throughput(filehash.legacy_file_hash, path, size, args.repeat), 1)
+            saved = filehash.MMAP_MIN_SIZE
+            filehash.MMAP_MIN_SIZE = float('inf')
+            row['read'] = round(_throughput(filehash.file_hash, path, size, args.repeat), 1)
+            filehash.MMAP_MIN_SIZE = saved
+            row['mmap'] = round(_throughput(filehash.file_hash, path, size, args.repeat), 1)
+            results['throughput_mb_s'].append(row)
+
+        a, b = os.path.join(tmp, 'a.pdf'), os.path.join(tmp, 'b.pdf')
+        with open(a, 'wb') as f:
+            f.write(_pdf('분기 실적 보고 - 매출 120억'))
+        with open(b, 'wb') as f:
+            f.write(_pdf('분기 실적 보고 - 매출 980억'))
+        results['collision'] = {
+            'same_size': os.path.getsize(a) == os.path.getsize(b),
+            'legacy_equal': filehash.legacy_file_hash(a) == filehash.legacy_file_hash(b),
+            'full_equal': filehash.file_hash(a) == filehash.file_hash(b),
+        }
+
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+        return
+    print("[THROUGHPUT] MB/s of file size (legacy reads only 128KB per file)")
+    print(f"  {'size':>8} {'legacy':>10} {'read':>10} {'mmap':>10}")
+    for row in results['throughput_mb_s']:
+        print(f"  {row['size_mb']:>6}MB {row['legacy']:>10} {row['read']:>10} {row['mmap']:>10}")
+    c = results['collision']
+    print(f"[COLLISION] two PDFs edited in place in the middle (same size: {c['same_size']})")
+    print(f"  legacy hash equal: {c['legacy_equal']}   full hash equal: {c['full_equal']}")
+
+
+if __name__ == '__main__':
+    main()
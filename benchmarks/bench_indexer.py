@@ -0,0 +1,324 @@
+"""
+인덱서 단계별 처리량 벤치마크
+==============================
+fixtures로 만든 가상 Drive 폴더를 대역 서버(stub_server)에 대고 인덱싱하며 단계별로 측정합니다.
+
+  - scan:   scan_files (files/s)
+  - hash:   파일 전체 내용 해시 (files/s, MB/s)
+  - parse:  PARSERS 형식별 (files/s, chunks/s, MB/s) - 파싱 캐시 없이
+  - tag:    auto_tag_chunk (chunks/s, 본문 MB/s)
+  - upload: UploadPipeline -> 대역 서버 (chunks/s, 전송 MB/s)
+  - index:  전체 실행 (plan_changes + index_files_* + 서버 임베딩 생성), 빈 상태 DB에서
+
+단계마다 최대 RSS(MB, 이 프로세스만 - PDF 페이지 추출 / --workers 프로세스 제외)도 기록합니다.
+Linux는 단계 시작 전에 /proc/self/clear_refs로 최대값을 초기화하므로 단계별 값, 그 밖의 OS는 누적 최대값입니다.
+
+결과는 --out으로 JSON 저장, --compare로 이전 결과와 비교 (처리량이 --tolerance 이상 떨어진 단계 표시).
+
+사용법 (저장소 루트에서):
+  python -m benchmarks.bench_indexer --out before.json
+  python -m benchmarks.bench_indexer --out after.json --compare before.json
+  python -m benchmarks.bench_indexer --scale 3 --workers 4 --latency 0.05 --fixtures /tmp/bench_drive
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+
+from benchmarks import INDEXER_DIR
+from benchmarks.fixtures import make_drive
+from benchmarks.stub_server import StubServer
+import indexer
+from async_client import UploadPipeline
+from config import BATCH_SIZE, UPLOAD_IN_FLIGHT
+from parse_cache import complete_chunks
+from state import StateStore
+from uploader import WikiClient, merge_upload_stats, new_upload_stats
+
+
+# =============================================
+# 최대 RSS
+# =============================================
+
+def reset_peak_rss():
+    """최대 RSS 초기화 (Linux만, 성공 여부 반환)"""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss_mb():
+    """이 프로세스의 최대 RSS (MB). 알 수 없으면 None"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    try:
+        import resource
+    except ImportError:         # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1 << 20 if sys.platform == 'darwin' else 1024), 1)
+
+
+class Stage:
+    """with Stage(results, 'parse') as s: ... s.rate(files=.., chunks=.., mb=..)"""
+
+    def __init__(self, results, name):
+        self.results = results
+        self.name = name
+        self.row = {}
+
+    def __enter__(self):
+        reset_peak_rss()
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.seconds = time.perf_counter() - self.t0
+        if exc[0] is None:
+            self.row = {'seconds': round(self.seconds, 3), **self.row, 'peak_rss_mb': peak_rss_mb()}
+            self.results[self.name] = self.row
+
+    def rate(self, seconds=None, **counts):
+        """counts(files / chunks / mb)와 초당 처리량 기록"""
+        seconds = seconds or self.seconds or 1e-9
+        for key, value in counts.items():
+            self.row[key] = round(value, 2) if isinstance(value, float) else value
+            self.row[f'{key}_per_s'] = round(value / seconds, 1)
+
+
+# =============================================
+# 단계
+# =============================================
+
+def _mb(n):
+    return n / 1e6
+
+
+def bench_parse(files):
+    """형식별 파싱 -> ({확장자: 지표}, [(파일 경로, 청크)])"""
+    by_ext = {}
+    parsed = []
+    for ext in sorted({Path(e.path).suffix.lower() for e in files}):
+        group = [e for e in files if Path(e.path).suffix.lower() == ext]
+        chunks = 0
+        t0 = time.perf_counter()
+        for entry in group:
+            for chunk in complete_chunks(indexer.PARSERS[ext](entry.path)):
+                parsed.append((entry, chunk))
+                chunks += 1
+        seconds = time.perf_counter() - t0
+        mb = _mb(sum(e.size for e in group))
+        by_ext[ext.lstrip('.')] = {
+            'files': len(group), 'chunks': chunks, 'mb': round(mb, 2), 'seconds': round(seconds, 3),
+            'files_per_s': round(len(group) / seconds, 1), 'chunks_per_s': round(chunks / seconds, 1),
+            'mb_per_s': round(mb / seconds, 2),
+        }
+    return by_ext, parsed
+
+
+def tag_chunks(parsed):
+    """iter_file_chunks와 같은 메타데이터로 태깅한 업로드용 청크 목록"""
+    tagged = []
+    for i, (entry, c) in enumerate(parsed):
+        chunk = {
+            'chunk_id': f'bench-{i}',
+            'file_path': indexer.server_path(entry.rel_path),
+            'file_type': Path(entry.path).suffix.lstrip('.'),
+            'doc_title': Path(entry.path).stem,
+            'location_type': c['location_type'],
+            'location_value': c['location_value'],
+            'location_detail': c['location_detail'],
+            'text': c['text'],
+        }
+        tagged.append(indexer.auto_tag_chunk(chunk, entry.rel_path))
+    return tagged
+
+
+def upload(url, chunks):
+    pipeline = UploadPipeline(WikiClient(url), UPLOAD_IN_FLIGHT)
+    stats = new_upload_stats()
+    for i in range(0, len(chunks), BATCH_SIZE):
+        pipeline.submit(chunks[i:i + BATCH_SIZE], lambda s: merge_upload_stats(stats, s))
+    pipeline.join()
+    return stats
+
+
+def index_drive(url, root, db_path, workers):
+    """빈 상태 DB로 전체 인덱싱 실행 (진행 출력은 버림). run 집계 반환"""
+    indexer.WIKI_API_URL = url
+    indexer.DRIVE_ROOT = root
+    indexer.PARSE_CACHE_PATH = ''
+    indexer._client = indexer._pipeline = indexer._parse_cache = None
+    state = StateStore(db_path)
+    indexer.set_doc_freq(state.doc_freq)
+    run = indexer.new_run_stats()
+    with contextlib.redirect_stdout(io.StringIO()):
+        files = indexer.scan_files(root)
+        to_index, _, _ = indexer.plan_changes(state, files)
+        if workers > 1:
+            indexer.index_files_parallel(state, to_index, workers, run)
+        else:
+            indexer.index_files_serial(state, to_index, run)
+        indexer.generate_embeddings()
+    state.close()
+    return run, len(to_index), sum(e.size for e in to_index)
+
+
+# =============================================
+# 결과 저장 / 비교
+# =============================================
+
+def _git_version():
+    try:
+        out = subprocess.run(['git', 'describe', '--always', '--dirty'], cwd=os.path.dirname(INDEXER_DIR),
+                             capture_output=True, text=True, timeout=10)
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def _throughputs(stages):
+    """비교 대상 지표 {'parse.pdf.chunks_per_s': 값, ...}"""
+    out = {}
+    for name, row in stages.items():
+        if name == 'parse':
+            for ext, sub in row['by_type'].items():
+                out.update({f'parse.{ext}.{k}': v for k, v in sub.items() if k.endswith('_per_s')})
+            row = {k: v for k, v in row.items() if k != 'by_type'}
+        out.update({f'{name}.{k}': v for k, v in row.items() if k.endswith('_per_s')})
+    return out
+
+
+def compare(old, new, tolerance):
+    """이전 결과 대비 처리량 변화 출력. 떨어진 지표 수 반환"""
+    before, after = _throughputs(old['stages']), _throughputs(new['stages'])
+    print(f"\n[COMPARE] {old['meta'].get('version')} -> {new['meta'].get('version')} "
+          f"(regression: >{tolerance:.0%} slower)")
+    regressions = 0
+    for key in sorted(before.keys() & after.keys()):
+        if not before[key]:
+            continue
+        change = after[key] / before[key] - 1
+        flag = ''
+        if change < -tolerance:
+            flag = '  REGRESSION'
+            regressions += 1
+        print(f"  {key:<32} {before[key]:>10} -> {after[key]:>10} ({change:+.0%}){flag}")
+    return regressions
+
+
+# =============================================
+# main
+# =============================================
+
+def main():
+    parser = argparse.ArgumentParser(description='Indexer per-stage throughput benchmark')
+    parser.add_argument('--scale', type=float, default=1.0, help='픽스처 규모 (1.0 = 80개 파일)')
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--fixtures', help='픽스처 폴더 (없으면 생성, 있으면 재사용). 기본: 임시 폴더')
+    parser.add_argument('--workers', type=int, default=1, help='index 단계의 --workers')
+    parser.add_argument('--latency', type=float, default=0.0, help='대역 서버 요청당 지연 (초)')
+    parser.add_argument('--out', help='결과 JSON 저장 경로')
+    parser.add_argument('--compare', help='비교할 이전 결과 JSON')
+    parser.add_argument('--tolerance', type=float, default=0.1, help='회귀로 표시할 처리량 감소 비율')
+    parser.add_argument('--json', action='store_true', help='결과를 JSON으로 출력')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = args.fixtures or os.path.join(tmp, 'drive')
+        if not os.path.isdir(root) or not os.listdir(root):
+            t0 = time.perf_counter()
+            counts = make_drive(root, args.scale, args.seed)
+            print(f"[FIXTURES] {sum(counts.values())} files generated in {time.perf_counter() - t0:.1f}s -> {root}",
+                  file=sys.stderr)
+
+        stages = {}
+        with Stage(stages, 'scan') as s:
+            files = indexer.scan_files(root)
+        s.rate(files=len(files))
+        total_mb = _mb(sum(e.size for e in files))
+
+        with Stage(stages, 'hash') as s:
+            for entry in files:
+                indexer.file_hash(entry.path, entry.size)
+        s.rate(files=len(files), mb=total_mb)
+
+        with Stage(stages, 'parse') as s:
+            by_type, parsed = bench_parse(files)
+        s.rate(files=len(files), chunks=len(parsed), mb=total_mb)
+        s.row['by_type'] = by_type
+
+        with Stage(stages, 'tag') as s:
+            tagged = tag_chunks(parsed)
+        s.rate(chunks=len(tagged), mb=_mb(sum(len(c['text'].encode('utf-8')) for c in tagged)))
+        del parsed
+
+        with StubServer(args.latency) as server:
+            with Stage(stages, 'upload') as s:
+                stats = upload(server.url, tagged)
+            s.rate(chunks=stats['inserted'], mb=_mb(server.bytes_received))
+        del tagged
+
+        with StubServer(args.latency) as server:
+            with Stage(stages, 'index') as s:
+                run, n_files, n_bytes = index_drive(server.url, root, os.path.join(tmp, 'state.db'), args.workers)
+            s.rate(files=n_files, chunks=run['chunks'], mb=_mb(n_bytes))
+            s.row['errors'] = run['errors']
+
+    results = {
+        'meta': {
+            'version': _git_version(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'parser_version': indexer.PARSER_VERSION,
+            'scale': args.scale, 'seed': args.seed, 'workers': args.workers, 'latency_s': args.latency,
+            'files': len(files), 'mb': round(total_mb, 2),
+            'files_by_type': dict(Counter(Path(e.path).suffix.lstrip('.') for e in files)),
+        },
+        'stages': stages,
+    }
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+    else:
+        meta = results['meta']
+        print(f"[INDEXER] {meta['files']} files, {meta['mb']}MB (scale {args.scale}, {args.workers} workers, "
+              f"latency {args.latency * 1000:.0f}ms)  version {meta['version']}")
+        for name, row in stages.items():
+            rates = '  '.join(f"{row[k]:>9} {k[:-6].replace('mb', 'MB')}/s" for k in row if k.endswith('_per_s'))
+            print(f"  {name:<7} {row['seconds']:>8.2f}s  {rates}   peak RSS {row['peak_rss_mb']}MB")
+            for ext, sub in row.get('by_type', {}).items():
+                print(f"    {ext:<6} {sub['files']:>4} files {sub['chunks']:>6} chunks  "
+                      f"{sub['files_per_s']:>7} files/s {sub['chunks_per_s']:>9} chunks/s {sub['mb_per_s']:>7} MB/s")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            old = json.load(f)
+        if compare(old, results, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
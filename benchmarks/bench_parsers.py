@@ -0,0 +1,311 @@
+"""
+문서 파서 벤치마크 (indexer.PARSERS)
+====================================
+같은 파일을 이전 파서와 현재 파서로 읽어 처리량 / 최대 메모리를 비교하고 결과가 같은지 확인합니다.
+
+  - pptx: python-pptx 객체 모델(_pptx_slides_object_model) vs 슬라이드 XML 스트리밍(ooxml.pptx_slides)
+          텍스트 위주 발표자료와 슬라이드마다 큰 이미지가 있는 발표자료 두 종류
+  - docx: 5문단 고정 분할(doc.paragraphs 반복 접근) vs document.xml 한 번 스트리밍 + 제목 기준 분할
+          (출력 형식이 달라서 결과 비교 대신 청크 수 / 평균 길이 / 표 텍스트 포함 여부)
+  - csv:  인코딩마다 파일 전체를 다시 읽는 재시도 루프 vs 앞뒤 표본으로 한 번 판단 후 한 번 읽기(csvfile)
+          공공데이터 형태의 utf-8 / cp949 파일, 뒤쪽에만 한글이 있는 cp949 파일 (이전 파서는 행 중복)
+
+메모리는 tracemalloc 최대값 (Python 할당만, 파일 크기와 비교용)입니다.
+
+사용법 (저장소 루트에서):
+  python -m benchmarks.bench_parsers
+  python -m benchmarks.bench_parsers --slides 100 400 --image-kb 2000 --repeat 3
+  python -m benchmarks.bench_parsers --formats docx --paragraphs 2000 8000
+  python -m benchmarks.bench_parsers --formats csv --csv-mb 300 --repeat 1   # 수백 MB 공공데이터 규모
+"""
+
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks import INDEXER_DIR  # noqa: F401  (sys.path 설정)
+from benchmarks.fixtures import TextGenerator
+import indexer
+from ooxml import pptx_slides
+from config import DOCX_CHUNK_CHARS
+
+
+def _measure(fn, repeat):
+    """(최소 시간, tracemalloc 최대 바이트, 결과)"""
+    result = fn()           # 디스크 캐시 적재 + 결과 확인용
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best, peak, result
+
+
+def _compare(path, units, old, new, repeat):
+    size = os.path.getsize(path)
+    row = {'file_mb': round(size / 1e6, 2), 'units': units}
+    results = {}
+    for name, fn in (('old', old), ('new', new)):
+        seconds, peak, results[name] = _measure(fn, repeat)
+        row[name] = {'seconds': round(seconds, 3), 'units_per_s': round(units / seconds, 1),
+                     'mb_per_s': round(size / seconds / 1e6, 1), 'peak_mb': round(peak / 1e6, 1)}
+    row['speedup'] = round(row['old']['seconds'] / row['new']['seconds'], 1)
+    row['identical'] = results['old'] == results['new']
+    row['results'] = results
+    return row
+
+
+# =============================================
+# PPTX
+# =============================================
+
+def _png(path, rng, kb):
+    """잡음 PNG (압축이 거의 안 되어 kb 크기에 가까움)"""
+    import fitz
+    side = max(8, int((kb * 1024 / 3) ** 0.5))
+    pix = fitz.Pixmap(fitz.csRGB, side, side, rng.randbytes(side * side * 3), False)
+    pix.save(path)
+
+
+def write_deck(path, slides, image_kb, seed, tmp):
+    from pptx import Presentation
+    from pptx.util import Inches
+    rng = random.Random(seed)
+    text = TextGenerator(rng)
+    prs = Presentation()
+    for i in range(slides):
+        slide = prs.slides.add_slide(prs.slide_layouts[1])
+        slide.shapes.title.text = text.words(4)
+        slide.placeholders[1].text = '\n'.join(text.sentence() for _ in range(rng.randint(3, 8)))
+        if i % 4 == 1:
+            table = slide.shapes.add_table(6, 4, Inches(0.5), Inches(4.5), Inches(9), Inches(2)).table
+            for row in table.rows:
+                for cell in row.cells:
+                    cell.text = text.words(2)
+        if image_kb:
+            image = os.path.join(tmp, 'slide.png')
+            _png(image, rng, image_kb)      # 슬라이드마다 다른 이미지 (같은 이미지는 파트 하나로 합쳐짐)
+            slide.shapes.add_picture(image, Inches(6), Inches(1), Inches(3), Inches(3))
+    prs.save(path)
+
+
+def bench_pptx(tmp, args):
+    rows = []
+    for slides in args.slides:
+        for image_kb in (0, args.image_kb):
+            path = os.path.join(tmp, f'deck-{slides}-{image_kb}.pptx')
+            write_deck(path, slides, image_kb, args.seed, tmp)
+            row = _compare(path, slides,
+                           lambda: list(indexer._pptx_slides_object_model(path)),
+                           lambda: list(pptx_slides(path)), args.repeat)
+            del row['results']
+            row['case'] = f"{slides} slides, {'images ' + str(image_kb) + 'KB' if image_kb else 'text only'}"
+            rows.append(row)
+    return rows
+
+
+# =============================================
+# DOCX
+# =============================================
+
+def write_report(path, paragraphs, seed):
+    """제목 / 짧은 줄 / 긴 문단 / 표가 섞인 보고서"""
+    from docx import Document
+    rng = random.Random(seed)
+    text = TextGenerator(rng)
+    doc = Document()
+    doc.add_heading(text.words(4), 0)
+    written = 0
+    while written < paragraphs:
+        doc.add_heading(text.words(3), 1)
+        for _ in range(rng.randint(2, 5)):
+            doc.add_heading(text.words(3), 2)
+            for _ in range(rng.randint(4, 20)):
+                if rng.random() < 0.4:
+                    doc.add_paragraph(text.words(rng.randint(2, 6)), style='List Bullet')
+                else:
+                    doc.add_paragraph(' '.join(text.sentence() for _ in range(rng.randint(1, 6))))
+                written += 1
+            if rng.random() < 0.3:
+                table = doc.add_table(rows=rng.randint(3, 8), cols=4)
+                for row in table.rows:
+                    for cell in row.cells:
+                        cell.text = text.words(2)
+    doc.save(path)
+
+
+def _docx_five_paragraphs(filepath):
+    """이전 parse_docx (5문단마다 분할, 반복마다 doc.paragraphs를 다시 만듦, 표 제외)"""
+    from docx import Document
+    doc = Document(filepath)
+    current_text = []
+    para_start = 1
+    for i, para in enumerate(doc.paragraphs, 1):
+        text = para.text.strip()
+        if text:
+            current_text.append(text)
+        if len(current_text) >= 5 or (i == len(doc.paragraphs) and current_text):
+            yield {
+                'location_type': 'page',
+                'location_value': str(para_start),
+                'location_detail': f'Paragraphs {para_start}-{i}',
+                'text': '\n'.join(current_text)
+            }
+            current_text = []
+            para_start = i + 1
+
+
+def _chunk_stats(chunks, marker=None):
+    sizes = [len(c['text']) for c in chunks]
+    stats = {'chunks': len(chunks), 'avg_chars': round(sum(sizes) / max(len(sizes), 1)),
+             'max_chars': max(sizes, default=0)}
+    if marker:
+        stats['tables'] = any(marker in c['text'] for c in chunks)
+    return stats
+
+
+def bench_docx(tmp, args):
+    rows = []
+    for paragraphs in args.paragraphs:
+        path = os.path.join(tmp, f'report-{paragraphs}.docx')
+        write_report(path, paragraphs, args.seed)
+        row = _compare(path, paragraphs,
+                       lambda: list(_docx_five_paragraphs(path)),
+                       lambda: list(indexer.parse_docx(path)), args.repeat)
+        results = row.pop('results')
+        row['identical'] = None
+        row['case'] = f'{paragraphs} paragraphs'
+        row['chunks'] = {name: _chunk_stats(chunks, ' | ') for name, chunks in results.items()}
+        rows.append(row)
+    return rows
+
+
+# =============================================
+# CSV
+# =============================================
+
+SIDO = ['서울특별시', '부산광역시', '대구광역시', '인천광역시', '광주광역시', '대전광역시', '경기도', '강원특별자치도']
+GU = ['중구', '동구', '서구', '남구', '북구', '강남구', '수성구', '해운대구', '수원시', '춘천시']
+
+
+def write_public_csv(path, mb, encoding, korean_from, seed):
+    """공공데이터 형태 CSV (mb MB 전후). korean_from(0~1) 이전 행은 주소를 영문으로"""
+    rng = random.Random(seed)
+    target = int(mb * 1e6)
+    header = '연번,시도,시군구,도로명주소,위도,경도,측정값,기준일자\n' if not korean_from else 'no,sido,sigungu,road,lat,lon,value,date\n'
+    with open(path, 'w', encoding=encoding, newline='') as f:
+        f.write(header)
+        written = len(header.encode(encoding))
+        n = 0
+        while written < target:
+            n += 1
+            if written >= korean_from * target:
+                addr = f'{rng.choice(SIDO)},{rng.choice(GU)},"{rng.choice(GU)} 중앙로{rng.randint(1, 300)}번길 {rng.randint(1, 99)}"'
+            else:
+                addr = f'Seoul,Jung-gu,"{rng.randint(1, 300)} Jungang-ro"'
+            line = (f'{n},{addr},{rng.uniform(33, 38):.6f},{rng.uniform(126, 130):.6f},'
+                    f'{rng.randint(0, 99999)},2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}\r\n')
+            f.write(line)
+            written += len(line.encode(encoding))
+    return n
+
+
+def _csv_retry_loop(filepath):
+    """이전 parse_csv (인코딩마다 처음부터 다시 읽음, 실패 전에 내보낸 행은 그대로 남음)"""
+    import csv
+    for enc in ['utf-8', 'cp949', 'euc-kr', 'latin-1']:
+        try:
+            with open(filepath, 'r', encoding=enc) as f:
+                def csv_rows():
+                    for i, row in enumerate(csv.reader(f), 1):
+                        cells = [c.strip() for c in row if c.strip()]
+                        if cells:
+                            yield i, ','.join(cells)
+
+                for start, end, text, n_rows, row_bytes in indexer.group_rows(csv_rows()):
+                    yield {
+                        'location_type': 'row',
+                        'location_value': str(start),
+                        'location_detail': indexer._row_range(start, end, sep=' '),
+                        'text': text,
+                        'rows': n_rows,
+                        'row_bytes': row_bytes,
+                    }
+            break
+        except (UnicodeDecodeError, UnicodeError):
+            continue
+
+
+def bench_csv(tmp, args):
+    rows = []
+    for mb in args.csv_mb:
+        for encoding, korean_from in (('utf-8', 0), ('cp949', 0), ('cp949', 0.7)):
+            path = os.path.join(tmp, f'public-{mb}-{encoding}-{korean_from}.csv')
+            n = write_public_csv(path, mb, encoding, korean_from, args.seed)
+            row = _compare(path, n,
+                           lambda: list(_csv_retry_loop(path)),
+                           lambda: list(indexer.parse_csv(path)), args.repeat)
+            results = row.pop('results')
+            row['case'] = f"{mb}MB {encoding}{', hangul after ' + format(korean_from, '.0%') if korean_from else ''}"
+            row['chunks'] = {name: _chunk_stats(chunks) for name, chunks in results.items()}
+            rows.append(row)
+            os.remove(path)
+    return rows
+
+
+BENCHES = {'pptx': (bench_pptx, 'slides'), 'docx': (bench_docx, 'paragraphs'), 'csv': (bench_csv, 'rows')}
+
+
+def _verdict(row):
+    if row['identical'] or 'chunks' not in row:
+        return 'identical' if row['identical'] else 'OUTPUT DIFFERS'
+    old, new = row['chunks']['old'], row['chunks']['new']
+    verdict = '' if row['identical'] is None else 'OUTPUT DIFFERS: '
+    verdict += f"chunks {old['chunks']} -> {new['chunks']}, avg {old['avg_chars']} -> {new['avg_chars']} chars"
+    if 'tables' in new:
+        verdict += f" (max {new['max_chars']}/{DOCX_CHUNK_CHARS}), tables {old['tables']} -> {new['tables']}"
+    return verdict
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Document parser benchmark (old vs current parser)')
+    parser.add_argument('--formats', nargs='+', choices=list(BENCHES), default=list(BENCHES))
+    parser.add_argument('--slides', type=int, nargs='+', default=[50, 200], help='pptx 슬라이드 수')
+    parser.add_argument('--image-kb', type=int, default=500, help='pptx 슬라이드당 이미지 크기')
+    parser.add_argument('--paragraphs', type=int, nargs='+', default=[500, 2000], help='docx 본문 문단 수')
+    parser.add_argument('--csv-mb', type=float, nargs='+', default=[20], help='csv 파일 크기 (MB)')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--json', action='store_true', help='결과를 JSON으로 출력')
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for fmt in args.formats:
+            results[fmt] = BENCHES[fmt][0](tmp, args)
+
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+        return
+    for fmt, rows in results.items():
+        unit = BENCHES[fmt][1]
+        print(f"[{fmt.upper()}] old -> new ({unit}/s, MB/s of file, peak traced memory)")
+        for row in rows:
+            old, new = row['old'], row['new']
+            print(f"  {row['case']:<36} {row['file_mb']:>7.1f}MB  "
+                  f"{old['units_per_s']:>9} -> {new['units_per_s']:>9} {unit}/s ({row['speedup']}x)  "
+                  f"{old['mb_per_s']:>7} -> {new['mb_per_s']:>7} MB/s  "
+                  f"peak {old['peak_mb']:>6} -> {new['peak_mb']:>6}MB  "
+                  f"{_verdict(row)}")
+
+
+if __name__ == '__main__':
+    main()
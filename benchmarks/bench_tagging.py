@@ -0,0 +1,116 @@
+"""
+자동 태깅 벤치마크
+==================
+v3.0 구현(legacy_tagging)과 현재 indexer.py 구현을 같은 코퍼스에 돌려
+결과가 완전히 같은지 확인한 뒤 청크당 시간을 비교합니다.
+auto_tag_chunk는 한 번의 패스로 태깅하는 tag_text를 거치며, 필드 순서까지 비교합니다.
+
+사용법 (저장소 루트에서):
+  python -m benchmarks.bench_tagging
+  python -m benchmarks.bench_tagging --chunks 5000 --repeat 5
+"""
+
+import argparse
+import json
+import time
+
+from benchmarks import legacy_tagging as legacy
+from benchmarks.corpus import make_chunks
+import indexer
+
+
+def _best_of(fn, corpus, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for text, path in corpus:
+            fn(text, path)
+        best = min(best, time.perf_counter() - t0)
+    return best / len(corpus) * 1e6
+
+
+CASES = {
+    'extract_tags': (
+        lambda t, p: legacy.extract_tags(t),
+        lambda t, p: indexer.extract_tags(t),
+    ),
+    'classify_category': (
+        lambda t, p: legacy.classify_category(t, p),
+        lambda t, p: indexer.classify_category(t, p),
+    ),
+    'detect_doc_stage': (
+        lambda t, p: legacy.detect_doc_stage(p, t),
+        lambda t, p: indexer.detect_doc_stage(p, t),
+    ),
+    'detect_org': (
+        lambda t, p: legacy.detect_org(t, p),
+        lambda t, p: indexer.detect_org(t, p),
+    ),
+    'extract_author': (
+        lambda t, p: legacy.extract_author(t, p),
+        lambda t, p: indexer.extract_author(t, p),
+    ),
+    'extract_year': (
+        lambda t, p: legacy.extract_year(t, p),
+        lambda t, p: indexer.extract_year(t, p),
+    ),
+    'calc_importance': (
+        lambda t, p: legacy.calc_importance(t, '최종보고', p),
+        lambda t, p: indexer.calc_importance(t, '최종보고', p),
+    ),
+    # 필드 순서까지 비교 (업로드 JSON 동일)
+    'auto_tag_chunk': (
+        lambda t, p: list(legacy.auto_tag_chunk({'text': t}, p).items()),
+        lambda t, p: list(indexer.auto_tag_chunk({'text': t}, p).items()),
+    ),
+}
+
+
+def verify(corpus):
+    """모든 청크에서 기존 구현과 결과가 같은지 확인. 불일치 목록 반환"""
+    mismatches = []
+    for name, (old, new) in CASES.items():
+        for text, path in corpus:
+            a, b = old(text, path), new(text, path)
+            if a != b:
+                mismatches.append({'case': name, 'path': path, 'legacy': a, 'current': b})
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Auto-tagging benchmark')
+    parser.add_argument('--chunks', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--json', action='store_true', help='결과를 JSON으로 출력')
+    args = parser.parse_args()
+
+    corpus = make_chunks(args.chunks, args.seed)
+    mismatches = verify(corpus)
+
+    results = {'chunks': len(corpus), 'mismatches': len(mismatches), 'cases': {}}
+    for name, (old, new) in CASES.items():
+        old_us = _best_of(old, corpus, args.repeat)
+        new_us = _best_of(new, corpus, args.repeat)
+        results['cases'][name] = {
+            'legacy_us_per_chunk': round(old_us, 2),
+            'current_us_per_chunk': round(new_us, 2),
+            'speedup': round(old_us / new_us, 2) if new_us else None,
+        }
+
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+    else:
+        print(f"[CORPUS] {len(corpus)} chunks (seed={args.seed})")
+        print(f"[VERIFY] {'OK' if not mismatches else f'{len(mismatches)} mismatches'}")
+        for m in mismatches[:5]:
+            print(f"  - {m['case']} {m['path']}: {m['legacy']!r} != {m['current']!r}")
+        print(f"  {'case':<20} {'legacy(us)':>11} {'current(us)':>12} {'speedup':>8}")
+        for name, r in results['cases'].items():
+            print(f"  {name:<20} {r['legacy_us_per_chunk']:>11} {r['current_us_per_chunk']:>12} {r['speedup']:>7}x")
+
+    raise SystemExit(1 if mismatches else 0)
+
+
+if __name__ == '__main__':
+    main()
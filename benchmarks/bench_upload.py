@@ -0,0 +1,105 @@
+"""
+업로드 전송 계층 벤치마크 (uploader.WikiClient vs async_client.UploadPipeline)
+==============================================================================
+대역 서버(stub_server)에 왕복 지연을 주고 같은 청크를 배치 단위로 올리며 처리량을 비교합니다.
+
+  - sync:     WikiClient.upload_chunks, 배치를 하나씩 (이전 기본 모드)
+  - pipeline: UploadPipeline, 동시 요청 UPLOAD_IN_FLIGHT개 (429를 받으면 창을 줄임)
+
+지연이 커질수록 sync는 처리량이 지연에 반비례해 떨어지고 pipeline은 동시 요청 수만큼 버텨야 합니다.
+
+사용법 (저장소 루트에서):
+  python -m benchmarks.bench_upload
+  python -m benchmarks.bench_upload --chunks 5000 --latency 0.02 0.1 0.3 --in-flight 16 --throttle 0.1
+"""
+
+import argparse
+import json
+import threading
+import time
+
+from benchmarks import INDEXER_DIR  # noqa: F401  (sys.path 설정)
+from benchmarks.corpus import make_chunks
+from benchmarks.stub_server import StubServer
+from async_client import UploadPipeline
+from config import BATCH_SIZE, UPLOAD_IN_FLIGHT
+from uploader import WikiClient, merge_upload_stats, new_upload_stats
+
+
+def _chunks(n, seed):
+    return [{'chunk_id': f'c{i:06d}', 'file_path': path, 'text': text}
+            for i, (text, path) in enumerate(make_chunks(n, seed))]
+
+
+def _batches(chunks):
+    return [chunks[i:i + BATCH_SIZE] for i in range(0, len(chunks), BATCH_SIZE)]
+
+
+def run_sync(url, chunks):
+    client = WikiClient(url)
+    stats = new_upload_stats()
+    for batch in _batches(chunks):
+        client.upload_chunks(batch, stats)
+    return stats
+
+
+def run_pipeline(url, chunks, in_flight):
+    pipeline = UploadPipeline(WikiClient(url), in_flight)
+    stats = new_upload_stats()
+    lock = threading.Lock()
+
+    def done(batch_stats):
+        with lock:
+            merge_upload_stats(stats, batch_stats)
+
+    for batch in _batches(chunks):
+        pipeline.submit(batch, done)
+    pipeline.join()
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Upload transport benchmark')
+    parser.add_argument('--chunks', type=int, default=2000)
+    parser.add_argument('--latency', type=float, nargs='+', default=[0.02, 0.1], help='요청당 지연 (초)')
+    parser.add_argument('--in-flight', type=int, default=UPLOAD_IN_FLIGHT)
+    parser.add_argument('--throttle', type=float, default=0.0, help='/api/chunks 429 응답 확률')
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--json', action='store_true', help='결과를 JSON으로 출력')
+    args = parser.parse_args()
+
+    chunks = _chunks(args.chunks, args.seed)
+    results = []
+    for latency in args.latency:
+        row = {'latency_s': latency}
+        for name, fn in (('sync', lambda url: run_sync(url, chunks)),
+                         ('pipeline', lambda url: run_pipeline(url, chunks, args.in_flight))):
+            with StubServer(latency, args.throttle, args.seed) as server:
+                t0 = time.perf_counter()
+                stats = fn(server.url)
+                elapsed = time.perf_counter() - t0
+                row[name] = {
+                    'seconds': round(elapsed, 2),
+                    'chunks_per_s': round(stats['inserted'] / elapsed, 1),
+                    'inserted': stats['inserted'],
+                    'failed': stats['failed'],
+                    'retries': stats['retries'],
+                    'throttled': server.throttled,
+                }
+        results.append(row)
+
+    if args.json:
+        print(json.dumps({'chunks': len(chunks), 'batch_size': BATCH_SIZE, 'in_flight': args.in_flight,
+                          'throttle': args.throttle, 'results': results}, ensure_ascii=False, indent=2))
+        return
+    print(f"[UPLOAD] {len(chunks)} chunks in batches of {BATCH_SIZE}, "
+          f"{args.in_flight} in flight, throttle {args.throttle:.0%}")
+    for row in results:
+        sync, pipe = row['sync'], row['pipeline']
+        print(f"  latency {row['latency_s'] * 1000:>5.0f}ms: sync {sync['chunks_per_s']:>8} chunks/s   "
+              f"pipeline {pipe['chunks_per_s']:>8} chunks/s ({sync['seconds'] / pipe['seconds']:.1f}x, "
+              f"{pipe['retries']} retries, {pipe['failed']} failed)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+"""
+오프라인 벡터 인덱스 벤치마크
+=============================
+코퍼스 임베딩으로 vector_index 파일을 만들고 질의당 지연 시간을 비교합니다.
+
+  - server: 서버 /api/semantic-search 방식 (행마다 JSON.parse + 코사인 루프)을 Python으로 재현
+  - flat:   인덱스 전체 탐색 (int8 행렬 곱)
+  - ivf:    IVF 목록 일부만 탐색 + flat 대비 recall@k (동점을 고려해 점수 기준)
+
+사용법 (저장소 루트에서):
+  python -m benchmarks.bench_vector_index
+  python -m benchmarks.bench_vector_index --chunks 100000 --lists 300 --n-probe 16
+"""
+
+import argparse
+import json
+import math
+import os
+import tempfile
+import time
+
+from benchmarks import INDEXER_DIR  # noqa: F401  (sys.path 설정)
+from benchmarks.corpus import make_chunks
+import embedding
+from vector_index import VectorIndex, build_index
+
+
+def _rows(texts, vectors, projects):
+    for i, (text, vector) in enumerate(zip(texts, vectors)):
+        yield (f'c{i:07d}', 'pdf', projects[i % len(projects)], '', '2024',
+               embedding.pack_vector(vector, 'f16'))
+
+
+def server_search(json_vectors, query, top_k):
+    """서버 구현 재현: 행마다 JSON 파싱 + 코사인 유사도"""
+    scored = []
+    for i, stored in enumerate(json_vectors):
+        vec = json.loads(stored)
+        dot = sum(a * b for a, b in zip(query, vec))
+        na = math.sqrt(sum(a * a for a in query))
+        nb = math.sqrt(sum(b * b for b in vec))
+        if na and nb:
+            scored.append((dot / (na * nb), i))
+    scored.sort(reverse=True)
+    return scored[:top_k]
+
+
+def _time(fn, queries):
+    t0 = time.perf_counter()
+    results = [fn(q) for q in queries]
+    return (time.perf_counter() - t0) / len(queries) * 1e3, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Offline vector index benchmark')
+    parser.add_argument('--chunks', type=int, default=20000)
+    parser.add_argument('--queries', type=int, default=50)
+    parser.add_argument('--top-k', type=int, default=10)
+    parser.add_argument('--lists', type=int, default=0, help='IVF 목록 수 (0: sqrt(chunks))')
+    parser.add_argument('--n-probe', type=int, default=8)
+    parser.add_argument('--server-rows', type=int, default=2000,
+                        help='server 방식은 느리므로 이 행 수로 측정 후 전체 행 수로 환산')
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--json', action='store_true', help='결과를 JSON으로 출력')
+    args = parser.parse_args()
+
+    import numpy as np
+
+    corpus = make_chunks(args.chunks, args.seed)
+    texts = [f'{path} {text}' for text, path in corpus]
+    vectors = embedding.encode_vectors(texts)
+    projects = ['P1/sub', 'P2', 'P3']
+    queries = [text[:80] for text, _ in make_chunks(args.queries, args.seed + 1)]
+    lists = args.lists or int(math.sqrt(args.chunks))
+
+    results = {'chunks': args.chunks, 'queries': len(queries), 'top_k': args.top_k}
+    with tempfile.TemporaryDirectory() as tmp:
+        flat_path = os.path.join(tmp, 'flat.kwvi')
+        ivf_path = os.path.join(tmp, 'ivf.kwvi')
+
+        t0 = time.perf_counter()
+        build_index(_rows(texts, vectors, projects), len(texts), flat_path, n_lists=1)
+        results['build_flat_s'] = round(time.perf_counter() - t0, 2)
+        t0 = time.perf_counter()
+        build_index(_rows(texts, vectors, projects), len(texts), ivf_path, n_lists=lists)
+        results['build_ivf_s'] = round(time.perf_counter() - t0, 2)
+        results['index_bytes'] = os.path.getsize(flat_path)
+
+        json_vectors = [json.dumps(v) for v in vectors[:args.server_rows].tolist()]
+        server_ms, _ = _time(lambda q: server_search(json_vectors, embedding.encode_vectors([q])[0], args.top_k),
+                             queries[:5])
+        results['server_ms_per_query'] = round(server_ms * args.chunks / len(json_vectors), 2)
+
+        with VectorIndex.open(flat_path) as flat, VectorIndex.open(ivf_path) as ivf:
+            flat_ms, exact = _time(lambda q: flat.search(q, args.top_k), queries)
+            ivf_ms, approx = _time(lambda q: ivf.search(q, args.top_k, n_probe=args.n_probe), queries)
+            filt_ms, _ = _time(lambda q: flat.search(q, args.top_k, project='P2', year=2024), queries)
+            # 합성 코퍼스는 점수 동점이 많으므로 ID 대신 점수로 비교 (k번째 정확 점수 이상이면 적중)
+            recall = np.mean([
+                sum(h.score >= e[-1].score - 1e-6 for h in a) / len(e)
+                for a, e in zip(approx, exact) if e
+            ])
+            results.update({
+                'flat_ms_per_query': round(flat_ms, 3),
+                'flat_filtered_ms_per_query': round(filt_ms, 3),
+                'ivf_lists': ivf.n_lists,
+                'ivf_n_probe': args.n_probe,
+                'ivf_ms_per_query': round(ivf_ms, 3),
+                'ivf_recall_at_k': round(float(recall), 3),
+            })
+
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+        return
+    print(f"[CORPUS] {args.chunks} chunks, {len(queries)} queries, top_k={args.top_k}")
+    print(f"  index file: {results['index_bytes'] / 1e6:.1f}MB "
+          f"(build flat {results['build_flat_s']}s, ivf {results['build_ivf_s']}s)")
+    print(f"  server (JSON.parse + cosine, est.): {results['server_ms_per_query']:>9} ms/query")
+    print(f"  flat:                               {results['flat_ms_per_query']:>9} ms/query")
+    print(f"  flat + project/year prefilter:      {results['flat_filtered_ms_per_query']:>9} ms/query")
+    print(f"  ivf ({results['ivf_lists']} lists, probe {args.n_probe}):"
+          f"{'':<{max(0, 16 - len(str(results['ivf_lists'])) - len(str(args.n_probe)))}}"
+          f"{results['ivf_ms_per_query']:>9} ms/query  recall@{args.top_k} {results['ivf_recall_at_k']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""
+결정적 청크 코퍼스 생성기
+=========================
+태깅 사전의 키워드 + 한국어 일반 어휘 + 대소문자/경계 사례를 섞어
+seed가 같으면 항상 같은 (text, filepath) 목록을 만듭니다.
+"""
+
+import random
+
+from benchmarks import INDEXER_DIR  # noqa: F401  (sys.path 설정)
+from indexer import STOP_WORDS, CATEGORY_KEYWORDS, DOC_STAGE_PATTERNS, ORG_DICT
+
+FILLER = [
+    '현황', '분석', '결과', '보고', '과제', '추진', '방안', '검토', '회의', '의견',
+    '일정', '예산', '인력', '성과', '지표', '평가', '개요', '배경', '목적', '범위',
+    '전략', '비전', '목표', '로드맵', '핵심', '결론', '권고', '단계', '적용', '도입',
+    'KPI', 'Data', 'cloud', 'Platform', 'API', 'dashboard', 'pipeline', 'model',
+]
+
+FOLDERS = [
+    '01. RFP', '02 산출물', '03.최종보고', '04. 중간산출물', '05 조사자료', '06.분석코드',
+    '참고자료', 'archive', '2023_사업', '기타',
+]
+
+AUTHORS = ['수행기관: 한빛컨설팅', '작성: 김민수', '㈜ 데이터랩', '주) 미래연구', '']
+
+# 소문자 변환 시 길이가 바뀌거나 문맥에 따라 바뀌는 문자
+ODD_TEXT = ['İstanbul 데이터', 'ΟΔΟΣ σχέδιο', 'ﬁle straße']
+
+
+def vocabulary():
+    """태깅 사전(주제 키워드, 문서단계 패턴, 기관명) 전체 어휘"""
+    words = [kw for kws in CATEGORY_KEYWORDS.values() for kw in kws]
+    words += [p for ps in DOC_STAGE_PATTERNS.values() for p in ps]
+    words += [p for ps in ORG_DICT.values() for p in ps]
+    return words
+
+
+def _case(rng, word):
+    r = rng.random()
+    if r < 0.15:
+        return word.upper()
+    if r < 0.3:
+        return word.lower()
+    return word
+
+
+def make_chunks(n=2000, seed=7):
+    """[(text, filepath)] 반환"""
+    rng = random.Random(seed)
+    keywords = vocabulary()
+    stop = sorted(STOP_WORDS)
+    chunks = []
+    for i in range(n):
+        size = rng.choice([0, 5, 40, 120, 300, 480, 520, 900, 1500, 3000])
+        words = []
+        length = 0
+        while length < size:
+            r = rng.random()
+            if r < 0.25:
+                word = _case(rng, rng.choice(keywords))
+            elif r < 0.35:
+                word = rng.choice(stop)
+            elif r < 0.37:
+                # 키워드 연속 반복 (겹침 카운트 경계)
+                word = rng.choice(keywords) * rng.randint(2, 3)
+            elif r < 0.38:
+                word = rng.choice(ODD_TEXT)
+            elif r < 0.40:
+                word = str(rng.randint(2015, 2035)) + '년'
+            else:
+                word = rng.choice(FILLER)
+            words.append(word)
+            length += len(word) + 1
+        sep = rng.choice(['\n', '\r\n', ' \n ', ' ', ' ', ' '])
+        text = sep.join(words)
+        if rng.random() < 0.2:
+            text = rng.choice(AUTHORS) + '\n' + text
+        if rng.random() < 0.1:
+            # 빈 줄/공백 줄로 시작 (요약 첫 줄 경계)
+            text = '  \n\t\n' + text
+
+        folder = rng.choice(FOLDERS)
+        name = rng.choice(FILLER) + (('_' + _case(rng, rng.choice(keywords))) if rng.random() < 0.4 else '')
+        ext = rng.choice(['pptx', 'pdf', 'xlsx', 'csv', 'docx', 'ipynb'])
+        filepath = f'/drive/{folder}/{name}_{i}.{ext}'
+        chunks.append((text, filepath))
+    return chunks
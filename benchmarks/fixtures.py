@@ -0,0 +1,161 @@
+"""
+결정적 문서 픽스처 생성기 (가상 Drive 폴더)
+=============================================
+태깅 사전(CATEGORY_KEYWORDS / DOC_STAGE_PATTERNS / ORG_DICT) 어휘로 만든 한국어 컨설팅 문서를
+PARSERS가 지원하는 형식(PPTX / PDF / XLSX / CSV / DOCX / ipynb)으로 씁니다.
+seed가 같으면 파일 목록과 본문이 항상 같습니다 (Office 파일의 zip 시각 등 메타데이터는 다를 수 있음).
+
+  - 폴더: P01 ~ Pnn 프로젝트 아래 corpus.FOLDERS 단계 폴더 (01. RFP, 03.최종보고 ...)
+  - scale 1.0 = 형식별 SCALE_FILES개 (80개 파일, 수천 청크). 페이지 / 행 수도 파일마다 다름
+  - PDF 일부 페이지는 이미지만 (스캔본), CSV 절반은 cp949, XLSX는 시트 2개
+
+사용법 (저장소 루트에서):
+  python -m benchmarks.fixtures /tmp/drive --scale 2     # 생성 후 config.DRIVE_ROOT로 지정해 실행
+"""
+
+import argparse
+import json
+import os
+import random
+
+from benchmarks.corpus import FILLER, FOLDERS, vocabulary
+
+# scale 1.0일 때 형식별 파일 수
+SCALE_FILES = {'.pptx': 15, '.pdf': 15, '.xlsx': 8, '.csv': 10, '.docx': 20, '.ipynb': 12}
+
+STAGE_NAMES = ['제안서', '착수보고', '중간보고', '최종보고', '회의록', '분석자료']
+
+
+class TextGenerator:
+    """seed 고정 문장 생성기"""
+
+    def __init__(self, rng):
+        self.rng = rng
+        self.keywords = vocabulary()
+
+    def words(self, n):
+        rng = self.rng
+        return ' '.join(rng.choice(self.keywords) if rng.random() < 0.3 else rng.choice(FILLER) for _ in range(n))
+
+    def sentence(self, lo=8, hi=24):
+        return self.words(self.rng.randint(lo, hi)) + '.'
+
+    def paragraph(self, sentences=3):
+        return ' '.join(self.sentence() for _ in range(self.rng.randint(1, sentences)))
+
+
+def write_pptx(path, text, rng):
+    from pptx import Presentation
+    from pptx.util import Inches
+    prs = Presentation()
+    for i in range(rng.randint(8, 30)):
+        slide = prs.slides.add_slide(prs.slide_layouts[1])
+        slide.shapes.title.text = text.words(4)
+        slide.placeholders[1].text = '\n'.join(text.sentence() for _ in range(rng.randint(2, 6)))
+        if i % 5 == 2:
+            rows, cols = rng.randint(3, 8), rng.randint(2, 5)
+            table = slide.shapes.add_table(rows, cols, Inches(0.5), Inches(4.5), Inches(9), Inches(2)).table
+            for row in table.rows:
+                for cell in row.cells:
+                    cell.text = text.words(2)
+    prs.save(path)
+
+
+def write_pdf(path, text, rng):
+    import fitz
+    doc = fitz.open()
+    try:
+        for i in range(rng.randint(10, 60)):
+            page = doc.new_page()
+            if rng.random() < 0.1:
+                # 스캔 페이지: 글꼴 없이 이미지만
+                pix = fitz.Pixmap(fitz.csGRAY, fitz.IRect(0, 0, 64, 64), False)
+                pix.clear_with(rng.randint(0, 255))
+                page.insert_image(page.rect, pixmap=pix)
+                continue
+            body = '\n'.join(text.sentence() for _ in range(rng.randint(10, 40)))
+            page.insert_textbox(page.rect + (50, 50, -50, -50), body, fontname='korea', fontsize=9)
+        doc.save(path)
+    finally:
+        doc.close()
+
+
+def write_xlsx(path, text, rng):
+    from openpyxl import Workbook
+    wb = Workbook()
+    for s in range(2):
+        ws = wb.active if s == 0 else wb.create_sheet()
+        ws.title = f'{rng.choice(FILLER)}{s + 1}'
+        ws.append(['구분', '항목', '값', '비고'])
+        for r in range(rng.randint(100, 1500)):
+            ws.append([text.words(1), text.words(3), rng.randint(0, 100000), text.words(rng.randint(0, 6))])
+    wb.save(path)
+
+
+def write_csv(path, text, rng):
+    encoding = 'cp949' if rng.random() < 0.5 else 'utf-8'
+    with open(path, 'w', encoding=encoding, errors='replace', newline='') as f:
+        f.write('연도,기관,지표,값,설명\n')
+        for r in range(rng.randint(200, 3000)):
+            f.write(f'{rng.randint(2019, 2025)},{text.words(1)},{text.words(2)},{rng.random() * 100:.2f},'
+                    f'"{text.words(rng.randint(0, 8))}"\n')
+
+
+def write_docx(path, text, rng):
+    from docx import Document
+    doc = Document()
+    for h in range(rng.randint(3, 10)):
+        doc.add_heading(f'{h + 1}. {text.words(3)}', level=1)
+        for _ in range(rng.randint(3, 15)):
+            doc.add_paragraph(text.paragraph(4))
+    doc.save(path)
+
+
+def write_ipynb(path, text, rng):
+    cells = []
+    for i in range(rng.randint(10, 40)):
+        if i % 3 == 0:
+            cells.append({'cell_type': 'markdown', 'metadata': {}, 'source': [f'## {text.words(4)}\n', text.sentence()]})
+        else:
+            cells.append({'cell_type': 'code', 'metadata': {}, 'execution_count': None, 'outputs': [],
+                          'source': [f'# {text.sentence()}\n', f"df = load('{text.words(1)}.csv')\n",
+                                     "df.groupby('기관').sum()\n"]})
+    nb = {'cells': cells, 'metadata': {}, 'nbformat': 4, 'nbformat_minor': 5}
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(nb, f, ensure_ascii=False)
+
+
+WRITERS = {
+    '.pptx': write_pptx, '.pdf': write_pdf, '.xlsx': write_xlsx,
+    '.csv': write_csv, '.docx': write_docx, '.ipynb': write_ipynb,
+}
+
+
+def make_drive(root, scale=1.0, seed=7):
+    """root 아래에 픽스처 폴더 생성. {확장자: 파일 수} 반환"""
+    rng = random.Random(seed)
+    text = TextGenerator(rng)
+    projects = max(1, round(5 * scale))
+    counts = {}
+    for ext, n in SCALE_FILES.items():
+        counts[ext] = max(1, round(n * scale))
+        for i in range(counts[ext]):
+            folder = os.path.join(root, f'P{rng.randint(1, projects):02d}', rng.choice(FOLDERS))
+            os.makedirs(folder, exist_ok=True)
+            name = f'{rng.choice(STAGE_NAMES)}_{text.words(1)}_{i:03d}{ext}'
+            WRITERS[ext](os.path.join(folder, name), text, rng)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a synthetic Drive folder for benchmarks')
+    parser.add_argument('root')
+    parser.add_argument('--scale', type=float, default=1.0)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+    counts = make_drive(args.root, args.scale, args.seed)
+    print(f"[FIXTURES] {sum(counts.values())} files -> {args.root}  {counts}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,187 @@
+"""
+v3.0 자동 태깅 함수 원본 (비교 기준)
+====================================
+local-indexer/indexer.py의 태깅 함수를 최적화하기 전 구현 그대로 보관합니다.
+사전(STOP_WORDS, CATEGORY_KEYWORDS 등)은 indexer.py의 현재 값을 그대로 사용하므로
+벤치마크는 같은 사전에 대해 구현만 비교합니다.
+"""
+
+import re
+from collections import Counter
+
+from benchmarks import INDEXER_DIR  # noqa: F401  (sys.path 설정)
+from indexer import STOP_WORDS, CATEGORY_KEYWORDS, DOC_STAGE_PATTERNS, ORG_DICT
+
+
+def extract_tags(text, max_tags=8):
+    """TF 기반 키워드 추출 (단순 빈도)"""
+    if not text:
+        return []
+    
+    # 한글+영문 토큰 추출 (2글자 이상)
+    tokens = re.findall(r'[가-힣]{2,}|[A-Za-z]{2,}', text)
+    tokens = [t for t in tokens if t.lower() not in STOP_WORDS and len(t) >= 2]
+    
+    # 빈도 카운트
+    counter = Counter(tokens)
+    
+    # 상위 키워드 반환
+    return [word for word, _ in counter.most_common(max_tags)]
+
+
+def classify_category(text, filepath=''):
+    """텍스트 기반 주제분류"""
+    if not text:
+        return '', ''
+    
+    combined = text + ' ' + filepath
+    scores = {}
+    
+    for cat, keywords in CATEGORY_KEYWORDS.items():
+        score = 0
+        for kw in keywords:
+            count = combined.lower().count(kw.lower())
+            score += count
+        if score > 0:
+            scores[cat] = score
+    
+    if not scores:
+        return '', ''
+    
+    # 최고 점수 카테고리
+    sorted_cats = sorted(scores.items(), key=lambda x: x[1], reverse=True)
+    main_cat = sorted_cats[0][0]
+    sub_cat = sorted_cats[1][0] if len(sorted_cats) > 1 and sorted_cats[1][1] > 2 else ''
+    
+    return main_cat, sub_cat
+
+
+def detect_doc_stage(filepath, text=''):
+    """파일경로 + 텍스트로 문서단계 판별"""
+    combined = filepath + ' ' + (text[:500] if text else '')
+    
+    for stage, patterns in DOC_STAGE_PATTERNS.items():
+        for pat in patterns:
+            if pat.lower() in combined.lower():
+                return stage
+    
+    # 폴더명 기반 추정
+    path_parts = filepath.lower()
+    folder_stage_map = {
+        '01.': 'RFP', '01 ': 'RFP',
+        '02.': '산출물', '02 ': '산출물',
+        '03.': '최종보고', '03 ': '최종보고',
+        '04.': '산출물', '04 ': '산출물',
+        '05.': '조사자료', '05 ': '조사자료',
+        '06.': '분석코드', '06 ': '분석코드',
+    }
+    for prefix, stage in folder_stage_map.items():
+        if prefix in path_parts:
+            return stage
+    
+    return ''
+
+
+def detect_org(text, filepath=''):
+    """발주기관 인식"""
+    combined = text + ' ' + filepath
+    
+    for org_name, patterns in ORG_DICT.items():
+        for pat in patterns:
+            if pat in combined:
+                return org_name
+    
+    return ''
+
+
+def extract_author(text, filepath=''):
+    """작성자/수행기관 추출 (표지 텍스트 패턴)"""
+    # 일반적인 패턴: "수행기관: XXX", "작성: XXX컨설팅"
+    patterns = [
+        r'수행기관[:\s]+([가-힣A-Za-z]+(?:컨설팅|연구원|연구소|주식회사|㈜))',
+        r'작성[:\s]+([가-힣A-Za-z]+)',
+        r'(?:㈜|주\))\s*([가-힣]+)',
+    ]
+    
+    for pat in patterns:
+        m = re.search(pat, text[:1000])
+        if m:
+            return m.group(1).strip()
+    
+    return ''
+
+
+def extract_year(text, filepath=''):
+    """사업연도 추출"""
+    combined = filepath + ' ' + (text[:500] if text else '')
+    
+    # 2020~2029년도 패턴
+    years = re.findall(r'20[2-3]\d', combined)
+    if years:
+        return max(years)  # 가장 최근 연도
+    
+    return ''
+
+
+def calc_importance(text, doc_stage='', filepath=''):
+    """문서 중요도 점수 (0-100)"""
+    score = 50  # 기본
+    
+    # 문서 단계 가중치
+    stage_weight = {
+        '최종보고': 20, '제안서': 15, '산출물': 10,
+        'RFP': 8, '중간보고': 5, '착수보고': 3,
+        '조사자료': 0, '분석코드': -5,
+    }
+    score += stage_weight.get(doc_stage, 0)
+    
+    # 텍스트 길이 가중치 (내용이 풍부할수록)
+    text_len = len(text) if text else 0
+    if text_len > 500:
+        score += 10
+    elif text_len > 200:
+        score += 5
+    
+    # 핵심 키워드 포함 시 가중치
+    important_keywords = ['전략', '비전', '목표', 'KPI', '로드맵', '핵심', '결론', '권고']
+    for kw in important_keywords:
+        if kw in (text or ''):
+            score += 3
+    
+    return min(max(score, 10), 100)  # 10~100 범위
+
+
+def auto_tag_chunk(chunk, filepath):
+    """청크에 자동 메타데이터 태깅 적용"""
+    text = chunk.get('text', '')
+    
+    # Tags
+    chunk['tags'] = extract_tags(text)
+    
+    # Category
+    cat, sub_cat = classify_category(text, filepath)
+    chunk['category'] = cat
+    chunk['sub_category'] = sub_cat
+    
+    # Doc Stage
+    chunk['doc_stage'] = detect_doc_stage(filepath, text)
+    
+    # Organization
+    chunk['org'] = detect_org(text, filepath)
+    
+    # Author
+    chunk['author'] = extract_author(text, filepath)
+    
+    # Year
+    chunk['doc_year'] = extract_year(text, filepath)
+    
+    # Importance
+    chunk['importance'] = calc_importance(text, chunk['doc_stage'], filepath)
+    
+    # Summary (간단한 첫 줄 요약 - 추후 AI 대체)
+    lines = [l.strip() for l in text.split('\n') if l.strip()]
+    chunk['summary'] = lines[0][:150] if lines else ''
+    
+    return chunk
+
+
@@ -0,0 +1,151 @@
+"""
+벤치마크용 Knowledge Wiki API 대역 서버
+========================================
+Cloudflare 배포 없이 업로드 경로 / 인덱서 전체 실행을 측정하기 위한 최소 /api/* 구현 (메모리 저장).
+
+  - POST /api/chunks (gzip 본문 지원), /api/chunks/delete, /api/chunks/rename
+  - POST /api/embeddings/generate?limit=N, GET /api/embedding-stats
+  - latency: 요청마다 지연(초) - 원격 엔드포인트 왕복 시간 흉내
+  - throttle: /api/chunks 요청을 이 확률로 429 (Retry-After 없음) 응답
+  - errors: /api/chunks 요청에 차례로 돌려줄 오류 상태 코드 목록 (예: [503, 500] -> 재시도 확인)
+  - max_chunks: 한 요청의 청크가 이보다 많으면 413 (배치 분할 확인)
+  - reject_paths: 이 file_path의 청크가 들어 있는 /api/chunks 요청은 400 (재시도 없이 실패하는 배치)
+
+local-indexer/tests의 업로드 테스트도 이 서버를 씁니다.
+"""
+
+import gzip
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, latency=0.0, throttle=0.0, seed=0, errors=(), max_chunks=0, reject_paths=()):
+        super().__init__(('127.0.0.1', 0), _Handler)
+        self.latency = latency
+        self.throttle = throttle
+        self.errors = list(errors)
+        self.max_chunks = max_chunks
+        self.reject_paths = set(reject_paths)
+        self.rng = random.Random(seed)
+        self.chunks = {}
+        self.requests = 0
+        self.throttled = 0
+        self.statuses = Counter()       # /api/chunks 응답 상태 코드별 수
+        self.bytes_received = 0
+        self.lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def url(self):
+        return f'http://127.0.0.1:{self.server_port}'
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        self.server_close()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def _body(self):
+        raw = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        with self.server.lock:
+            self.server.bytes_received += len(raw)
+        if self.headers.get('Content-Encoding') == 'gzip':
+            raw = gzip.decompress(raw)
+        return json.loads(raw or b'{}')
+
+    def _send(self, obj, status=200):
+        data = json.dumps(obj).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        srv = self.server
+        if srv.latency:
+            time.sleep(srv.latency)
+        with srv.lock:
+            srv.requests += 1
+            if self.path.startswith('/api/embedding-stats'):
+                total = sum(1 for c in srv.chunks.values() if not c.get('duplicate_of'))
+                done = sum(1 for c in srv.chunks.values() if c.get('embedding'))
+                self._send({'total_chunks': total, 'with_embeddings': done,
+                            'coverage': round(done / total * 100) if total else 0})
+                return
+        self._send({})
+
+    def do_POST(self):
+        srv = self.server
+        body = self._body()
+        if srv.latency:
+            time.sleep(srv.latency)
+        with srv.lock:
+            srv.requests += 1
+            if self.path == '/api/chunks' and srv.throttle and srv.rng.random() < srv.throttle:
+                srv.throttled += 1
+                srv.statuses[429] += 1
+                self._send({'error': 'rate limited'}, 429)
+                return
+            if self.path == '/api/chunks' and srv.errors:
+                status = srv.errors.pop(0)
+                srv.statuses[status] += 1
+                self._send({'error': 'injected'}, status)
+                return
+            if self.path == '/api/chunks':
+                n = len(body.get('chunks', []))
+                if srv.max_chunks and n > srv.max_chunks:
+                    srv.statuses[413] += 1
+                    self._send({'error': 'payload too large'}, 413)
+                    return
+                if srv.reject_paths & {chunk.get('file_path') for chunk in body.get('chunks', [])}:
+                    srv.statuses[400] += 1
+                    self._send({'error': 'rejected'}, 400)
+                    return
+                for chunk in body.get('chunks', []):
+                    srv.chunks[chunk['chunk_id']] = chunk
+                srv.statuses[200] += 1
+                self._send({'inserted': n, 'errors': [], 'total_sent': n})
+            elif self.path == '/api/chunks/delete':
+                ids = set(body.get('chunk_ids', []))
+                paths = set(body.get('file_paths', []))
+                doomed = [k for k, c in srv.chunks.items() if k in ids or c.get('file_path') in paths]
+                for k in doomed:
+                    del srv.chunks[k]
+                self._send({'deleted': len(doomed)})
+            elif self.path == '/api/chunks/rename':
+                updated = 0
+                for r in body.get('renames', []):
+                    for c in srv.chunks.values():
+                        if c.get('file_path') == r['from']:
+                            c['file_path'] = r['to']
+                            updated += 1
+                self._send({'updated': updated})
+            elif self.path.startswith('/api/embeddings/generate'):
+                m = re.search(r'limit=(\d+)', self.path)
+                missing = [c for c in srv.chunks.values() if not c.get('embedding') and not c.get('duplicate_of')]
+                todo = missing[:int(m.group(1))] if m else missing
+                for c in todo:
+                    c['embedding'] = 'stub'
+                self._send({'message': f'Generated embeddings for {len(todo)} chunks', 'count': len(todo),
+                            'remaining': len(missing) - len(todo)})
+            else:
+                self._send({})
@@ -0,0 +1,215 @@
+"""
+Knowledge Wiki - Async Upload Transport
+========================================
+업로드 / 임베딩 생성 요청을 asyncio로 동시에 진행하는 계층 (WikiClient 위).
+
+  - 동시 요청 수 상한 (UPLOAD_IN_FLIGHT). 429 / 503을 받으면 창을 절반으로 줄이고
+    성공할 때마다 조금씩 다시 늘림 (AIMD) - 서버가 버틸 수 있는 만큼만 보냄
+  - 재시도 대기는 asyncio.sleep (Retry-After 우선, 없으면 지수 백오프 + 지터)이라
+    한 요청이 기다리는 동안 다른 요청은 계속 진행
+  - 소켓 I/O는 WikiClient의 requests 세션(연결 풀, 프록시, TLS 설정 그대로)을
+    동시 요청 수만큼의 스레드 실행기에서 실행 - 추가 패키지 없음
+  - UploadPipeline: 동기 코드(파싱 루프)에서 배치를 넘기고 바로 돌아오는 창구.
+    진행 + 대기 배치 수가 상한에 닿으면 submit()이 기다리므로 메모리가 늘지 않음
+  - 서버 임베딩 생성: 페이지 단위로 나눠 요청하고 /api/embedding-stats로 진행률 확인
+"""
+
+import asyncio
+import concurrent.futures
+import threading
+import time
+from functools import partial
+
+import requests
+
+from config import UPLOAD_IN_FLIGHT
+from uploader import (
+    RETRY_STATUS, UploadError, backoff_delay, new_upload_stats, parse_response, retry_after,
+)
+
+THROTTLE_STATUS = {429, 503}
+
+
+class _Window:
+    """동시 요청 창 (AIMD). size는 1 ~ limit 사이 실수, 진행 중 요청 수 < int(size)일 때 시작"""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.size = float(limit)
+        self.active = 0
+        self._cond = asyncio.Condition()
+
+    async def __aenter__(self):
+        async with self._cond:
+            await self._cond.wait_for(lambda: self.active < max(1, int(self.size)))
+            self.active += 1
+
+    async def __aexit__(self, *exc):
+        async with self._cond:
+            self.active -= 1
+            self._cond.notify_all()
+
+    def throttled(self):
+        self.size = max(1.0, self.size / 2)
+
+    def succeeded(self):
+        self.size = min(float(self.limit), self.size + 1 / self.size)
+
+
+class AsyncWikiClient:
+    """WikiClient의 asyncio 버전 (같은 세션 / 배치 분할 / 집계 형식)"""
+
+    def __init__(self, client, max_in_flight=UPLOAD_IN_FLIGHT):
+        self.client = client
+        self.max_in_flight = max_in_flight
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_in_flight, thread_name_prefix='upload')
+        self._window = None
+
+    @property
+    def window(self):
+        if self._window is None:        # 이벤트 루프 안에서 생성
+            self._window = _Window(self.max_in_flight)
+        return self._window
+
+    async def request(self, method, path, body=None, timeout=None, stats=None):
+        """JSON 요청 + 재시도 (WikiClient.request와 같은 규칙, 대기는 비동기)"""
+        client = self.client
+        url = f'{client.api_url}{path}'
+        data, headers = client.encode(body)
+        send = partial(client.session.request, method, url, data=data, headers=headers,
+                       timeout=timeout or client.timeout)
+        loop = asyncio.get_running_loop()
+
+        last_error = None
+        for attempt in range(client.retries + 1):
+            if attempt:
+                if stats is not None:
+                    stats['retries'] += 1
+                await asyncio.sleep(backoff_delay(attempt))
+            async with self.window:
+                t0 = time.perf_counter()
+                try:
+                    resp = await loop.run_in_executor(self._executor, send)
+                except (requests.ConnectionError, requests.Timeout) as e:
+                    client.observe(method, path, None, t0)
+                    last_error = UploadError(f'{type(e).__name__}: {e}')
+                    continue
+                client.observe(method, path, resp.status_code, t0)
+                if stats is not None and data is not None:
+                    stats['bytes_sent'] += len(data)
+                if resp.status_code in THROTTLE_STATUS:
+                    self.window.throttled()
+                else:
+                    self.window.succeeded()
+            if resp.status_code in RETRY_STATUS:
+                last_error = UploadError(f'HTTP {resp.status_code}', resp.status_code)
+                delay = retry_after(resp)
+                if delay:
+                    await asyncio.sleep(delay)
+                continue
+            return parse_response(resp)
+
+        raise last_error
+
+    async def _post_batch(self, parts, stats):
+        client = self.client
+        try:
+            data = await self.request('POST', '/api/chunks', client.batch_body(parts), stats=stats)
+        except UploadError as e:
+            if e.status == 413 and len(parts) > 1:
+                await asyncio.gather(*(self._post_batch(half, stats) for half in client.split_batch(parts)))
+                return
+            client.count_batch(parts, stats, error=e)
+            return
+        client.count_batch(parts, stats, data)
+
+    async def upload_chunks(self, chunks, stats=None):
+        """청크를 배치로 나눠 동시에 업로드하고 집계 반환"""
+        if stats is None:
+            stats = new_upload_stats()
+        await asyncio.gather(*(self._post_batch(parts, stats) for parts in self.client.iter_batches(chunks)))
+        return stats
+
+    async def generate_embeddings(self, page, timeout, progress=None):
+        """서버 임베딩 생성을 page개씩 반복 요청. 생성한 청크 수 반환
+
+        요청이 시간 초과여도 /api/embedding-stats의 임베딩 수가 늘었으면 서버가 처리 중인 것으로 보고
+        다음 페이지로 넘어갑니다. progress(stats)는 페이지마다 호출됩니다.
+        """
+        stats = await self.request('GET', '/api/embedding-stats')
+        done = stats.get('with_embeddings', 0)
+        total = 0
+        while True:
+            try:
+                data = await self.request('POST', f'/api/embeddings/generate?limit={page}', timeout=timeout)
+            except UploadError as e:
+                if e.status is not None:
+                    raise
+                data = None
+            stats = await self.request('GET', '/api/embedding-stats')
+            gained = stats.get('with_embeddings', 0) - done
+            done += gained
+            total += data.get('count', 0) if data else max(0, gained)
+            if progress is not None:
+                progress(stats)
+            if data is None:
+                if gained <= 0:
+                    raise UploadError('embedding generation timed out without progress')
+                continue
+            # remaining이 없는 이전 서버는 한 번에 전체를 처리
+            if not data.get('count') or not data.get('remaining'):
+                return total
+
+
+class UploadPipeline:
+    """백그라운드 이벤트 루프에서 배치를 동시에 업로드하는 동기 코드용 창구"""
+
+    def __init__(self, client, max_in_flight=UPLOAD_IN_FLIGHT):
+        self.client = AsyncWikiClient(client, max_in_flight)
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name='upload-loop', daemon=True)
+        self._thread.start()
+        # 진행 중 + 대기 배치 상한 (backpressure)
+        self._slots = threading.BoundedSemaphore(max_in_flight * 2)
+        self._outstanding = 0
+        self._idle = threading.Condition()
+
+    def run(self, coro):
+        """코루틴을 업로드 루프에서 실행하고 결과를 기다림"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+
+    def submit(self, chunks, done=None):
+        """청크 업로드 예약 -> concurrent.futures.Future (결과: 업로드 집계)
+
+        done(stats)는 업로드가 끝나면 루프 스레드에서 호출됩니다.
+        """
+        self._slots.acquire()
+        with self._idle:
+            self._outstanding += 1
+        future = asyncio.run_coroutine_threadsafe(self.client.upload_chunks(chunks), self.loop)
+
+        def finished(f):
+            try:
+                if done is None:
+                    return
+                error = f.exception()
+                if error is None:
+                    done(f.result())
+                else:
+                    stats = new_upload_stats()
+                    stats.update(failed=len(chunks), errors=[f'{type(error).__name__}: {error}'])
+                    done(stats)
+            finally:
+                # done() 호출까지 끝난 뒤에 완료로 셈 (join()이 돌아오면 집계도 끝난 상태)
+                self._slots.release()
+                with self._idle:
+                    self._outstanding -= 1
+                    self._idle.notify_all()
+
+        future.add_done_callback(finished)
+        return future
+
+    def join(self):
+        """예약한 업로드가 모두 끝나고 done()까지 호출될 때까지 대기"""
+        with self._idle:
+            self._idle.wait_for(lambda: self._outstanding == 0)
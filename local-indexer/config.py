@@ -27,6 +27,113 @@ WIKI_API_URL = "http://localhost:3000"
 # API 업로드 배치 크기
 BATCH_SIZE = 50
 
+# 업로드 배치당 최대 JSON 크기 (압축 전, bytes). BATCH_SIZE와 함께 먼저 도달하는 기준으로 분할
+UPLOAD_MAX_BATCH_BYTES = 2_000_000
+
+# 요청 본문 gzip 압축 (서버 /api/chunks가 Content-Encoding: gzip 지원)
+UPLOAD_GZIP = True
+
+# 5xx / 429 / 타임아웃 시 재시도 횟수 (지수 백오프 + 지터)
+UPLOAD_RETRIES = 4
+
+# 요청 타임아웃 (초)
+UPLOAD_TIMEOUT = 30
+
+# 동시에 진행하는 업로드 요청 수 (async_client.py). 서버까지 지연 시간이 길수록 크게.
+# 429 / 503 응답을 받으면 자동으로 줄였다가 다시 늘립니다.
+UPLOAD_IN_FLIGHT = 8
+
+# 서버 임베딩 생성 (/api/embeddings/generate)을 한 번에 이 청크 수씩 나눠 요청
+# 요청마다 /api/embedding-stats로 진행률을 확인합니다.
+EMBED_GENERATE_PAGE = 500
+EMBED_GENERATE_TIMEOUT = 120
+
+# =============================================
+# 스캔 제외 규칙 (.gitignore 형식)
+# =============================================
+#   name/      디렉터리만 (하위 전체를 탐색하지 않음)
+#   /path      DRIVE_ROOT 기준 경로
+#   *.tmp      어느 폴더에서든 이름 매칭 (*, ?, ** 지원)
+#   !pattern   앞선 규칙 예외 처리 (제외한 폴더 안은 탐색하지 않으므로 폴더부터 되살려야 함)
+
+EXCLUDE_PATTERNS = [
+    '.git/',
+    'node_modules/',
+    '__pycache__/',
+    '.venv/',
+    '.tmp.drivedownload/',   # Google Drive 동기화 임시 폴더
+    '.tmp.driveupload/',
+    '$RECYCLE.BIN/',
+    '.Trash*/',
+    '~$*',                   # Office 잠금 파일
+    '*.tmp',
+]
+
+# =============================================
+# 병렬 인덱싱 설정 (python indexer.py --workers N)
+# =============================================
+
+# 업로드 대기열 최대 배치 수 (파싱이 업로드보다 빠를 때 메모리 상한)
+# 최대 메모리 ≈ UPLOAD_QUEUE_SIZE × BATCH_SIZE 청크
+UPLOAD_QUEUE_SIZE = 16
+
+# XLSX/CSV 행 묶음 청킹
+# 여러 행을 하나의 청크로 묶어 청크 수(= D1 행, FTS 항목, 임베딩 수)를 줄입니다.
+# ROW_CHUNK_ROWS = 1 로 두면 기존처럼 행 단위로 청크를 만듭니다.
+ROW_CHUNK_ROWS = 50            # 청크당 최대 행 수
+ROW_CHUNK_MAX_CHARS = 4000     # 청크당 최대 글자 수 (먼저 도달하는 기준으로 분할)
+ROW_CHUNK_REPEAT_HEADER = True # 각 청크 맨 앞에 헤더(첫 행) 반복
+
+# 로컬 임베딩 (python indexer.py --embed-local)
+# 서버 textToVector와 같은 tfidf-256 벡터를 인덱서에서 계산해 청크와 함께 업로드
+#   'f16': float16 (오차 ~2e-4)   'i8': int8 (오차 ~4e-3, 더 작음)
+EMBED_FORMAT = 'f16'
+
+# 오프라인 벡터 인덱스 (--embed-local 실행 끝에 vector_index.kwvi 작성, vector_index.py로 검색)
+VECTOR_INDEX = True
+VECTOR_INDEX_DTYPE = 'i8'      # 'i8' | 'f16'
+VECTOR_INDEX_IVF_LISTS = 0     # IVF 목록 수. 0 = 자동 (5만 행 이상일 때 sqrt(행 수))
+
+# 중복 청크 정리 (v1 / v2 / 최종 / 최종_수정 복사본)
+# 이미 올라간 대표 청크와 거의 같은 청크(MinHash 추정 자카드 유사도 DEDUP_THRESHOLD 이상)는
+# 본문 없이 대표 청크를 가리키는 참조로 업로드합니다 (서버 migrations/0005 필요).
+DEDUP = True
+DEDUP_THRESHOLD = 0.85
+DEDUP_MIN_CHARS = 200          # 이보다 짧은 청크(표지, 목차 등)는 비교하지 않음
+
+# DOCX 청크 (parse_docx): 제목(Heading) 구간 단위로 묶고, 구간이 길면 DOCX_CHUNK_CHARS 안에서 나눔
+# 표는 행마다 셀을 ' | '로 이어 본문과 같은 흐름으로 묶습니다.
+DOCX_CHUNK_CHARS = 2000
+DOCX_MIN_CHUNK_CHARS = 300     # 이보다 짧은 구간은 다음 제목 구간과 합침 (제목만 많은 문서에서 조각 방지)
+
+# 파싱 결과 캐시 (파일 내용 해시 -> 파서 출력, parse_cache.py)
+# 같은 내용의 파일은 경로가 바뀌거나 다른 PC에서 실행해도 다시 파싱하지 않습니다.
+# 여러 PC가 함께 쓰려면 공유 폴더 경로로 지정 (예: r"\\nas\wiki\parse_cache"). 상대 경로는 local-indexer 기준, '' 이면 사용 안 함
+PARSE_CACHE_DIR = 'parse_cache'
+PARSE_CACHE_MAX_MB = 2048      # 넘으면 오래 쓰지 않은 항목부터 삭제 (LRU)
+
+# PDF 페이지 추출 (pdf_pages.py)
+# 페이지 텍스트를 별도 프로세스에서 PDF_SHARD_PAGES쪽 구간 단위로 나눠 추출하고 페이지 순서대로 합칩니다.
+# --workers N이면 파싱 워커마다 PDF_WORKERS // N개 (최소 1). 0 이면 인덱서 프로세스에서 직접 (시간 제한 없음)
+PDF_WORKERS = 4
+PDF_SHARD_PAGES = 50
+PDF_PAGE_TIMEOUT = 30          # 한 페이지에서 이 시간(초) 동안 진행이 없으면 건너뜀 (깨진 페이지), 0 = 제한 없음
+PDF_SKIP_IMAGE_ONLY = True     # 글꼴 없이 이미지만 있는 페이지(스캔본)는 텍스트 추출 없이 건너뜀
+
+# 실행 계측 보고서 (metrics.py): 실행마다 metrics/run-<시각>.jsonl (파일별) + .summary.jsonl (누적 요약) + Prometheus textfile(indexer.prom)
+# 상대 경로는 local-indexer 기준, '' 이면 쓰지 않음 (요약 출력만)
+METRICS_DIR = 'metrics'
+METRICS_TOP_FILES = 10         # 실행 끝에 출력 / 기록하는 느린 파일 수
+METRICS_KEEP_RUNS = 30         # 보관할 실행 보고서 수 (오래된 것부터 삭제)
+
+# D1 일괄 적재용 샤드 (python indexer.py --export DIR, exporter.py)
+# 처음 대량으로 올릴 때 /api/chunks 대신 wrangler d1 execute --file로 적재할 SQL / NDJSON 샤드를 씁니다.
+EXPORT_FORMAT = 'sql'          # 'sql' | 'ndjson'
+EXPORT_SHARD_MB = 50           # 샤드 크기 (압축 전)
+EXPORT_STATEMENT_BYTES = 90_000  # INSERT 문 하나의 최대 크기 (D1 SQL 문 제한 100KB)
+EXPORT_GZIP = True             # 샤드를 .gz로 저장 (wrangler로 올리기 전 gunzip)
+EXPORT_REBUILD_FTS = True      # 적재 중 FTS 트리거를 끄고 마지막에 색인을 한 번에 재구성 (sql)
+
 # 지원하는 파일 확장자
 SUPPORTED_EXTENSIONS = [
     '.pptx',
@@ -37,3 +144,13 @@ SUPPORTED_EXTENSIONS = [
     '.docx',
     # '.hwp',  # HWP 지원 시 hwp5txt 또는 별도 변환 필요
 ]
+
+# =============================================
+# 감시 모드 (python indexer.py --watch)
+# =============================================
+# 파일 변경 알림(Linux inotify, watchdog 패키지, 없으면 폴링)을 받아 바뀐 파일만 인덱싱합니다.
+WATCH_DEBOUNCE_SECONDS = 3     # 마지막 알림 후 이만큼 조용하면 처리 (동기화 중 연속 쓰기를 한 번으로)
+WATCH_MAX_DELAY_SECONDS = 60   # 계속 바뀌는 파일도 첫 알림 후 이 시간이 지나면 처리
+WATCH_BATCH_FILES = 100        # 한 번에 처리하는 최대 경로 수
+WATCH_MAX_BUFFER = 10000       # 메모리에 모으는 최대 경로 수. 넘으면 전체 재스캔 1번으로 대체
+WATCH_POLL_SECONDS = 30        # 폴링 방식일 때 스캔 주기
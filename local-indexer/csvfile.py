@@ -0,0 +1,167 @@
+"""
+Knowledge Wiki - CSV Reader
+============================
+CSV 인코딩 / 구분자를 한 번에 판단하고 파일을 한 번만 읽으며 행을 내보냄 (indexer.parse_csv에서 사용).
+
+이전에는 utf-8 -> cp949 -> euc-kr -> latin-1 순서로 파일 전체를 다시 읽었고, 큰 cp949 파일이
+뒤쪽에서 utf-8 디코딩에 실패하면 그 앞까지 내보낸 행이 다음 시도에서 한 번 더 나왔습니다.
+
+  - 인코딩: 앞 / 뒤 SAMPLE_BYTES만 읽어 BOM -> UTF-8 유효성 -> CP949(한글 음절 비율) -> latin-1 순으로 판단
+  - 구분자: 이전처럼 , 가 기본. 앞쪽 줄 어디에도 , 가 없을 때만 탭 / ; / | 중 줄마다 개수가 가장
+    일정한 것 (셀 안에 ; 나 | 가 들어 있는 쉼표 CSV를 잘못 나누지 않도록)
+  - 본문은 BLOCK_BYTES 단위 증분 디코딩 한 번. 표본에 안 잡힌 중간 위치에서 디코딩이 실패하면
+    그때까지가 ASCII였을 때만 그 블록부터 다른 인코딩으로 바꾸고 (ASCII 부분은 어느 쪽이든 같음),
+    이후로는 깨진 바이트만 U+FFFD로 바꿔 계속 읽음 (이미 내보낸 행은 다시 읽지 않음)
+  - 줄바꿈은 텍스트 모드 open()과 같게 \\r\\n, \\r을 \\n으로 바꿈
+"""
+
+import codecs
+import csv
+import io
+import os
+import re
+from itertools import chain, islice
+
+SAMPLE_BYTES = 1 << 18
+BLOCK_BYTES = 1 << 18
+SNIFF_LINES = 50
+DELIMITERS = (',', '\t', ';', '|')
+CP949_MIN_HANGUL = 0.5          # 디코딩된 비ASCII 글자 중 한글 음절 비율이 이 이상이면 CP949
+
+HANGUL = re.compile('[가-힣]')
+
+BOMS = (
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+)
+
+
+# =============================================
+# 인코딩 / 구분자 판단
+# =============================================
+
+def _samples(f, size):
+    """앞 / 뒤 표본 (줄 경계에서 자름, 작은 파일은 앞 표본 하나)"""
+    if size <= 2 * SAMPLE_BYTES:
+        return [f.read()]
+    head = f.read(SAMPLE_BYTES)
+    f.seek(size - SAMPLE_BYTES)
+    tail = f.read()
+    newline = tail.find(b'\n')
+    return [head, tail[newline + 1:]] if newline >= 0 else [head]
+
+
+def _decodes(samples, encoding):
+    """표본이 모두 encoding으로 디코딩되면 이어 붙인 텍스트, 아니면 None (끝의 잘린 글자는 무시)"""
+    texts = []
+    for sample in samples:
+        try:
+            texts.append(codecs.getincrementaldecoder(encoding)().decode(sample, final=False))
+        except UnicodeDecodeError:
+            return None
+    return ''.join(texts)
+
+
+def _looks_korean(text):
+    non_ascii = len(text) - len(text.encode('ascii', 'ignore'))
+    return len(HANGUL.findall(text)) >= CP949_MIN_HANGUL * non_ascii
+
+
+def guess_encoding(samples, exclude=()):
+    """BOM이 없는 바이트 표본의 인코딩 (utf-8 / cp949 / latin-1)"""
+    if 'utf-8' not in exclude and _decodes(samples, 'utf-8') is not None:
+        return 'utf-8'
+    if 'cp949' not in exclude:
+        text = _decodes(samples, 'cp949')
+        if text is not None and _looks_korean(text):
+            return 'cp949'
+    return 'latin-1'
+
+
+def detect_encoding(filepath):
+    """(인코딩, 앞 표본 바이트)"""
+    with open(filepath, 'rb') as f:
+        samples = _samples(f, os.fstat(f.fileno()).st_size)
+    for bom, encoding in BOMS:
+        if samples[0].startswith(bom):
+            return encoding, samples[0]
+    return guess_encoding(samples), samples[0]
+
+
+def sniff_delimiter(text):
+    """구분자: 앞쪽 줄에 , 가 하나라도 있으면 , 아니면 개수가 가장 일정한 구분자 (따옴표 안도 세는 근사치)"""
+    lines = [line for line in islice(text.splitlines(), SNIFF_LINES) if line.strip()]
+    if len(lines) > 1:
+        lines = lines[:-1]      # 표본 끝에서 잘렸을 수 있는 줄
+    if any(',' in line for line in lines):
+        return ','
+    best, best_score = ',', 0
+    for delimiter in DELIMITERS[1:]:
+        counts = [line.count(delimiter) for line in lines]
+        if not counts or not max(counts):
+            continue
+        mode = max(set(counts), key=counts.count)
+        score = counts.count(mode) * 1000 + mode if mode else 0
+        if score > best_score:
+            best, best_score = delimiter, score
+    return best
+
+
+# =============================================
+# 스트리밍 디코딩
+# =============================================
+
+def _decoded_blocks(filepath, encoding):
+    """BLOCK_BYTES씩 증분 디코딩한 텍스트 (중간에 실패하면 인코딩 전환 또는 U+FFFD 치환, 모듈 설명 참고)"""
+    with open(filepath, 'rb') as f:
+        yield from _decode(f, encoding)
+
+
+def _decode(f, encoding):
+    decoder = codecs.getincrementaldecoder(encoding)()
+    ascii_so_far = True
+    while True:
+        block = f.read(BLOCK_BYTES)
+        pending = decoder.getstate()[0]
+        try:
+            text = decoder.decode(block, final=not block)
+        except UnicodeDecodeError:
+            data = pending + block
+            if ascii_so_far:
+                encoding = guess_encoding([data], exclude=(encoding,))
+            decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+            text = decoder.decode(data, final=not block)
+        if text:
+            ascii_so_far = ascii_so_far and text.isascii()
+            yield text
+        if not block:
+            return
+
+
+def _line_blocks(blocks):
+    """텍스트 블록을 줄 경계에서 잘라 StringIO로 (\\r\\n, \\r -> \\n은 replace로, 줄 나눔은 C 구현에 맡김)"""
+    rest = ''
+    for text in blocks:
+        cut = text.rfind('\n') + 1 or text.rfind('\r', 0, len(text) - 1) + 1     # \r만 쓰는 파일
+        if not cut:
+            rest += text
+            continue
+        piece, rest = rest + text[:cut], text[cut:]
+        if '\r' in piece:
+            piece = piece.replace('\r\n', '\n').replace('\r', '\n')
+        yield io.StringIO(piece, newline='\n')
+    if rest:
+        yield io.StringIO(rest, newline=None)
+
+
+def csv_rows(filepath):
+    """(행 번호, 셀 목록) 이터레이터 - 행 번호는 csv.reader 레코드 순번 (1부터)
+
+    행마다 거치는 파이썬 제너레이터가 없도록 C 이터레이터(enumerate / csv.reader / chain / StringIO)만
+    이어 붙임. 파일은 끝까지 읽거나 이터레이터가 버려지면 닫힘.
+    """
+    encoding, head = detect_encoding(filepath)
+    delimiter = sniff_delimiter(_decodes([head], encoding) or '')
+    lines = chain.from_iterable(_line_blocks(_decoded_blocks(filepath, encoding)))
+    return enumerate(csv.reader(lines, delimiter=delimiter), 1)
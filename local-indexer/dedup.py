@@ -0,0 +1,99 @@
+"""
+Knowledge Wiki - Near-Duplicate Chunk Signatures
+=================================================
+v1 / v2 / 최종 / 최종_수정 처럼 복사본이 여러 벌인 문서의 청크를 찾기 위한 MinHash 서명 + LSH.
+
+  - 공백 단위 단어 3-gram(shingle) 집합의 One Permutation MinHash (해시 1회 + 구간별 최솟값)
+    NumPy가 있으면 벡터 연산으로, 없으면 순수 Python으로 같은 서명을 계산
+    빈 구간은 오른쪽의 값을 빌려 채움 (rotation densification)
+  - 서명 SIG_SIZE개 값을 ROWS개씩 BANDS개 띠로 나눠 띠마다 버킷 키 1개 (LSH)
+    자카드 유사도 0.85 청크 쌍이 후보로 잡힐 확률 약 99%, 0.5 쌍은 약 6%
+  - 후보는 서명이 일치하는 구간 비율(추정 자카드 유사도)로 최종 판정
+
+버킷 / 서명 저장과 조회는 StateStore(chunk_sigs / lsh_buckets 테이블)가 담당합니다.
+"""
+
+import hashlib
+import zlib
+from array import array
+
+SHINGLE = 3
+SIG_SIZE = 128
+BANDS = 16
+ROWS = SIG_SIZE // BANDS
+
+_M64 = (1 << 64) - 1
+_BIN_SHIFT = 64 - SIG_SIZE.bit_length() + 1     # 상위 7비트 = 구간 번호
+_VALUE_SHIFT = _BIN_SHIFT - 32
+_EMPTY = 0xFFFFFFFF
+
+
+_K1, _K2, _K3 = 0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0xFF51AFD7ED558CCD
+
+
+def _bin_minimums(words):
+    """단어 해시 목록 -> 구간별 최솟값 list (빈 구간 = _EMPTY)
+
+    shingle 해시는 multiply-shift: ((a*K1 ^ b*K2 ^ c) * K3) mod 2^64.
+    상위 7비트 = 구간, 바로 아래 32비트 = 값. NumPy가 있으면 uint64 연산(같은 결과)으로 계산합니다.
+    """
+    try:
+        import numpy as np
+    except ImportError:
+        np = None
+    if np is None:
+        hashes = sorted({((a * _K1 ^ b * _K2 ^ c) * _K3) & _M64
+                         for a, b, c in zip(words, words[1:], words[2:])}, reverse=True)
+        # 내림차순으로 덮어쓰므로 구간마다 가장 작은 값이 남음 (구간 안에서는 해시 순서 = 값 순서)
+        slots = {h >> _BIN_SHIFT: (h >> _VALUE_SHIFT) & 0xFFFFFFFF for h in hashes}
+        return [slots.get(i, _EMPTY) for i in range(SIG_SIZE)]
+
+    x = np.array(words, dtype=np.uint64)
+    h = (x[:-2] * np.uint64(_K1) ^ x[1:-1] * np.uint64(_K2) ^ x[2:]) * np.uint64(_K3)
+    sig = np.full(SIG_SIZE, _EMPTY, dtype=np.uint32)
+    np.minimum.at(sig, (h >> np.uint64(_BIN_SHIFT)).astype(np.intp),
+                  ((h >> np.uint64(_VALUE_SHIFT)) & np.uint64(0xFFFFFFFF)).astype(np.uint32))
+    return sig.tolist()
+
+
+def signature(text):
+    """텍스트 -> MinHash 서명 bytes (array('I') SIG_SIZE개). 단어가 없으면 None"""
+    words = [zlib.crc32(w.encode('utf-8')) for w in text.lower().split()]
+    if not words:
+        return None
+    if len(words) < SHINGLE:
+        words += [0] * (SHINGLE - len(words))
+    sig = _bin_minimums(words)
+
+    # 빈 구간: 오른쪽(순환)으로 가장 가까운 값 + 거리 (서로 다른 빈 구간이 같은 값이 되지 않도록)
+    if _EMPTY in sig:
+        src = sig[:]
+        nearest = None
+        for i in range(2 * SIG_SIZE - 1, -1, -1):
+            slot = i % SIG_SIZE
+            if src[slot] != _EMPTY:
+                nearest = i
+            elif i < SIG_SIZE and nearest is not None:
+                sig[slot] = (src[nearest % SIG_SIZE] + (nearest - i) * 0x9E3779B1) & 0xFFFFFFFF
+    return array('I', sig).tobytes()
+
+
+def unpack(sig):
+    values = array('I')
+    values.frombytes(sig)
+    return values
+
+
+def band_keys(sig):
+    """서명 -> LSH 버킷 키 BANDS개 (띠 번호 7비트 + 띠 해시 56비트, SQLite INTEGER 범위)"""
+    return [
+        (band << 56) | int.from_bytes(
+            hashlib.blake2b(sig[band * ROWS * 4:(band + 1) * ROWS * 4], digest_size=7).digest(), 'little')
+        for band in range(BANDS)
+    ]
+
+
+def similarity(sig_a, sig_b):
+    """추정 자카드 유사도 (일치하는 구간 비율)"""
+    a, b = unpack(sig_a), unpack(sig_b)
+    return sum(x == y for x, y in zip(a, b)) / SIG_SIZE
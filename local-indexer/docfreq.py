@@ -0,0 +1,93 @@
+"""
+Knowledge Wiki - Document Frequency Table
+==========================================
+청크 단위 문서 빈도(DF) 표. TF-IDF 태그 순위에 사용합니다.
+
+  - 토큰(소문자) -> 정수 ID (vocab), DF는 ID로 색인하는 array('I')
+  - 파일별 기여분 {토큰 ID: 그 토큰이 들어있는 청크 수}를 array 바이트로 저장해
+    파일이 다시 인덱싱되거나 삭제되면 이전 기여분을 빼고 새 기여분을 더함 (증분 갱신)
+  - 전체 청크 수(n_docs)는 파일별 청크 수의 합
+
+영속화는 StateStore(indexer_state.db의 terms / file_terms 테이블)가 담당합니다.
+"""
+
+import heapq
+import math
+from array import array
+
+
+def pack_terms(pairs):
+    """[(토큰 ID, 청크 수)] -> bytes (ID, 수 교차 배열)"""
+    flat = array('I')
+    for term_id, count in pairs:
+        flat.append(term_id)
+        flat.append(count)
+    return flat.tobytes()
+
+
+def unpack_terms(blob):
+    flat = array('I')
+    flat.frombytes(blob)
+    return zip(flat[0::2], flat[1::2])
+
+
+class DocFreq:
+    """토큰별 DF 표 (메모리) + IDF 계산"""
+
+    def __init__(self, tokens=(), df=(), n_docs=0):
+        self.tokens = list(tokens)                  # ID -> 토큰
+        self.vocab = {t: i for i, t in enumerate(self.tokens)}
+        self.df = array('I', df)
+        self.n_docs = n_docs
+        self.dirty = set()                          # 저장되지 않은 ID
+
+    def __len__(self):
+        return len(self.tokens)
+
+    def __getstate__(self):
+        # 워커 프로세스로 보낼 때 vocab dict는 빼고 보내서 받는 쪽에서 재구성
+        return self.tokens, self.df, self.n_docs
+
+    def __setstate__(self, state):
+        tokens, df, n_docs = state
+        self.__init__(tokens, df, n_docs)
+
+    def term_id(self, token):
+        term_id = self.vocab.get(token)
+        if term_id is None:
+            term_id = len(self.tokens)
+            self.vocab[token] = term_id
+            self.tokens.append(token)
+            self.df.append(0)
+        return term_id
+
+    def add_file(self, n_chunks, terms):
+        """파일 하나의 기여분 추가. terms = {토큰(소문자): 들어있는 청크 수}. 저장용 bytes 반환"""
+        pairs = []
+        for token, count in terms.items():
+            term_id = self.term_id(token)
+            self.df[term_id] += count
+            self.dirty.add(term_id)
+            pairs.append((term_id, count))
+        self.n_docs += n_chunks
+        return pack_terms(pairs)
+
+    def remove_file(self, n_chunks, blob):
+        """add_file()이 돌려준 기여분 제거"""
+        for term_id, count in unpack_terms(blob):
+            self.df[term_id] = max(0, self.df[term_id] - count)
+            self.dirty.add(term_id)
+        self.n_docs = max(0, self.n_docs - n_chunks)
+
+    def idf(self, token):
+        """smooth IDF: log((1 + N) / (1 + df)) + 1. DF 표가 비어 있으면 모두 1"""
+        term_id = self.vocab.get(token)
+        df = self.df[term_id] if term_id is not None else 0
+        return math.log((1 + self.n_docs) / (1 + df)) + 1
+
+    def top_terms(self, counts, n):
+        """{토큰: 청크 내 빈도} -> TF-IDF 상위 n개 토큰 (동점은 먼저 나온 순)"""
+        if not self.n_docs:
+            return [token for token, _ in counts.most_common(n)]
+        scored = {token: tf * self.idf(token.lower()) for token, tf in counts.items()}
+        return heapq.nlargest(n, scored, key=scored.__getitem__)
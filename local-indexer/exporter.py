@@ -0,0 +1,305 @@
+"""
+Knowledge Wiki - D1 Bulk Export
+================================
+HTTP 업로드 대신 청크를 D1에 바로 적재할 수 있는 SQL / NDJSON 샤드로 기록 (indexer.py --export DIR).
+처음 수백만 청크를 올릴 때 /api/chunks 호출(50행씩 INSERT + 행마다 FTS 트리거)을 거치지 않습니다.
+
+  - 행 값은 POST /api/chunks(src/api.ts)와 같음 (migrations/ 스키마, 참조 중복 청크, 로컬 임베딩)
+  - SQL: 여러 행 INSERT OR REPLACE 문 (문 하나가 EXPORT_STATEMENT_BYTES 이하, D1 문 길이 제한 100KB)
+    00000-begin.sql  chunks FTS 트리거 3개 삭제 (행마다 FTS 색인 갱신 생략)
+    00001.sql ...    청크 행 + 삭제 / 경로 변경 문
+    99999-finish.sql FTS 색인 한 번에 재구성 (rebuild) + 트리거 복구
+    적재 중에는 검색 결과가 불완전하고, 그 사이 API로 바뀐 행도 finish에서 함께 색인됨
+    manifest.json의 load_order 순서대로 실행 (이번 실행에서 쓴 샤드만 begin / finish 사이에):
+      gunzip DIR/*.gz; for f in $(jq -r '.load_order[]' DIR/manifest.json); do npx wrangler d1 execute <DB> --remote --file "DIR/${f%.gz}"; done
+    begin / finish는 몇 번 실행해도 결과가 같음 (DROP / CREATE TRIGGER IF [NOT] EXISTS, rebuild)
+  - NDJSON: 줄마다 chunks 행 객체. 삭제 / 경로 변경은 {"_op": "delete" | "rename", ...} 줄
+  - 샤드는 압축 전 EXPORT_SHARD_MB 단위로 나누고 (EXPORT_GZIP이면 .gz, wrangler로 올리기 전 gunzip)
+    임시 파일에 쓰다가 닫을 때 os.replace + manifest.json 갱신
+  - 재개: 같은 DIR로 다시 실행하면 manifest의 샤드 번호 뒤에 이어서 씀. load_order는 이번 실행의
+    샤드만 담고 (이미 적재한 앞 샤드와 FTS 재구성을 다시 하지 않도록), 실행마다의 목록은 runs에 남김.
+    배치의 done 콜백과 after_close()로 맡긴 상태 기록(indexed_files, 삭제 / 이동 반영)은 그 문이 들어간
+    샤드를 닫은 뒤에 호출하므로, 중단되어 버려진 .tmp 샤드의 행 / 삭제 문은 다음 실행에서 다시 내보냄
+    (chunk_id 기준 덮어쓰기라 중복 안전)
+
+indexed_files는 샤드를 적재했다고 보고 갱신합니다. 샤드를 버릴 경우 상태 DB도 지우고 다시 인덱싱하세요.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import time
+
+MANIFEST = 'manifest.json'
+BEGIN_SQL = '00000-begin.sql'
+FINISH_SQL = '99999-finish.sql'
+MAX_SHARDS = 99998
+
+# api.ts INSERT OR REPLACE INTO chunks 열 순서 (indexed_at 제외)
+COLUMNS = (
+    'chunk_id', 'file_path', 'file_type', 'project_path', 'doc_title',
+    'location_type', 'location_value', 'location_detail', 'text', 'mtime', 'hash',
+    'tags', 'category', 'sub_category', 'author', 'org', 'doc_stage', 'doc_year',
+    'summary', 'importance', 'embedding', 'embed_model', 'duplicate_of',
+)
+EMBEDDING_PREFIXES = ('f16:', 'f16s:', 'i8:', 'i8s:')
+
+# migrations/0001_initial_schema.sql와 같은 트리거.
+# 색인에 없는 행을 'delete'하면 FTS5 외부 콘텐츠 색인이 깨지므로 삽입 트리거만 끌 수 없고 셋 다 끔
+FTS_TRIGGERS = """CREATE TRIGGER IF NOT EXISTS chunks_ai AFTER INSERT ON chunks BEGIN
+  INSERT INTO chunks_fts(rowid, text) VALUES (new.rowid, new.text);
+END;
+
+CREATE TRIGGER IF NOT EXISTS chunks_ad AFTER DELETE ON chunks BEGIN
+  INSERT INTO chunks_fts(chunks_fts, rowid, text) VALUES('delete', old.rowid, old.text);
+END;
+
+CREATE TRIGGER IF NOT EXISTS chunks_au AFTER UPDATE ON chunks BEGIN
+  INSERT INTO chunks_fts(chunks_fts, rowid, text) VALUES('delete', old.rowid, old.text);
+  INSERT INTO chunks_fts(rowid, text) VALUES (new.rowid, new.text);
+END;
+"""
+MATERIALIZE = ("UPDATE chunks SET text = COALESCE((SELECT c.text FROM chunks c WHERE c.chunk_id = chunks.duplicate_of), ''), "
+               "embedding = '', embed_model = '', duplicate_of = '' WHERE {where};\n")
+
+
+def chunk_row(chunk):
+    """업로드 청크 -> chunks 행 값 (COLUMNS 순서). api.ts POST /api/chunks의 기본값 / 변환과 같음"""
+    duplicate_of = chunk.get('duplicate_of') if isinstance(chunk.get('duplicate_of'), str) else ''
+    text = '' if duplicate_of else (chunk.get('text') or '')
+    embedding = chunk.get('embedding')
+    if duplicate_of or not (isinstance(embedding, str) and embedding.startswith(EMBEDDING_PREFIXES)):
+        embedding = ''
+    return (
+        chunk['chunk_id'], chunk['file_path'], chunk['file_type'],
+        chunk.get('project_path') or '', chunk.get('doc_title') or '',
+        chunk.get('location_type') or '', chunk.get('location_value') or '', chunk.get('location_detail') or '',
+        text, chunk.get('mtime') or '', chunk.get('hash') or '',
+        json.dumps(chunk.get('tags') or [], ensure_ascii=False, separators=(',', ':')),
+        chunk.get('category') or '', chunk.get('sub_category') or '', chunk.get('author') or '',
+        chunk.get('org') or '', chunk.get('doc_stage') or '', chunk.get('doc_year') or '',
+        chunk.get('summary') or '', chunk.get('importance') or 50,
+        embedding, (chunk.get('embed_model') or 'tfidf-256') if embedding else '', duplicate_of,
+    )
+
+
+def sql_literal(value):
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return str(value)
+    # SQLite 문자열 리터럴에는 NUL을 쓸 수 없음
+    return "'" + str(value).replace('\x00', '').replace("'", "''") + "'"
+
+
+def sql_list(values):
+    return ', '.join(sql_literal(v) for v in values)
+
+
+class ShardExporter:
+    """청크 배치를 샤드 파일로 기록 (UploadPipeline.submit/join, WikiClient.delete_chunks/rename_files 대체)
+
+    호출은 한 스레드(인덱서 메인 스레드)에서만 합니다.
+    """
+
+    def __init__(self, out_dir, fmt='sql', shard_bytes=50_000_000, statement_bytes=90_000,
+                 compress=True, rebuild_fts=True):
+        if fmt not in ('sql', 'ndjson'):
+            raise ValueError(f'Unknown export format: {fmt}')
+        self.out_dir = out_dir
+        self.fmt = fmt
+        self.shard_bytes = shard_bytes
+        self.statement_bytes = statement_bytes
+        self.compress = compress
+        self.rebuild_fts = rebuild_fts and fmt == 'sql'
+        self.stats = {'rows': 0, 'deletes': 0, 'renames': 0, 'shards': 0, 'bytes': 0, 'bytes_written': 0}
+
+        os.makedirs(out_dir, exist_ok=True)
+        self.manifest = self._load_manifest()
+        self._run = {'started': time.strftime('%Y-%m-%dT%H:%M:%S'), 'shards': [], 'load_order': []}
+        for name in os.listdir(out_dir):
+            if name.endswith('.tmp'):           # 이전 실행이 강제 종료되며 남긴 샤드
+                os.remove(os.path.join(out_dir, name))
+        if self.rebuild_fts:
+            self._write_text(BEGIN_SQL, '-- FTS 트리거 없이 적재한 뒤 99999-finish.sql에서 FTS 색인을 한 번에 재구성\n'
+                                        'DROP TRIGGER IF EXISTS chunks_ai;\n'
+                                        'DROP TRIGGER IF EXISTS chunks_ad;\n'
+                                        'DROP TRIGGER IF EXISTS chunks_au;\n')
+            self._write_text(FINISH_SQL, "INSERT INTO chunks_fts(chunks_fts) VALUES('rebuild');\n\n" + FTS_TRIGGERS)
+        self._file = None
+        self._pending = []      # 현재 샤드를 닫은 뒤 호출할 (함수, 인자...)
+
+    # ---------- manifest ----------
+
+    def _load_manifest(self):
+        path = os.path.join(self.out_dir, MANIFEST)
+        try:
+            with open(path, encoding='utf-8') as f:
+                manifest = json.load(f)
+        except FileNotFoundError:
+            return {'format': self.fmt, 'compress': self.compress, 'columns': list(COLUMNS),
+                    'created': time.strftime('%Y-%m-%dT%H:%M:%S'), 'shards': []}
+        if manifest.get('format') != self.fmt:
+            raise ValueError(f"{path} is a {manifest.get('format')} export, not {self.fmt}; use another directory")
+        if manifest.get('columns') != list(COLUMNS):
+            raise ValueError(f"{path} was written for another chunks schema; use another directory")
+        return manifest
+
+    def _save_manifest(self):
+        m = self.manifest
+        m['updated'] = time.strftime('%Y-%m-%dT%H:%M:%S')
+        m['rows'] = sum(s['rows'] for s in m['shards'])
+        shards = self._run['shards']
+        if self.rebuild_fts and shards:
+            shards = [BEGIN_SQL] + shards + [FINISH_SQL]
+        m['load_order'] = shards
+        runs = m.setdefault('runs', [])
+        if shards and self._run not in runs:
+            runs.append(self._run)
+        self._run['load_order'] = shards
+        path = os.path.join(self.out_dir, MANIFEST)
+        tmp = path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(m, f, ensure_ascii=False, indent=1)
+        os.replace(tmp, path)
+
+    def _write_text(self, name, text):
+        with open(os.path.join(self.out_dir, name), 'w', encoding='utf-8') as f:
+            f.write(text)
+
+    # ---------- shards ----------
+
+    def _open(self):
+        number = len(self.manifest['shards']) + 1
+        if number > MAX_SHARDS:
+            raise ValueError(f'Too many shards in {self.out_dir} (raise config.EXPORT_SHARD_MB)')
+        name = f"{number:05d}.{self.fmt}" + ('.gz' if self.compress else '')
+        tmp = os.path.join(self.out_dir, name + '.tmp')
+        raw = open(tmp, 'wb')
+        self._file = {'name': name, 'tmp': tmp, 'raw': raw,
+                      'out': gzip.GzipFile(fileobj=raw, mode='wb', compresslevel=6) if self.compress else raw,
+                      'sha256': hashlib.sha256(), 'bytes': 0, 'rows': 0, 'deletes': 0, 'renames': 0}
+
+    def _write(self, data):
+        if self._file is None:
+            self._open()
+        f = self._file
+        f['out'].write(data)
+        f['sha256'].update(data)
+        f['bytes'] += len(data)
+        self.stats['bytes'] += len(data)
+
+    def _close_shard(self):
+        f, self._file = self._file, None
+        if f is None:
+            return
+        if f['out'] is not f['raw']:
+            f['out'].close()
+        f['raw'].flush()
+        os.fsync(f['raw'].fileno())
+        f['raw'].close()
+        os.replace(f['tmp'], os.path.join(self.out_dir, f['name']))
+        written = os.path.getsize(os.path.join(self.out_dir, f['name']))
+        self.manifest['shards'].append({
+            'name': f['name'], 'rows': f['rows'], 'deletes': f['deletes'], 'renames': f['renames'],
+            'bytes': f['bytes'], 'bytes_written': written, 'sha256': f['sha256'].hexdigest(),
+        })
+        self._run['shards'].append(f['name'])
+        self._save_manifest()
+        self.stats['shards'] += 1
+        self.stats['bytes_written'] += written
+        pending, self._pending = self._pending, []
+        for fn, *args in pending:
+            fn(*args)
+
+    def after_close(self, fn):
+        """지금까지 쓴 문이 들어간 샤드를 닫은 뒤 fn() 호출 (열린 샤드가 없으면 바로)"""
+        if self._file is None:
+            fn()
+        else:
+            self._pending.append((fn,))
+
+    def _maybe_rotate(self):
+        if self._file is not None and self._file['bytes'] >= self.shard_bytes:
+            self._close_shard()
+
+    # ---------- UploadPipeline 대체 ----------
+
+    def submit(self, chunks, done):
+        """청크 배치를 현재 샤드에 기록. done(집계)은 샤드를 닫은 뒤 호출"""
+        rows = [chunk_row(c) for c in chunks]
+        if self.fmt == 'sql':
+            self._write_sql_rows(rows)
+        else:
+            self._write(b''.join(json.dumps(dict(zip(COLUMNS, row)), ensure_ascii=False).encode('utf-8') + b'\n'
+                                 for row in rows))
+        self._file['rows'] += len(rows)
+        self.stats['rows'] += len(rows)
+        self._pending.append((done, {'inserted': len(rows), 'failed': 0, 'batches': 1, 'retries': 0,
+                                     'bytes_sent': 0, 'errors': []}))
+        self._maybe_rotate()
+
+    def _write_sql_rows(self, rows):
+        # 기존 행을 덮어쓰기 전에 그 행을 가리키는 참조 청크에 본문을 채움 (api.ts materializeDuplicates).
+        # 새 본문과 비교하지 않으므로 같은 청크를 다시 내보내면 참조가 풀릴 수 있음 (처음 적재에는 해당 없음)
+        self._write(MATERIALIZE.format(where=f'duplicate_of IN ({sql_list(r[0] for r in rows)})').encode('utf-8'))
+        head = f"INSERT OR REPLACE INTO chunks ({', '.join(COLUMNS)}, indexed_at) VALUES\n".encode('utf-8')
+        values = []
+        size = len(head)
+        for row in rows:
+            value = f"({sql_list(row)}, datetime('now'))".encode('utf-8')
+            if values and size + len(value) + 2 > self.statement_bytes:
+                self._write(head + b',\n'.join(values) + b';\n')
+                values, size = [], len(head)
+            values.append(value)
+            size += len(value) + 2
+        self._write(head + b',\n'.join(values) + b';\n')
+
+    def join(self):
+        """현재 샤드를 닫아 남은 done 콜백 호출"""
+        self._close_shard()
+
+    def close(self):
+        self._close_shard()
+        if not self._run['shards']:
+            self._save_manifest()       # 쓴 샤드가 없으면 load_order 비움
+
+    # ---------- WikiClient 대체 (delta sync) ----------
+
+    def _write_op(self, op, key, values, sql):
+        if self.fmt == 'sql':
+            for i in range(0, len(values), 500):
+                self._write(sql(values[i:i + 500]).encode('utf-8'))
+        else:
+            self._write(json.dumps({'_op': op, key: values}, ensure_ascii=False).encode('utf-8') + b'\n')
+
+    def delete_chunks(self, chunk_ids=(), file_paths=()):
+        """삭제 문 기록. 반환값은 기록한 조건 수 (서버 삭제 행 수는 알 수 없음)"""
+        chunk_ids, file_paths = list(chunk_ids), list(file_paths)
+        if chunk_ids:
+            self._write_op('delete', 'chunk_ids', chunk_ids, lambda ids: (
+                MATERIALIZE.format(where=f'duplicate_of IN ({sql_list(ids)})')
+                + f'DELETE FROM chunks WHERE chunk_id IN ({sql_list(ids)});\n'))
+        if file_paths:
+            self._write_op('delete', 'file_paths', file_paths, lambda paths: (
+                MATERIALIZE.format(where=f'duplicate_of IN (SELECT chunk_id FROM chunks WHERE file_path IN ({sql_list(paths)}))')
+                + f'DELETE FROM chunks WHERE file_path IN ({sql_list(paths)});\n'))
+        count = len(chunk_ids) + len(file_paths)
+        if count:
+            self._file['deletes'] += count
+            self.stats['deletes'] += count
+            self._maybe_rotate()
+        return count
+
+    def rename_files(self, renames):
+        """[{'from', 'to', 'doc_title', 'project_path'}] 경로 변경 문 기록. 반환값은 파일 수"""
+        if not renames:
+            return 0
+        self._write_op('rename', 'renames', renames, lambda items: ''.join(
+            f"UPDATE chunks SET file_path = {sql_literal(r['to'])}, "
+            f"doc_title = COALESCE({sql_literal(r['doc_title']) if r.get('doc_title') is not None else 'NULL'}, doc_title), "
+            f"project_path = COALESCE({sql_literal(r['project_path']) if r.get('project_path') is not None else 'NULL'}, project_path) "
+            f"WHERE file_path = {sql_literal(r['from'])};\n" for r in items))
+        self._file['renames'] += len(renames)
+        self.stats['renames'] += len(renames)
+        self._maybe_rotate()
+        return len(renames)
@@ -0,0 +1,62 @@
+"""
+Knowledge Wiki - File Content Hash
+===================================
+파일 내용 해시 (indexed_files.hash, 이동 감지, 파싱 캐시 키).
+
+  - 파일 전체 BLAKE2b-128 (32자 hex). 1MB 이상은 mmap으로 한 번에, 작은 파일 / mmap이 안 되는
+    파일(가상 드라이브 등)은 1MB 버퍼 readinto로 읽음 (추가 복사 없음)
+  - v3.0 시절 해시(크기 + 앞/뒤 64KB의 SHA-256 앞 16자)는 ZIP 헤더 / 중앙 디렉터리가 같은
+    Office 파일끼리 겹칠 수 있어 대체. 기존 기록의 이동 감지를 위해 legacy_file_hash()로 남겨둠
+    (길이 16 = 구 해시, is_legacy_hash)
+"""
+
+import hashlib
+import mmap
+import os
+
+HASH_DIGEST_SIZE = 16
+BLOCK_SIZE = 1 << 20
+MMAP_MIN_SIZE = 1 << 20
+LEGACY_HASH_LEN = 16
+
+
+def file_hash(filepath, size=None):
+    """파일 전체 BLAKE2b (32자 hex)"""
+    with open(filepath, 'rb') as f:
+        if size is None:
+            size = os.fstat(f.fileno()).st_size
+        if size >= MMAP_MIN_SIZE:
+            try:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    return hashlib.blake2b(mm, digest_size=HASH_DIGEST_SIZE).hexdigest()
+            except (OSError, ValueError):
+                f.seek(0)
+        hasher = hashlib.blake2b(digest_size=HASH_DIGEST_SIZE)
+        buf = bytearray(BLOCK_SIZE)
+        view = memoryview(buf)
+        while True:
+            n = f.readinto(buf)
+            if not n:
+                break
+            hasher.update(view[:n])
+    return hasher.hexdigest()
+
+
+def legacy_file_hash(filepath, block_size=65536, size=None):
+    """v3.0 해시: 크기 + 앞 64KB + 뒤 64KB의 SHA-256 앞 16자 (이전 기록과 비교할 때만 사용)"""
+    if size is None:
+        size = os.path.getsize(filepath)
+    hasher = hashlib.sha256()
+    hasher.update(str(size).encode())
+    with open(filepath, 'rb') as f:
+        buf = f.read(block_size)
+        hasher.update(buf)
+        if size > block_size * 2:
+            f.seek(-block_size, 2)
+            buf = f.read(block_size)
+            hasher.update(buf)
+    return hasher.hexdigest()[:LEGACY_HASH_LEN]
+
+
+def is_legacy_hash(value):
+    return bool(value) and len(value) == LEGACY_HASH_LEN
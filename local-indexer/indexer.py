@@ -8,33 +8,67 @@ v3.0: 임베딩 생성 + 시맨틱 검색 지원
 지원 파일:
   - PPTX (슬라이드 단위)
   - PDF (페이지 단위)
-  - XLSX (시트+행 단위)
-  - CSV (행 단위)
+  - XLSX (시트+행 묶음 단위, config.ROW_CHUNK_ROWS)
+  - CSV (행 묶음 단위)
   - ipynb (셀 단위)
   - DOCX (문단 단위)
 
 사용법:
   1. pip install -r requirements.txt
   2. config.py에서 DRIVE_ROOT, WIKI_API_URL 설정
-  3. python indexer.py          # 파싱 + 태깅 + 업로드
-  4. python indexer.py --embed  # 업로드 후 서버측 임베딩 생성 트리거
+  3. python indexer.py              # 파싱 + 태깅 + 업로드
+  4. python indexer.py --embed      # 업로드 후 서버측 임베딩 생성 트리거
+  5. python indexer.py --workers 4  # 프로세스 4개로 병렬 파싱 + 동시 업로드
+  6. python indexer.py --retag      # 누적된 문서 빈도(DF)로 전체 태그 TF-IDF 재계산
+  7. python indexer.py --embed-local  # 임베딩을 인덱서에서 계산해 청크와 함께 업로드 (NumPy)
+                                      # + 오프라인 벡터 인덱스 작성 (python vector_index.py "검색어")
+  8. python indexer.py --watch      # 상주하며 변경 알림을 받은 파일만 바로 인덱싱 (watcher.py)
+  9. python indexer.py --export DIR  # 업로드 대신 D1 일괄 적재용 SQL 샤드 작성 (exporter.py, 처음 대량 적재용)
+ 10. python indexer.py --profile    # 단계별 cProfile / tracemalloc 결과 저장 (실행 지표는 항상 metrics/에 기록)
 """
 
 import os
 import sys
 import json
 import hashlib
-import sqlite3
 import re
 import time
+import queue
+import argparse
+import threading
 import traceback
+import multiprocessing
 from pathlib import Path
 from datetime import datetime
-from collections import Counter
-
-import requests
-
-from config import DRIVE_ROOT, WIKI_API_URL, BATCH_SIZE, SUPPORTED_EXTENSIONS
+from collections import Counter, namedtuple
+
+from config import (
+    DRIVE_ROOT, WIKI_API_URL, BATCH_SIZE, SUPPORTED_EXTENSIONS,
+    UPLOAD_IN_FLIGHT, UPLOAD_QUEUE_SIZE, EMBED_GENERATE_PAGE, EMBED_GENERATE_TIMEOUT,
+    ROW_CHUNK_ROWS, ROW_CHUNK_MAX_CHARS, ROW_CHUNK_REPEAT_HEADER,
+    DOCX_CHUNK_CHARS, DOCX_MIN_CHUNK_CHARS,
+    EXCLUDE_PATTERNS, EMBED_FORMAT,
+    VECTOR_INDEX, VECTOR_INDEX_DTYPE, VECTOR_INDEX_IVF_LISTS,
+    DEDUP, DEDUP_THRESHOLD, DEDUP_MIN_CHARS,
+    PARSE_CACHE_DIR, PARSE_CACHE_MAX_MB,
+    PDF_WORKERS, PDF_SHARD_PAGES, PDF_PAGE_TIMEOUT, PDF_SKIP_IMAGE_ONLY,
+    METRICS_DIR, METRICS_TOP_FILES, METRICS_KEEP_RUNS,
+    EXPORT_FORMAT, EXPORT_SHARD_MB, EXPORT_STATEMENT_BYTES, EXPORT_GZIP, EXPORT_REBUILD_FTS,
+    WATCH_DEBOUNCE_SECONDS, WATCH_MAX_DELAY_SECONDS, WATCH_BATCH_FILES, WATCH_MAX_BUFFER,
+    WATCH_POLL_SECONDS,
+)
+from async_client import UploadPipeline
+from csvfile import csv_rows
+from dedup import signature
+from exporter import ShardExporter
+from filehash import file_hash, is_legacy_hash, legacy_file_hash
+from metrics import RunMetrics, prune_reports
+from ooxml import FORMAT_ERRORS as OOXML_FORMAT_ERRORS, docx_blocks, pptx_slides
+from parse_cache import INCOMPLETE, ParseCache, complete_chunks, new_cache_stats
+from pdf_pages import PdfPagePool, page_text
+from uploader import WikiClient, UploadError, new_upload_stats, merge_upload_stats
+from state import StateStore
+from termcount import TermCounter
 
 
 # =============================================
@@ -99,38 +133,129 @@ STOP_WORDS = set([
 # Auto-Tagging Functions
 # =============================================
 
-def extract_tags(text, max_tags=8):
-    """TF 기반 키워드 추출 (단순 빈도)"""
+# 한글+영문 토큰 (2글자 이상)
+TOKEN_RE = re.compile(r'[가-힣]{2,}|[A-Za-z]{2,}')
+AUTHOR_PATTERNS = [
+    # 일반적인 패턴: "수행기관: XXX", "작성: XXX컨설팅"
+    ('수행기관', re.compile(r'수행기관[:\s]+([가-힣A-Za-z]+(?:컨설팅|연구원|연구소|주식회사|㈜))')),
+    ('작성', re.compile(r'작성[:\s]+([가-힣A-Za-z]+)')),
+    (('㈜', '주)'), re.compile(r'(?:㈜|주\))\s*([가-힣]+)')),
+]
+YEAR_RE = re.compile(r'20[2-3]\d')
+STAGE_WEIGHT = {
+    '최종보고': 20, '제안서': 15, '산출물': 10,
+    'RFP': 8, '중간보고': 5, '착수보고': 3,
+    '조사자료': 0, '분석코드': -5,
+}
+IMPORTANT_KEYWORDS = ['전략', '비전', '목표', 'KPI', '로드맵', '핵심', '결론', '권고']
+
+
+# 태그 순위용 문서 빈도 표 (docfreq.DocFreq). None이면 단순 빈도 순위
+DOC_FREQ = None
+
+
+def set_doc_freq(doc_freq):
+    global DOC_FREQ
+    DOC_FREQ = doc_freq
+
+
+def token_counts(text):
+    """불용어를 제외한 토큰별 빈도 Counter (토큰 종류별로 한 번만 lower)"""
+    counter = Counter(TOKEN_RE.findall(text))
+    for token in [t for t in counter if t.lower() in STOP_WORDS]:
+        del counter[token]
+    return counter
+
+
+def extract_tags(text, max_tags=8, counts=None):
+    """TF-IDF 기반 키워드 추출
+
+    IDF는 DOC_FREQ(코퍼스 전체 청크의 문서 빈도)에서 구하며,
+    DF 표가 없거나 비어 있으면 단순 빈도 순위입니다.
+    """
     if not text:
         return []
     
-    # 한글+영문 토큰 추출 (2글자 이상)
-    tokens = re.findall(r'[가-힣]{2,}|[A-Za-z]{2,}', text)
-    tokens = [t for t in tokens if t.lower() not in STOP_WORDS and len(t) >= 2]
-    
-    # 빈도 카운트
-    counter = Counter(tokens)
-    
-    # 상위 키워드 반환
-    return [word for word, _ in counter.most_common(max_tags)]
+    if counts is None:
+        counts = token_counts(text)
+    if DOC_FREQ is None:
+        return [word for word, _ in counts.most_common(max_tags)]
+    return DOC_FREQ.top_terms(counts, max_tags)
 
 
-def classify_category(text, filepath=''):
-    """텍스트 기반 주제분류"""
-    if not text:
-        return '', ''
-    
-    combined = text + ' ' + filepath
-    scores = {}
-    
-    for cat, keywords in CATEGORY_KEYWORDS.items():
-        score = 0
-        for kw in keywords:
-            count = combined.lower().count(kw.lower())
-            score += count
-        if score > 0:
-            scores[cat] = score
-    
+# =============================================
+# Keyword Matcher (사전 3종을 모듈 로드 시 한 번 컴파일)
+# =============================================
+
+class KeywordMatcher:
+    """CATEGORY_KEYWORDS / DOC_STAGE_PATTERNS / ORG_DICT 통합 매처
+
+    모든 키워드(소문자)를 TermCounter 하나로 컴파일해 텍스트를 한 번 훑고,
+    실제로 등장할 수 있는 키워드 후보만 골라 정확한 횟수를 셉니다.
+
+    결과는 기존 함수와 동일:
+      - 주제분류: 키워드별 str.count 합, 대상 (text + ' ' + filepath).lower()
+      - 문서단계: (filepath + ' ' + text[:500]).lower() 안에 있는 첫 패턴
+      - 기관: text + ' ' + filepath 안에 있는 첫 패턴 (대소문자 구분)
+    """
+
+    def __init__(self, categories, stages, orgs):
+        self.categories = [(name, tuple(kw.lower() for kw in kws)) for name, kws in categories.items()]
+        self.stages = [(name, tuple(p.lower() for p in pats)) for name, pats in stages.items()]
+        self.orgs = [(name, tuple(pats)) for name, pats in orgs.items()]
+
+        words = {kw for _, kws in self.categories + self.stages for kw in kws}
+        words |= {p.lower() for _, pats in self.orgs for p in pats}
+        self.terms = TermCounter(words)
+
+    def category_scores(self, lower, hits, found):
+        scores = {}
+        exact = self.terms.exact
+        for name, kws in self.categories:
+            score = 0
+            for kw in kws:
+                if kw in exact:
+                    score += hits.get(kw, 0)
+                elif kw in found:
+                    score += lower.count(kw)
+            if score > 0:
+                scores[name] = score
+        return scores
+
+    def doc_stage(self, head, found=None):
+        """head = filepath + ' ' + text[:500]"""
+        combined = head.lower()
+        for name, pats in self.stages:
+            for pat in pats:
+                if (found is None or pat in found) and pat in combined:
+                    return name
+        return ''
+
+    def org(self, combined, found=None):
+        for name, pats in self.orgs:
+            for pat in pats:
+                if (found is None or pat.lower() in found) and pat in combined:
+                    return name
+        return ''
+
+    def scan(self, text, filepath=''):
+        """텍스트를 한 번 훑어 (주제별 점수 dict, 문서단계 패턴, 기관) 반환"""
+        text = text or ''
+        combined = text + ' ' + filepath
+        lower = combined.lower()
+        hits, found = self.terms.scan(lower)
+        if not found:
+            return {}, '', ''
+        return (self.category_scores(lower, hits, found),
+                self.doc_stage(filepath + ' ' + text[:500], found),
+                self.org(combined, found))
+
+
+KEYWORDS = KeywordMatcher(CATEGORY_KEYWORDS, DOC_STAGE_PATTERNS, ORG_DICT)
+
+
+def rank_categories(scores):
+    """주제별 점수 -> (주 분류, 보조 분류). 보조 분류는 점수 3 이상일 때만"""
     if not scores:
         return '', ''
     
@@ -142,16 +267,8 @@ def classify_category(text, filepath=''):
     return main_cat, sub_cat
 
 
-def detect_doc_stage(filepath, text=''):
-    """파일경로 + 텍스트로 문서단계 판별"""
-    combined = filepath + ' ' + (text[:500] if text else '')
-    
-    for stage, patterns in DOC_STAGE_PATTERNS.items():
-        for pat in patterns:
-            if pat.lower() in combined.lower():
-                return stage
-    
-    # 폴더명 기반 추정
+def folder_stage(filepath):
+    """폴더명 번호 접두어 기반 문서단계 추정"""
     path_parts = filepath.lower()
     folder_stage_map = {
         '01.': 'RFP', '01 ': 'RFP',
@@ -168,29 +285,34 @@ def detect_doc_stage(filepath, text=''):
     return ''
 
 
+def classify_category(text, filepath=''):
+    """텍스트 기반 주제분류"""
+    if not text:
+        return '', ''
+    scores, _, _ = KEYWORDS.scan(text, filepath)
+    return rank_categories(scores)
+
+
+def detect_doc_stage(filepath, text=''):
+    """파일경로 + 텍스트로 문서단계 판별"""
+    head = filepath + ' ' + (text[:500] if text else '')
+    return KEYWORDS.doc_stage(head) or folder_stage(filepath)
+
+
 def detect_org(text, filepath=''):
     """발주기관 인식"""
-    combined = text + ' ' + filepath
-    
-    for org_name, patterns in ORG_DICT.items():
-        for pat in patterns:
-            if pat in combined:
-                return org_name
-    
-    return ''
+    return KEYWORDS.org(text + ' ' + filepath)
 
 
 def extract_author(text, filepath=''):
     """작성자/수행기관 추출 (표지 텍스트 패턴)"""
-    # 일반적인 패턴: "수행기관: XXX", "작성: XXX컨설팅"
-    patterns = [
-        r'수행기관[:\s]+([가-힣A-Za-z]+(?:컨설팅|연구원|연구소|주식회사|㈜))',
-        r'작성[:\s]+([가-힣A-Za-z]+)',
-        r'(?:㈜|주\))\s*([가-힣]+)',
-    ]
-    
-    for pat in patterns:
-        m = re.search(pat, text[:1000])
+    head = text[:1000]
+    for marker, pat in AUTHOR_PATTERNS:
+        # 표지 표시어가 없으면 정규식 생략
+        markers = marker if isinstance(marker, tuple) else (marker,)
+        if not any(m in head for m in markers):
+            continue
+        m = pat.search(head)
         if m:
             return m.group(1).strip()
     
@@ -201,8 +323,8 @@ def extract_year(text, filepath=''):
     """사업연도 추출"""
     combined = filepath + ' ' + (text[:500] if text else '')
     
-    # 2020~2029년도 패턴
-    years = re.findall(r'20[2-3]\d', combined)
+    # 2020~2039 패턴
+    years = YEAR_RE.findall(combined)
     if years:
         return max(years)  # 가장 최근 연도
     
@@ -211,126 +333,106 @@ def extract_year(text, filepath=''):
 
 def calc_importance(text, doc_stage='', filepath=''):
     """문서 중요도 점수 (0-100)"""
+    text = text or ''
     score = 50  # 기본
     
     # 문서 단계 가중치
-    stage_weight = {
-        '최종보고': 20, '제안서': 15, '산출물': 10,
-        'RFP': 8, '중간보고': 5, '착수보고': 3,
-        '조사자료': 0, '분석코드': -5,
-    }
-    score += stage_weight.get(doc_stage, 0)
+    score += STAGE_WEIGHT.get(doc_stage, 0)
     
     # 텍스트 길이 가중치 (내용이 풍부할수록)
-    text_len = len(text) if text else 0
-    if text_len > 500:
+    if len(text) > 500:
         score += 10
-    elif text_len > 200:
+    elif len(text) > 200:
         score += 5
     
     # 핵심 키워드 포함 시 가중치
-    important_keywords = ['전략', '비전', '목표', 'KPI', '로드맵', '핵심', '결론', '권고']
-    for kw in important_keywords:
-        if kw in (text or ''):
-            score += 3
+    score += 3 * sum(kw in text for kw in IMPORTANT_KEYWORDS)
     
     return min(max(score, 10), 100)  # 10~100 범위
 
 
-def auto_tag_chunk(chunk, filepath):
+def first_line(text, limit=150):
+    """공백이 아닌 첫 줄 (간단한 요약 - 추후 AI 대체)"""
+    head = text.lstrip()
+    if not head:
+        return ''
+    return head.split('\n', 1)[0].strip()[:limit]
+
+
+# auto_tag_chunk 결과 (필드 순서 = 청크에 기록되는 순서)
+TagResult = namedtuple('TagResult', 'tags category sub_category doc_stage org author doc_year importance summary')
+
+
+def tag_text(text, filepath='', counts=None):
+    """텍스트 1개에 대한 전체 자동 태깅 (한 번의 패스)
+
+    토큰화 1회, 소문자 변환 + 사전 매칭 1회, 앞 500/1000자는 한 번만 잘라
+    각 추출기가 공유합니다. 결과는 개별 함수(extract_tags, classify_category,
+    detect_doc_stage, detect_org, extract_author, extract_year, calc_importance)를
+    차례로 호출한 것과 같습니다. counts는 이미 계산한 token_counts(text) (선택)
+    """
+    text = text or ''
+    head = filepath + ' ' + text[:500]
+
+    scores, stage, org = KEYWORDS.scan(text, filepath)
+    category, sub_category = rank_categories(scores) if text else ('', '')
+    doc_stage = stage or folder_stage(filepath)
+
+    years = YEAR_RE.findall(head)
+    return TagResult(
+        tags=extract_tags(text, counts=counts),
+        category=category,
+        sub_category=sub_category,
+        doc_stage=doc_stage,
+        org=org,
+        author=extract_author(text, filepath),
+        doc_year=max(years) if years else '',
+        importance=calc_importance(text, doc_stage, filepath),
+        summary=first_line(text),
+    )
+
+
+def auto_tag_chunk(chunk, filepath, counts=None):
     """청크에 자동 메타데이터 태깅 적용"""
-    text = chunk.get('text', '')
-    
-    # Tags
-    chunk['tags'] = extract_tags(text)
-    
-    # Category
-    cat, sub_cat = classify_category(text, filepath)
-    chunk['category'] = cat
-    chunk['sub_category'] = sub_cat
-    
-    # Doc Stage
-    chunk['doc_stage'] = detect_doc_stage(filepath, text)
-    
-    # Organization
-    chunk['org'] = detect_org(text, filepath)
-    
-    # Author
-    chunk['author'] = extract_author(text, filepath)
-    
-    # Year
-    chunk['doc_year'] = extract_year(text, filepath)
-    
-    # Importance
-    chunk['importance'] = calc_importance(text, chunk['doc_stage'], filepath)
-    
-    # Summary (간단한 첫 줄 요약 - 추후 AI 대체)
-    lines = [l.strip() for l in text.split('\n') if l.strip()]
-    chunk['summary'] = lines[0][:150] if lines else ''
-    
+    chunk.update(tag_text(chunk.get('text', ''), filepath, counts)._asdict())
     return chunk
 
 
 # =============================================
-# Database (tracking indexed files)
+# State DB (indexed_files 추적, state.py)
 # =============================================
 DB_PATH = os.path.join(os.path.dirname(__file__), 'indexer_state.db')
+INDEX_PATH = os.path.join(os.path.dirname(__file__), 'vector_index.kwvi')
+PARSE_CACHE_PATH = os.path.join(os.path.dirname(__file__), PARSE_CACHE_DIR) if PARSE_CACHE_DIR else ''
+METRICS_PATH = os.path.join(os.path.dirname(__file__), METRICS_DIR) if METRICS_DIR else ''
 
-def init_db():
-    conn = sqlite3.connect(DB_PATH)
-    conn.execute('''
-        CREATE TABLE IF NOT EXISTS indexed_files (
-            file_path TEXT PRIMARY KEY,
-            mtime REAL,
-            hash TEXT,
-            chunk_count INTEGER DEFAULT 0,
-            last_indexed TEXT,
-            status TEXT DEFAULT 'ok'
-        )
-    ''')
-    conn.commit()
-    return conn
-
-def get_file_hash(filepath, block_size=65536):
-    size = os.path.getsize(filepath)
-    hasher = hashlib.sha256()
-    hasher.update(str(size).encode())
-    with open(filepath, 'rb') as f:
-        buf = f.read(block_size)
-        hasher.update(buf)
-        if size > block_size * 2:
-            f.seek(-block_size, 2)
-            buf = f.read(block_size)
-            hasher.update(buf)
-    return hasher.hexdigest()[:16]
-
-def needs_indexing(conn, filepath, mtime):
-    row = conn.execute(
-        'SELECT mtime, hash FROM indexed_files WHERE file_path = ?', (filepath,)
-    ).fetchone()
-    if row is None:
-        return True
-    if abs(row[0] - mtime) > 1:
-        return True
-    return False
-
-def mark_indexed(conn, filepath, mtime, file_hash, chunk_count, status='ok'):
-    conn.execute('''
-        INSERT OR REPLACE INTO indexed_files (file_path, mtime, hash, chunk_count, last_indexed, status)
-        VALUES (?, ?, ?, ?, ?, ?)
-    ''', (filepath, mtime, file_hash, chunk_count, datetime.now().isoformat(), status))
-    conn.commit()
+def get_file_hash(entry):
+    """FileEntry의 내용 해시 (plan_changes에서 이미 계산했으면 재사용)"""
+    return entry.content_hash or file_hash(entry.path, size=entry.size)
 
 
 # =============================================
-# Parsers (unchanged from v1)
+# Parsers (generator: 청크를 하나씩 yield하여 파일 전체를 메모리에 올리지 않음)
 # =============================================
 
-def parse_pptx(filepath):
+def _slide_chunk(number, texts):
+    full_text = '\n'.join(texts)
+    if full_text.strip():
+        return {
+            'location_type': 'slide',
+            'location_value': str(number),
+            'location_detail': f'Slide {number}',
+            'text': full_text
+        }
+    return None
+
+def _pptx_slides_object_model(filepath, start=1):
+    """python-pptx로 (슬라이드 번호, 텍스트 목록) yield. start 이전 슬라이드는 건너뜀"""
     from pptx import Presentation
-    chunks = []
     prs = Presentation(filepath)
     for i, slide in enumerate(prs.slides, 1):
+        if i < start:
+            continue
         texts = []
         for shape in slide.shapes:
             if shape.has_text_frame:
@@ -344,111 +446,231 @@ def parse_pptx(filepath):
                     row_texts = [cell.text.strip() for cell in row.cells if cell.text.strip()]
                     if row_texts:
                         texts.append(' | '.join(row_texts))
-        full_text = '\n'.join(texts)
-        if full_text.strip():
-            chunks.append({
-                'location_type': 'slide',
-                'location_value': str(i),
-                'location_detail': f'Slide {i}',
-                'text': full_text
-            })
-    return chunks
+        yield i, texts
+
+def parse_pptx(filepath):
+    """슬라이드 단위. 슬라이드 XML을 zip에서 바로 읽고 (ooxml.pptx_slides),
+    구조가 예상과 다른 파일은 python-pptx로 읽음 (이미 낸 슬라이드 다음부터, 결과는 같음)
+    """
+    done = 0
+    try:
+        for number, texts in pptx_slides(filepath):
+            done = number
+            chunk = _slide_chunk(number, texts)
+            if chunk:
+                yield chunk
+        return
+    except OOXML_FORMAT_ERRORS:
+        pass
+    for number, texts in _pptx_slides_object_model(filepath, start=done + 1):
+        chunk = _slide_chunk(number, texts)
+        if chunk:
+            yield chunk
 
 def parse_pdf(filepath):
+    """페이지 단위. 추출은 PdfPagePool(pdf_pages.py)에서 페이지 구간별로 나눠 진행
+
+    시간 초과 / 크래시로 건너뛴 페이지가 있으면 경고 후 INCOMPLETE 표시 (파싱 캐시에 저장하지 않음)
+    """
     import fitz
-    chunks = []
+    pool = get_pdf_pool()
+    skipped = []
     doc = fitz.open(filepath)
-    for i, page in enumerate(doc, 1):
-        text = page.get_text().strip()
-        if text:
-            chunks.append({
-                'location_type': 'page',
-                'location_value': str(i),
-                'location_detail': f'Page {i}',
-                'text': text
-            })
-    doc.close()
-    return chunks
+    try:
+        if pool is None:
+            pages = ((pno, page_text(page, PDF_SKIP_IMAGE_ONLY)) for pno, page in enumerate(doc))
+        else:
+            page_count = doc.page_count
+            doc.close()
+            pages = pool.pages(filepath, page_count, skipped)
+        for pno, text in pages:
+            if text:
+                yield {
+                    'location_type': 'page',
+                    'location_value': str(pno + 1),
+                    'location_detail': f'Page {pno + 1}',
+                    'text': text
+                }
+    finally:
+        if not doc.is_closed:
+            doc.close()
+    if skipped:
+        for pno, reason in sorted(skipped):
+            print(f"  [WARN] {os.path.basename(filepath)}: page {pno + 1} skipped ({reason})")
+        yield {INCOMPLETE: True}
+
+def group_rows(rows):
+    """(행번호, 행 텍스트) 스트림을 ROW_CHUNK_ROWS / ROW_CHUNK_MAX_CHARS 단위로 묶기
+
+    yield (시작 행, 끝 행, 텍스트, 행 수, 원본 행 바이트 수).
+    ROW_CHUNK_REPEAT_HEADER가 켜져 있으면 두 번째 청크부터 첫 행(헤더)을 앞에 붙입니다.
+    """
+    max_rows = max(1, ROW_CHUNK_ROWS)
+    repeat_header = ROW_CHUNK_REPEAT_HEADER and max_rows > 1
+    header = None
+    lines = []
+    n_rows = 0
+    n_chars = 0
+    row_bytes = 0
+    start = end = 0
+
+    for row_num, text in rows:
+        if n_rows and (n_rows >= max_rows or n_chars + len(text) > ROW_CHUNK_MAX_CHARS):
+            yield start, end, '\n'.join(lines), n_rows, row_bytes
+            lines = []
+            n_rows = n_chars = row_bytes = 0
+
+        if not n_rows:
+            start = row_num
+            if header is not None and repeat_header:
+                lines.append(header)
+                n_chars = len(header)
+        if header is None:
+            header = text
+
+        lines.append(text)
+        n_rows += 1
+        n_chars += len(text)
+        row_bytes += len(text.encode('utf-8'))
+        end = row_num
+
+    if n_rows:
+        yield start, end, '\n'.join(lines), n_rows, row_bytes
+
+
+def _row_range(start, end, sep=':'):
+    return f'Row{sep}{start}' if start == end else f'Rows{sep}{start}-{end}'
+
 
 def parse_xlsx(filepath):
     from openpyxl import load_workbook
-    chunks = []
     wb = load_workbook(filepath, read_only=True, data_only=True)
-    for sheet_name in wb.sheetnames:
-        ws = wb[sheet_name]
-        row_num = 0
-        for row in ws.iter_rows(values_only=True):
-            row_num += 1
-            cells = [str(c).strip() for c in row if c is not None and str(c).strip()]
-            if cells:
-                text = ' | '.join(cells)
-                chunks.append({
+    try:
+        for sheet_name in wb.sheetnames:
+            ws = wb[sheet_name]
+
+            def sheet_rows():
+                for row_num, row in enumerate(ws.iter_rows(values_only=True), 1):
+                    cells = [str(c).strip() for c in row if c is not None and str(c).strip()]
+                    if cells:
+                        yield row_num, ' | '.join(cells)
+
+            for start, end, text, n_rows, row_bytes in group_rows(sheet_rows()):
+                yield {
                     'location_type': 'sheet',
-                    'location_value': sheet_name,
-                    'location_detail': f'Sheet:{sheet_name} Row:{row_num}',
-                    'text': text
-                })
-    wb.close()
-    return chunks
+                    'location_value': f'{sheet_name}:{start}',
+                    'location_detail': f'Sheet:{sheet_name} {_row_range(start, end)}',
+                    'text': text,
+                    'rows': n_rows,
+                    'row_bytes': row_bytes,
+                }
+    finally:
+        wb.close()
 
 def parse_csv(filepath):
-    import csv
-    chunks = []
-    for enc in ['utf-8', 'cp949', 'euc-kr', 'latin-1']:
-        try:
-            with open(filepath, 'r', encoding=enc) as f:
-                reader = csv.reader(f)
-                for i, row in enumerate(reader, 1):
-                    cells = [c.strip() for c in row if c.strip()]
-                    if cells:
-                        text = ','.join(cells)
-                        chunks.append({
-                            'location_type': 'row',
-                            'location_value': str(i),
-                            'location_detail': f'Row {i}',
-                            'text': text
-                        })
-            break
-        except (UnicodeDecodeError, UnicodeError):
-            continue
-    return chunks
+    """인코딩 / 구분자는 csvfile이 앞뒤 표본으로 한 번 판단하고, 본문은 한 번만 읽음"""
+    def rows():
+        # 셀마다 strip 한 번 (빈 셀을 빼고 이으므로 빈 문자열 = 빈 행)
+        for i, row in csv_rows(filepath):
+            text = ','.join(filter(None, map(str.strip, row)))
+            if text:
+                yield i, text
+
+    for start, end, text, n_rows, row_bytes in group_rows(rows()):
+        yield {
+            'location_type': 'row',
+            'location_value': str(start),
+            'location_detail': _row_range(start, end, sep=' '),
+            'text': text,
+            'rows': n_rows,
+            'row_bytes': row_bytes,
+        }
+
 
 def parse_ipynb(filepath):
-    chunks = []
     with open(filepath, 'r', encoding='utf-8') as f:
         nb = json.load(f)
     for i, cell in enumerate(nb.get('cells', []), 1):
         cell_type = cell.get('cell_type', 'code')
         source = ''.join(cell.get('source', []))
         if source.strip():
-            chunks.append({
+            yield {
                 'location_type': 'cell',
                 'location_value': str(i),
                 'location_detail': f'Cell {i} ({cell_type})',
                 'text': source
-            })
-    return chunks
+            }
+
+def _split_text(text, limit):
+    """limit자보다 긴 텍스트를 줄바꿈 / 공백 경계에서 limit자 이하 조각으로"""
+    pieces = []
+    while len(text) > limit:
+        cut = max(text.rfind('\n', 0, limit), text.rfind(' ', 0, limit))
+        if cut <= limit // 2:
+            cut = limit
+        pieces.append(text[:cut].rstrip())
+        text = text[cut:].lstrip()
+    if text:
+        pieces.append(text)
+    return pieces
+
+def _docx_detail(section, paras, tables):
+    parts = []
+    if paras:
+        parts.append(f'Paragraph {paras[0]}' if paras[0] == paras[1] else f'Paragraphs {paras[0]}-{paras[1]}')
+    if tables:
+        parts.append(f'Table {tables[0]}' if tables[0] == tables[1] else f'Tables {tables[0]}-{tables[1]}')
+    detail = ', '.join(parts)
+    return f'{section} | {detail}' if section else detail
 
 def parse_docx(filepath):
-    from docx import Document
-    chunks = []
-    doc = Document(filepath)
-    current_text = []
-    para_start = 1
-    for i, para in enumerate(doc.paragraphs, 1):
-        text = para.text.strip()
-        if text:
-            current_text.append(text)
-        if len(current_text) >= 5 or (i == len(doc.paragraphs) and current_text):
-            chunks.append({
-                'location_type': 'page',
-                'location_value': str(para_start),
-                'location_detail': f'Paragraphs {para_start}-{i}',
-                'text': '\n'.join(current_text)
-            })
-            current_text = []
-            para_start = i + 1
-    return chunks
+    """본문 문단 + 표 행을 제목 구간 단위로 묶음 (ooxml.docx_blocks로 document.xml을 한 번만 읽음)
+
+    제목 문단에서 새 청크를 시작하고 (앞 청크가 DOCX_MIN_CHUNK_CHARS 이상일 때),
+    구간이 DOCX_CHUNK_CHARS를 넘으면 나눕니다. 한 문단이 상한보다 길면 공백 경계에서 자릅니다.
+    location_value는 청크가 시작하는 블록(문단 / 표 행) 순번 (긴 문단을 자른 조각이면 '.n'),
+    location_detail은 '상위 제목 > 제목 | Paragraphs a-b, Table n'
+    """
+    headings = []       # [(수준, 제목)] 현재 위치의 제목 경로
+    chunk = None
+
+    def section():
+        return first_line(' > '.join(text for _, text in headings), 150)
+
+    def emit(c):
+        return {
+            'location_type': 'page',
+            'location_value': c['value'],
+            'location_detail': _docx_detail(c['section'], c['paras'], c['tables']),
+            'text': '\n'.join(c['texts']),
+        }
+
+    for block, (kind, number, text, level) in enumerate(docx_blocks(filepath), 1):
+        if not text:
+            continue
+        if level is not None:
+            if chunk and chunk['body'] and chunk['size'] >= DOCX_MIN_CHUNK_CHARS:
+                yield emit(chunk)
+                chunk = None
+            while headings and headings[-1][0] >= level:
+                headings.pop()
+            headings.append((level, text))
+        for piece_no, piece in enumerate(_split_text(text, DOCX_CHUNK_CHARS)):
+            if chunk and chunk['body'] and chunk['size'] + len(piece) > DOCX_CHUNK_CHARS:
+                yield emit(chunk)
+                chunk = None
+            if chunk is None:
+                chunk = {'value': f'{block}.{piece_no}' if piece_no else str(block), 'section': section(),
+                         'texts': [], 'size': 0, 'body': False, 'paras': None, 'tables': None}
+            elif not chunk['body']:
+                chunk['section'] = section()     # 제목만 모인 청크는 가장 안쪽 제목으로
+            chunk['texts'].append(piece)
+            chunk['size'] += len(piece) + 1
+            chunk['body'] = chunk['body'] or level is None
+            key = 'paras' if kind == 'p' else 'tables'
+            chunk[key] = [chunk[key][0], number] if chunk[key] else [number, number]
+    if chunk:
+        yield emit(chunk)
 
 
 PARSERS = {
@@ -456,19 +678,172 @@ PARSERS = {
     '.csv': parse_csv, '.ipynb': parse_ipynb, '.docx': parse_docx,
 }
 
+# 파서 출력이 바뀌면 올림 (파싱 캐시의 이전 항목을 쓰지 않도록)
+PARSER_VERSION = 3
+
+_parse_cache = None
+_pdf_pool = None
+_pdf_workers = PDF_WORKERS
+
+
+def set_pdf_workers(workers):
+    """이 프로세스의 PDF 페이지 추출 프로세스 수 (--workers 파싱 워커는 PDF_WORKERS를 나눠 씀)"""
+    global _pdf_workers
+    _pdf_workers = workers
+
+
+def get_pdf_pool():
+    """프로세스 공용 PdfPagePool (PDF_WORKERS가 0이거나 자식 프로세스를 둘 수 없으면 None)"""
+    global _pdf_pool
+    if _pdf_pool is not None and _pdf_pool.pid != os.getpid():
+        close_pdf_pool()        # fork한 파싱 워커가 물려받은 부모의 풀
+    if _pdf_pool is None and _pdf_workers and not multiprocessing.current_process().daemon:
+        _pdf_pool = PdfPagePool(_pdf_workers, PDF_SHARD_PAGES, PDF_PAGE_TIMEOUT, PDF_SKIP_IMAGE_ONLY)
+    return _pdf_pool
+
+
+def close_pdf_pool():
+    """get_pdf_pool()로 띄운 추출 프로세스 종료 (실행 / 파싱 워커가 끝날 때)"""
+    global _pdf_pool
+    if _pdf_pool is not None:
+        _pdf_pool.close()
+        _pdf_pool = None
+
+
+def get_parse_cache():
+    """프로세스 공용 ParseCache (PARSE_CACHE_DIR이 비어 있으면 None)"""
+    global _parse_cache
+    if _parse_cache is None and PARSE_CACHE_PATH:
+        _parse_cache = ParseCache(PARSE_CACHE_PATH, PARSE_CACHE_MAX_MB * 1024 * 1024)
+    return _parse_cache
+
+
+def parse_file(entry, cache_stats=None, content_hash=None):
+    """파일의 파서 출력 청크 iterator
+
+    파싱 캐시가 켜져 있으면 파일 내용 + 파서 설정이 같은 이전 결과를 파서 없이 돌려줍니다.
+    content_hash가 없으면 get_file_hash(entry)로 계산합니다.
+    cache_stats(new_cache_stats())가 주어지면 적중 여부 / 아낀 파싱 시간을 누적합니다.
+    """
+    ext = Path(entry.path).suffix.lower()
+    parser = PARSERS[ext]
+    cache = get_parse_cache()
+    if cache is None:
+        return complete_chunks(parser(entry.path))
+    settings = [PARSER_VERSION, ext]
+    if ext in ('.xlsx', '.csv'):
+        settings += [ROW_CHUNK_ROWS, ROW_CHUNK_MAX_CHARS, ROW_CHUNK_REPEAT_HEADER]
+    elif ext == '.docx':
+        settings += [DOCX_CHUNK_CHARS, DOCX_MIN_CHUNK_CHARS]
+    key = cache.key(content_hash or get_file_hash(entry), settings)
+    if cache_stats is None:
+        cache_stats = new_cache_stats()
+    return cache.parse(key, lambda: parser(entry.path), cache_stats)
+
 
 # =============================================
 # Scanner & Upload
 # =============================================
 
-def scan_files(root_dir):
-    files = []
-    root = Path(root_dir)
-    for ext in SUPPORTED_EXTENSIONS:
-        for f in root.rglob(f'*{ext}'):
-            if '~$' in f.name or '.git' in str(f) or 'node_modules' in str(f):
+# 스캔 결과 (stat 정보를 함께 전달하여 이후 단계에서 다시 stat하지 않음)
+# content_hash: plan_changes에서 내용 해시를 계산한 경우에만 채워짐 (index_file에서 재사용)
+FileEntry = namedtuple('FileEntry', 'path rel_path size mtime mtime_ns inode content_hash', defaults=('',))
+
+
+def _glob_to_regex(pat):
+    out = []
+    i = 0
+    while i < len(pat):
+        if pat.startswith('**/', i):
+            out.append('(?:.*/)?')
+            i += 3
+        elif pat.startswith('**', i):
+            out.append('.*')
+            i += 2
+        elif pat[i] == '*':
+            out.append('[^/]*')
+            i += 1
+        elif pat[i] == '?':
+            out.append('[^/]')
+            i += 1
+        else:
+            out.append(re.escape(pat[i]))
+            i += 1
+    return ''.join(out)
+
+
+def compile_ignore(patterns):
+    """.gitignore 형식 패턴 목록 -> is_ignored(rel_path, is_dir) 함수
+
+    rel_path는 DRIVE_ROOT 기준 '/' 구분 경로. 마지막으로 일치한 규칙이 적용됩니다.
+    """
+    rules = []
+    for pat in patterns:
+        pat = pat.strip()
+        if not pat or pat.startswith('#'):
+            continue
+        negate = pat.startswith('!')
+        if negate:
+            pat = pat[1:]
+        dir_only = pat.endswith('/')
+        pat = pat.rstrip('/')
+        if '/' in pat:
+            regex = '^' + _glob_to_regex(pat.lstrip('/')) + '$'
+        else:
+            regex = '(?:^|/)' + _glob_to_regex(pat) + '$'
+        rules.append((re.compile(regex, re.IGNORECASE), negate, dir_only))
+
+    def is_ignored(rel_path, is_dir):
+        ignored = False
+        for regex, negate, dir_only in rules:
+            if dir_only and not is_dir:
                 continue
-            files.append(f)
+            if regex.search(rel_path):
+                ignored = not negate
+        return ignored
+
+    return is_ignored
+
+
+def scan_files(root_dir, exclude=EXCLUDE_PATTERNS, subdir=''):
+    """os.scandir 기반 단일 패스 디렉터리 탐색
+
+    제외 디렉터리는 하위로 내려가기 전에 잘라내고, 파일마다 scandir가 돌려준
+    stat 결과(size, mtime, inode)를 FileEntry로 함께 반환합니다.
+    subdir(root_dir 기준 상대 경로)를 주면 그 아래만 탐색합니다 (--watch 폴더 재스캔).
+    """
+    is_ignored = compile_ignore(exclude)
+    extensions = {ext.lower() for ext in SUPPORTED_EXTENSIONS if ext.lower() in PARSERS}
+    files = []
+    subdir = subdir.replace(os.sep, '/').strip('/')
+    stack = [(os.path.join(str(root_dir), subdir) if subdir else str(root_dir), subdir)]
+
+    while stack:
+        dir_path, rel_dir = stack.pop()
+        try:
+            it = os.scandir(dir_path)
+        except OSError as e:
+            print(f"  [WARN] Cannot read {dir_path}: {e}")
+            continue
+        with it:
+            for entry in it:
+                rel = f'{rel_dir}/{entry.name}' if rel_dir else entry.name
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if not is_ignored(rel, True):
+                            stack.append((entry.path, rel))
+                        continue
+                    if os.path.splitext(entry.name)[1].lower() not in extensions:
+                        continue
+                    if is_ignored(rel, False):
+                        continue
+                    st = entry.stat()
+                except OSError:
+                    continue
+                files.append(FileEntry(entry.path, rel.replace('/', os.sep), st.st_size,
+                                       st.st_mtime, st.st_mtime_ns, st.st_ino))
+
+    files.sort(key=lambda e: e.path)
     return files
 
 def get_project_path(filepath, root_dir):
@@ -476,27 +851,993 @@ def get_project_path(filepath, root_dir):
     parts = Path(rel).parts
     return parts[0] if len(parts) > 1 else ''
 
-def upload_chunks(chunks, api_url):
-    url = f'{api_url}/api/chunks'
-    for i in range(0, len(chunks), BATCH_SIZE):
-        batch = chunks[i:i + BATCH_SIZE]
+_client = None
+
+def get_client():
+    """프로세스 공용 WikiClient (연결 풀 재사용)"""
+    global _client
+    if _client is None:
+        _client = WikiClient(WIKI_API_URL)
+    return _client
+
+_pipeline = None
+
+def get_pipeline():
+    """프로세스 공용 UploadPipeline (업로드 이벤트 루프, async_client.py)"""
+    global _pipeline
+    if _pipeline is None:
+        _pipeline = UploadPipeline(get_client(), UPLOAD_IN_FLIGHT)
+    return _pipeline
+
+_exporter = None
+
+def set_exporter(exporter):
+    """--export: 이후 청크 업로드 / 삭제 / 경로 변경을 서버 대신 ShardExporter에 기록"""
+    global _exporter
+    _exporter = exporter
+
+def upload_sink():
+    """청크 배치를 보낼 곳 (submit / join): ShardExporter 또는 UploadPipeline"""
+    return _exporter or get_pipeline()
+
+def chunk_store():
+    """서버 청크 삭제 / 경로 변경 대상 (delete_chunks / rename_files): ShardExporter 또는 WikiClient"""
+    return _exporter or get_client()
+
+def after_sync(fn):
+    """chunk_store()에 보낸 변경이 반영된 뒤 상태 기록: 업로드는 바로, --export는 그 문이 든 샤드를 닫은 뒤"""
+    if _exporter:
+        _exporter.after_close(fn)
+    else:
+        fn()
+
+def upload_chunks(chunks, done):
+    """청크 업로드 예약. 끝나면 오류를 출력하고 done(집계) 호출 (inserted / failed / batches / retries / errors)
+
+    진행 중인 배치가 상한에 닿아 있으면 자리가 날 때까지 기다립니다.
+    """
+    def finished(stats):
+        for err in stats['errors']:
+            print(f"  [WARN] Upload error: {err}")
+        done(stats)
+
+    upload_sink().submit(chunks, finished)
+
+
+def generate_embeddings():
+    """서버 임베딩 생성을 EMBED_GENERATE_PAGE개씩 나눠 요청하며 진행률 출력. 생성 수 반환"""
+    def progress(stats):
+        print(f"  Embeddings: {stats.get('with_embeddings', 0)}/{stats.get('total_chunks', 0)} "
+              f"({stats.get('coverage', 0)}%)")
+
+    pipeline = get_pipeline()
+    return pipeline.run(pipeline.client.generate_embeddings(EMBED_GENERATE_PAGE, EMBED_GENERATE_TIMEOUT, progress))
+
+
+def print_upload_report(upload_stats):
+    print(f"  Uploaded: {upload_stats['inserted']} inserted, {upload_stats['failed']} failed "
+          f"in {upload_stats['batches']} batches ({upload_stats['retries']} retries, "
+          f"{upload_stats['bytes_sent'] / 1e6:.1f}MB sent)")
+
+
+def print_export_report(exporter):
+    stats = exporter.stats
+    print(f"  Exported: {stats['rows']} rows, {stats['deletes']} deletes, {stats['renames']} renames "
+          f"in {stats['shards']} shards ({stats['bytes'] / 1e6:.1f}MB, {stats['bytes_written'] / 1e6:.1f}MB on disk)")
+    order = exporter.manifest.get('load_order', [])
+    if order and exporter.fmt == 'sql':
+        print(f"  Load {len(order)} files in order (manifest.json 'load_order'):")
+        if exporter.compress:
+            print(f"    gunzip {os.path.join(exporter.out_dir, '*.gz')}")
+        print(f"    for f in $(jq -r '.load_order[]' {os.path.join(exporter.out_dir, 'manifest.json')}); do "
+              f"npx wrangler d1 execute knowledge-wiki-db --remote --file \"{exporter.out_dir}/${{f%.gz}}\"; done")
+
+
+# =============================================
+# Delta Sync (변경 / 이동 / 삭제 파일 반영)
+# =============================================
+
+def server_path(rel_path):
+    """서버(chunks.file_path)에 저장되는 경로 형식: DRIVE_ROOT 기준, '/' 구분"""
+    return rel_path.replace('\\', '/')
+
+
+def plan_changes(state, files, removed=None):
+    """스캔 결과와 indexed_files를 비교해 (재)인덱싱 / 이동 / 삭제 대상 분류
+
+    반환: (to_index, renames[(old_path, entry)], gone[old_path])
+    사라진 파일과 새로 나타난 파일의 크기 + 해시가 같으면 이동으로 보고
+    파싱/임베딩 없이 서버 경로만 갱신합니다.
+    stat만 바뀌고 내용 해시가 기록과 같은 파일(드라이브 재동기화 등)은 stat만 갱신하고 건너뜁니다.
+    계산한 해시는 entry.content_hash로 넘겨 index_file에서 다시 읽지 않습니다.
+    removed를 주면 files는 전체가 아닌 일부(--watch)로 보고, 삭제 후보를 removed 안에서만 찾습니다.
+    """
+    root_prefix = os.path.join(str(DRIVE_ROOT), '')
+    seen = {entry.path for entry in files}
+    if removed is not None:
+        gone = [path for path in removed if path in state.files and path not in seen]
+    else:
+        gone = [path for path in state.files if path not in seen and path.startswith(root_prefix)]
+    if gone and not files and removed is None:
+        # 드라이브가 비어 보이면(마운트 해제, 동기화 중단 등) 전체 삭제를 막음
+        print(f"  [WARN] No files found but {len(gone)} were indexed before; skipping deletions")
+        gone = []
+
+    gone_by_hash = {}
+    gone_sizes = set()
+    legacy = False
+    for path in gone:
+        row = state.files[path]
+        if row.status == 'ok' and row.hash:
+            gone_by_hash.setdefault(row.hash, []).append(path)
+            gone_sizes.add(row.size)
+            legacy = legacy or is_legacy_hash(row.hash)
+
+    to_index = []
+    renames = []
+    touched = []
+    for entry in files:
+        if not state.needs_indexing(entry):
+            continue
+        row = state.files.get(entry.path)
+        if (row is not None and row.status == 'ok' and row.has_manifest and row.doc_id
+                and row.size == entry.size and row.hash and not is_legacy_hash(row.hash)):
+            entry = entry._replace(content_hash=file_hash(entry.path, size=entry.size))
+            if entry.content_hash == row.hash:
+                touched.append(entry)
+                continue
+        if (gone_by_hash and row is None
+                and (entry.size in gone_sizes or None in gone_sizes)):
+            entry = entry._replace(content_hash=file_hash(entry.path, size=entry.size))
+            candidates = gone_by_hash.get(entry.content_hash)
+            if not candidates and legacy:
+                candidates = gone_by_hash.get(legacy_file_hash(entry.path, size=entry.size))
+            while candidates:
+                old_path = candidates.pop()
+                old_size = state.files[old_path].size
+                if old_size is None or old_size == entry.size:
+                    renames.append((old_path, entry))
+                    break
+            else:
+                to_index.append(entry)
+            continue
+        to_index.append(entry)
+
+    if touched:
+        state.touch_files(touched)
+        print(f"  {len(touched)} files re-synced with identical content (not re-indexed)")
+    renamed = {old_path for old_path, _ in renames}
+    gone = [path for path in gone if path not in renamed]
+    return to_index, renames, gone
+
+
+def sync_renames_and_deletes(state, renames, gone):
+    """이동된 파일은 서버 경로 갱신, 사라진 파일은 서버 청크 삭제 후 indexed_files 반영
+
+    요청이 실패하면 indexed_files를 건드리지 않으므로 다음 실행 때 다시 시도합니다.
+    """
+    client = chunk_store()
+    if renames:
+        try:
+            updated = client.rename_files([{
+                'from': server_path(os.path.relpath(old_path, DRIVE_ROOT)),
+                'to': server_path(entry.rel_path),
+                'doc_title': Path(entry.path).stem,
+                'project_path': get_project_path(entry.path, DRIVE_ROOT),
+            } for old_path, entry in renames])
+            def moved():
+                state.move_files(renames)
+                for _, entry in renames:
+                    state.set_vector_project(entry.path, get_project_path(entry.path, DRIVE_ROOT))
+            after_sync(moved)
+            print(f"  Renamed {len(renames)} files ({updated} chunks updated, no re-parse)")
+        except UploadError as e:
+            print(f"  [WARN] Rename sync failed: {e} (will retry next run)")
+    if gone:
+        try:
+            deleted = client.delete_chunks(
+                file_paths=[server_path(os.path.relpath(path, DRIVE_ROOT)) for path in gone])
+            after_sync(lambda: state.forget_files(gone))
+            print(f"  Removed {len(gone)} deleted files ({deleted} chunks)")
+        except UploadError as e:
+            print(f"  [WARN] Delete sync failed: {e} (will retry next run)")
+
+
+def purge_untracked(state, to_index):
+    """manifest가 없는(v3.0 시절) 기록의 파일은 재업로드 전에 서버 청크를 파일 단위로 삭제"""
+    legacy = [entry for entry in to_index
+              if entry.path in state.files and not state.files[entry.path].has_manifest]
+    if not legacy:
+        return
+    try:
+        chunk_store().delete_chunks(file_paths=[server_path(entry.rel_path) for entry in legacy])
+    except UploadError as e:
+        print(f"  [WARN] Could not clear old chunks of {len(legacy)} files: {e}")
+
+
+# =============================================
+# Pipeline (Parse -> Auto-tag -> Upload)
+# =============================================
+
+def chunk_fingerprint(location_detail, text):
+    """청크 지문: 위치 + 공백을 정규화한 텍스트의 BLAKE2b 해시
+
+    공백/줄바꿈만 바뀐 청크는 같은 청크로 취급합니다.
+    """
+    norm = location_detail + '\n' + ' '.join(text.split())
+    return hashlib.blake2b(norm.encode('utf-8'), digest_size=8).hexdigest()
+
+
+def _timed(iterable, timings, key):
+    """iterable을 그대로 돌려주며 next()에 걸린 시간을 timings[key]에 누적"""
+    it = iter(iterable)
+    while True:
+        t0 = time.perf_counter()
+        try:
+            item = next(it)
+        except StopIteration:
+            timings[key] += time.perf_counter() - t0
+            return
+        timings[key] += time.perf_counter() - t0
+        yield item
+
+
+def iter_file_chunks(entry, file_hash, doc_id, row_stats=None, known=None, terms=None, cache_stats=None,
+                     timings=None):
+    """파일 하나를 파싱하고 메타데이터를 붙여 태깅된 청크를 순서대로 yield (스트리밍)
+
+    yield (chunk_id, 지문, chunk). known({chunk_id: 지문})에 같은 지문이 있으면
+    이전 업로드와 내용이 같은 청크이므로 태깅을 건너뛰고 chunk 자리에 None을 돌려줍니다.
+    row_stats(Counter)가 주어지면 XLSX/CSV 행 묶음 효과(행 수 대비 청크 수, 바이트)를 누적합니다.
+    terms(Counter)가 주어지면 건너뛴 청크를 포함한 모든 청크의 {토큰(소문자): 들어있는 청크 수}를
+    누적합니다 (문서 빈도 표 갱신용).
+    파싱은 parse_file()을 거치므로 캐시 적중이면 파서를 실행하지 않습니다 (cache_stats에 누적).
+    timings(Counter)가 주어지면 파싱 / 태깅에 걸린 시간(초)을 'parse' / 'tag'에 누적합니다.
+    """
+    if timings is None:
+        timings = Counter()
+    filepath = Path(entry.path)
+    ext = filepath.suffix.lower()
+
+    rel_path = entry.rel_path
+    project = get_project_path(entry.path, DRIVE_ROOT)
+    mtime = datetime.fromtimestamp(entry.mtime).isoformat()
+
+    for c in _timed(parse_file(entry, cache_stats, file_hash), timings, 'parse'):
+        t0 = time.perf_counter()
+        chunk_id = f"{doc_id}-{c['location_type']}-{c['location_value']}"
+        fingerprint = chunk_fingerprint(c['location_detail'], c['text'])
+        counts = None
+        if terms is not None:
+            counts = token_counts(c['text'])
+            terms.update({t.lower() for t in counts})
+        if known and known.get(chunk_id) == fingerprint:
+            timings['tag'] += time.perf_counter() - t0
+            yield chunk_id, fingerprint, None
+            continue
+
+        chunk = {
+            'chunk_id': chunk_id,
+            'file_path': server_path(rel_path),
+            'file_type': ext.lstrip('.'),
+            'project_path': project,
+            'doc_title': filepath.stem,
+            'location_type': c['location_type'],
+            'location_value': c['location_value'],
+            'location_detail': c['location_detail'],
+            'text': c['text'],
+            'mtime': mtime,
+            'hash': file_hash,
+        }
+
+        # v2.0: Auto-tag each chunk
+        chunk = auto_tag_chunk(chunk, rel_path, counts)
+
+        if row_stats is not None and 'rows' in c:
+            text_bytes = len(c['text'].encode('utf-8'))
+            meta_bytes = len(json.dumps(chunk, ensure_ascii=False).encode('utf-8')) - text_bytes
+            row_stats['rows'] += c['rows']
+            row_stats['chunks'] += 1
+            row_stats['row_payload'] += c['row_bytes'] + c['rows'] * meta_bytes
+            row_stats['chunk_payload'] += text_bytes + meta_bytes
+
+        timings['tag'] += time.perf_counter() - t0
+        yield chunk_id, fingerprint, chunk
+
+
+def print_row_grouping_report(row_stats):
+    """XLSX/CSV 행 묶음 청킹에 따른 청크 수/업로드 바이트 감소 보고"""
+    if not row_stats.get('chunks'):
+        return
+    rows, chunks = row_stats['rows'], row_stats['chunks']
+    before_mb = row_stats['row_payload'] / 1e6
+    after_mb = row_stats['chunk_payload'] / 1e6
+    print(f"  Row grouping (XLSX/CSV, {ROW_CHUNK_ROWS} rows/chunk): "
+          f"{rows:,} rows -> {chunks:,} chunks ({rows / chunks:.1f}x fewer), "
+          f"payload ~{before_mb:.1f}MB -> {after_mb:.1f}MB")
+
+
+def new_file_summary():
+    return {'hash': '', 'count': 0, 'unchanged': 0, 'category': '', 'doc_stage': '',
+            'categories': Counter(), 'row_stats': Counter(), 'manifest': {}, 'terms': Counter(),
+            'parse_cache': new_cache_stats(), 'timings': Counter()}
+
+
+def new_run_stats(metrics=None):
+    """실행 집계. metrics(RunMetrics)가 없으면 보고서를 쓰지 않는 계측만"""
+    return {'chunks': 0, 'unchanged': 0, 'errors': 0, 'categories': Counter(),
+            'row_stats': Counter(), 'upload': new_upload_stats(), 'stale_deleted': 0,
+            'dedup': Counter(), 'parse_cache': Counter(), 'metrics': metrics or RunMetrics()}
+
+
+def index_file(entry, doc_id, known, emit_batch, embed=None):
+    """파일 하나를 파싱/태깅하여 BATCH_SIZE 단위로 emit_batch(batch) 호출 후 요약 반환
+
+    known은 이전 manifest({chunk_id: 지문}). 지문이 같은 청크는 태깅/업로드하지 않으므로
+    서버의 기존 행과 임베딩이 그대로 유지됩니다.
+    embed('f16' / 'i8')가 주어지면 배치마다 임베딩을 계산해 청크에 붙입니다 (embedding.py).
+    config.DEDUP이면 청크마다 MinHash 서명을 'minhash'에 붙입니다 (업로드 전 dedup_batch()가 제거).
+    요약의 manifest는 이번 파일 전체의 {chunk_id: 지문} (delta sync용),
+    timings는 구간별 시간(초): hash / parse / tag / dedup / embed / upload_wait(emit_batch 대기) / total
+    """
+    summary = new_file_summary()
+    timings = summary['timings']
+    started = time.perf_counter()
+    if embed:
+        from embedding import embed_chunks
+
+    def emit(batch):
+        if embed:
+            t0 = time.perf_counter()
+            batch = embed_chunks(batch, embed)
+            timings['embed'] += time.perf_counter() - t0
+        t0 = time.perf_counter()
+        emit_batch(batch)
+        timings['upload_wait'] += time.perf_counter() - t0
+
+    summary['hash'] = get_file_hash(entry)
+    timings['hash'] = time.perf_counter() - started
+    batch = []
+    for chunk_id, fingerprint, chunk in iter_file_chunks(
+            entry, summary['hash'], doc_id, summary['row_stats'], known, summary['terms'],
+            summary['parse_cache'], timings):
+        summary['count'] += 1
+        summary['manifest'][chunk_id] = fingerprint
+        if chunk is None:
+            summary['unchanged'] += 1
+            continue
+        if not summary['category'] and not summary['doc_stage']:
+            summary['category'] = chunk.get('category', '')
+            summary['doc_stage'] = chunk.get('doc_stage', '')
+        if chunk.get('category'):
+            summary['categories'][chunk['category']] += 1
+        if DEDUP:
+            t0 = time.perf_counter()
+            text = chunk['text']
+            chunk['minhash'] = signature(text) if len(text) >= DEDUP_MIN_CHARS else None
+            timings['dedup'] += time.perf_counter() - t0
+        batch.append(chunk)
+        if len(batch) >= BATCH_SIZE:
+            emit(batch)
+            batch = []
+    if batch:
+        emit(batch)
+    timings['total'] = time.perf_counter() - started
+    return summary
+
+
+def finish_file(state, entry, doc_id, summary, run):
+    """업로드가 끝난 파일 마무리: 이전 manifest에만 있던 청크 삭제 후 indexed_files 기록
+
+    삭제 요청이 실패하면 UploadError를 그대로 올려 indexed_files를 갱신하지 않으므로,
+    다음 실행 때 다시 처리됩니다. --export에서는 삭제 문이 든 샤드를 닫은 뒤에 기록합니다.
+    """
+    manifest = summary['manifest']
+    old = state.get_manifest(entry.path)
+    if old:
+        stale = [cid for cid in old if cid not in manifest]
+        if stale:
+            chunk_store().delete_chunks(chunk_ids=stale)
+            state.drop_vectors(stale)
+            run['dedup']['released'] += state.drop_signatures(stale)
+            run['stale_deleted'] += len(stale)
+
+    def indexed():
+        state.mark_indexed(entry, summary['hash'], summary['count'], manifest=manifest, doc_id=doc_id)
+        state.set_file_terms(entry.path, summary['count'], summary['terms'])
+    after_sync(indexed)
+
+    run['chunks'] += summary['count']
+    run['unchanged'] += summary['unchanged']
+    run['categories'].update(summary['categories'])
+    run['row_stats'].update(summary['row_stats'])
+    run['parse_cache'].update(summary['parse_cache'])
+
+
+def _describe(summary):
+    if not summary['count']:
+        return "(empty)"
+    cached = " (parse cache)" if summary['parse_cache']['hits'] else ''
+    if summary['unchanged']:
+        changed = summary['count'] - summary['unchanged']
+        return (f"{summary['count']} chunks, {changed} changed "
+                f"[cat:{summary['category']} stage:{summary['doc_stage']}]{cached}")
+    return f"{summary['count']} chunks [cat:{summary['category']} stage:{summary['doc_stage']}]{cached}"
+
+
+def dedup_batch(state, path, batch, stats, tracker=None):
+    """업로드 직전(메인 프로세스) 중복 청크 정리: 대표 청크와 거의 같은 청크는 본문 없이 참조로 바꿈
+
+    청크의 'minhash'(index_file이 붙인 서명)를 꺼내 LSH 버킷에서 비슷한 대표 청크를 찾고,
+    DEDUP_THRESHOLD 이상이면 text/임베딩을 비우고 duplicate_of를 붙입니다 (제자리 수정).
+    내용이 바뀐 대표 청크를 참조하던 청크는 대표 청크로 전환합니다
+    (서버는 같은 업로드에서 이전 본문을 그 청크들에 복사해 둠).
+
+    tracker(UploadTracker)가 주어지면 찾은 대표 청크가 아직 업로드 중인 다른 배치에 있을 때
+    그 배치가 끝날 때까지 기다렸다 다시 찾습니다 (실패한 배치의 서명은 settle_signatures가 지움).
+    그래서 참조는 서버에 올라간 대표 청크만 가리킵니다. 서명을 기록한 chunk_id 목록 반환.
+    """
+    written = []
+    for chunk in batch:
+        if 'minhash' not in chunk:
+            continue
+        sig = chunk.pop('minhash')
+        chunk_id = chunk['chunk_id']
+        old = state.chunk_signature(chunk_id)
+        if old is not None and old[2]:
+            if sig == old[0]:
+                # 다른 청크가 참조 중인 대표 청크이고 내용도 같으면 그대로 유지
+                stats['signed'] += 1
+                continue
+            stats['released'] += state.release_duplicates([chunk_id])
+        if sig is None:
+            if old is not None:
+                state.drop_signatures([chunk_id])
+            continue
+
+        stats['signed'] += 1
+        text_bytes = len(chunk['text'].encode('utf-8'))
+        canonical = state.find_duplicate(chunk_id, sig, DEDUP_THRESHOLD)
+        while canonical and tracker is not None and canonical in tracker.unsettled:
+            settle_signatures(state, tracker, wait=True)
+            canonical = state.find_duplicate(chunk_id, sig, DEDUP_THRESHOLD)
+        if canonical:
+            stats['duplicates'] += 1
+            stats['bytes_saved'] += text_bytes + len(chunk.pop('embedding', ''))
+            chunk.pop('embed_model', None)
+            chunk['text'] = ''
+            chunk['duplicate_of'] = canonical
+        state.set_signature(chunk_id, path, sig, canonical or '', text_bytes)
+        written.append(chunk_id)
+    return written
+
+
+def settle_signatures(state, tracker, wait=False):
+    """업로드가 끝난 배치의 서명 정리 (메인 스레드). 실패한 배치의 서명은 제거
+
+    wait이면 끝난 배치가 없을 때 하나가 끝날 때까지 기다림 (dedup_batch가 업로드 중인 대표 청크를 만났을 때)
+    """
+    while True:
+        try:
+            chunk_ids, uploaded = tracker.signatures.get(block=wait)
+        except queue.Empty:
+            return
+        wait = False
+        tracker.unsettled.difference_update(chunk_ids)
+        if not uploaded:
+            state.forget_signatures(chunk_ids)
+
+
+def _upload_batch(state, tracker, key, batch, run):
+    """중복 정리 + 로컬 벡터 기록 후 업로드 예약 (index_files_serial / parallel 공통)"""
+    # --export 샤드는 적재 순서대로 들어가므로 앞 배치의 대표 청크를 기다리지 않음 (done도 샤드를 닫을 때 호출)
+    signed = dedup_batch(state, key, batch, run['dedup'], None if _exporter else tracker)
+    state.record_vectors(key, batch)
+    if not _exporter:
+        tracker.unsettled.update(signed)
+    tracker.batch_queued(key)
+    upload_chunks(batch, lambda stats: tracker.batch_done(key, stats, signed))
+
+
+def print_dedup_report(stats, state):
+    """이번 실행 + 전체 중복 청크 정리 현황"""
+    if not stats['signed']:
+        return
+    released = f", {stats['released']} copies restored after their original changed" if stats['released'] else ''
+    print(f"  Near-duplicates: {stats['duplicates']} of {stats['signed']} chunks uploaded as references "
+          f"(~{stats['bytes_saved'] / 1e6:.1f}MB not uploaded{released})")
+    signed, refs, ref_bytes, canonical = state.dedup_totals()
+    if refs:
+        print(f"  Collapsed overall: {refs:,} of {signed:,} chunks are copies of {canonical:,} chunks "
+              f"({refs / signed * 100:.0f}%, ~{ref_bytes / 1e6:.1f}MB of text stored once)")
+        for chunk_id, path, n in state.largest_duplicate_groups(3):
+            print(f"    {n:>5} copies of {os.path.relpath(path, DRIVE_ROOT)} ({chunk_id})")
+
+
+def print_parse_cache_report(stats):
+    """이번 실행의 파싱 캐시 적중률 + 상한을 넘은 항목 정리"""
+    cache = get_parse_cache()
+    if cache is None or not (stats['hits'] or stats['misses']):
+        return
+    total = stats['hits'] + stats['misses']
+    print(f"  Parse cache: {stats['hits']} hits / {stats['misses']} misses "
+          f"({stats['hits'] / total * 100:.0f}%, ~{stats['seconds_saved']:.1f}s of parsing skipped, "
+          f"{stats['bytes_written'] / 1e6:.1f}MB written)")
+    if stats['bytes_written']:
+        size, evicted = cache.evict()
+        evicted = f", {evicted} least recently used entries evicted" if evicted else ''
+        print(f"    cache size {size / 1e6:.1f}MB / {PARSE_CACHE_MAX_MB}MB{evicted}")
+
+
+def print_run_metrics(run):
+    """단계별 시간, 파일 구간 시간 합계, HTTP 지연, 느린 파일 출력 + 보고서 기록 (metrics.py)"""
+    metrics = run['metrics']
+    if metrics.stages:
+        print("  Stages: " + ', '.join(f"{name} {sec:.1f}s" for name, sec in metrics.stages.items()))
+    spent = {k: v for k, v in metrics.file_seconds.items() if k != 'total' and v >= 0.05}
+    if spent:
+        print("  File time (summed over files): "
+              + ', '.join(f"{k} {v:.1f}s" for k, v in sorted(spent.items(), key=lambda kv: -kv[1])))
+    for path, entry in sorted(metrics.http.items()):
+        latency = entry['latency']
+        codes = ', '.join(f"{n}x {code}" for code, n in sorted(entry['status'].items()) if code != '200')
+        print(f"  HTTP {path}: {latency.count} requests, avg {latency.sum / latency.count:.2f}s, "
+              f"p95 <= {latency.quantile(0.95):g}s{f' ({codes})' if codes else ''}")
+    slowest = [item for item in metrics.slowest() if item[0] >= 0.1]
+    if slowest:
+        print(f"  Slowest files:")
+        for seconds, rel_path, timings in slowest:
+            parts = ', '.join(f"{k} {v:.1f}s" for k, v in sorted(timings.items(), key=lambda kv: -kv[1])
+                              if k != 'total' and v >= 0.05)
+            print(f"    {seconds:7.1f}s  {rel_path}{f'  ({parts})' if parts else ''}")
+    metrics.add_run(run)
+    try:
+        report = metrics.write_report()
+    except OSError as e:
+        print(f"  [WARN] Cannot write run metrics: {e}")
+        return
+    if report:
+        prune_reports(metrics.report_dir, METRICS_KEEP_RUNS)
+        print(f"  Run metrics: {report} (+ per-file {metrics.run_id}.jsonl, "
+              f"{os.path.join(metrics.report_dir, 'indexer.prom')})")
+
+
+def _parse_worker(task_q, result_q, doc_freq=None, embed=None, pdf_workers=PDF_WORKERS, profile=None):
+    """워커 프로세스: 파일을 파싱/태깅하여 BATCH_SIZE 단위로 결과 큐에 전달
+
+    결과 큐는 크기가 제한되어 있으므로 업로드가 밀리면 여기서 put()이 블록되고,
+    큰 XLSX 하나가 들어와도 메모리에 쌓이는 청크 수는 일정하게 유지됩니다.
+    doc_freq는 실행 시작 시점의 문서 빈도 표 (워커마다 복사본 1개)
+    pdf_workers는 이 워커가 쓸 PDF 페이지 추출 프로세스 수
+    profile(경로 접두사)이 주어지면 워커 전체를 cProfile로 감싸 <profile>-worker-<pid>.prof에 저장 (--profile)
+    """
+    set_doc_freq(doc_freq)
+    set_pdf_workers(pdf_workers)
+    if profile:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            _parse_loop(task_q, result_q, embed)
+        finally:
+            profiler.disable()
+            profiler.dump_stats(f'{profile}-worker-{os.getpid()}.prof')
+            close_pdf_pool()
+        return
+    try:
+        _parse_loop(task_q, result_q, embed)
+    finally:
+        close_pdf_pool()
+
+
+def _parse_loop(task_q, result_q, embed):
+    while True:
+        task = task_q.get()
+        if task is None:
+            break
+        entry, doc_id, known = task
+        key = entry.path
+        try:
+            summary = index_file(entry, doc_id, known, lambda batch: result_q.put(('chunks', key, batch)), embed)
+            result_q.put(('done', key, summary, None))
+        except Exception as e:
+            result_q.put(('done', key, new_file_summary(), str(e)))
+
+
+class UploadTracker:
+    """파일별 미완료 업로드 배치 수 추적
+
+    파일의 모든 배치가 업로드된 뒤에만 완료 목록에 올라가므로,
+    중간에 중단되어도 indexed_files에는 업로드가 끝난 파일만 기록됩니다.
+    """
+
+    def __init__(self, upload_stats):
+        self.lock = threading.Lock()
+        self.pending = Counter()
+        self.failed = set()
+        self.parsed = {}
+        self.finished = queue.Queue()
+        self.signatures = queue.Queue()     # (dedup_batch가 서명을 기록한 chunk_id 목록, 업로드 성공 여부)
+        self.unsettled = set()              # 업로드가 끝나지 않은 배치의 chunk_id (메인 스레드 전용)
+        self.upload_stats = upload_stats
+
+    def batch_queued(self, key):
+        with self.lock:
+            self.pending[key] += 1
+
+    def batch_done(self, key, stats, signed=()):
+        with self.lock:
+            self.pending[key] -= 1
+            merge_upload_stats(self.upload_stats, stats)
+            if stats['failed']:
+                self.failed.add(key)
+            if signed:
+                self.signatures.put((signed, not stats['failed']))
+            self._check(key)
+
+    def file_parsed(self, key, summary, error):
+        with self.lock:
+            self.parsed[key] = (summary, error)
+            self._check(key)
+
+    def _check(self, key):
+        if key in self.parsed and self.pending[key] <= 0:
+            summary, error = self.parsed.pop(key)
+            self.finished.put((key, summary, error, key not in self.failed))
+            self.failed.discard(key)
+            del self.pending[key]
+
+
+def _drain_finished(state, tracker, entries, run, done, total):
+    """업로드까지 끝난 파일을 기록하고 진행 상황 출력. 누적 완료 수 반환"""
+    settle_signatures(state, tracker)
+    while True:
         try:
-            resp = requests.post(url, json={'chunks': batch}, timeout=30)
-            data = resp.json()
-            if data.get('errors'):
-                print(f"  [WARN] Upload errors: {data['errors']}")
-            return data.get('inserted', 0)
+            key, summary, error, uploaded = tracker.finished.get_nowait()
+        except queue.Empty:
+            return done
+        done += 1
+        entry, doc_id = entries[key]
+        result = _complete_file(state, entry, doc_id, summary, error, uploaded, run)
+        print(f"  [{done}/{total}] {entry.rel_path}... {result}")
+
+
+def _complete_file(state, entry, doc_id, summary, error, uploaded, run):
+    """파일 처리 결과를 indexed_files/집계/계측에 반영하고 진행 상황 문자열 반환"""
+    metrics = run['metrics']
+    if error:
+        state.mark_indexed(entry, '', 0, status=f'error: {error}', doc_id=doc_id)
+        run['errors'] += 1
+        metrics.file_done(entry, summary or {}, 'error')
+        return f"ERROR: {error}"
+    if not uploaded:
+        # 업로드 실패 파일은 기록하지 않아 다음 실행 때 다시 인덱싱
+        run['errors'] += 1
+        metrics.file_done(entry, summary, 'upload_failed')
+        return f"{summary['count']} chunks, UPLOAD FAILED (will retry next run)"
+    try:
+        finish_file(state, entry, doc_id, summary, run)
+    except UploadError as e:
+        run['errors'] += 1
+        metrics.file_done(entry, summary, 'upload_failed')
+        return f"{summary['count']} chunks, stale chunk cleanup failed: {e} (will retry next run)"
+    metrics.file_done(entry, summary, 'ok')
+    return _describe(summary)
+
+
+def _known_chunks(state, entry, retag, embed):
+    """건너뛸 수 있는 이전 청크 {chunk_id: 지문}
+
+    --retag이면 없음. --embed-local이면 로컬 임베딩이 없는 청크는 다시 태깅/임베딩하도록 제외
+    (벡터 인덱스가 전체 청크를 담도록, 참조로 올린 중복 청크는 제외하지 않음)
+    """
+    if retag:
+        return None
+    known = state.get_manifest(entry.path)
+    if known and embed and VECTOR_INDEX:
+        with_vectors = state.vector_ids(entry.path) | state.duplicate_ids(entry.path)
+        known = {cid: fp for cid, fp in known.items() if cid in with_vectors}
+    return known
+
+
+def build_vector_index(state):
+    """chunk_vectors 테이블 -> INDEX_PATH (vector_index.py)"""
+    from vector_index import build_index
+
+    count = state.count_vectors()
+    t0 = time.time()
+    header = build_index(state.iter_vectors(), count, INDEX_PATH,
+                         dtype=VECTOR_INDEX_DTYPE, n_lists=VECTOR_INDEX_IVF_LISTS)
+    size_mb = os.path.getsize(INDEX_PATH) / 1e6
+    ivf = f", IVF {header['n_lists']} lists" if header['n_lists'] else ''
+    print(f"  Vector index: {header['count']:,} vectors ({header['dtype']}{ivf}) -> "
+          f"{os.path.basename(INDEX_PATH)} {size_mb:.1f}MB in {time.time() - t0:.1f}s")
+
+
+def index_files_serial(state, to_index, run, retag=False, embed=None):
+    """파일을 하나씩 파싱 + 태깅 (기본 모드), 업로드는 UploadPipeline에서 동시에 진행
+
+    청크는 BATCH_SIZE개가 모일 때마다 업로드가 예약되고 진행 중 배치 수가 제한되므로,
+    최대 메모리는 파일 크기가 아니라 배치 크기에 비례합니다.
+    파일은 모든 배치가 업로드된 뒤에 기록됩니다 (UploadTracker).
+    """
+    tracker = UploadTracker(run['upload'])
+    entries = {}
+    done = 0
+    for entry in to_index:
+        doc_id = state.doc_id_for(entry)
+        entries[entry.path] = (entry, doc_id)
+        known = _known_chunks(state, entry, retag, embed)
+        summary, error = None, None
+
+        def emit(batch, key=entry.path):
+            _upload_batch(state, tracker, key, batch, run)
+
+        try:
+            summary = index_file(entry, doc_id, known, emit, embed)
         except Exception as e:
-            print(f"  [ERROR] Upload failed: {e}")
-            return 0
-    return 0
+            error = str(e)
+        tracker.file_parsed(entry.path, summary, error)
+        done = _drain_finished(state, tracker, entries, run, done, len(to_index))
+
+    upload_sink().join()
+    _drain_finished(state, tracker, entries, run, done, len(to_index))
+
+
+def index_files_parallel(state, to_index, workers, run, retag=False, embed=None):
+    """프로세스 풀 파싱/태깅 + 동시 업로드 (UploadPipeline)
+
+    워커 프로세스 -> result_q (제한) -> 메인 -> UploadPipeline (진행 중 배치 수 제한)
+    둘 다 크기가 제한되어 있어 업로드가 느리면 파싱도 함께 대기합니다.
+    indexed_files 기록(StateStore)은 메인 프로세스에서만 수행합니다.
+    """
+    task_q = multiprocessing.Queue()
+    result_q = multiprocessing.Queue(maxsize=UPLOAD_QUEUE_SIZE)
+    tracker = UploadTracker(run['upload'])
+
+    entries = {}
+    for entry in to_index:
+        doc_id = state.doc_id_for(entry)
+        entries[entry.path] = (entry, doc_id)
+        task_q.put((entry, doc_id, _known_chunks(state, entry, retag, embed)))
+    for _ in range(workers):
+        task_q.put(None)
+
+    # 워커가 PDF 페이지 추출 프로세스를 둘 수 있도록 daemon이 아닌 프로세스로 띄우고, 중단 시 직접 종료
+    pdf_workers = max(1, PDF_WORKERS // workers) if PDF_WORKERS else 0
+    profile = run['metrics'].worker_profile()
+    procs = [multiprocessing.Process(target=_parse_worker,
+                                     args=(task_q, result_q, DOC_FREQ, embed, pdf_workers, profile))
+             for _ in range(workers)]
+    for p in procs:
+        p.start()
+
+    done = 0
+
+    def drain_finished():
+        nonlocal done
+        done = _drain_finished(state, tracker, entries, run, done, len(to_index))
+
+    parsed = 0
+    try:
+        while parsed < len(to_index):
+            try:
+                msg = result_q.get(timeout=0.5)
+            except queue.Empty:
+                drain_finished()
+                if not any(p.is_alive() for p in procs) and result_q.empty():
+                    print(f"  [ERROR] Parser workers exited early ({len(to_index) - parsed} files not parsed)")
+                    break
+                continue
+
+            if msg[0] == 'chunks':
+                _, key, batch = msg
+                _upload_batch(state, tracker, key, batch, run)
+            else:
+                _, key, summary, error = msg
+                tracker.file_parsed(key, summary, error)
+                parsed += 1
+            drain_finished()
+
+        upload_sink().join()
+        for p in procs:
+            p.join()
+    finally:
+        for p in procs:
+            if p.is_alive():
+                p.terminate()
+    drain_finished()
+
+
+# =============================================
+# Watch mode (python indexer.py --watch, watcher.py)
+# =============================================
+
+def _watch_filter():
+    """알림 경로 필터 accept(path, is_dir): scan_files와 같은 제외 규칙 + 확장자 (~$ 잠금 파일 등 제외)"""
+    is_ignored = compile_ignore(EXCLUDE_PATTERNS)
+    extensions = {ext.lower() for ext in SUPPORTED_EXTENSIONS if ext.lower() in PARSERS}
+
+    def accept(path, is_dir):
+        rel = os.path.relpath(path, DRIVE_ROOT).replace(os.sep, '/')
+        if rel.startswith('../'):
+            return False
+        if not is_dir and os.path.splitext(path)[1].lower() not in extensions:
+            return False
+        parts = rel.split('/')
+        # 상위 폴더가 제외 대상이면 (scan_files가 내려가지 않는 폴더) 함께 제외
+        for i in range(1, len(parts)):
+            if is_ignored('/'.join(parts[:i]), True):
+                return False
+        return not is_ignored(rel, is_dir)
+
+    return accept
+
+
+def collect_changes(state, paths, accept):
+    """대기열 경로 -> (현재 FileEntry 목록, 사라진 기록 경로 목록)
+
+    폴더는 그 아래를 다시 스캔하고, 없어진 경로는 그 경로와 하위의 기록을 삭제 후보로 돌려줍니다.
+    """
+    files = {}
+    removed = []
+    for path in paths:
+        if os.path.isdir(path):
+            rel = os.path.relpath(path, DRIVE_ROOT)
+            found = scan_files(DRIVE_ROOT, subdir='' if rel == '.' else rel)
+            files.update((entry.path, entry) for entry in found)
+            prefix = os.path.join(path, '')
+            removed += [p for p in state.files if p.startswith(prefix) and p not in files]
+            continue
+        try:
+            st = os.stat(path)
+        except OSError:
+            prefix = os.path.join(path, '')
+            removed += [path] + [p for p in state.files if p.startswith(prefix)]
+            continue
+        if accept(path, False):
+            files[path] = FileEntry(path, os.path.relpath(path, DRIVE_ROOT), st.st_size,
+                                    st.st_mtime, st.st_mtime_ns, st.st_ino)
+    return list(files.values()), list(dict.fromkeys(removed))
+
+
+def process_changes(state, paths, accept, workers, embed=None, metrics=None):
+    """알림 받은 경로만 이동 / 삭제 / (재)인덱싱. 업로드하거나 서버를 바꿨으면 True
+
+    metrics(RunMetrics, 감시 세션 전체)가 주어지면 처리할 때마다 보고서를 갱신합니다.
+    """
+    if DRIVE_ROOT in paths:
+        files, removed = scan_files(DRIVE_ROOT), None     # 시작 시 / 알림 유실 시 전체 확인
+    else:
+        files, removed = collect_changes(state, paths, accept)
+    to_index, renames, gone = plan_changes(state, files, removed)
+    if renames or gone:
+        sync_renames_and_deletes(state, renames, gone)
+    if not to_index:
+        state.flush()
+        return bool(renames or gone)
+
+    purge_untracked(state, to_index)
+    run = new_run_stats(metrics)
+    t0 = time.time()
+    with run['metrics'].stage('index'):
+        if workers > 1 and len(to_index) > 1:
+            index_files_parallel(state, to_index, min(workers, len(to_index)), run, embed=embed)
+        else:
+            index_files_serial(state, to_index, run, embed=embed)
+    state.flush()
+    upload = run['upload']
+    print(f"  {len(to_index)} files, {run['chunks']} chunks ({run['unchanged']} unchanged), "
+          f"{upload['inserted']} uploaded, {run['errors']} errors in {time.time() - t0:.1f}s")
+    if metrics is not None:
+        metrics.add_run(run)
+        try:
+            metrics.write_report()
+        except OSError as e:
+            print(f"  [WARN] Cannot write run metrics: {e}")
+    return True
+
+
+def ready_events(state, buffer, now):
+    """버퍼의 알림을 대기열(pending_events)로 옮기고 지금 처리할 경로 반환
+
+    마지막 알림 후 WATCH_DEBOUNCE_SECONDS 동안 조용했거나 첫 알림 후 WATCH_MAX_DELAY_SECONDS가 지난 경로,
+    오래된 순으로 WATCH_BATCH_FILES개까지. 버퍼가 넘쳤으면 DRIVE_ROOT(전체 재스캔)를 바로 처리합니다.
+    """
+    events, overflow = buffer.drain()
+    if overflow:
+        print("  [WARN] Too many changes at once; rescanning the whole drive")
+        events[DRIVE_ROOT] = 0.0
+    state.add_pending(events)
+    return state.ready_pending(now, WATCH_DEBOUNCE_SECONDS, WATCH_MAX_DELAY_SECONDS, WATCH_BATCH_FILES)
+
+
+def watch_drive(state, workers, embed=None, metrics=None):
+    """--watch: 변경 알림을 디바운스해 바뀐 파일만 인덱싱하는 상주 모드 (Ctrl+C로 종료)
+
+    알림 -> EventBuffer(메모리, 크기 제한) -> pending_events(상태 DB) -> 조용해진 경로부터
+    WATCH_BATCH_FILES개씩 처리. 처리 중 쌓인 알림은 버퍼에서 기다리고, 처리가 끝난 경로만
+    대기열에서 지우므로 재시작해도 알림을 잃지 않습니다. 대기열이 비면 임베딩 생성을 트리거합니다.
+    """
+    from watcher import EventBuffer, start_watcher
+
+    accept = _watch_filter()
+    buffer = EventBuffer(WATCH_MAX_BUFFER)
+    snapshot = lambda: {e.path: (e.size, e.mtime_ns) for e in scan_files(DRIVE_ROOT)}
+    watcher = start_watcher(DRIVE_ROOT, buffer, accept, snapshot, WATCH_POLL_SECONDS)
+    pending = state.count_pending()
+    # 꺼져 있던 동안의 변경은 알림이 없으므로 시작할 때 전체를 한 번 확인
+    state.add_pending({DRIVE_ROOT: 0.0})
+    print(f"[WATCH] {DRIVE_ROOT} ({watcher.name}, debounce {WATCH_DEBOUNCE_SECONDS}s"
+          f"{f', {pending} queued from last run' if pending else ''}). Ctrl+C to stop.")
+
+    dirty = False
+    try:
+        while True:
+            ready = ready_events(state, buffer, time.time())
+            if ready:
+                print(f"[{datetime.now():%H:%M:%S}] {len(ready)} changed paths")
+                try:
+                    dirty |= process_changes(state, ready, accept, workers, embed, metrics)
+                except UploadError as e:
+                    print(f"  [WARN] {e} (will retry)")
+                    buffer.wait(WATCH_DEBOUNCE_SECONDS * 10)
+                    continue
+                state.drop_pending(ready)
+                continue
+            if dirty and not state.count_pending():
+                _watch_idle(state, embed)
+                dirty = False
+            buffer.wait(1.0)
+    except KeyboardInterrupt:
+        print(f"\n[WATCH] Stopped ({state.count_pending()} paths queued for next start)")
+    finally:
+        watcher.stop()
+        if metrics is not None:
+            metrics.close()
+
+
+def _watch_idle(state, embed):
+    """대기열이 빈 뒤 한 번: 파싱 캐시 정리, 임베딩 생성 / 벡터 인덱스 갱신"""
+    cache = get_parse_cache()
+    if cache is not None:
+        cache.evict()
+    if embed:
+        if VECTOR_INDEX:
+            build_vector_index(state)
+        return
+    try:
+        generate_embeddings()
+    except Exception as e:
+        print(f"  [WARN] Embedding generation request failed: {e}")
 
 
 # =============================================
 # Main
 # =============================================
 
+def parse_args(argv=None):
+    ap = argparse.ArgumentParser(description='Knowledge Wiki - Local Indexer')
+    ap.add_argument('--embed', action='store_true',
+                    help='서버측 임베딩 생성만 트리거')
+    ap.add_argument('--workers', type=int, default=1, metavar='N',
+                    help='파싱/태깅 워커 프로세스 수 (기본 1: 순차 처리)')
+    ap.add_argument('--embed-local', nargs='?', const=EMBED_FORMAT, choices=['f16', 'i8'], metavar='FORMAT',
+                    help=f'임베딩을 로컬에서 계산해 청크와 함께 업로드 (f16 | i8, 기본 {EMBED_FORMAT})')
+    ap.add_argument('--retag', action='store_true',
+                    help='현재 문서 빈도 표로 모든 파일의 태그를 다시 계산하여 재업로드')
+    ap.add_argument('--watch', action='store_true',
+                    help='상주하며 변경된 파일만 바로 인덱싱 (config.WATCH_*)')
+    ap.add_argument('--export', metavar='DIR',
+                    help='업로드 대신 wrangler d1 execute --file로 적재할 샤드를 DIR에 기록 (config.EXPORT_*, 재개 가능)')
+    ap.add_argument('--profile', action='store_true',
+                    help='단계별 cProfile + tracemalloc 결과를 config.METRICS_DIR에 저장')
+    return ap.parse_args(argv)
+
+
 def main():
+    args = parse_args()
+
     print("=" * 60)
     print("  Knowledge Wiki - Local Indexer v3.0")
     print("  (Auto Tagging + Embedding Support)")
@@ -506,19 +1847,10 @@ def main():
     print()
 
     # Check for --embed flag (trigger server-side embedding only)
-    embed_only = '--embed' in sys.argv
-    
-    if embed_only:
+    if args.embed:
         print("[EMBED] Triggering server-side embedding generation...")
         try:
-            resp = requests.post(f'{WIKI_API_URL}/api/embeddings/generate', timeout=60)
-            data = resp.json()
-            print(f"  Result: {data.get('message', 'Unknown')}")
-            print(f"  Model: {data.get('model', 'N/A')}, Dimensions: {data.get('dimensions', 'N/A')}")
-            
-            # Check stats
-            stats = requests.get(f'{WIKI_API_URL}/api/embedding-stats', timeout=10).json()
-            print(f"  Coverage: {stats.get('with_embeddings', 0)}/{stats.get('total_chunks', 0)} ({stats.get('coverage', 0)}%)")
+            print(f"  Result: generated embeddings for {generate_embeddings()} chunks")
         except Exception as e:
             print(f"  [ERROR] {e}")
         print("\n[DONE]")
@@ -529,109 +1861,139 @@ def main():
         print("  Please check config.py and set the correct path.")
         sys.exit(1)
 
-    conn = init_db()
+    if args.embed_local:
+        try:
+            import numpy  # noqa: F401
+        except ImportError:
+            print("[ERROR] --embed-local requires NumPy: pip install numpy")
+            sys.exit(1)
+
+    if args.export:
+        if args.watch:
+            print("[ERROR] --export cannot be combined with --watch")
+            sys.exit(1)
+        try:
+            exporter = ShardExporter(args.export, EXPORT_FORMAT, EXPORT_SHARD_MB * 1_000_000,
+                                     EXPORT_STATEMENT_BYTES, EXPORT_GZIP, EXPORT_REBUILD_FTS)
+        except (OSError, ValueError) as e:
+            print(f"[ERROR] Cannot export to {args.export}: {e}")
+            sys.exit(1)
+        set_exporter(exporter)
+        print(f"  Export:     {os.path.abspath(args.export)} ({EXPORT_FORMAT} shards, "
+              f"{len(exporter.manifest['shards'])} already written) - no uploads")
+        print()
+
+    state = StateStore(DB_PATH)
+    set_doc_freq(state.doc_freq)
+    metrics = RunMetrics(METRICS_PATH, METRICS_TOP_FILES, args.profile)
+    get_client().on_response = metrics.observe_http
+    run = new_run_stats(metrics)
+
+    if args.watch:
+        watch_drive(state, max(1, args.workers), args.embed_local, metrics)
+        close_pdf_pool()
+        state.close()
+        return
 
     # Scan
     print("[1/5] Scanning files...")
-    files = scan_files(DRIVE_ROOT)
+    with metrics.stage('scan'):
+        files = scan_files(DRIVE_ROOT)
     print(f"  Found {len(files)} supported files")
 
     # Check changes
     print("[2/5] Checking for changes...")
-    to_index = []
-    for f in files:
-        mtime = os.path.getmtime(f)
-        if needs_indexing(conn, str(f), mtime):
-            to_index.append(f)
-    print(f"  {len(to_index)} files need (re)indexing")
-    
+    with metrics.stage('plan'):
+        to_index, renames, gone = plan_changes(state, files)
+    print(f"  {len(to_index)} files need (re)indexing, {len(renames)} moved, {len(gone)} deleted")
+    with metrics.stage('sync'):
+        sync_renames_and_deletes(state, renames, gone)
+    if args.embed_local and VECTOR_INDEX and not args.retag:
+        # 로컬 임베딩이 빠진 청크가 있는 파일은 해당 청크만 다시 임베딩 (_known_chunks)
+        missing = state.files_missing_vectors()
+        queued = {entry.path for entry in to_index} | {entry.path for _, entry in renames}
+        backfill = [entry for entry in files if entry.path in missing and entry.path not in queued]
+        if backfill:
+            print(f"  {len(backfill)} files have chunks without local embeddings (backfilling)")
+            to_index += backfill
+    if args.retag:
+        moved = {entry.path for _, entry in renames}
+        to_index = [entry for entry in files if entry.path not in moved]
+        print(f"  --retag: re-tagging all {len(to_index)} files "
+              f"(DF table: {len(state.doc_freq):,} terms / {state.doc_freq.n_docs:,} chunks)")
+
     if not to_index:
+        if _exporter:
+            _exporter.close()           # 삭제 / 이동 문이 든 샤드를 닫아 indexed_files 반영
+            print_export_report(_exporter)
+        if args.embed_local and VECTOR_INDEX and (renames or gone or not os.path.exists(INDEX_PATH)):
+            with metrics.stage('vector_index'):
+                build_vector_index(state)
         print("\n[DONE] Everything is up to date!")
-        conn.close()
+        print_run_metrics(run)
+        metrics.close()
+        close_pdf_pool()
+        state.close()
         return
 
-    # Parse + Auto-tag + Upload
-    print(f"[3/5] Parsing & auto-tagging {len(to_index)} files...")
-    total_chunks = 0
-    errors = 0
-    tag_stats = Counter()
-
-    for i, filepath in enumerate(to_index, 1):
-        ext = filepath.suffix.lower()
-        parser = PARSERS.get(ext)
-        if not parser:
-            continue
-
-        rel_path = os.path.relpath(filepath, DRIVE_ROOT)
-        project = get_project_path(filepath, DRIVE_ROOT)
-        doc_title = filepath.stem
-        mtime_raw = os.path.getmtime(filepath)
-        mtime = datetime.fromtimestamp(mtime_raw).isoformat()
-        file_hash = get_file_hash(str(filepath))
-
-        print(f"  [{i}/{len(to_index)}] {rel_path}...", end=' ', flush=True)
+    purge_untracked(state, to_index)
 
+    # Parse + Auto-tag + Upload
+    workers = max(1, args.workers)
+    if workers > 1:
+        print(f"[3/5] Parsing & auto-tagging {len(to_index)} files "
+              f"({workers} workers, {UPLOAD_IN_FLIGHT} uploads in flight)...")
+        with metrics.stage('index'):
+            index_files_parallel(state, to_index, workers, run, args.retag, args.embed_local)
+    else:
+        print(f"[3/5] Parsing & auto-tagging {len(to_index)} files...")
+        with metrics.stage('index'):
+            index_files_serial(state, to_index, run, args.retag, args.embed_local)
+
+    if _exporter:
+        _exporter.close()
+    print(f"\n[4/5] {'Export' if _exporter else 'Upload'} complete!")
+    print(f"  Total chunks: {run['chunks']}")
+    if run['unchanged']:
+        print(f"  Unchanged chunks skipped: {run['unchanged']} "
+              f"({run['unchanged'] / run['chunks'] * 100:.0f}%, not re-tagged/uploaded/embedded)")
+    if _exporter:
+        print_export_report(_exporter)
+    else:
+        print_upload_report(run['upload'])
+    if run['stale_deleted']:
+        print(f"  Stale chunks deleted: {run['stale_deleted']}")
+    print(f"  Errors: {run['errors']}")
+    if run['categories']:
+        print(f"  Category distribution: {dict(run['categories'].most_common())}")
+    print_row_grouping_report(run['row_stats'])
+    print_dedup_report(run['dedup'], state)
+    print_parse_cache_report(run['parse_cache'])
+    print(f"  Tag DF table: {len(state.doc_freq):,} terms over {state.doc_freq.n_docs:,} chunks")
+
+    if args.embed_local:
+        print(f"\n[5/5] Embeddings computed locally ({args.embed_local}), "
+              f"{'written to the shards' if _exporter else 'uploaded with chunks'}")
+        if VECTOR_INDEX:
+            with metrics.stage('vector_index'):
+                build_vector_index(state)
+    elif _exporter:
+        print(f"\n[5/5] Load the shards, then generate embeddings: python indexer.py --embed")
+    else:
+        # v3.0: Trigger server-side embedding generation
+        print(f"\n[5/5] Triggering embedding generation...")
         try:
-            raw_chunks = parser(str(filepath))
-            
-            chunks = []
-            for c in raw_chunks:
-                chunk_id = f"{file_hash}-{c['location_type']}-{c['location_value']}"
-                chunk = {
-                    'chunk_id': chunk_id,
-                    'file_path': rel_path.replace('\\', '/'),
-                    'file_type': ext.lstrip('.'),
-                    'project_path': project,
-                    'doc_title': doc_title,
-                    'location_type': c['location_type'],
-                    'location_value': c['location_value'],
-                    'location_detail': c['location_detail'],
-                    'text': c['text'],
-                    'mtime': mtime,
-                    'hash': file_hash,
-                }
-                
-                # v2.0: Auto-tag each chunk
-                chunk = auto_tag_chunk(chunk, rel_path)
-                chunks.append(chunk)
-                
-                # Stats
-                if chunk.get('category'):
-                    tag_stats[chunk['category']] += 1
-            
-            if chunks:
-                uploaded = upload_chunks(chunks, WIKI_API_URL)
-                total_chunks += len(chunks)
-                cat_info = chunks[0].get('category', '?')
-                stage_info = chunks[0].get('doc_stage', '?')
-                print(f"{len(chunks)} chunks [cat:{cat_info} stage:{stage_info}]")
-            else:
-                print("(empty)")
-
-            mark_indexed(conn, str(filepath), mtime_raw, file_hash, len(chunks))
-
+            with metrics.stage('embed'):
+                print(f"  Generated embeddings for {generate_embeddings()} chunks")
         except Exception as e:
-            print(f"ERROR: {e}")
-            mark_indexed(conn, str(filepath), mtime_raw, '', 0, status=f'error: {e}')
-            errors += 1
-
-    print(f"\n[4/5] Upload complete!")
-    print(f"  Total chunks: {total_chunks}")
-    print(f"  Errors: {errors}")
-    if tag_stats:
-        print(f"  Category distribution: {dict(tag_stats.most_common())}")
-
-    # v3.0: Trigger server-side embedding generation
-    print(f"\n[5/5] Triggering embedding generation...")
-    try:
-        resp = requests.post(f'{WIKI_API_URL}/api/embeddings/generate', timeout=120)
-        data = resp.json()
-        print(f"  {data.get('message', 'OK')}")
-    except Exception as e:
-        print(f"  [WARN] Embedding generation request failed: {e}")
-        print(f"  You can generate embeddings later: python indexer.py --embed")
-    
-    conn.close()
+            print(f"  [WARN] Embedding generation request failed: {e}")
+            print(f"  You can generate embeddings later: python indexer.py --embed")
+
+    print(f"\n[RUN METRICS]")
+    print_run_metrics(run)
+    metrics.close()
+    close_pdf_pool()
+    state.close()
     print("\n[DONE]")
 
 
@@ -0,0 +1,300 @@
+"""
+Knowledge Wiki - Run Metrics
+=============================
+인덱싱 실행 계측과 보고서 출력 (indexer.py에서 사용).
+
+  - 단계: 실행 단계(scan / plan / index / embed ...)별 벽시계 시간
+  - 파일: 크기, 청크 수, 구간별 시간 (parse / tag / dedup / embed / 업로드 대기) -> 느린 파일 상위 N개
+    구간 시간은 파일을 처리한 프로세스 기준이므로 --workers N이면 합계가 벽시계 시간보다 클 수 있음
+  - HTTP: 경로별 요청 수, 상태 코드, 지연 히스토그램 (재시도한 요청도 한 번씩)
+  - 보고서: <METRICS_DIR>/run-<시각>.jsonl          파일마다 한 줄 {"type": "file", ...} (처리하는 대로 추가)
+            <METRICS_DIR>/run-<시각>.summary.jsonl  {"type": "stage" | "http" | "run", ...} 세션 누적값
+                                                    (write_report마다 통째로 다시 씀, --watch면 배치마다)
+            <METRICS_DIR>/indexer.prom             Prometheus textfile collector 형식 (덮어씀)
+    모든 집계(단계 / 파일 / HTTP / 업로드 / 파싱 캐시)는 같은 기간(실행 또는 --watch 세션 시작부터)입니다.
+  - --profile: 단계마다 cProfile(.prof + 상위 함수 .txt)과 tracemalloc 할당 증가 상위 목록
+
+파일 기록은 처리하는 대로 JSONL에 바로 쓰므로 파일 수가 많아도 메모리에는 상위 N개만 남습니다.
+"""
+
+import bisect
+import heapq
+import json
+import os
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+PROM_PREFIX = 'knowledge_wiki_indexer'
+PROM_FILE = 'indexer.prom'
+
+
+class Histogram:
+    """고정 구간 히스토그램 (Prometheus histogram과 같은 le 구간)"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)      # 마지막: +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q):
+        """q 분위가 들어있는 구간의 상한 (근사). 마지막 구간이면 inf"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(self.buckets, self.counts):
+            seen += n
+            if seen >= rank:
+                return bound
+        return float('inf')
+
+    def cumulative(self):
+        """[(le, 누적 개수)] (+Inf 포함)"""
+        out, seen = [], 0
+        for bound, n in zip(self.buckets + (float('inf'),), self.counts):
+            seen += n
+            out.append((bound, seen))
+        return out
+
+    def to_dict(self):
+        return {'buckets': list(self.buckets), 'counts': self.counts, 'sum': round(self.sum, 3),
+                'count': self.count, 'p50': self.quantile(0.5), 'p95': self.quantile(0.95)}
+
+
+class RunMetrics:
+    """한 번의 실행 (--watch면 세션 전체) 계측"""
+
+    def __init__(self, report_dir='', top_n=10, profile=False):
+        self.report_dir = report_dir
+        self.top_n = top_n
+        self.profile = profile and bool(report_dir)
+        self.started = time.time()
+        self.run_id = time.strftime('run-%Y%m%d-%H%M%S', time.localtime(self.started))
+        self.stages = Counter()
+        self.file_seconds = Counter()       # 파일별 구간 시간 합계
+        self.files = Counter()              # status / files / bytes / chunks / unchanged
+        self.http = {}
+        self.upload = Counter()             # uploader.new_upload_stats() 숫자 항목 누적 (add_run)
+        self.parse_cache = Counter()
+        self._slowest = []                  # (seconds, rel_path, timings) min-heap, 크기 top_n
+        self._lock = threading.Lock()
+        self._out = None
+
+    # ---------- 기록 ----------
+
+    def _write(self, record):
+        if not self.report_dir:
+            return
+        if self._out is None:
+            os.makedirs(self.report_dir, exist_ok=True)
+            self._out = open(os.path.join(self.report_dir, self.run_id + '.jsonl'), 'a', encoding='utf-8')
+        self._out.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+    @contextmanager
+    def stage(self, name):
+        """단계 벽시계 시간 누적 (--profile이면 cProfile + tracemalloc)"""
+        profiler = self._start_profile() if self.profile else None
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] += time.perf_counter() - t0
+            if profiler is not None:
+                self._stop_profile(name, *profiler)
+
+    def add_run(self, run):
+        """indexer.new_run_stats() 한 번의 업로드 / 파싱 캐시 집계를 세션 누적값에 더함 (run마다 한 번)"""
+        self.upload.update({k: v for k, v in run['upload'].items() if k != 'errors'})
+        self.parse_cache.update(run['parse_cache'])
+
+    def observe_http(self, method, path, status, seconds):
+        """WikiClient.on_response: 응답 1건 (status None = 연결 오류 / 시간 초과)"""
+        path = path.split('?', 1)[0]
+        with self._lock:
+            entry = self.http.get(path)
+            if entry is None:
+                entry = self.http[path] = {'latency': Histogram(), 'status': Counter()}
+            entry['latency'].observe(seconds)
+            entry['status'][str(status) if status else 'error'] += 1
+
+    def file_done(self, entry, summary, status):
+        """파일 1개 처리 결과 (status: ok | error | upload_failed)"""
+        timings = summary.get('timings') or {}
+        total = timings.get('total', 0.0)
+        self.files['files'] += 1
+        self.files[status] += 1
+        self.files['bytes'] += entry.size
+        self.files['chunks'] += summary.get('count', 0)
+        self.files['unchanged'] += summary.get('unchanged', 0)
+        self.file_seconds.update(timings)
+        self._write({'type': 'file', 'path': entry.rel_path, 'ext': os.path.splitext(entry.path)[1].lower(),
+                     'bytes': entry.size, 'chunks': summary.get('count', 0), 'unchanged': summary.get('unchanged', 0),
+                     'status': status, 'seconds': {k: round(v, 4) for k, v in timings.items()}})
+        item = (total, entry.rel_path, dict(timings))
+        if len(self._slowest) < self.top_n:
+            heapq.heappush(self._slowest, item)
+        elif self.top_n and total > self._slowest[0][0]:
+            heapq.heapreplace(self._slowest, item)
+
+    def slowest(self):
+        """[(초, 경로, 구간 시간)] 느린 순"""
+        return sorted(self._slowest, key=lambda item: -item[0])
+
+    # ---------- profile ----------
+
+    def worker_profile(self):
+        """--profile이면 파싱 워커 프로세스의 .prof 경로 접두사, 아니면 None"""
+        if not self.profile:
+            return None
+        os.makedirs(self.report_dir, exist_ok=True)
+        return os.path.join(self.report_dir, self.run_id)
+
+    def _start_profile(self):
+        import cProfile
+        import tracemalloc
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(10)
+        profiler = cProfile.Profile()
+        snapshot = tracemalloc.take_snapshot()
+        profiler.enable()
+        return profiler, snapshot
+
+    def _stop_profile(self, name, profiler, before):
+        import io
+        import pstats
+        import tracemalloc
+        profiler.disable()
+        after = tracemalloc.take_snapshot()
+        base = os.path.join(self.report_dir, f'{self.run_id}-{name}')
+        os.makedirs(self.report_dir, exist_ok=True)
+        profiler.dump_stats(base + '.prof')
+        text = io.StringIO()
+        pstats.Stats(profiler, stream=text).sort_stats('cumulative').print_stats(30)
+        allocs = after.compare_to(before, 'lineno')[:15]
+        text.write('\nTop allocations (tracemalloc, growth during stage):\n')
+        for stat in allocs:
+            text.write(f'  {stat}\n')
+        with open(base + '.txt', 'w', encoding='utf-8') as f:
+            f.write(text.getvalue())
+        peak = tracemalloc.get_traced_memory()[1]
+        print(f"  [PROFILE] {name}: {base}.prof (+ .txt), traced peak {peak / 1e6:.1f}MB")
+
+    # ---------- 보고서 ----------
+
+    def summary(self):
+        """실행 요약 dict (세션 누적)"""
+        return {
+            'type': 'run', 'run_id': self.run_id,
+            'started': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(self.started)),
+            'seconds': round(time.time() - self.started, 3),
+            'stages': {k: round(v, 3) for k, v in self.stages.items()},
+            'file_seconds': {k: round(v, 3) for k, v in self.file_seconds.items()},
+            'files': dict(self.files),
+            'upload': dict(self.upload),
+            'parse_cache': dict(self.parse_cache),
+            'slowest': [{'path': p, 'seconds': round(s, 3)} for s, p, _ in self.slowest()],
+        }
+
+    def write_report(self):
+        """요약 JSONL(단계 / HTTP / 요약)을 새로 쓰고 Prometheus 파일 갱신. 요약 경로 반환 (비활성이면 None)"""
+        if not self.report_dir:
+            return None
+        if self._out is not None:
+            self._out.flush()
+        records = [{'type': 'stage', 'name': name, 'seconds': round(seconds, 3)}
+                   for name, seconds in self.stages.items()]
+        with self._lock:
+            records += [{'type': 'http', 'path': path, 'status': dict(e['status']), 'latency': e['latency'].to_dict()}
+                        for path, e in self.http.items()]
+        records.append(self.summary())
+        os.makedirs(self.report_dir, exist_ok=True)
+        path = os.path.join(self.report_dir, self.run_id + '.summary.jsonl')
+        _replace(path, ''.join(json.dumps(r, ensure_ascii=False) + '\n' for r in records))
+        self._write_prometheus()
+        return path
+
+    def _write_prometheus(self):
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f'# HELP {PROM_PREFIX}_{name} {help_text}')
+            lines.append(f'# TYPE {PROM_PREFIX}_{name} {kind}')
+            for labels, value in samples:
+                label = ','.join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+                lines.append(f'{PROM_PREFIX}_{name}{{{label}}} {value}' if label else f'{PROM_PREFIX}_{name} {value}')
+
+        metric('last_run_timestamp_seconds', 'gauge', 'Start time of the last indexer run.',
+               [({}, round(self.started, 3))])
+        metric('stage_seconds', 'gauge', 'Wall time per stage of the last run.',
+               [({'stage': k}, round(v, 3)) for k, v in sorted(self.stages.items())])
+        metric('file_stage_seconds', 'gauge', 'Per-file stage time summed over files (worker time).',
+               [({'stage': k}, round(v, 3)) for k, v in sorted(self.file_seconds.items())])
+        metric('files', 'gauge', 'Files processed in the last run by status.',
+               [({'status': k}, self.files[k]) for k in ('ok', 'error', 'upload_failed')])
+        metric('chunks', 'gauge', 'Chunks produced in the last run.', [({}, self.files['chunks'])])
+        metric('bytes', 'gauge', 'Bytes of files processed in the last run.', [({}, self.files['bytes'])])
+        upload = self.upload
+        metric('upload_retries', 'gauge', 'Upload request retries in the last run.', [({}, upload['retries'])])
+        metric('upload_bytes_sent', 'gauge', 'Request body bytes sent in the last run.', [({}, upload['bytes_sent'])])
+        with self._lock:
+            http = sorted(self.http.items())
+            responses = [({'path': p, 'code': code}, n) for p, e in http for code, n in sorted(e['status'].items())]
+            buckets = [({'path': p, 'le': _le(le)}, n) for p, e in http for le, n in e['latency'].cumulative()]
+            sums = [(p, round(e['latency'].sum, 3), e['latency'].count) for p, e in http]
+        metric('http_responses', 'gauge', 'HTTP responses by path and status code.', responses)
+        lines.append(f'# HELP {PROM_PREFIX}_http_request_duration_seconds HTTP request latency.')
+        lines.append(f'# TYPE {PROM_PREFIX}_http_request_duration_seconds histogram')
+        name = f'{PROM_PREFIX}_http_request_duration_seconds'
+        for labels, n in buckets:
+            lines.append(f'{name}_bucket{{path="{_escape(labels["path"])}",le="{labels["le"]}"}} {n}')
+        for path, total, count in sums:
+            lines.append(f'{name}_sum{{path="{_escape(path)}"}} {total}')
+            lines.append(f'{name}_count{{path="{_escape(path)}"}} {count}')
+
+        _replace(os.path.join(self.report_dir, PROM_FILE), '\n'.join(lines) + '\n')
+
+    def close(self):
+        if self._out is not None:
+            self._out.close()
+            self._out = None
+
+
+def prune_reports(report_dir, keep):
+    """오래된 run-*.jsonl / 프로파일 파일 정리 (최근 keep개 실행만 남김)"""
+    try:
+        names = os.listdir(report_dir)
+    except OSError:
+        return
+    runs = sorted({name.split('.', 1)[0][:19] for name in names if name.startswith('run-')})
+    old = set(runs[:-keep]) if keep else set()
+    for name in names:
+        if name.startswith('run-') and name[:19] in old:
+            try:
+                os.remove(os.path.join(report_dir, name))
+            except OSError:
+                pass
+
+
+def _replace(path, text):
+    """임시 파일에 쓴 뒤 os.replace (textfile collector나 다른 도구가 쓰는 중인 파일을 읽지 않도록)"""
+    tmp = f'{path}.{os.getpid()}.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+def _le(bound):
+    return '+Inf' if bound == float('inf') else repr(float(bound))
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
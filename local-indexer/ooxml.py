@@ -0,0 +1,311 @@
+"""
+Knowledge Wiki - OOXML Streaming Readers
+=========================================
+Office 파일(zip + XML)에서 텍스트만 바로 읽는 파서 (indexer.parse_pptx / parse_docx에서 사용).
+
+python-pptx는 Presentation()에서 패키지의 모든 파트(이미지, 레이아웃, 마스터 ...)를 읽고
+객체로 감싸므로, 이미지가 많은 큰 발표자료는 쓰지도 않는 객체를 만드는 데 시간 / 메모리를 씁니다.
+여기서는 presentation.xml의 슬라이드 목록만 읽고, 슬라이드 XML을 zip에서 스트리밍으로
+iterparse하면서 도형 하나를 처리할 때마다 지웁니다.
+
+  - 슬라이드 순서 / 도형 / 문단 / 표 셀 텍스트는 python-pptx(indexer.parse_pptx 기존 경로)와 같음:
+    spTree 바로 아래 p:sp의 문단(a:r / a:fld 텍스트, a:br은 '\\v')과 p:graphicFrame 안의 a:tbl 행.
+    그룹(p:grpSp) 안의 도형은 python-pptx 경로와 마찬가지로 읽지 않음
+  - 구조가 예상과 다르면 FORMAT_ERRORS 중 하나를 올림 (호출 측이 python-pptx로 대체)
+
+DOCX도 같은 방식으로 word/document.xml을 한 번만 읽으며 본문 문단과 표 행을 문서 순서대로 내보냅니다
+(python-docx의 doc.paragraphs는 접근할 때마다 목록을 새로 만듦). 제목 수준은 styles.xml의
+스타일 이름(heading N / Title)이나 개요 수준(outlineLvl)으로 판단합니다 (한글 Word의 스타일 ID '1', '2' 포함).
+"""
+
+import posixpath
+import zipfile
+from xml.etree.ElementTree import ParseError, fromstring, iterparse
+
+NS_P = 'http://schemas.openxmlformats.org/presentationml/2006/main'
+NS_A = 'http://schemas.openxmlformats.org/drawingml/2006/main'
+NS_R = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+NS_REL = 'http://schemas.openxmlformats.org/package/2006/relationships'
+REL_OFFICE_DOCUMENT = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument'
+URI_TABLE = 'http://schemas.openxmlformats.org/drawingml/2006/table'
+NS_W = 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'
+NS_MC = 'http://schemas.openxmlformats.org/markup-compatibility/2006'
+REL_STYLES = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles'
+
+P_SPTREE = f'{{{NS_P}}}spTree'
+P_SP = f'{{{NS_P}}}sp'
+P_GRAPHIC_FRAME = f'{{{NS_P}}}graphicFrame'
+P_TXBODY = f'{{{NS_P}}}txBody'
+A_P = f'{{{NS_A}}}p'
+A_R = f'{{{NS_A}}}r'
+A_FLD = f'{{{NS_A}}}fld'
+A_BR = f'{{{NS_A}}}br'
+A_T = f'{{{NS_A}}}t'
+A_TXBODY = f'{{{NS_A}}}txBody'
+A_TR = f'{{{NS_A}}}tr'
+A_TC = f'{{{NS_A}}}tc'
+
+W_BODY = f'{{{NS_W}}}body'
+W_P = f'{{{NS_W}}}p'
+W_TBL = f'{{{NS_W}}}tbl'
+W_TR = f'{{{NS_W}}}tr'
+W_TC = f'{{{NS_W}}}tc'
+W_T = f'{{{NS_W}}}t'
+W_VAL = f'{{{NS_W}}}val'
+# 본문과 같은 흐름에 있는 내용 컨트롤 / 사용자 XML: 안쪽 문단과 표를 그대로 읽음
+W_CONTAINERS = {f'{{{NS_W}}}sdt', f'{{{NS_W}}}sdtContent', f'{{{NS_W}}}customXml'}
+W_BREAKS = {f'{{{NS_W}}}br': '\n', f'{{{NS_W}}}cr': '\n', f'{{{NS_W}}}tab': '\t',
+            f'{{{NS_W}}}noBreakHyphen': '-'}
+# 문단 텍스트에 넣지 않는 run 내용: 그림 / 텍스트 상자(안쪽 문단), 문단 속성
+W_SKIP = {f'{{{NS_W}}}drawing', f'{{{NS_W}}}pict', f'{{{NS_W}}}object', f'{{{NS_MC}}}AlternateContent',
+          f'{{{NS_W}}}pPr', f'{{{NS_W}}}rPr'}
+
+# 파일 구조가 예상과 다를 때 (파트 누락, 깨진 XML, 알 수 없는 관계 등)
+FORMAT_ERRORS = (KeyError, ValueError, ParseError, zipfile.BadZipFile)
+
+
+class FormatError(ValueError):
+    """빠른 경로로 읽을 수 없는 OOXML 구조"""
+
+
+def _rels_path(part):
+    folder, name = posixpath.split(part)
+    return posixpath.join(folder, '_rels', name + '.rels')
+
+
+def _relationships(zf, part):
+    """파트의 관계 {rId: (Type, 대상 파트 경로)} (외부 링크 제외)"""
+    root = fromstring(zf.read(_rels_path(part)))
+    folder = posixpath.dirname(part)
+    rels = {}
+    for rel in root.iter(f'{{{NS_REL}}}Relationship'):
+        if rel.get('TargetMode') == 'External':
+            continue
+        target = rel.get('Target', '')
+        path = target.lstrip('/') if target.startswith('/') else posixpath.normpath(posixpath.join(folder, target))
+        rels[rel.get('Id')] = (rel.get('Type', ''), path)
+    return rels
+
+
+def _main_part(zf):
+    main = [path for kind, path in _relationships(zf, '').values() if kind == REL_OFFICE_DOCUMENT]
+    if len(main) != 1:
+        raise FormatError('no officeDocument relationship')
+    return main[0]
+
+
+def _slide_parts(zf):
+    """presentation.xml의 sldIdLst 순서대로 슬라이드 파트 경로 (python-pptx prs.slides와 같은 순서)"""
+    presentation = _main_part(zf)
+    rels = _relationships(zf, presentation)
+    root = fromstring(zf.read(presentation))
+    slide_ids = root.find(f'{{{NS_P}}}sldIdLst')
+    if slide_ids is None:
+        return []
+    return [rels[sld.get(f'{{{NS_R}}}id')][1] for sld in slide_ids.findall(f'{{{NS_P}}}sldId')]
+
+
+def _paragraph_text(p):
+    parts = []
+    for child in p:
+        if child.tag in (A_R, A_FLD):
+            t = child.find(A_T)
+            if t is not None and t.text:
+                parts.append(t.text)
+        elif child.tag == A_BR:
+            parts.append('\v')
+    return ''.join(parts)
+
+
+def _shape_texts(shape, texts):
+    """spTree 바로 아래 도형 -> texts에 문단 / 표 행 추가 (parse_pptx의 python-pptx 경로와 같은 규칙)"""
+    if shape.tag == P_SP:
+        body = shape.find(P_TXBODY)
+        if body is not None:
+            for p in body.findall(A_P):
+                text = _paragraph_text(p).strip()
+                if text:
+                    texts.append(text)
+    elif shape.tag == P_GRAPHIC_FRAME:
+        data = shape.find(f'{{{NS_A}}}graphic/{{{NS_A}}}graphicData')
+        if data is None or data.get('uri') != URI_TABLE:
+            return
+        table = data.find(f'{{{NS_A}}}tbl')
+        if table is None:
+            return
+        for tr in table.findall(A_TR):
+            row_texts = []
+            for tc in tr.findall(A_TC):
+                body = tc.find(A_TXBODY)
+                cell = '\n'.join(_paragraph_text(p) for p in body.findall(A_P)).strip() if body is not None else ''
+                if cell:
+                    row_texts.append(cell)
+            if row_texts:
+                texts.append(' | '.join(row_texts))
+
+
+def _slide_texts(f):
+    """슬라이드 XML 스트림 -> 문단 / 표 행 텍스트 목록. 도형 단위로 처리하고 지움"""
+    texts = []
+    depth_tags = []
+    for event, elem in iterparse(f, events=('start', 'end')):
+        if event == 'start':
+            depth_tags.append(elem.tag)
+            continue
+        depth_tags.pop()
+        if depth_tags and depth_tags[-1] == P_SPTREE:
+            _shape_texts(elem, texts)
+            elem.clear()
+    return texts
+
+
+def pptx_slides(path):
+    """PPTX -> (슬라이드 번호, 텍스트 목록)을 슬라이드 순서대로 yield
+
+    슬라이드 목록을 먼저 모두 확인한 뒤 yield하므로, 목록 단계의 FORMAT_ERRORS는 첫 yield 전에 납니다.
+    """
+    with zipfile.ZipFile(path) as zf:
+        parts = _slide_parts(zf)
+        for number, part in enumerate(parts, 1):
+            with zf.open(part) as f:
+                yield number, _slide_texts(f)
+
+
+# =============================================
+# DOCX
+# =============================================
+
+def _heading_levels(zf, styles_part):
+    """styles.xml -> {스타일 ID: 제목 수준} (Title 0, heading N / 개요 수준 N-1 -> N). basedOn 상속 반영"""
+    if styles_part is None:
+        return {}
+    try:
+        root = fromstring(zf.read(styles_part))
+    except KeyError:
+        return {}
+    styles = {}
+    for style in root.iter(f'{{{NS_W}}}style'):
+        if style.get(f'{{{NS_W}}}type') != 'paragraph':
+            continue
+        name = style.find(f'{{{NS_W}}}name')
+        based = style.find(f'{{{NS_W}}}basedOn')
+        outline = style.find(f'{{{NS_W}}}pPr/{{{NS_W}}}outlineLvl')
+        styles[style.get(f'{{{NS_W}}}styleId')] = (
+            (name.get(W_VAL, '') if name is not None else '').lower(),
+            based.get(W_VAL) if based is not None else None,
+            outline.get(W_VAL) if outline is not None else None,
+        )
+
+    def level(style_id, depth=0):
+        if style_id not in styles or depth > 10:
+            return None
+        name, based, outline = styles[style_id]
+        if name == 'title':
+            return 0
+        if name.startswith('heading ') and name[8:].isdigit():
+            return int(name[8:])
+        if outline is not None:
+            return int(outline) + 1 if outline.isdigit() and int(outline) < 9 else None
+        return level(based, depth + 1)
+
+    return {sid: lvl for sid in styles if (lvl := level(sid)) is not None}
+
+
+def _run_text(elem, parts):
+    for child in elem:
+        tag = child.tag
+        if tag == W_T:
+            if child.text:
+                parts.append(child.text)
+        elif tag in W_BREAKS:
+            if child.get(f'{{{NS_W}}}type') not in ('page', 'column'):
+                parts.append(W_BREAKS[tag])
+        elif tag not in W_SKIP:
+            _run_text(child, parts)
+
+
+def _paragraph_level(p, levels):
+    """문단의 제목 수준 (본문이면 None). 문단에 직접 지정한 개요 수준이 스타일보다 우선"""
+    ppr = p.find(f'{{{NS_W}}}pPr')
+    if ppr is None:
+        return None
+    outline = ppr.find(f'{{{NS_W}}}outlineLvl')
+    if outline is not None:
+        value = outline.get(W_VAL, '')
+        return int(value) + 1 if value.isdigit() and int(value) < 9 else None
+    style = ppr.find(f'{{{NS_W}}}pStyle')
+    return levels.get(style.get(W_VAL)) if style is not None else None
+
+
+def _cell_text(tc):
+    """셀 안 문단(중첩 표 포함) 텍스트를 공백 하나로 이어 붙임"""
+    parts = []
+    for child in tc:
+        if child.tag == W_P:
+            parts.append(''.join(_text_parts(child)))
+        elif child.tag == W_TBL:
+            parts.extend(_table_rows(child))
+        elif child.tag in W_CONTAINERS:
+            parts.append(_cell_text(child))
+    return ' '.join(' '.join(parts).split())
+
+
+def _text_parts(p):
+    parts = []
+    _run_text(p, parts)
+    return parts
+
+
+def _children(elem, tag):
+    """elem 바로 아래의 tag 요소 (내용 컨트롤 / 사용자 XML 안쪽 포함)"""
+    for child in elem:
+        if child.tag == tag:
+            yield child
+        elif child.tag in W_CONTAINERS:
+            yield from _children(child, tag)
+
+
+def _table_rows(tbl):
+    """표 -> 행 텍스트 목록 (빈 셀 / 빈 행 제외, 세로 병합으로 이어지는 셀은 비어 있음, 중첩 표는 셀 텍스트로)"""
+    rows = []
+    for tr in _children(tbl, W_TR):
+        cells = [text for tc in _children(tr, W_TC) if (text := _cell_text(tc))]
+        if cells:
+            rows.append(' | '.join(cells))
+    return rows
+
+
+def docx_blocks(path):
+    """DOCX 본문 -> 블록을 문서 순서대로 yield (word/document.xml 한 번 스트리밍)
+
+    ('p', 문단 번호, 텍스트(strip), 제목 수준 또는 None)  본문 문단 (빈 문단도 번호를 차지)
+    ('row', 표 번호, 행 텍스트, None)                    표 행 (셀 텍스트를 ' | '로 연결)
+    """
+    with zipfile.ZipFile(path) as zf:
+        document = _main_part(zf)
+        styles = [p for kind, p in _relationships(zf, document).values() if kind == REL_STYLES]
+        levels = _heading_levels(zf, styles[0] if styles else None)
+        counters = {'p': 0, 'table': 0}
+
+        def blocks(elem):
+            if elem.tag == W_P:
+                counters['p'] += 1
+                yield 'p', counters['p'], ''.join(_text_parts(elem)).strip(), _paragraph_level(elem, levels)
+            elif elem.tag == W_TBL:
+                counters['table'] += 1
+                for text in _table_rows(elem):
+                    yield 'row', counters['table'], text, None
+            elif elem.tag in W_CONTAINERS:
+                for child in elem:
+                    yield from blocks(child)
+
+        depth_tags = []
+        with zf.open(document) as f:
+            for event, elem in iterparse(f, events=('start', 'end')):
+                if event == 'start':
+                    depth_tags.append(elem.tag)
+                    continue
+                depth_tags.pop()
+                if depth_tags and depth_tags[-1] == W_BODY:
+                    yield from blocks(elem)
+                    elem.clear()
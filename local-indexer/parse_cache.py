@@ -0,0 +1,195 @@
+"""
+Knowledge Wiki - Parse Result Cache
+====================================
+파서 출력(태깅 전 원본 청크 목록)을 파일 내용 해시로 저장하는 캐시.
+PPTX/PDF 파싱(python-pptx, PyMuPDF)이 가장 비싼 단계이므로, 같은 내용의 파일은 다시 파싱하지 않습니다.
+
+  - 키: 파일 전체 BLAKE2b(filehash.file_hash) + 파서 설정(파서 버전, 확장자, 행 묶음 설정) 해시
+    경로가 바뀌거나 다른 PC에서 같은 드라이브를 인덱싱해도 적중 (공유 폴더에 둘 수 있음)
+  - 항목: gzip JSON Lines (청크 1줄씩) + 마지막 줄 {"_end": ...} (완결 표시 + 파싱 시간)
+    파싱과 동시에 임시 파일에 스트리밍으로 쓰고 끝나면 os.replace
+    → 여러 PC / 워커가 같은 항목을 동시에 써도 읽는 쪽에는 완결된 항목만 보임
+  - 크기 상한 + LRU: 적중 시 mtime 갱신, 실행 끝에 상한을 넘으면 오래된 항목부터 삭제
+  - 캐시 폴더를 쓸 수 없거나 항목이 깨져 있으면 조용히 파서로 돌아감
+  - 파서가 일부를 빠뜨린 결과(INCOMPLETE 표시, 예: PDF 페이지 시간 초과)는 저장하지 않음
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import socket
+import time
+import zlib
+from itertools import islice
+
+SUFFIX = '.jsonl.gz'
+COMPRESS_LEVEL = 6
+
+# 파서가 출력 일부를 빠뜨렸을 때 마지막에 yield하는 표시 (청크가 아님, 소비 측에 전달하지 않음).
+# 실행 환경(시간 제한 등)에 따라 다른 결과이므로 캐시에 남기지 않음
+INCOMPLETE = '_incomplete'
+
+
+def complete_chunks(chunks):
+    """INCOMPLETE 표시를 걸러낸 청크 iterator (캐시를 거치지 않는 경로용)"""
+    return (c for c in chunks if INCOMPLETE not in c)
+
+
+def new_cache_stats():
+    return {'hits': 0, 'misses': 0, 'seconds_saved': 0.0, 'bytes_read': 0, 'bytes_written': 0}
+
+
+class ParseCache:
+    """content-addressed 파서 출력 캐시 (root/ab/<key>.jsonl.gz)"""
+
+    def __init__(self, root, max_bytes):
+        self.root = root
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def key(file_hash, settings):
+        """파일 내용 해시 + 파서 설정(JSON으로 직렬화 가능한 값) -> 캐시 키"""
+        tag = hashlib.blake2b(json.dumps(settings, sort_keys=True).encode('utf-8'), digest_size=6).hexdigest()
+        return f'{file_hash}-{tag}'
+
+    def _path(self, key):
+        return os.path.join(self.root, key[:2], key + SUFFIX)
+
+    def parse(self, key, parse, stats):
+        """캐시 적중이면 저장된 청크를, 아니면 parse()를 실행하며 저장하는 제너레이터 반환
+
+        stats(new_cache_stats())에 적중/미적중, 아낀 파싱 시간, 읽고 쓴 바이트를 누적합니다.
+        """
+        path = self._path(key)
+        try:
+            f = gzip.open(path, 'rt', encoding='utf-8')
+            size = os.path.getsize(path)
+        except OSError:
+            stats['misses'] += 1
+            return self._store(path, parse(), stats)
+        stats['hits'] += 1
+        stats['bytes_read'] += size
+        try:
+            os.utime(path)          # LRU
+        except OSError:
+            pass
+        return self._load(f, path, parse, stats)
+
+    def _load(self, f, path, parse, stats):
+        count = 0
+        try:
+            with f:
+                for line in f:
+                    chunk = json.loads(line)
+                    if '_end' in chunk:
+                        stats['seconds_saved'] += chunk.get('parse_seconds', 0.0)
+                        return
+                    count += 1
+                    yield chunk
+        except (OSError, EOFError, zlib.error, ValueError):
+            pass
+        # 완결 표시가 없거나 깨진 항목: 삭제하고 이미 돌려준 청크 다음부터 파서로 이어서 진행
+        self._remove(path)
+        stats['hits'] -= 1
+        stats['misses'] += 1
+        yield from complete_chunks(islice(parse(), count, None))
+
+    def _store(self, path, chunks, stats):
+        tmp = f'{path}.{socket.gethostname()}-{os.getpid()}.tmp'
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            f = gzip.open(tmp, 'wt', encoding='utf-8', compresslevel=COMPRESS_LEVEL)
+        except OSError:
+            yield from chunks
+            return
+
+        it = iter(chunks)
+        count = 0
+        parse_seconds = 0.0
+        try:
+            while True:
+                t0 = time.perf_counter()
+                try:
+                    chunk = next(it)
+                except StopIteration:
+                    break
+                finally:
+                    parse_seconds += time.perf_counter() - t0
+                if INCOMPLETE in chunk:
+                    if f is not None:
+                        f = self._abandon(f, tmp)
+                    continue
+                if f is not None:
+                    try:
+                        f.write(json.dumps(chunk, ensure_ascii=False) + '\n')
+                    except OSError:
+                        f = self._abandon(f, tmp)
+                count += 1
+                yield chunk
+            if f is not None:
+                try:
+                    f.write(json.dumps({'_end': True, 'chunks': count,
+                                        'parse_seconds': round(parse_seconds, 3)}) + '\n')
+                    f.close()
+                    os.replace(tmp, path)
+                    stats['bytes_written'] += os.path.getsize(path)
+                except OSError:
+                    self._abandon(f, tmp)
+        except BaseException:
+            # 파서 오류 또는 소비 측 중단 (GeneratorExit 포함): 미완성 항목은 남기지 않음
+            if f is not None:
+                self._abandon(f, tmp)
+            raise
+
+    def _abandon(self, f, tmp):
+        try:
+            f.close()
+        except OSError:
+            pass
+        self._remove(tmp)
+        return None
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def evict(self):
+        """전체 크기가 max_bytes를 넘으면 오래 쓰지 않은 항목부터 삭제. (남은 바이트, 삭제 수) 반환
+
+        하루 넘게 남아 있는 임시 파일(중단된 쓰기)도 정리합니다.
+        """
+        entries = []
+        now = time.time()
+        try:
+            subdirs = [d.path for d in os.scandir(self.root) if d.is_dir()]
+        except OSError:
+            return 0, 0
+        for sub in subdirs:
+            try:
+                with os.scandir(sub) as it:
+                    for e in it:
+                        try:
+                            st = e.stat()
+                        except OSError:
+                            continue
+                        if e.name.endswith(SUFFIX):
+                            entries.append((st.st_mtime, st.st_size, e.path))
+                        elif e.name.endswith('.tmp') and now - st.st_mtime > 86400:
+                            self._remove(e.path)
+            except OSError:
+                continue
+
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        if total > self.max_bytes:
+            for _, size, path in sorted(entries):
+                self._remove(path)
+                total -= size
+                removed += 1
+                if total <= self.max_bytes:
+                    break
+        return total, removed
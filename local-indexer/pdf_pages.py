@@ -0,0 +1,208 @@
+"""
+Knowledge Wiki - PDF Page Extraction
+=====================================
+PDF 페이지 텍스트를 별도 프로세스에서 페이지 구간(shard) 단위로 추출 (indexer.parse_pdf에서 사용).
+
+  - PDF를 PDF_SHARD_PAGES쪽씩 구간으로 나누고 PdfPagePool의 프로세스들이 각자 fitz 문서를 열어 추출.
+    결과는 페이지 순서대로 합쳐서 돌려줌 (2,000쪽 보고서도 여러 코어에서 나눠 처리)
+  - 메모리: 순서를 기다리는 구간 결과만 들고 있고 앞선 페이지보다 (프로세스 수 × 구간 크기) 이상
+    앞서는 구간은 맡기지 않으므로 문서 크기와 무관
+  - 페이지 시간 제한: 한 페이지에서 page_timeout초 동안 진행이 없거나 프로세스가 죽으면
+    (깨진 페이지에서 MuPDF가 멈추거나 크래시) 그 프로세스를 종료하고 페이지를 건너뛴 뒤
+    구간의 나머지를 새 프로세스에서 이어서 추출
+  - 이미지만 있는 페이지 (스캔본): 글꼴 리소스가 없으면 텍스트가 있을 수 없으므로 추출하지 않음
+
+프로세스는 한 번 띄워 파일 사이에 재사용합니다 (작은 PDF마다 프로세스를 만들지 않음).
+"""
+
+import heapq
+import multiprocessing
+import os
+import time
+from multiprocessing.connection import wait
+
+IMAGE_ONLY = None       # page_text(): 이미지만 있어 추출하지 않은 페이지
+
+
+def page_text(page, skip_image_only=True):
+    """페이지 텍스트 (strip). 이미지만 있는 페이지면 IMAGE_ONLY"""
+    # get_fonts()는 리소스 사전만 읽음 (Form XObject 안의 글꼴 포함) - 텍스트 추출보다 훨씬 쌈
+    if skip_image_only and not page.get_fonts() and page.get_images():
+        return IMAGE_ONLY
+    return page.get_text().strip()
+
+
+def _page_worker(tasks, results, skip_image_only):
+    """추출 프로세스: (작업 번호, 경로, 시작, 끝) 구간을 받아 페이지마다 결과 전송
+
+    ('page', 작업, 페이지 번호, 텍스트) ... ('done', 작업) 또는 ('error', 작업, 메시지)
+    """
+    import fitz
+    parent = multiprocessing.parent_process()
+    doc, doc_key = None, None
+    while True:
+        if not tasks.poll(1.0):
+            if parent is not None and not parent.is_alive():
+                return
+            continue
+        try:
+            task = tasks.recv()
+        except EOFError:
+            return
+        if task is None:
+            return
+        job, path, start, end = task
+        try:
+            # 같은 파일의 다음 구간이면 열어 둔 문서 재사용 (작업 번호가 다르면 내용이 바뀌었을 수 있음)
+            if (job, path) != doc_key:
+                if doc is not None:
+                    doc.close()
+                doc, doc_key = None, None
+                doc, doc_key = fitz.open(path), (job, path)
+            for pno in range(start, end):
+                results.send(('page', job, pno, page_text(doc[pno], skip_image_only)))
+            results.send(('done', job))
+        except Exception as e:
+            results.send(('error', job, f'{type(e).__name__}: {e}'))
+
+
+class PdfPagePool:
+    """페이지 추출 프로세스 풀. pages()는 (페이지 번호, 텍스트) 를 순서대로 yield"""
+
+    def __init__(self, workers, shard_pages, page_timeout, skip_image_only=True):
+        self.size = max(1, workers)
+        self.shard_pages = max(1, shard_pages)
+        self.page_timeout = page_timeout
+        self.skip_image_only = skip_image_only
+        self._workers = []
+        self._job = 0
+        self.pid = os.getpid()         # 추출 프로세스를 join할 수 있는 것은 띄운 프로세스뿐
+
+    def _spawn(self):
+        task_reader, task_writer = multiprocessing.Pipe(duplex=False)
+        result_reader, result_writer = multiprocessing.Pipe(duplex=False)
+        proc = multiprocessing.Process(target=_page_worker, args=(task_reader, result_writer, self.skip_image_only),
+                                       name='pdf-pages', daemon=True)
+        proc.start()
+        task_reader.close()
+        result_writer.close()
+        return {'proc': proc, 'tasks': task_writer, 'results': result_reader,
+                'shard': None, 'next_page': 0, 'last': 0.0}
+
+    def _kill(self, w):
+        w['proc'].terminate()
+        w['proc'].join(5)
+        w['tasks'].close()
+        w['results'].close()
+
+    def _replace(self, w):
+        self._kill(w)
+        fresh = self._spawn()
+        self._workers[self._workers.index(w)] = fresh
+        return fresh
+
+    def close(self, timeout=5.0):
+        """종료 신호(None)를 보내고 끝나기를 기다림. timeout 안에 끝나지 않은 프로세스만 terminate
+
+        fork로 물려받은 풀이면 (다른 프로세스 소유) 물려받은 파이프만 닫고 프로세스는 건드리지 않음.
+        """
+        if self.pid != os.getpid():
+            for w in self._workers:
+                w['tasks'].close()
+                w['results'].close()
+            self._workers = []
+            return
+        for w in self._workers:
+            try:
+                w['tasks'].send(None)
+            except OSError:
+                pass
+        deadline = time.monotonic() + timeout
+        for w in self._workers:
+            w['proc'].join(max(0.0, deadline - time.monotonic()))
+            if w['proc'].is_alive():
+                w['proc'].terminate()
+                w['proc'].join(5)
+            w['tasks'].close()
+            w['results'].close()
+        self._workers = []
+
+    def pages(self, path, page_count, skipped=None):
+        """path의 0 ~ page_count-1 페이지를 (번호, 텍스트 또는 IMAGE_ONLY) 순서대로 yield
+
+        시간 초과 / 크래시로 건너뛴 페이지는 yield하지 않고 skipped(list)에 (번호, 사유)로 추가합니다.
+        """
+        while len(self._workers) < self.size:
+            self._workers.append(self._spawn())
+        self._job += 1
+        job = self._job
+        step = self.shard_pages
+        pending = [(s, min(s + step, page_count)) for s in range(0, page_count, step)]
+        window = self.size * step
+        ready = {}
+        lost = set()
+        next_page = 0
+
+        try:
+            while next_page < page_count:
+                # 순서대로 내보낼 수 있는 페이지
+                while next_page in ready or next_page in lost:
+                    if next_page in ready:
+                        yield next_page, ready.pop(next_page)
+                    else:
+                        lost.discard(next_page)
+                    next_page += 1
+                if next_page >= page_count:
+                    break
+
+                now = time.monotonic()
+                for w in self._workers:
+                    if w['shard'] is None and pending and pending[0][0] < next_page + window:
+                        start, end = heapq.heappop(pending)
+                        w['tasks'].send((job, path, start, end))
+                        w.update(shard=(start, end), next_page=start, last=now)
+
+                busy = [w for w in self._workers if w['shard'] is not None]
+                if not busy:
+                    raise RuntimeError(f'PDF page {next_page} was never extracted')
+                timeout = None
+                if self.page_timeout:
+                    timeout = max(0.0, min(w['last'] for w in busy) + self.page_timeout - now)
+                ready_conns = wait([w['results'] for w in busy], timeout)
+
+                for w in busy:
+                    if w['results'] in ready_conns:
+                        try:
+                            msg = w['results'].recv()
+                        except (EOFError, OSError):
+                            msg = None
+                        if msg is None:
+                            w['proc'].join(1)
+                            reason = f"worker exited (code {w['proc'].exitcode})"
+                        elif msg[0] == 'page':
+                            _, _, pno, text = msg
+                            ready[pno] = text
+                            w.update(next_page=pno + 1, last=time.monotonic())
+                            continue
+                        elif msg[0] == 'done':
+                            w['shard'] = None
+                            continue
+                        else:
+                            raise RuntimeError(msg[2])
+                    elif self.page_timeout and time.monotonic() - w['last'] >= self.page_timeout:
+                        reason = f'timed out after {self.page_timeout}s'
+                    else:
+                        continue
+                    # 멈춘 / 죽은 프로세스: 현재 페이지를 건너뛰고 구간 나머지를 다시 맡김
+                    pno, end = w['next_page'], w['shard'][1]
+                    lost.add(pno)
+                    if skipped is not None:
+                        skipped.append((pno, reason))
+                    if pno + 1 < end:
+                        heapq.heappush(pending, (pno + 1, end))
+                    self._replace(w)
+        finally:
+            # 중간에 멈춘 경우 (파서 오류, 소비 측 중단): 아직 이 파일을 추출 중인 프로세스는 교체
+            for w in list(self._workers):
+                if w['shard'] is not None:
+                    self._replace(w)
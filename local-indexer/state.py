@@ -0,0 +1,633 @@
+"""
+Knowledge Wiki - Indexer State Store
+=====================================
+indexer_state.db (SQLite) 관리.
+
+  - 실행 시작 시 indexed_files 전체를 한 번의 쿼리로 메모리에 로드하여 변경 감지
+  - 쓰기는 모아서 executemany + commit (WAL 모드, synchronous=NORMAL)
+  - 주기적 WAL 체크포인트
+  - PRAGMA user_version 기반 스키마 버전 관리 및 순차 마이그레이션
+    (기존 v3.0 indexed_files 테이블은 그대로 두고 컬럼만 추가)
+  - 파일별 chunk_id manifest {chunk_id: 텍스트 지문} (오래된 청크 삭제 + 바뀐 청크만 업로드)
+  - 파일별 doc_id (chunk_id 접두어, 내용이 바뀌거나 이동해도 유지)
+  - 변경 감지: (size, mtime_ns, inode)가 같으면 건너뜀, 다르면 파일 전체 해시(filehash.py)로 확인
+  - --watch 대기열 (pending_events): 알림 받은 경로를 디바운스할 때까지 보관, 재시작해도 유지
+  - 태그 TF-IDF용 문서 빈도 표 (terms) + 파일별 기여분 (file_terms), 증분 갱신
+  - --embed-local로 업로드한 청크 임베딩 + 검색 필터용 메타데이터 (chunk_vectors)
+    오프라인 벡터 인덱스(vector_index.py)를 이 테이블에서 만듭니다.
+  - 청크 MinHash 서명 + LSH 버킷 (chunk_sigs / lsh_buckets, dedup.py)
+    비슷한 대표 청크를 버킷 색인으로 찾으므로 조회 비용이 전체 청크 수에 비례하지 않음
+"""
+
+import hashlib
+import json
+import sqlite3
+import time
+from collections import namedtuple
+from datetime import datetime
+
+from dedup import band_keys, similarity
+from docfreq import DocFreq
+
+# 쓰기 버퍼가 이 개수 또는 시간(초)에 도달하면 commit
+FLUSH_EVERY = 500
+FLUSH_SECONDS = 5.0
+# commit 이 횟수마다 WAL 체크포인트
+CHECKPOINT_EVERY = 20
+
+
+def _add_columns(conn, table, columns):
+    existing = {row[1] for row in conn.execute(f'PRAGMA table_info({table})')}
+    for name, decl in columns:
+        if name not in existing:
+            conn.execute(f'ALTER TABLE {table} ADD COLUMN {name} {decl}')
+
+
+def _migrate_1(conn):
+    # v3.0 스키마 (기존 DB에는 이미 존재)
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS indexed_files (
+            file_path TEXT PRIMARY KEY,
+            mtime REAL,
+            hash TEXT,
+            chunk_count INTEGER DEFAULT 0,
+            last_indexed TEXT,
+            status TEXT DEFAULT 'ok'
+        )
+    ''')
+
+
+def _migrate_2(conn):
+    # scandir stat 정보 저장 (size, mtime_ns, inode)
+    _add_columns(conn, 'indexed_files', [
+        ('size', 'INTEGER'), ('mtime_ns', 'INTEGER'), ('inode', 'INTEGER'),
+    ])
+
+
+def _migrate_3(conn):
+    # 파일별 chunk_id manifest (JSON 배열). NULL = v3.0 시절 기록이라 알 수 없음
+    _add_columns(conn, 'indexed_files', [('manifest', 'TEXT')])
+
+
+def _migrate_4(conn):
+    # 파일별 doc_id. 기존 기록은 v3.0 chunk_id 접두어였던 파일 해시를 그대로 사용해
+    # 서버에 이미 올라간 chunk_id가 계속 유효하도록 함
+    _add_columns(conn, 'indexed_files', [('doc_id', 'TEXT')])
+    conn.execute("UPDATE indexed_files SET doc_id = hash WHERE doc_id IS NULL AND hash != ''")
+
+
+def _migrate_5(conn):
+    # 청크 단위 문서 빈도 표. file_terms.terms = docfreq.pack_terms() 바이트
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS terms (
+            id INTEGER PRIMARY KEY,
+            token TEXT NOT NULL UNIQUE,
+            df INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS file_terms (
+            file_path TEXT PRIMARY KEY,
+            n_chunks INTEGER NOT NULL,
+            terms BLOB NOT NULL
+        )
+    ''')
+
+
+def _migrate_6(conn):
+    # 업로드한 청크의 로컬 임베딩 (embedding.pack_vector 문자열). file_path는 로컬 경로
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS chunk_vectors (
+            chunk_id TEXT PRIMARY KEY,
+            file_path TEXT NOT NULL,
+            file_type TEXT,
+            project_path TEXT,
+            category TEXT,
+            doc_year TEXT,
+            embedding TEXT NOT NULL
+        )
+    ''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_chunk_vectors_file ON chunk_vectors(file_path)')
+
+
+def _migrate_7(conn):
+    # 청크 MinHash 서명 (dedup.signature). duplicate_of = 대표 청크 ID ('' = 대표 청크)
+    # lsh_buckets에는 대표 청크만 들어가므로 같은 내용이 여러 벌이어도 버킷이 커지지 않음
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS chunk_sigs (
+            chunk_id TEXT PRIMARY KEY,
+            file_path TEXT NOT NULL,
+            sig BLOB NOT NULL,
+            duplicate_of TEXT NOT NULL DEFAULT '',
+            text_bytes INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_chunk_sigs_file ON chunk_sigs(file_path)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_chunk_sigs_duplicate_of ON chunk_sigs(duplicate_of)')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS lsh_buckets (
+            bucket INTEGER NOT NULL,
+            chunk_id TEXT NOT NULL,
+            PRIMARY KEY (bucket, chunk_id)
+        ) WITHOUT ROWID
+    ''')
+
+
+def _migrate_8(conn):
+    # _migrate_4에서 doc_id = v3.0 해시(앞/뒤 64KB)로 옮긴 기록은 내용이 같거나 해시가 겹친 파일끼리
+    # chunk_id를 공유할 수 있음. 한 파일만 doc_id를 유지하고 나머지는 새 doc_id로 다시 인덱싱
+    # (manifest를 비워 공유 chunk_id를 삭제하지 않음). 유지하는 파일은 지문을 지워 청크를 전부 다시 올림
+    shared = conn.execute('''
+        SELECT doc_id FROM indexed_files WHERE doc_id IS NOT NULL AND doc_id != ''
+        GROUP BY doc_id HAVING COUNT(*) > 1
+    ''').fetchall()
+    for (doc_id,) in shared:
+        rows = conn.execute(
+            'SELECT file_path, manifest FROM indexed_files WHERE doc_id = ? ORDER BY file_path', (doc_id,)
+        ).fetchall()
+        keep_path, manifest = rows[0]
+        if manifest is not None:
+            manifest = json.dumps(list(json.loads(manifest)), ensure_ascii=False)
+        conn.execute('UPDATE indexed_files SET mtime = NULL, mtime_ns = NULL, manifest = ? WHERE file_path = ?',
+                     (manifest, keep_path))
+        conn.executemany('''
+            UPDATE indexed_files SET mtime = NULL, mtime_ns = NULL, doc_id = NULL, manifest = '[]'
+            WHERE file_path = ?
+        ''', [(path,) for path, _ in rows[1:]])
+
+
+def _migrate_9(conn):
+    # --watch 대기열: 알림을 받았지만 아직 인덱싱하지 않은 경로 (재시작해도 유지)
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS pending_events (
+            path TEXT PRIMARY KEY,
+            first_seen REAL NOT NULL,
+            last_seen REAL NOT NULL
+        )
+    ''')
+
+
+MIGRATIONS = [_migrate_1, _migrate_2, _migrate_3, _migrate_4, _migrate_5, _migrate_6, _migrate_7,
+              _migrate_8, _migrate_9]
+SCHEMA_VERSION = len(MIGRATIONS)
+
+# indexed_files 메모리 스냅샷 행 (manifest 본문 제외)
+FileState = namedtuple('FileState', 'file_path mtime size hash status has_manifest doc_id mtime_ns inode')
+
+
+class StateStore:
+    """indexed_files 상태 저장소 (메모리 스냅샷 + 배치 쓰기)"""
+
+    def __init__(self, path):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.migrate()
+
+        self.files = {}
+        self._doc_ids = set()
+        self._pending = []
+        self._pending_manifests = {}
+        self._pending_terms = {}
+        self._pending_vectors = {}   # chunk_id -> 행 (None = 삭제)
+        self._last_flush = time.monotonic()
+        self._commits = 0
+        self.load()
+        self.doc_freq = self.load_doc_freq()
+
+    def migrate(self):
+        version = self.conn.execute('PRAGMA user_version').fetchone()[0]
+        for i in range(version, SCHEMA_VERSION):
+            with self.conn:
+                MIGRATIONS[i](self.conn)
+                self.conn.execute(f'PRAGMA user_version = {i + 1}')
+
+    def load(self):
+        """indexed_files 전체를 {file_path: FileState} 로 로드
+
+        manifest 본문은 크기가 크므로 필요할 때 get_manifest()로 파일별로 읽습니다.
+        """
+        cur = self.conn.execute('''
+            SELECT file_path, mtime, size, hash, status, manifest IS NOT NULL, doc_id, mtime_ns, inode
+            FROM indexed_files
+        ''')
+        self.files = {row[0]: FileState(*row) for row in cur}
+        self._doc_ids = {row.doc_id for row in self.files.values() if row.doc_id}
+        return self.files
+
+    def load_doc_freq(self):
+        """terms 테이블 -> DocFreq (ID 순서 그대로 배열에 적재)"""
+        tokens, df = [], []
+        for term_id, token, count in self.conn.execute('SELECT id, token, df FROM terms ORDER BY id'):
+            if term_id != len(tokens):
+                raise ValueError(f'terms table has a gap at id {len(tokens)}')
+            tokens.append(token)
+            df.append(count)
+        n_docs = self.conn.execute('SELECT COALESCE(SUM(n_chunks), 0) FROM file_terms').fetchone()[0]
+        return DocFreq(tokens, df, n_docs)
+
+    def _file_terms(self, path):
+        if path in self._pending_terms:
+            return self._pending_terms[path]
+        return self.conn.execute(
+            'SELECT n_chunks, terms FROM file_terms WHERE file_path = ?',
+            (path,)
+        ).fetchone()
+
+    def set_file_terms(self, path, n_chunks, terms):
+        """파일의 DF 기여분 교체. terms = {토큰(소문자): 들어있는 청크 수}"""
+        old = self._file_terms(path)
+        if old is not None:
+            self.doc_freq.remove_file(*old)
+        self._pending_terms[path] = (n_chunks, self.doc_freq.add_file(n_chunks, terms))
+
+    def get_manifest(self, path):
+        """이전 인덱싱 때 업로드한 {chunk_id: 지문} (알 수 없으면 None)
+
+        지문 없이 chunk_id 목록만 저장된 기록은 지문을 None으로 돌려줍니다.
+        """
+        if path in self._pending_manifests:
+            return self._pending_manifests[path]
+        row = self.conn.execute(
+            'SELECT manifest FROM indexed_files WHERE file_path = ?', (path,)
+        ).fetchone()
+        if row is None or row[0] is None:
+            return None
+        manifest = json.loads(row[0])
+        if isinstance(manifest, list):
+            return dict.fromkeys(manifest)
+        return manifest
+
+    def doc_id_for(self, entry):
+        """파일의 doc_id (chunk_id 접두어)
+
+        이미 기록된 파일은 기존 값을 유지하고, 새 파일은 상대 경로에서 만들되
+        다른 파일(예: 이동된 파일)이 쓰고 있으면 겹치지 않게 바꿉니다.
+        """
+        row = self.files.get(entry.path)
+        if row is not None and row.doc_id:
+            return row.doc_id
+        seed = entry.rel_path.replace('\\', '/')
+        doc_id = hashlib.blake2b(seed.encode('utf-8'), digest_size=8).hexdigest()
+        while doc_id in self._doc_ids:
+            seed += f'#{entry.mtime_ns}'
+            doc_id = hashlib.blake2b(seed.encode('utf-8'), digest_size=8).hexdigest()
+        self._doc_ids.add(doc_id)
+        return doc_id
+
+    # ---------- change detection ----------
+
+    def needs_indexing(self, entry):
+        """stat이 기록과 다르면 True. (size, mtime_ns, inode)가 모두 같으면 해시를 계산하지 않음"""
+        row = self.files.get(entry.path)
+        if row is None:
+            return True
+        if row.mtime_ns is not None:
+            if (row.size, row.mtime_ns) != (entry.size, entry.mtime_ns):
+                return True
+            # Windows scandir stat은 inode가 0이므로 양쪽 모두 있을 때만 비교
+            return bool(row.inode and entry.inode and row.inode != entry.inode)
+        # mtime_ns 이전 기록: mtime 1초 오차 허용
+        if row.mtime is None or abs(row.mtime - entry.mtime) > 1:
+            return True
+        if row.size is not None and row.size != entry.size:
+            return True
+        return False
+
+    # ---------- watch queue ----------
+
+    def add_pending(self, events):
+        """{경로: 알림 시각} 을 대기열에 추가 (이미 있으면 마지막 시각만 갱신)"""
+        if not events:
+            return
+        with self.conn:
+            self.conn.executemany('''
+                INSERT INTO pending_events (path, first_seen, last_seen) VALUES (?, ?, ?)
+                ON CONFLICT(path) DO UPDATE SET last_seen = MAX(last_seen, excluded.last_seen)
+            ''', [(path, t, t) for path, t in events.items()])
+
+    def ready_pending(self, now, quiet, max_delay, limit):
+        """quiet초 동안 알림이 없었거나 처음 알림 후 max_delay초가 지난 경로 (오래된 순, 최대 limit개)"""
+        return [row[0] for row in self.conn.execute('''
+            SELECT path FROM pending_events
+            WHERE last_seen <= ? OR first_seen <= ?
+            ORDER BY last_seen, path LIMIT ?
+        ''', (now - quiet, now - max_delay, limit))]
+
+    def drop_pending(self, paths):
+        with self.conn:
+            self.conn.executemany('DELETE FROM pending_events WHERE path = ?', [(p,) for p in paths])
+
+    def count_pending(self):
+        return self.conn.execute('SELECT COUNT(*) FROM pending_events').fetchone()[0]
+
+    # ---------- chunk vectors ----------
+
+    def vector_ids(self, path):
+        """로컬 임베딩이 저장된 파일의 chunk_id set"""
+        ids = {row[0] for row in self.conn.execute(
+            'SELECT chunk_id FROM chunk_vectors WHERE file_path = ?', (path,))}
+        for chunk_id, row in self._pending_vectors.items():
+            if row is None:
+                ids.discard(chunk_id)
+            elif row[1] == path:
+                ids.add(chunk_id)
+        return ids
+
+    def files_missing_vectors(self):
+        """청크 수보다 저장된 로컬 임베딩이 적은 파일 경로 set (--embed-local 이전에 인덱싱된 파일 등)
+
+        참조 청크(near-duplicate)는 임베딩 없이 업로드하므로 임베딩이 있는 것으로 셉니다.
+        """
+        self.flush()
+        return {row[0] for row in self.conn.execute('''
+            SELECT f.file_path FROM indexed_files f
+            LEFT JOIN (SELECT file_path, COUNT(*) AS n FROM chunk_vectors GROUP BY file_path) v
+              ON v.file_path = f.file_path
+            LEFT JOIN (SELECT file_path, COUNT(*) AS n FROM chunk_sigs
+                       WHERE duplicate_of != '' GROUP BY file_path) d
+              ON d.file_path = f.file_path
+            WHERE f.status = 'ok' AND f.chunk_count > COALESCE(v.n, 0) + COALESCE(d.n, 0)
+        ''')}
+
+    def record_vectors(self, path, chunks):
+        """업로드하는 청크 배치 반영: 임베딩이 있으면 저장, 없으면(서버 생성) 이전 값 삭제"""
+        for chunk in chunks:
+            if chunk.get('embedding'):
+                self._pending_vectors[chunk['chunk_id']] = (
+                    chunk['chunk_id'], path, chunk.get('file_type', ''), chunk.get('project_path', ''),
+                    chunk.get('category', ''), chunk.get('doc_year', ''), chunk['embedding'],
+                )
+            else:
+                self._pending_vectors[chunk['chunk_id']] = None
+
+    def drop_vectors(self, chunk_ids):
+        for chunk_id in chunk_ids:
+            self._pending_vectors[chunk_id] = None
+
+    def set_vector_project(self, path, project_path):
+        """파일 이동 후 검색 필터용 project_path 갱신"""
+        self.flush()
+        with self.conn:
+            self.conn.execute('UPDATE chunk_vectors SET project_path = ? WHERE file_path = ?',
+                              (project_path, path))
+
+    def count_vectors(self):
+        self.flush()
+        return self.conn.execute('SELECT COUNT(*) FROM chunk_vectors').fetchone()[0]
+
+    def iter_vectors(self):
+        """(chunk_id, file_type, project_path, category, doc_year, embedding) - chunk_id 순"""
+        self.flush()
+        return self.conn.execute('''
+            SELECT chunk_id, file_type, project_path, category, doc_year, embedding
+            FROM chunk_vectors ORDER BY chunk_id
+        ''')
+
+    # ---------- near-duplicate chunks ----------
+    # 같은 실행 안에서 방금 기록한 서명도 바로 조회되어야 하므로 쓰기 버퍼 없이 바로 실행하고
+    # commit은 flush()에서 함께 합니다.
+
+    def chunk_signature(self, chunk_id):
+        """(서명, duplicate_of, 이 청크를 참조하는 청크 수) 또는 None"""
+        row = self.conn.execute(
+            'SELECT sig, duplicate_of FROM chunk_sigs WHERE chunk_id = ?', (chunk_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        refs = self.conn.execute(
+            'SELECT COUNT(*) FROM chunk_sigs WHERE duplicate_of = ?', (chunk_id,)
+        ).fetchone()[0]
+        return row[0], row[1], refs
+
+    def find_duplicate(self, chunk_id, sig, threshold):
+        """LSH 버킷을 공유하는 대표 청크 중 추정 유사도가 threshold 이상인 가장 비슷한 chunk_id (없으면 None)"""
+        keys = band_keys(sig)
+        rows = self.conn.execute(f'''
+            SELECT chunk_id, sig FROM chunk_sigs
+            WHERE chunk_id IN (SELECT chunk_id FROM lsh_buckets WHERE bucket IN ({','.join('?' * len(keys))}))
+              AND chunk_id != ?
+        ''', (*keys, chunk_id))
+        best, best_score = None, threshold
+        for candidate, other in rows:
+            score = similarity(sig, other)
+            if score > best_score or (score == best_score and (best is None or candidate < best)):
+                best, best_score = candidate, score
+        return best
+
+    def set_signature(self, chunk_id, path, sig, duplicate_of='', text_bytes=0):
+        """청크 서명 기록. 대표 청크(duplicate_of == '')만 LSH 버킷에 등록"""
+        self._unlink_signature(chunk_id)
+        self.conn.execute('''
+            INSERT OR REPLACE INTO chunk_sigs (chunk_id, file_path, sig, duplicate_of, text_bytes)
+            VALUES (?, ?, ?, ?, ?)
+        ''', (chunk_id, path, sig, duplicate_of, text_bytes))
+        if not duplicate_of:
+            self._link_signature(chunk_id, sig)
+
+    def forget_signatures(self, chunk_ids):
+        """업로드에 실패한 청크의 서명 제거 (참조하던 청크 전환 없이). 다시 인덱싱할 때 새로 기록됩니다"""
+        for chunk_id in chunk_ids:
+            self._unlink_signature(chunk_id)
+            self.conn.execute('DELETE FROM chunk_sigs WHERE chunk_id = ?', (chunk_id,))
+
+    def release_duplicates(self, chunk_ids):
+        """내용이 바뀌거나 삭제되는 대표 청크를 참조하던 청크를 대표 청크로 전환 후 전환 수 반환
+
+        서버도 같은 시점(/api/chunks 업로드, /api/chunks/delete)에 이 청크들로 본문을 복사해 둡니다.
+        """
+        released = 0
+        for chunk_id in chunk_ids:
+            rows = self.conn.execute(
+                'SELECT chunk_id, sig FROM chunk_sigs WHERE duplicate_of = ?', (chunk_id,)
+            ).fetchall()
+            for dup_id, sig in rows:
+                self._link_signature(dup_id, sig)
+            self.conn.execute("UPDATE chunk_sigs SET duplicate_of = '' WHERE duplicate_of = ?", (chunk_id,))
+            released += len(rows)
+        return released
+
+    def drop_signatures(self, chunk_ids):
+        """삭제된 청크의 서명 제거 (참조하던 청크는 대표 청크로 전환). 전환 수 반환"""
+        released = self.release_duplicates(chunk_ids)
+        for chunk_id in chunk_ids:
+            self._unlink_signature(chunk_id)
+            self.conn.execute('DELETE FROM chunk_sigs WHERE chunk_id = ?', (chunk_id,))
+        return released
+
+    def duplicate_ids(self, path):
+        """참조(본문 없이)로 업로드된 파일의 chunk_id set"""
+        return {row[0] for row in self.conn.execute(
+            "SELECT chunk_id FROM chunk_sigs WHERE file_path = ? AND duplicate_of != ''", (path,))}
+
+    def dedup_totals(self):
+        """(서명이 있는 청크 수, 참조 청크 수, 참조 청크 본문 바이트 합, 참조되는 대표 청크 수)"""
+        return self.conn.execute('''
+            SELECT COUNT(*), COALESCE(SUM(duplicate_of != ''), 0),
+                   COALESCE(SUM(CASE WHEN duplicate_of != '' THEN text_bytes ELSE 0 END), 0),
+                   COUNT(DISTINCT NULLIF(duplicate_of, ''))
+            FROM chunk_sigs
+        ''').fetchone()
+
+    def largest_duplicate_groups(self, n=5):
+        """참조가 가장 많은 대표 청크 [(chunk_id, 로컬 파일 경로, 참조 수)]"""
+        return self.conn.execute('''
+            SELECT d.duplicate_of, s.file_path, COUNT(*) AS n
+            FROM chunk_sigs d JOIN chunk_sigs s ON s.chunk_id = d.duplicate_of
+            WHERE d.duplicate_of != ''
+            GROUP BY d.duplicate_of ORDER BY n DESC, d.duplicate_of LIMIT ?
+        ''', (n,)).fetchall()
+
+    def _link_signature(self, chunk_id, sig):
+        self.conn.executemany('INSERT OR IGNORE INTO lsh_buckets (bucket, chunk_id) VALUES (?, ?)',
+                              [(key, chunk_id) for key in band_keys(sig)])
+
+    def _unlink_signature(self, chunk_id):
+        row = self.conn.execute('SELECT sig FROM chunk_sigs WHERE chunk_id = ?', (chunk_id,)).fetchone()
+        if row is not None:
+            self.conn.executemany('DELETE FROM lsh_buckets WHERE bucket = ? AND chunk_id = ?',
+                                  [(key, chunk_id) for key in band_keys(row[0])])
+
+    def _file_signature_ids(self, path):
+        return [row[0] for row in self.conn.execute(
+            'SELECT chunk_id FROM chunk_sigs WHERE file_path = ?', (path,))]
+
+    # ---------- batched writes ----------
+
+    def mark_indexed(self, entry, file_hash, chunk_count, status='ok', manifest=None, doc_id=None):
+        """파일 처리 결과 기록
+
+        manifest/doc_id가 None이면 기존 값을 유지합니다 (파싱 오류가 나도 서버에 남은 청크를 계속 추적).
+        """
+        manifest_json = json.dumps(manifest, ensure_ascii=False) if manifest is not None else None
+        self._pending.append((
+            entry.path, entry.mtime, file_hash, chunk_count, datetime.now().isoformat(), status,
+            entry.size, entry.mtime_ns, entry.inode, manifest_json, entry.path, doc_id, entry.path,
+        ))
+        if manifest is not None:
+            self._pending_manifests[entry.path] = manifest
+        old = self.files.get(entry.path)
+        self.files[entry.path] = FileState(
+            entry.path, entry.mtime, entry.size, file_hash, status,
+            manifest is not None or bool(old and old.has_manifest),
+            doc_id or (old.doc_id if old else None),
+            entry.mtime_ns, entry.inode,
+        )
+        if (len(self._pending) >= FLUSH_EVERY
+                or time.monotonic() - self._last_flush >= FLUSH_SECONDS):
+            self.flush()
+
+    def flush(self):
+        self._last_flush = time.monotonic()
+        if (not self._pending and not self._pending_terms and not self._pending_vectors
+                and not self.conn.in_transaction):
+            return
+        with self.conn:
+            self.conn.executemany('''
+                INSERT OR REPLACE INTO indexed_files
+                (file_path, mtime, hash, chunk_count, last_indexed, status,
+                 size, mtime_ns, inode, manifest, doc_id)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?,
+                        COALESCE(?, (SELECT manifest FROM indexed_files WHERE file_path = ?)),
+                        COALESCE(?, (SELECT doc_id FROM indexed_files WHERE file_path = ?)))
+            ''', self._pending)
+            self._write_terms()
+            self._write_vectors()
+        self._pending = []
+        self._pending_manifests = {}
+        self._commits += 1
+        if self._commits % CHECKPOINT_EVERY == 0:
+            self.conn.execute('PRAGMA wal_checkpoint(PASSIVE)')
+
+    def _write_terms(self):
+        doc_freq = self.doc_freq
+        if doc_freq.dirty:
+            self.conn.executemany(
+                'INSERT OR REPLACE INTO terms (id, token, df) VALUES (?, ?, ?)',
+                [(i, doc_freq.tokens[i], doc_freq.df[i]) for i in sorted(doc_freq.dirty)])
+            doc_freq.dirty.clear()
+        if self._pending_terms:
+            self.conn.executemany(
+                'INSERT OR REPLACE INTO file_terms (file_path, n_chunks, terms) VALUES (?, ?, ?)',
+                [(path, n, blob) for path, (n, blob) in self._pending_terms.items()])
+            self._pending_terms = {}
+
+    def _write_vectors(self):
+        if not self._pending_vectors:
+            return
+        rows = [row for row in self._pending_vectors.values() if row is not None]
+        deleted = [(cid,) for cid, row in self._pending_vectors.items() if row is None]
+        self.conn.executemany('DELETE FROM chunk_vectors WHERE chunk_id = ?', deleted)
+        self.conn.executemany('''
+            INSERT OR REPLACE INTO chunk_vectors
+            (chunk_id, file_path, file_type, project_path, category, doc_year, embedding)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', rows)
+        self._pending_vectors = {}
+
+    def move_files(self, moves):
+        """[(old_path, new_entry)] - 내용이 같은 파일의 경로 이동 반영 (hash/manifest 유지)"""
+        self.flush()
+        now = datetime.now().isoformat()
+        with self.conn:
+            for old_path, entry in moves:
+                self.conn.execute('DELETE FROM indexed_files WHERE file_path = ?', (entry.path,))
+                self._drop_terms(entry.path)
+                self.conn.execute('DELETE FROM chunk_vectors WHERE file_path = ?', (entry.path,))
+                self.drop_signatures(self._file_signature_ids(entry.path))
+                self.conn.execute('UPDATE chunk_sigs SET file_path = ? WHERE file_path = ?',
+                                  (entry.path, old_path))
+                self.conn.execute('UPDATE file_terms SET file_path = ? WHERE file_path = ?',
+                                  (entry.path, old_path))
+                self.conn.execute('UPDATE chunk_vectors SET file_path = ? WHERE file_path = ?',
+                                  (entry.path, old_path))
+                self.conn.execute('''
+                    UPDATE indexed_files
+                    SET file_path = ?, mtime = ?, size = ?, mtime_ns = ?, inode = ?, last_indexed = ?
+                    WHERE file_path = ?
+                ''', (entry.path, entry.mtime, entry.size, entry.mtime_ns, entry.inode, now, old_path))
+                old = self.files.pop(old_path)
+                self.files[entry.path] = old._replace(file_path=entry.path, mtime=entry.mtime, size=entry.size,
+                                                      mtime_ns=entry.mtime_ns, inode=entry.inode)
+            self._write_terms()
+
+    def touch_files(self, entries):
+        """내용 해시가 기록과 같은 파일(동기화로 mtime / inode만 바뀜)의 stat만 갱신"""
+        self.flush()
+        with self.conn:
+            self.conn.executemany(
+                'UPDATE indexed_files SET mtime = ?, size = ?, mtime_ns = ?, inode = ? WHERE file_path = ?',
+                [(e.mtime, e.size, e.mtime_ns, e.inode, e.path) for e in entries])
+        for e in entries:
+            self.files[e.path] = self.files[e.path]._replace(
+                mtime=e.mtime, size=e.size, mtime_ns=e.mtime_ns, inode=e.inode)
+
+    def forget_files(self, paths):
+        """삭제된 파일 기록 제거 (DF 기여분, 청크 서명도 제거)"""
+        self.flush()
+        with self.conn:
+            self.conn.executemany('DELETE FROM indexed_files WHERE file_path = ?', [(p,) for p in paths])
+            for path in paths:
+                self._drop_terms(path)
+            self._write_terms()
+            self.conn.executemany('DELETE FROM chunk_vectors WHERE file_path = ?', [(p,) for p in paths])
+            for path in paths:
+                self.drop_signatures(self._file_signature_ids(path))
+        for path in paths:
+            row = self.files.pop(path, None)
+            if row is not None:
+                self._doc_ids.discard(row.doc_id)
+
+    def _drop_terms(self, path):
+        row = self.conn.execute(
+            'SELECT n_chunks, terms FROM file_terms WHERE file_path = ?', (path,)
+        ).fetchone()
+        if row is not None:
+            self.doc_freq.remove_file(*row)
+            self.conn.execute('DELETE FROM file_terms WHERE file_path = ?', (path,))
+
+    def close(self):
+        self.flush()
+        self.conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+        self.conn.close()
@@ -0,0 +1,81 @@
+"""
+Knowledge Wiki - Fixed Vocabulary Term Counter
+===============================================
+고정 단어 목록의 출현 횟수를 텍스트 한 번 스캔으로 계산합니다.
+자동 태깅 사전 매칭(indexer.KeywordMatcher)과 로컬 임베딩(embedding.py)이 함께 사용합니다.
+
+  - 모든 단어를 접두어를 공유하는 트라이 정규식 하나로 컴파일 (C 정규식 엔진으로 1회 스캔)
+  - 정규식은 겹치지 않게 매칭하므로, 매칭된 단어에 포함되거나 끝부분이 겹치는 단어(related)를
+    후보로 추가하고 후보만 str.count로 정확히 셈
+  - 다른 단어와 겹칠 수 없는 단어(exact)는 정규식 매칭 횟수가 곧 str.count 결과
+
+결과는 단어별 text.count(word) (겹치지 않는 출현 횟수)와 같습니다.
+"""
+
+import re
+from collections import Counter
+
+
+def _trie_pattern(words):
+    """단어 목록 -> 접두어를 공유하는 정규식 (예: 데이터(?: 개방| 품질)?)
+
+    한 위치에서 매칭되는 단어 중 가장 긴 것을 찾습니다.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[''] = {}
+
+    def build(node):
+        alts = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not alts:
+            return ''
+        body = alts[0] if len(alts) == 1 else '(?:' + '|'.join(alts) + ')'
+        return '(?:' + body + ')?' if '' in node else body
+
+    return build(trie)
+
+
+class TermCounter:
+    """고정 단어 목록(소문자 비교는 호출 측에서) 출현 횟수 계산기"""
+
+    def __init__(self, words):
+        words = set(words)
+        self.words = words
+        self.regex = re.compile(_trie_pattern(words))
+        # 매칭된 단어 w가 있을 때 함께 등장했을 수 있는 단어
+        # (w에 포함되거나, w의 끝부분으로 시작하는 단어)
+        self.related = {
+            w: frozenset(k for k in words
+                         if k in w or any(k.startswith(w[i:]) for i in range(1, len(w))))
+            for w in words
+        }
+        self.exact = {w for w in words if all(w not in self.related[x] for x in words if x != w)}
+
+    def scan(self, text):
+        """(정규식 매칭 횟수 Counter, 등장했을 수 있는 단어 set)"""
+        hits = Counter(self.regex.findall(text))
+        found = set()
+        for w in hits:
+            found |= self.related[w]
+        return hits, found
+
+    def count(self, text, word, hits, found):
+        """scan() 결과로 단어 하나의 text.count(word) 계산"""
+        if word in self.exact:
+            return hits.get(word, 0)
+        if word in found:
+            return text.count(word)
+        return 0
+
+    def counts(self, text):
+        """{단어: 출현 횟수} (1회 이상 등장한 단어만)"""
+        hits, found = self.scan(text)
+        result = {}
+        for word in found:
+            n = self.count(text, word, hits, found)
+            if n:
+                result[word] = n
+        return result
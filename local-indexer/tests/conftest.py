@@ -0,0 +1,36 @@
+"""
+local-indexer 테스트 공용 설정
+================================
+local-indexer 모듈(indexer, state ...)과 저장소 루트의 benchmarks 패키지(대역 서버, 픽스처)를 import할 수 있게
+sys.path를 잡고, indexer 모듈 전역 상태(클라이언트 / 업로드 파이프라인 / 파싱 캐시 ...)를 테스트마다 초기화합니다.
+
+실행 (저장소 루트에서):
+  python -m pytest -q local-indexer/tests
+"""
+
+import os
+import sys
+
+import pytest
+
+INDEXER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REPO_ROOT = os.path.dirname(INDEXER_DIR)
+for path in (INDEXER_DIR, REPO_ROOT):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+
+@pytest.fixture
+def indexer_env(monkeypatch, tmp_path):
+    """대역 서버에 붙일 수 있게 초기화한 indexer 모듈 (보고서 / 파싱 캐시 / 재시도 대기 없음)"""
+    import async_client
+    import indexer
+    monkeypatch.setattr(indexer, 'PARSE_CACHE_PATH', '')
+    monkeypatch.setattr(indexer, 'METRICS_PATH', '')
+    monkeypatch.setattr(indexer, '_client', None)
+    monkeypatch.setattr(indexer, '_pipeline', None)
+    monkeypatch.setattr(indexer, '_parse_cache', None)
+    monkeypatch.setattr(indexer, '_exporter', None)
+    monkeypatch.setattr(async_client, 'backoff_delay', lambda attempt: 0.0)
+    yield indexer
+    indexer.close_pdf_pool()
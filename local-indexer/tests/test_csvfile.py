@@ -0,0 +1,134 @@
+"""csvfile: BOM / 줄바꿈 / 블록 경계 / 중간 인코딩 전환, 구분자 판단"""
+
+import codecs
+
+import pytest
+
+import csvfile
+from csvfile import csv_rows, detect_encoding, sniff_delimiter
+
+ROWS = [['연번', '시군구', '주소'], ['1', '중구', '중앙로 12'], ['2', 'Jung-gu', '"따옴표" 포함, 쉼표'], ['3', '', '끝']]
+
+
+def _csv_text(rows, newline='\n'):
+    def cell(value):
+        return f'"{value.replace(chr(34), chr(34) * 2)}"' if any(c in value for c in ',"') else value
+    return ''.join(','.join(cell(v) for v in row) + newline for row in rows)
+
+
+def _rows(path):
+    return [row for _, row in csv_rows(str(path))]
+
+
+@pytest.fixture
+def small_blocks(monkeypatch):
+    """표본 / 디코딩 블록을 작게: 작은 파일로 블록 경계와 표본 밖 위치를 만듦"""
+    def use(sample, block):
+        monkeypatch.setattr(csvfile, 'SAMPLE_BYTES', sample)
+        monkeypatch.setattr(csvfile, 'BLOCK_BYTES', block)
+    return use
+
+
+# =============================================
+# 인코딩
+# =============================================
+
+@pytest.mark.parametrize('bom, encoding, expected', [
+    (codecs.BOM_UTF8, 'utf-8', 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16-le', 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16-be', 'utf-16'),
+])
+def test_bom_files(tmp_path, bom, encoding, expected):
+    path = tmp_path / 'bom.csv'
+    path.write_bytes(bom + _csv_text(ROWS, '\r\n').encode(encoding))
+    assert detect_encoding(str(path))[0] == expected
+    assert _rows(path) == ROWS          # 첫 셀에 BOM이 남지 않음
+
+
+@pytest.mark.parametrize('encoding', ['utf-8', 'cp949'])
+def test_detects_korean_encodings(tmp_path, encoding):
+    path = tmp_path / 'data.csv'
+    path.write_bytes(_csv_text(ROWS).encode(encoding))
+    assert detect_encoding(str(path))[0] == encoding
+    assert _rows(path) == ROWS
+
+
+def test_switches_encoding_after_ascii_prefix(tmp_path, small_blocks):
+    # 앞 / 뒤 표본은 ASCII뿐이라 utf-8로 판단, 중간의 CP949 행에서 디코딩 실패 -> 그 블록부터 cp949
+    small_blocks(sample=256, block=64)
+    rows = ([['id', 'name', 'city']] + [[str(i), f'user{i}', 'Seoul'] for i in range(1, 40)]
+            + [[str(i), f'사용자{i}', '서울특별시 중구'] for i in range(40, 60)]
+            + [[str(i), f'user{i}', 'Busan'] for i in range(60, 100)])
+    path = tmp_path / 'mixed.csv'
+    path.write_bytes(_csv_text(rows, '\r\n').encode('cp949'))
+    assert detect_encoding(str(path))[0] == 'utf-8'
+
+    numbered = list(csv_rows(str(path)))
+    assert [row for _, row in numbered] == rows             # 이미 내보낸 행이 다시 나오지 않음
+    assert [i for i, _ in numbered] == list(range(1, len(rows) + 1))
+
+
+def test_undecodable_bytes_after_non_ascii_are_replaced(tmp_path, small_blocks):
+    # UTF-8 한글 뒤에 깨진 바이트: 인코딩은 바꾸지 않고 그 바이트만 U+FFFD
+    small_blocks(sample=64, block=64)
+    head = _csv_text([['번호', '이름']] + [[str(i), f'이름{i}'] for i in range(20)]).encode('utf-8')
+    tail = _csv_text([[str(i), 'tail'] for i in range(20, 40)]).encode('utf-8')
+    path = tmp_path / 'broken.csv'
+    path.write_bytes(head + b'99,\xff\xfe\n' + tail)
+    rows = _rows(path)
+    assert rows[:21] == [['번호', '이름']] + [[str(i), f'이름{i}'] for i in range(20)]
+    assert rows[21] == ['99', '��']
+    assert rows[22:] == [[str(i), 'tail'] for i in range(20, 40)]
+
+
+# =============================================
+# 줄바꿈 / 블록 경계
+# =============================================
+
+@pytest.mark.parametrize('block', range(1, 24))
+def test_crlf_split_across_block_boundary(tmp_path, small_blocks, block):
+    # 블록 크기를 바꿔 가며 \r 과 \n 사이, 한글 글자 중간에서 블록이 끊기도록
+    small_blocks(sample=16, block=block)
+    path = tmp_path / 'crlf.csv'
+    path.write_bytes(_csv_text(ROWS * 3, '\r\n').encode('utf-8'))
+    assert _rows(path) == ROWS * 3
+
+
+@pytest.mark.parametrize('block', [1, 5, 7, 64, 1 << 18])
+def test_cr_only_file(tmp_path, small_blocks, block):
+    small_blocks(sample=1 << 18, block=block)
+    path = tmp_path / 'mac.csv'
+    path.write_bytes(_csv_text(ROWS * 2, '\r').encode('utf-8'))
+    assert _rows(path) == ROWS * 2
+
+
+def test_quoted_newline_and_missing_final_newline(tmp_path, small_blocks):
+    small_blocks(sample=16, block=8)
+    path = tmp_path / 'quoted.csv'
+    path.write_bytes('a,"첫 줄\r\n둘째 줄",c\r\nx,y,z'.encode('utf-8'))
+    assert _rows(path) == [['a', '첫 줄\n둘째 줄', 'c'], ['x', 'y', 'z']]
+
+
+# =============================================
+# 구분자
+# =============================================
+
+@pytest.mark.parametrize('text, expected', [
+    ('a,b,c\n1,2,3\n', ','),
+    # 셀마다 ; 나 | 가 들어 있어도 쉼표가 있으면 쉼표 (이전 동작)
+    ('이름,태그;분류;비고\n김,a;b;c\n이,d;e;f\n박,g;h;i\n', ','),
+    ('id,경로|분류|태그\n1,a|b|c\n2,d|e|f\n3,g|h|i\n', ','),
+    ('a\tb\tc\n1\t2\t3\n4\t5\t6\n', '\t'),
+    ('a;b;c\n1;2;3\n4;5;6\n', ';'),
+    ('a|b\n1|2\n3|4\n', '|'),
+    ('한 칸짜리\n값\n', ','),
+    ('', ','),
+])
+def test_sniff_delimiter(text, expected):
+    assert sniff_delimiter(text) == expected
+
+
+def test_semicolon_file_rows(tmp_path):
+    path = tmp_path / 'semicolon.csv'
+    path.write_text('이름;금액\n김;1000.50\n이;2000\n', encoding='utf-8')
+    assert _rows(path) == [['이름', '금액'], ['김', '1000.50'], ['이', '2000']]
@@ -0,0 +1,226 @@
+"""중복 청크 정리: MinHash 서명, LSH 후보에서 대표 청크 고르기 / 임계값 경계,
+업로드가 끝난 대표 청크만 참조하기 (dedup_batch / settle_signatures)"""
+
+import os
+import sys
+import threading
+from array import array
+
+import pytest
+
+import dedup
+from benchmarks.stub_server import StubServer
+from dedup import BANDS, ROWS, SIG_SIZE, signature, similarity
+from state import StateStore
+from uploader import new_upload_stats
+
+TEXT = ' '.join(f'2024년 디지털 전환 전략 과제 {i}번 추진 일정과 예산 검토 의견' for i in range(40))
+
+
+def _sig(values):
+    return array('I', values).tobytes()
+
+
+def _variant(base, changed, start=ROWS):
+    """base 서명에서 start부터 changed개 값만 바꾼 서명 (첫 띠는 같아 LSH 후보로 잡힘)"""
+    values = list(dedup.unpack(base))
+    for i in range(start, start + changed):
+        values[i] ^= 0x5A5A5A5A
+    return _sig(values)
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = StateStore(str(tmp_path / 'indexer_state.db'))
+    yield store
+    store.close()
+
+
+# =============================================
+# 서명
+# =============================================
+
+def test_signature_similarity():
+    sig = signature(TEXT)
+    assert len(sig) == SIG_SIZE * 4
+    assert signature(TEXT.upper().replace(' ', '  \n')) == sig       # 대소문자 / 공백 무관
+    assert similarity(sig, signature(TEXT + ' 추가 문장 하나')) > 0.85
+    assert similarity(sig, signature('전혀 다른 내용의 회의록 ' * 30)) < 0.3
+    assert signature('  \n ') is None
+    assert signature('짧은') is not None
+
+
+def test_signature_without_numpy(monkeypatch):
+    expected = [signature(TEXT), signature('두 단어'), signature(TEXT[:300])]
+    monkeypatch.setitem(sys.modules, 'numpy', None)         # import numpy -> ImportError
+    assert [signature(TEXT), signature('두 단어'), signature(TEXT[:300])] == expected
+
+
+# =============================================
+# 대표 청크 고르기 (StateStore)
+# =============================================
+
+def test_find_duplicate_picks_most_similar_canonical(store):
+    base = signature(TEXT)
+    store.set_signature('a', '/d/a.pptx', base)
+    store.set_signature('b', '/d/b.pptx', _variant(base, 4))
+    store.set_signature('c', '/d/c.pptx', _variant(base, 10))
+    assert store.find_duplicate('new', base, 0.85) == 'a'
+    assert store.find_duplicate('new', _variant(base, 9), 0.85) == 'c'      # 'c'와 1개, 'b'와 11개 차이
+    assert store.find_duplicate('a', base, 0.85) in ('b', 'c')               # 자기 자신은 제외
+
+    # 점수가 같으면 chunk_id 순
+    store.set_signature('0-first', '/d/z.pptx', base)
+    assert store.find_duplicate('new', base, 0.85) == '0-first'
+
+
+def test_references_are_not_candidates(store):
+    base = signature(TEXT)
+    store.set_signature('a', '/d/a.pptx', base)
+    store.set_signature('copy', '/d/copy.pptx', base, duplicate_of='a')
+    store.forget_signatures(['a'])
+    assert store.find_duplicate('new', base, 0.85) is None
+    assert store.chunk_signature('copy') == (base, 'a', 0)
+
+
+def test_no_shared_band_is_not_a_candidate(store):
+    base = signature(TEXT)
+    # 모든 띠에서 한 값씩 다르면 버킷을 공유하지 않음 (추정 유사도는 높아도 후보가 아님)
+    values = list(dedup.unpack(base))
+    for band in range(BANDS):
+        values[band * ROWS] ^= 1
+    store.set_signature('a', '/d/a.pptx', _sig(values))
+    assert similarity(base, _sig(values)) == 1 - BANDS / SIG_SIZE
+    assert store.find_duplicate('new', base, 0.5) is None
+
+
+@pytest.mark.parametrize('changed, found', [(16, True), (17, False)])
+def test_threshold_boundary(store, changed, found):
+    base = signature(TEXT)
+    store.set_signature('a', '/d/a.pptx', base)
+    other = _variant(base, changed)
+    threshold = (SIG_SIZE - 16) / SIG_SIZE              # 0.875: 16개 차이까지 같은 청크
+    assert similarity(base, other) == (SIG_SIZE - changed) / SIG_SIZE
+    assert (store.find_duplicate('new', other, threshold) == 'a') is found
+
+
+def test_release_duplicates_relinks_references(store):
+    base = signature(TEXT)
+    store.set_signature('a', '/d/a.pptx', base)
+    store.set_signature('copy', '/d/copy.pptx', base, duplicate_of='a')
+    assert store.chunk_signature('a') == (base, '', 1)
+    assert store.release_duplicates(['a']) == 1
+    assert store.chunk_signature('copy') == (base, '', 0)
+    assert store.find_duplicate('a', base, 0.85) == 'copy'
+
+
+# =============================================
+# dedup_batch / settle_signatures
+# =============================================
+
+def _chunk(chunk_id, text=TEXT):
+    return {'chunk_id': chunk_id, 'text': text, 'embedding': 'e', 'embed_model': 'm',
+            'minhash': signature(text)}
+
+
+def test_dedup_batch_turns_copies_into_references(indexer_env, store):
+    stats = indexer_env.new_run_stats()['dedup']
+    first = [_chunk('a-1'), _chunk('a-2', '다른 내용 ' * 50), _chunk('a-3', '짧음') | {'minhash': None}]
+    assert indexer_env.dedup_batch(store, '/d/a.pptx', first, stats) == ['a-1', 'a-2']
+    assert all('duplicate_of' not in c and 'minhash' not in c for c in first)
+
+    copy = [_chunk('b-1', TEXT + ' 수정')]
+    assert indexer_env.dedup_batch(store, '/d/b.pptx', copy, stats) == ['b-1']
+    assert copy[0]['duplicate_of'] == 'a-1'
+    assert copy[0]['text'] == '' and 'embedding' not in copy[0] and 'embed_model' not in copy[0]
+    assert (stats['signed'], stats['duplicates']) == (3, 1)
+    assert stats['bytes_saved'] == len((TEXT + ' 수정').encode('utf-8')) + 1
+
+    # 대표 청크 내용이 바뀌면 참조하던 청크는 대표 청크로 전환
+    changed = [_chunk('a-1', '완전히 바뀐 슬라이드 본문 ' * 30)]
+    indexer_env.dedup_batch(store, '/d/a.pptx', changed, stats)
+    assert stats['released'] == 1
+    assert store.chunk_signature('b-1')[1] == ''
+
+
+def _in_flight(indexer, store, tracker, key, batch, stats):
+    """업로드 중인 배치 흉내: 서명을 기록하고 아직 끝나지 않은 것으로 둠"""
+    signed = indexer.dedup_batch(store, key, batch, stats, tracker)
+    tracker.unsettled.update(signed)
+    tracker.batch_queued(key)
+    return signed
+
+
+@pytest.mark.parametrize('uploaded', [True, False])
+def test_reference_waits_for_canonical_upload(indexer_env, store, uploaded):
+    indexer = indexer_env
+    stats = indexer.new_run_stats()['dedup']
+    tracker = indexer.UploadTracker(new_upload_stats())
+    signed = _in_flight(indexer, store, tracker, '/d/a.pptx', [_chunk('a-1')], stats)
+
+    # 대표 청크 배치는 dedup_batch가 기다리기 시작한 뒤에 끝남 (업로드 루프 스레드)
+    result = new_upload_stats()
+    result.update(inserted=1) if uploaded else result.update(failed=1)
+    finisher = threading.Timer(0.2, tracker.batch_done, ('/d/a.pptx', result, signed))
+    finisher.start()
+    copy = [_chunk('b-1')]
+    indexer.dedup_batch(store, '/d/b.pptx', copy, stats, tracker)
+    finisher.join()
+
+    assert not tracker.unsettled
+    if uploaded:
+        assert copy[0]['duplicate_of'] == 'a-1'
+    else:
+        # 실패한 대표 청크는 참조하지 않고, 서명도 지워 다음 실행에서 새로 기록
+        assert 'duplicate_of' not in copy[0] and copy[0]['text'] == TEXT
+        assert store.chunk_signature('a-1') is None
+        assert store.find_duplicate('new', signature(TEXT), 0.85) == 'b-1'
+
+
+def test_settle_without_wait_keeps_pending(indexer_env, store):
+    indexer = indexer_env
+    tracker = indexer.UploadTracker(new_upload_stats())
+    _in_flight(indexer, store, tracker, '/d/a.pptx', [_chunk('a-1')], indexer.new_run_stats()['dedup'])
+    indexer.settle_signatures(store, tracker)
+    assert tracker.unsettled == {'a-1'}
+    assert store.chunk_signature('a-1') is not None
+
+
+@pytest.fixture
+def copies(tmp_path):
+    """같은 내용의 CSV 세 벌"""
+    root = tmp_path / 'drive'
+    rows = ['과제,담당,의견'] + [f'디지털 전환 과제 {i},김민수,일정과 예산을 다시 검토해야 함 {i}' for i in range(30)]
+    for name in ('v1', 'v2_최종', 'v3_최종_수정'):
+        (root / 'P01' / name).mkdir(parents=True)
+        (root / 'P01' / name / '과제목록.csv').write_text('\n'.join(rows) + '\n', encoding='utf-8')
+    return str(root)
+
+
+@pytest.mark.parametrize('reject', [(), ('P01/v1/과제목록.csv',)])
+def test_uploaded_references_resolve_on_server(indexer_env, copies, tmp_path, reject):
+    indexer = indexer_env
+    indexer.DRIVE_ROOT = copies
+    with StubServer(reject_paths=reject) as server:
+        indexer.WIKI_API_URL = server.url
+        store = StateStore(str(tmp_path / 'indexer_state.db'))
+        try:
+            to_index, _, _ = indexer.plan_changes(store, indexer.scan_files(copies))
+            run = indexer.new_run_stats()
+            indexer.index_files_serial(store, sorted(to_index, key=lambda e: e.path), run)
+            indexed = {path for path, row in store.files.items() if row.status == 'ok'}
+        finally:
+            store.close()
+
+    refs = {cid: c['duplicate_of'] for cid, c in server.chunks.items() if c.get('duplicate_of')}
+    assert refs, 'copies should be uploaded as references'
+    dangling = {cid: target for cid, target in refs.items()
+                if target not in server.chunks or server.chunks[target].get('duplicate_of')}
+    assert dangling == {}
+    if reject:
+        # 첫 파일의 배치가 400으로 실패 (다음 실행에서 다시 인덱싱): 참조는 둘째 파일을 가리킴
+        assert run['upload']['failed'] and os.path.join(copies, 'P01', 'v1', '과제목록.csv') not in indexed
+        assert {server.chunks[target]['file_path'] for target in refs.values()} == {'P01/v2_최종/과제목록.csv'}
+    else:
+        assert {server.chunks[target]['file_path'] for target in refs.values()} == {'P01/v1/과제목록.csv'}
+        assert len(indexed) == 3
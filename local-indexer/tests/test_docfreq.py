@@ -0,0 +1,166 @@
+"""DF 표: 파일 기여분 증분 갱신 (재인덱싱 / 이동 / 삭제), 영속화, top_terms 동점 순서"""
+
+import pickle
+from collections import Counter
+
+import pytest
+
+from benchmarks.stub_server import StubServer
+from docfreq import DocFreq, pack_terms, unpack_terms
+from state import StateStore
+
+
+def _table(doc_freq):
+    """{토큰: DF} (DF가 0인 토큰 제외) + 전체 청크 수"""
+    return {t: doc_freq.df[i] for i, t in enumerate(doc_freq.tokens) if doc_freq.df[i]}, doc_freq.n_docs
+
+
+# =============================================
+# DocFreq
+# =============================================
+
+def test_add_and_remove_file():
+    doc_freq = DocFreq()
+    first = doc_freq.add_file(2, {'전략': 2, 'kpi': 1})
+    doc_freq.add_file(3, {'전략': 1, '데이터': 3})
+    assert _table(doc_freq) == ({'전략': 3, 'kpi': 1, '데이터': 3}, 5)
+    assert list(unpack_terms(first)) == [(doc_freq.vocab['전략'], 2), (doc_freq.vocab['kpi'], 1)]
+
+    doc_freq.remove_file(2, first)
+    assert _table(doc_freq) == ({'전략': 1, '데이터': 3}, 3)
+    assert doc_freq.tokens == ['전략', 'kpi', '데이터']        # ID는 재사용하지 않음 (terms 테이블과 일치)
+    assert doc_freq.dirty == {0, 1, 2}
+
+    doc_freq.remove_file(9, first)                               # 두 번 빼도 음수가 되지 않음
+    assert _table(doc_freq) == ({'데이터': 3}, 0)
+
+
+def test_pack_terms_round_trip():
+    pairs = [(0, 1), (7, 300), (2 ** 32 - 1, 2)]
+    assert list(unpack_terms(pack_terms(pairs))) == pairs
+    assert list(unpack_terms(pack_terms([]))) == []
+
+
+def test_pickle_rebuilds_vocab():
+    doc_freq = DocFreq()
+    doc_freq.add_file(4, {'전략': 2, '데이터': 1})
+    copy = pickle.loads(pickle.dumps(doc_freq))
+    assert copy.vocab == doc_freq.vocab and _table(copy) == _table(doc_freq)
+    assert copy.idf('전략') == doc_freq.idf('전략')
+
+
+def test_idf():
+    doc_freq = DocFreq()
+    assert doc_freq.idf('무엇이든') == 1.0
+    doc_freq.add_file(9, {'흔한': 9, '드문': 1})
+    assert doc_freq.idf('흔한') == 1.0
+    assert doc_freq.idf('드문') > doc_freq.idf('흔한')
+    assert doc_freq.idf('없는') > doc_freq.idf('드문')
+
+
+# =============================================
+# top_terms 동점 순서
+# =============================================
+
+@pytest.mark.parametrize('n_docs', [0, 10])
+def test_top_terms_ties_keep_first_seen_order(n_docs):
+    doc_freq = DocFreq()
+    if n_docs:
+        doc_freq.add_file(n_docs, {'공통': 5})
+    counts = Counter(['다', '가', '나', '라', '가', '다'])     # 가 / 다 2회, 나 / 라 1회 (DF 같음)
+    assert doc_freq.top_terms(counts, 3) == ['다', '가', '나']
+    reordered = Counter(['가', '라', '나', '다', '가', '다'])
+    assert doc_freq.top_terms(reordered, 3) == ['가', '다', '라']
+    assert all(doc_freq.top_terms(Counter(['다', '가', '나', '라', '가', '다']), 3) == ['다', '가', '나']
+               for _ in range(20))
+
+
+def test_top_terms_uses_lowercase_df():
+    doc_freq = DocFreq()
+    doc_freq.add_file(10, {'strategy': 10, 'kpi': 1})
+    # 같은 빈도면 DF가 낮은 쪽이 먼저. 대소문자는 DF 조회 시에만 무시 (반환은 원래 표기)
+    assert doc_freq.top_terms(Counter({'Strategy': 2, 'KPI': 2}), 2) == ['KPI', 'Strategy']
+
+
+# =============================================
+# StateStore: 증분 갱신 / 영속화
+# =============================================
+
+@pytest.fixture
+def store(tmp_path):
+    store = StateStore(str(tmp_path / 'indexer_state.db'))
+    yield store
+    store.close()
+
+
+def test_state_reindex_move_and_delete(store, tmp_path):
+    store.set_file_terms('/d/a.pptx', 3, {'전략': 3, 'kpi': 1})
+    store.set_file_terms('/d/b.pptx', 2, {'전략': 1, '데이터': 2})
+    assert _table(store.doc_freq) == ({'전략': 4, 'kpi': 1, '데이터': 2}, 5)
+
+    # 다시 인덱싱: 이전 기여분을 빼고 새 기여분 (flush 전후 모두)
+    store.set_file_terms('/d/a.pptx', 1, {'로드맵': 1})
+    assert _table(store.doc_freq) == ({'전략': 1, '데이터': 2, '로드맵': 1}, 3)
+    store.flush()
+    store.set_file_terms('/d/a.pptx', 2, {'로드맵': 2, 'kpi': 1})
+    assert _table(store.doc_freq) == ({'전략': 1, '데이터': 2, '로드맵': 2, 'kpi': 1}, 4)
+
+    store.forget_files(['/d/b.pptx'])
+    assert _table(store.doc_freq) == ({'로드맵': 2, 'kpi': 1}, 2)
+    store.forget_files(['/d/b.pptx', '/d/없는.pptx'])             # 이미 지운 파일은 무시
+    assert _table(store.doc_freq) == ({'로드맵': 2, 'kpi': 1}, 2)
+
+    expected = _table(store.doc_freq)
+    store.flush()
+    reopened = StateStore(str(tmp_path / 'indexer_state.db'))
+    try:
+        assert _table(reopened.doc_freq) == expected
+        assert reopened.doc_freq.tokens == store.doc_freq.tokens
+    finally:
+        reopened.close()
+
+
+def _csv(path, rows):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text('과제,내용\n' + ''.join(f'{name},{text}\n' for name, text in rows), encoding='utf-8')
+
+
+def _index_drive(indexer, store, root):
+    to_index, renames, gone = indexer.plan_changes(store, indexer.scan_files(str(root)))
+    indexer.sync_renames_and_deletes(store, renames, gone)
+    indexer.index_files_serial(store, to_index, indexer.new_run_stats())
+    store.flush()
+
+
+def test_incremental_df_equals_full_rebuild(indexer_env, tmp_path, monkeypatch):
+    indexer = indexer_env
+    monkeypatch.setattr(indexer, 'DEDUP', False)
+    root = tmp_path / 'drive'
+    indexer.DRIVE_ROOT = str(root)
+    _csv(root / 'P01' / 'a.csv', [(f'전략 과제 {i}', '디지털 전환 로드맵 수립') for i in range(20)])
+    _csv(root / 'P01' / 'b.csv', [(f'데이터 과제 {i}', '데이터 거버넌스 체계') for i in range(15)])
+    _csv(root / 'P02' / 'c.csv', [(f'KPI {i}', '성과 지표 관리') for i in range(10)])
+
+    with StubServer() as server:
+        indexer.WIKI_API_URL = server.url
+        store = StateStore(str(tmp_path / 'incremental.db'))
+        try:
+            _index_drive(indexer, store, root)
+            # 내용 변경 / 이동 / 삭제 / 추가 후 다시 실행
+            _csv(root / 'P01' / 'a.csv', [(f'전략 과제 {i}', 'AI 전환 로드맵') for i in range(12)])
+            (root / 'P03').mkdir()
+            (root / 'P02' / 'c.csv').rename(root / 'P03' / 'c.csv')
+            (root / 'P01' / 'b.csv').unlink()
+            _csv(root / 'P03' / 'd.csv', [(f'보안 과제 {i}', '정보보호 체계') for i in range(8)])
+            _index_drive(indexer, store, root)
+            incremental = _table(store.doc_freq)
+        finally:
+            store.close()
+
+        fresh = StateStore(str(tmp_path / 'fresh.db'))
+        try:
+            _index_drive(indexer, fresh, root)
+            assert incremental == _table(fresh.doc_freq)
+            assert incremental[1] == sum(len(fresh.get_manifest(path)) for path in fresh.files)
+        finally:
+            fresh.close()
@@ -0,0 +1,139 @@
+"""DOCX: docx_blocks 블록 / 제목 수준, parse_docx 제목 구간 묶기와 DOCX_MIN_CHUNK_CHARS / DOCX_CHUNK_CHARS"""
+
+import pytest
+from docx import Document
+
+from ooxml import docx_blocks
+
+
+def _save(doc, tmp_path, name='report.docx'):
+    path = str(tmp_path / name)
+    doc.save(path)
+    return path
+
+
+def _table(doc, rows):
+    table = doc.add_table(rows=len(rows), cols=len(rows[0]))
+    for row, values in zip(table.rows, rows):
+        for cell, value in zip(row.cells, values):
+            cell.text = value
+    return table
+
+
+@pytest.fixture
+def report(tmp_path):
+    doc = Document()
+    doc.add_heading('연구 보고서', 0)
+    doc.add_heading('1. 개요', 1)
+    doc.add_paragraph('개요 본문 첫 문단')
+    doc.add_paragraph('')                                   # 빈 문단도 번호를 차지
+    doc.add_heading('1.1 배경', 2)
+    doc.add_paragraph('배경 설명')
+    _table(doc, [['구분', '2023', '2024'], ['예산', '', '120억'], ['', '', '']])
+    doc.add_heading('2. 결론', 1)
+    doc.add_paragraph('결론 본문')
+    return _save(doc, tmp_path)
+
+
+@pytest.fixture
+def docx_env(indexer_env, monkeypatch):
+    def limits(chunk_chars=2000, min_chars=0):
+        monkeypatch.setattr(indexer_env, 'DOCX_CHUNK_CHARS', chunk_chars)
+        monkeypatch.setattr(indexer_env, 'DOCX_MIN_CHUNK_CHARS', min_chars)
+        return indexer_env.parse_docx
+    return limits
+
+
+# =============================================
+# docx_blocks
+# =============================================
+
+def test_blocks_in_document_order(report):
+    assert list(docx_blocks(report)) == [
+        ('p', 1, '연구 보고서', 0),
+        ('p', 2, '1. 개요', 1),
+        ('p', 3, '개요 본문 첫 문단', None),
+        ('p', 4, '', None),
+        ('p', 5, '1.1 배경', 2),
+        ('p', 6, '배경 설명', None),
+        ('row', 1, '구분 | 2023 | 2024', None),       # 빈 셀 / 빈 행 제외
+        ('row', 1, '예산 | 120억', None),
+        ('p', 7, '2. 결론', 1),
+        ('p', 8, '결론 본문', None),
+    ]
+
+
+def test_paragraphs_match_python_docx(report):
+    expected = [p.text.strip() for p in Document(report).paragraphs]
+    assert [text for kind, _, text, _ in docx_blocks(report) if kind == 'p'] == expected
+
+
+def test_table_cells_joined_with_pipe(tmp_path):
+    doc = Document()
+    table = _table(doc, [['항목', '내용', '비고'], ['가', '여러\n줄 셀', ''], ['나', '', '끝']])
+    table.cell(1, 0).merge(table.cell(2, 0))                # 세로 병합: 이어지는 셀은 비어 있음
+    table.cell(0, 2).add_table(1, 2).rows[0].cells[0].text = '중첩 표'
+    path = _save(doc, tmp_path)
+    assert list(docx_blocks(path)) == [
+        ('row', 1, '항목 | 내용 | 비고 중첩 표', None),      # 중첩 표는 셀 텍스트로
+        ('row', 1, '가 나 | 여러 줄 셀', None),            # 셀 안 줄바꿈 / 병합된 문단은 공백 하나로
+        ('row', 1, '끝', None),
+    ]
+
+
+# =============================================
+# parse_docx
+# =============================================
+
+def test_chunks_follow_heading_sections(docx_env, report):
+    chunks = list(docx_env(min_chars=0)(report))
+    assert [(c['location_value'], c['location_detail'], c['text']) for c in chunks] == [
+        ('1', '연구 보고서 > 1. 개요 | Paragraphs 1-3', '연구 보고서\n1. 개요\n개요 본문 첫 문단'),
+        ('5', '연구 보고서 > 1. 개요 > 1.1 배경 | Paragraphs 5-6, Table 1',
+         '1.1 배경\n배경 설명\n구분 | 2023 | 2024\n예산 | 120억'),
+        ('9', '연구 보고서 > 2. 결론 | Paragraphs 7-8', '2. 결론\n결론 본문'),
+    ]
+    assert all(c['location_type'] == 'page' for c in chunks)
+
+
+def test_short_sections_merge_until_min_chars(docx_env, report):
+    # 구간이 DOCX_MIN_CHUNK_CHARS보다 짧으면 다음 제목에서 끊지 않음
+    chunks = list(docx_env(min_chars=40)(report))
+    assert [c['location_value'] for c in chunks] == ['1', '9']
+    assert chunks[0]['text'].endswith('1.1 배경\n배경 설명\n구분 | 2023 | 2024\n예산 | 120억')
+    assert chunks[0]['location_detail'] == '연구 보고서 > 1. 개요 | Paragraphs 1-6, Table 1'
+    assert len(list(docx_env(min_chars=1000)(report))) == 1
+
+
+def test_heading_only_chunk_takes_innermost_heading(docx_env, tmp_path):
+    doc = Document()
+    doc.add_heading('1장', 1)
+    doc.add_heading('1.1절', 2)
+    doc.add_paragraph('본문')
+    chunks = list(docx_env(min_chars=0)(_save(doc, tmp_path)))
+    assert [(c['location_detail'], c['text']) for c in chunks] == [('1장 > 1.1절 | Paragraphs 1-3', '1장\n1.1절\n본문')]
+
+
+def test_long_section_splits_at_chunk_chars(docx_env, tmp_path):
+    doc = Document()
+    doc.add_heading('긴 구간', 1)
+    paragraphs = [f'{i}번 문단 ' + '가나다라 ' * 12 for i in range(20)]
+    for text in paragraphs:
+        doc.add_paragraph(text)
+    chunks = list(docx_env(chunk_chars=200)(_save(doc, tmp_path)))
+    assert len(chunks) > 1
+    assert all(len(c['text']) <= 200 for c in chunks)
+    assert all(c['location_detail'].startswith('긴 구간 | Paragraph') for c in chunks)
+    # 문단을 나누지 않고 순서대로 이어짐
+    assert '\n'.join(c['text'] for c in chunks) == '\n'.join(['긴 구간'] + [p.strip() for p in paragraphs])
+
+
+def test_paragraph_longer_than_chunk_chars_is_cut_at_spaces(docx_env, tmp_path):
+    doc = Document()
+    doc.add_paragraph('머리말')
+    doc.add_paragraph(' '.join(f'단어{i:03d}' for i in range(120)))
+    chunks = list(docx_env(chunk_chars=100)(_save(doc, tmp_path)))
+    assert [c['location_value'] for c in chunks[:3]] == ['1', '2.1', '2.2']
+    assert all(len(c['text']) <= 100 for c in chunks)
+    words = ' '.join(c['text'] for c in chunks).split()
+    assert words == ['머리말'] + [f'단어{i:03d}' for i in range(120)]
@@ -0,0 +1,114 @@
+"""embedding: VOCAB == src/api.ts, encode_vectors == textToVector, pack_vector / unpack_vector 복원 오차"""
+
+import os
+import re
+
+import numpy as np
+import pytest
+
+import embedding
+from benchmarks.bench_embedding import text_to_vector
+from conftest import REPO_ROOT
+from embedding import DIM, VOCAB, embed_chunks, encode_vectors, pack_vector, unpack_vector
+
+TEXTS = [
+    '',
+    '디지털 전환 전략 로드맵',
+    '메타데이터 관리와 데이터레이크, 빅데이터 데이터 데이터',      # 포함 관계 단어 (겹치지 않는 횟수)
+    'Metadata DATA data-driven AI-based RAG pipelines for LLM agents',
+    'aiaiai maintain certain',                                      # 'ai'가 단어 안에 겹쳐 나옴
+    'x' * 500 + ' KPI ' * 40 + '표준 품질',
+    '관계없는 문장입니다',
+]
+
+
+def server_vocab():
+    """src/api.ts의 VOCAB 배열 (주석 제외)"""
+    with open(os.path.join(REPO_ROOT, 'src', 'api.ts'), encoding='utf-8') as f:
+        source = f.read()
+    body = re.search(r'const VOCAB: string\[\] = \[(.*?)\];', source, re.S).group(1)
+    return re.findall(r"'([^']*)'", re.sub(r'//[^\n]*', '', body))
+
+
+def test_vocab_matches_api_ts():
+    assert server_vocab() == VOCAB
+    assert DIM == len(VOCAB)
+
+
+# =============================================
+# encode_vectors
+# =============================================
+
+@pytest.mark.parametrize('batch', [1, 3, len(TEXTS)])
+def test_encode_vectors_matches_text_to_vector(batch):
+    vectors = np.vstack([encode_vectors(TEXTS[i:i + batch]) for i in range(0, len(TEXTS), batch)])
+    assert vectors.shape == (len(TEXTS), DIM)
+    assert np.array_equal(vectors, np.array([text_to_vector(t) for t in TEXTS]))
+
+
+def test_encode_vectors_values():
+    vectors = encode_vectors(TEXTS)
+    assert not vectors[0].any() and not vectors[-1].any()
+    norms = np.linalg.norm(vectors[1:-1], axis=1)
+    assert np.allclose(norms, 1, atol=1e-3)
+    # 4자리 반올림
+    assert np.array_equal(vectors, np.round(vectors, 4))
+    col = VOCAB.index('데이터')
+    assert vectors[2, col] > vectors[2, VOCAB.index('메타데이터')]       # 데이터 5회 vs 메타데이터 1회
+
+
+def test_encode_vectors_empty_batch():
+    assert encode_vectors([]).shape == (0, DIM)
+
+
+# =============================================
+# pack_vector / unpack_vector
+# =============================================
+
+def _vectors():
+    rng = np.random.default_rng(3)
+    dense = rng.random((20, DIM))
+    sparse = dense * (rng.random((20, DIM)) < 0.05)
+    out = np.vstack([encode_vectors(TEXTS), dense, sparse])
+    norms = np.linalg.norm(out, axis=1, keepdims=True)
+    return np.divide(out, norms, out=np.zeros_like(out), where=norms > 0)
+
+
+@pytest.mark.parametrize('fmt, max_error', [('f16', 2 ** -11), ('i8', 0.5 / 127 + 1e-9)])
+def test_round_trip_error(fmt, max_error):
+    prefixes = set()
+    for vector in _vectors():
+        encoded = pack_vector(vector, fmt)
+        prefixes.add(encoded.split(':', 1)[0])
+        decoded = unpack_vector(encoded)
+        assert decoded.shape == (DIM,)
+        assert np.abs(decoded - vector).max() <= max_error
+        assert (decoded >= 0).all()
+    assert prefixes == {fmt, fmt + 's'}             # 밀집 / 희소 둘 다 나옴
+
+
+@pytest.mark.parametrize('fmt', ['f16', 'i8'])
+def test_shorter_format_is_chosen(fmt):
+    sparse = np.zeros(DIM)
+    sparse[[0, 7, DIM - 1]] = [0.6, 0.6, 0.52915]
+    dense = np.full(DIM, 1 / np.sqrt(DIM))
+    assert pack_vector(sparse, fmt).startswith(fmt + 's:')
+    assert pack_vector(dense, fmt).startswith(fmt + ':')
+    assert len(pack_vector(sparse, fmt)) < len(pack_vector(dense, fmt))
+    assert not unpack_vector(pack_vector(np.zeros(DIM), fmt)).any()
+
+
+def test_unknown_format():
+    with pytest.raises(ValueError):
+        pack_vector(np.zeros(DIM), 'f32')
+
+
+def test_embed_chunks():
+    chunks = [{'doc_title': '전략 보고서', 'category': '전략', 'tags': ['AI', '로드맵'],
+               'project_path': 'P01', 'text': '데이터 거버넌스'}, {'text': ''}]
+    assert embed_chunks(chunks, 'i8') is chunks
+    assert [c['embed_model'] for c in chunks] == [embedding.EMBED_MODEL] * 2
+    expected = text_to_vector(embedding.embedding_text(chunks[0]))
+    assert np.abs(unpack_vector(chunks[0]['embedding']) - expected).max() <= 0.5 / 127 + 1e-9
+    assert not unpack_vector(chunks[1]['embedding']).any()
+    assert embed_chunks([]) == []
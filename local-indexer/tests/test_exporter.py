@@ -0,0 +1,235 @@
+"""--export 샤드: 문 길이 분할, SQL 값 인용, 재개 시 load_order / 상태 기록 시점"""
+
+import glob
+import gzip
+import json
+import os
+import sqlite3
+
+import pytest
+
+from conftest import REPO_ROOT
+from exporter import BEGIN_SQL, COLUMNS, FINISH_SQL, MANIFEST, ShardExporter, chunk_row
+from state import StateStore
+
+
+def _chunk(i, text=None, **fields):
+    return {'chunk_id': f'doc-{i:04d}', 'file_path': f'P01/문서{i % 3}.pptx', 'file_type': 'pptx',
+            'location_type': 'slide', 'location_value': str(i), 'text': text or f'{i}번 슬라이드 본문 ' * 20,
+            'tags': ['전략', f'태그{i}'], 'importance': 50 + i % 7, **fields}
+
+
+def _d1(tmp_path):
+    """migrations/ 스키마를 적용한 D1 대역 (sqlite3)"""
+    db = sqlite3.connect(str(tmp_path / 'd1.db'))
+    for path in sorted(glob.glob(os.path.join(REPO_ROOT, 'migrations', '*.sql'))):
+        with open(path, encoding='utf-8') as f:
+            db.executescript(f.read())
+    return db
+
+
+def _statements(path):
+    """샤드의 SQL 문 목록 (세미콜론이 든 문자열 값은 가르지 않음)"""
+    statements, current = [], ''
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            current += line
+            if sqlite3.complete_statement(current):
+                statements.append(current)
+                current = ''
+    assert current == ''
+    return statements
+
+
+def _load(db, out_dir, order=None):
+    """manifest.json의 load_order대로 적재"""
+    if order is None:
+        with open(os.path.join(out_dir, MANIFEST), encoding='utf-8') as f:
+            order = json.load(f)['load_order']
+    for name in order:
+        with open(os.path.join(out_dir, name), encoding='utf-8', newline='') as f:
+            db.executescript(f.read())
+    db.commit()
+
+
+def _rows(db):
+    cols = ', '.join(COLUMNS)
+    return {row[0]: row for row in db.execute(f'SELECT {cols} FROM chunks')}
+
+
+def _manifest(out_dir):
+    with open(os.path.join(out_dir, MANIFEST), encoding='utf-8') as f:
+        return json.load(f)
+
+
+# =============================================
+# 문 길이 / 값 인용
+# =============================================
+
+@pytest.mark.parametrize('statement_bytes', [1_500, 4_000, 90_000])
+def test_statements_split_at_statement_bytes(tmp_path, statement_bytes):
+    out = str(tmp_path / 'export')
+    exporter = ShardExporter(out, compress=False, statement_bytes=statement_bytes)
+    chunks = [_chunk(i) for i in range(60)]
+    results = []
+    exporter.submit(chunks[:25], results.append)
+    exporter.submit(chunks[25:], results.append)
+    assert results == []                    # 샤드를 닫기 전에는 done을 부르지 않음
+    exporter.close()
+    assert [r['inserted'] for r in results] == [25, 35]
+
+    inserts = [s for s in _statements(os.path.join(out, '00001.sql')) if s.startswith('INSERT')]
+    assert all(len(s.encode('utf-8')) <= statement_bytes for s in inserts)
+    assert len(inserts) == 2 if statement_bytes == 90_000 else len(inserts) > 2    # 배치마다 최소 한 문
+
+    db = _d1(tmp_path)
+    _load(db, out)
+    assert _rows(db) == {c['chunk_id']: chunk_row(c) for c in chunks}
+    # finish에서 FTS 색인 재구성 + 트리거 복구
+    assert db.execute("SELECT COUNT(*) FROM chunks_fts WHERE chunks_fts MATCH '본문'").fetchone()[0] == 60
+    assert {r[0] for r in db.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'")} == \
+        {'chunks_ai', 'chunks_ad', 'chunks_au'}
+
+
+def test_sql_quoting_round_trips(tmp_path):
+    texts = ["작은따옴표 ' 와 ''두 개''", "'); DROP TABLE chunks; --", 'NUL\x00 제거', '줄\n바꿈\r\n과 \t탭',
+             '이모지 🙂 와 한글 ㄱㄴㄷ', '\\ 역슬래시 \\n', '"큰따옴표"; 세미콜론;']
+    chunks = [_chunk(i, text, author="O'Brien", doc_title='연구 "최종"', mtime='2024-01-02T03:04:05')
+              for i, text in enumerate(texts)]
+    chunks.append(_chunk(99, importance=0, tags=[]) | {'duplicate_of': 'doc-0000'})
+    out = str(tmp_path / 'export')
+    exporter = ShardExporter(out, compress=True)
+    exporter.submit(chunks, lambda stats: None)
+    exporter.delete_chunks(chunk_ids=["no'such"])
+    exporter.close()
+
+    for name in os.listdir(out):
+        if name.endswith('.gz'):
+            with gzip.open(os.path.join(out, name)) as src, open(os.path.join(out, name[:-3]), 'wb') as dst:
+                dst.write(src.read())
+    db = _d1(tmp_path)
+    _load(db, out, [n.removesuffix('.gz') for n in _manifest(out)['load_order']])
+
+    rows = _rows(db)
+    assert [rows[c['chunk_id']][8] for c in chunks[:-1]] == [t.replace('\x00', '') for t in texts]
+    assert rows == {c['chunk_id']: tuple(v.replace('\x00', '') if isinstance(v, str) else v for v in chunk_row(c))
+                    for c in chunks}
+    assert rows['doc-0099'][COLUMNS.index('duplicate_of')] == 'doc-0000'
+    assert rows['doc-0099'][COLUMNS.index('importance')] == 50     # 0 -> 기본값 (api.ts와 같음)
+
+
+# =============================================
+# 재개
+# =============================================
+
+def test_resume_loads_only_new_shards(tmp_path):
+    out = str(tmp_path / 'export')
+    first = ShardExporter(out, compress=False)
+    first.submit([_chunk(i) for i in range(10)], lambda stats: None)
+    first.close()
+
+    # 강제 종료된 실행: 샤드를 닫지 못해 .tmp만 남고 done도 불리지 않음
+    crashed = ShardExporter(out, compress=False)
+    done = []
+    crashed.submit([_chunk(i) for i in range(10, 20)], done.append)
+    crashed._file['out'].flush()
+    assert done == [] and os.path.exists(os.path.join(out, '00002.sql.tmp'))
+
+    resumed = ShardExporter(out, compress=False)
+    assert not glob.glob(os.path.join(out, '*.tmp'))
+    resumed.submit([_chunk(i) for i in range(10, 30)], lambda stats: None)
+    resumed.close()
+
+    manifest = _manifest(out)
+    assert [s['name'] for s in manifest['shards']] == ['00001.sql', '00002.sql']
+    assert manifest['load_order'] == [BEGIN_SQL, '00002.sql', FINISH_SQL]
+    assert [run['load_order'] for run in manifest['runs']] == [[BEGIN_SQL, '00001.sql', FINISH_SQL],
+                                                               [BEGIN_SQL, '00002.sql', FINISH_SQL]]
+    assert manifest['rows'] == 30
+
+    # 첫 실행분을 적재한 뒤 이번 실행분만 적재: begin / finish를 다시 실행해도 결과가 같음
+    db = _d1(tmp_path)
+    _load(db, out, manifest['runs'][0]['load_order'])
+    _load(db, out)
+    assert len(_rows(db)) == 30
+    assert db.execute("SELECT COUNT(*) FROM chunks_fts WHERE chunks_fts MATCH '본문'").fetchone()[0] == 30
+    db.execute("INSERT INTO chunks_fts(chunks_fts) VALUES('integrity-check')")
+
+
+def test_resume_without_new_rows_has_empty_load_order(tmp_path):
+    out = str(tmp_path / 'export')
+    first = ShardExporter(out, compress=False)
+    first.submit([_chunk(1)], lambda stats: None)
+    first.close()
+    again = ShardExporter(out, compress=False)
+    again.close()
+    manifest = _manifest(out)
+    assert manifest['load_order'] == []                  # 이미 적재한 첫 실행분을 다시 안내하지 않음
+    assert [run['load_order'] for run in manifest['runs']] == [[BEGIN_SQL, '00001.sql', FINISH_SQL]]
+
+
+def test_after_close_runs_once_shard_is_closed(tmp_path):
+    exporter = ShardExporter(str(tmp_path / 'export'), compress=False)
+    calls = []
+    exporter.after_close(lambda: calls.append('idle'))          # 열린 샤드가 없으면 바로
+    exporter.delete_chunks(chunk_ids=['a'])
+    exporter.after_close(lambda: calls.append('deleted'))
+    assert calls == ['idle']
+    exporter.close()
+    assert calls == ['idle', 'deleted']
+
+
+# =============================================
+# 상태 기록 시점 (indexer --export)
+# =============================================
+
+def _csv(path, rows):
+    path.write_text('과제,담당\n' + ''.join(f'디지털 전환 과제 {i},담당자{i}\n' for i in range(rows)), encoding='utf-8')
+
+
+def test_interrupted_export_keeps_stale_file_for_next_run(indexer_env, tmp_path, monkeypatch):
+    indexer = indexer_env
+    monkeypatch.setattr(indexer, 'DEDUP', False)
+    monkeypatch.setattr(indexer, 'DOC_FREQ', None)
+    monkeypatch.setattr(indexer, 'ROW_CHUNK_ROWS', 1)
+    root = tmp_path / 'drive'
+    (root / 'P01').mkdir(parents=True)
+    csv = root / 'P01' / '과제.csv'
+    _csv(csv, 12)
+    indexer.DRIVE_ROOT = str(root)
+    out = str(tmp_path / 'export')
+    store = StateStore(str(tmp_path / 'indexer_state.db'))
+
+    def export_run(crash=False):
+        exporter = ShardExporter(out, compress=False)
+        if crash:
+            def killed():
+                raise KeyboardInterrupt
+            exporter.join = killed                      # 마지막 샤드를 닫기 전에 강제 종료
+        indexer.set_exporter(exporter)
+        to_index, _, _ = indexer.plan_changes(store, indexer.scan_files(str(root)))
+        indexer.index_files_serial(store, to_index, indexer.new_run_stats())
+        exporter.close()
+        return to_index
+
+    try:
+        export_run()
+        first, chunk_ids = store.files[str(csv)], set(store.get_manifest(str(csv)))
+
+        # 행이 줄어 이전 청크 일부를 지워야 함: 삭제 문이 든 샤드를 닫기 전에 중단
+        _csv(csv, 5)
+        with pytest.raises(KeyboardInterrupt):
+            export_run(crash=True)
+        assert store.files[str(csv)] == first            # indexed_files는 그대로 -> 다음 실행에서 다시 내보냄
+        assert set(store.get_manifest(str(csv))) == chunk_ids
+
+        assert [entry.path for entry in export_run()] == [str(csv)]
+        assert store.files[str(csv)].hash != first.hash
+        chunk_ids = set(store.get_manifest(str(csv)))
+    finally:
+        store.close()
+
+    db = _d1(tmp_path)
+    for run in _manifest(out)['runs']:
+        _load(db, out, run['load_order'])
+    assert set(_rows(db)) == chunk_ids                   # 첫 실행의 나머지 청크는 삭제됨
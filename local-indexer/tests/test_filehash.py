@@ -0,0 +1,161 @@
+"""filehash: mmap 경계(MMAP_MIN_SIZE) 위 / 아래, readinto 대체 경로가 같은 해시인지,
+구 해시(v3.0) 기록의 재해시 / 이동 감지 (plan_changes)"""
+
+import hashlib
+import mmap
+import os
+
+import pytest
+
+import filehash
+from benchmarks.stub_server import StubServer
+from filehash import BLOCK_SIZE, MMAP_MIN_SIZE, file_hash, is_legacy_hash, legacy_file_hash
+from state import StateStore
+
+SIZES = [0, 1, MMAP_MIN_SIZE - 1, MMAP_MIN_SIZE, MMAP_MIN_SIZE + 1, 3 * BLOCK_SIZE + 7]
+
+
+def _write(path, size):
+    data = os.urandom(size)
+    path.write_bytes(data)
+    return str(path), hashlib.blake2b(data, digest_size=filehash.HASH_DIGEST_SIZE).hexdigest()
+
+
+@pytest.mark.parametrize('size', SIZES)
+def test_hash_is_blake2b_of_whole_file(tmp_path, monkeypatch, size):
+    path, expected = _write(tmp_path / 'f.bin', size)
+    mapped = []
+    real_mmap = mmap.mmap
+
+    def spy(*args, **kwargs):
+        mapped.append(args)
+        return real_mmap(*args, **kwargs)
+
+    monkeypatch.setattr(mmap, 'mmap', spy)
+    assert file_hash(path) == expected
+    assert file_hash(path, size=size) == expected
+    assert bool(mapped) == (size >= MMAP_MIN_SIZE)      # 경계 이상만 mmap, 아래는 readinto
+
+
+@pytest.mark.parametrize('size', [MMAP_MIN_SIZE, 3 * BLOCK_SIZE + 7])
+def test_mmap_failure_falls_back_to_readinto(tmp_path, monkeypatch, size):
+    path, expected = _write(tmp_path / 'f.bin', size)
+
+    def no_mmap(*args, **kwargs):
+        raise OSError('mmap not supported')
+
+    monkeypatch.setattr(mmap, 'mmap', no_mmap)
+    assert file_hash(path) == expected
+
+
+def test_legacy_hash_is_recognised(tmp_path):
+    path, _ = _write(tmp_path / 'f.bin', 200_000)
+    assert is_legacy_hash(legacy_file_hash(path))
+    assert not is_legacy_hash(file_hash(path))
+    assert not is_legacy_hash('')
+    assert not is_legacy_hash(None)
+
+
+# =============================================
+# 구 해시 기록
+# =============================================
+
+@pytest.fixture
+def drive(tmp_path):
+    root = tmp_path / 'drive'
+    (root / 'P01').mkdir(parents=True)
+    for name, rows in (('a.csv', 40), ('b.csv', 60)):
+        lines = ['항목,값,비고'] + [f'항목{i},{i * 7},비고 {name} {i}' for i in range(rows)]
+        (root / 'P01' / name).write_text('\n'.join(lines) + '\n', encoding='utf-8')
+    return str(root)
+
+
+@pytest.fixture
+def hashed(indexer_env, monkeypatch):
+    """이번 실행에서 file_hash()로 전체 해시를 계산한 경로 목록"""
+    paths = []
+
+    def counting_hash(filepath, size=None):
+        paths.append(filepath)
+        return file_hash(filepath, size=size)
+
+    monkeypatch.setattr(indexer_env, 'file_hash', counting_hash)
+    return paths
+
+
+def _sync(indexer, store, root):
+    """plan_changes + 순차 인덱싱. 인덱싱한 경로 목록"""
+    to_index, renames, gone = indexer.plan_changes(store, indexer.scan_files(root))
+    assert not renames and not gone
+    indexer.index_files_serial(store, to_index, indexer.new_run_stats())
+    store.flush()
+    return sorted(entry.path for entry in to_index)
+
+
+def _bump_mtime(paths):
+    for path in paths:
+        st = os.stat(path)
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 2_000_000_000))
+
+
+def test_legacy_hash_rows_are_rehashed_once(indexer_env, hashed, drive, tmp_path):
+    indexer = indexer_env
+    indexer.DRIVE_ROOT = drive
+    db = str(tmp_path / 'indexer_state.db')
+    with StubServer() as server:
+        indexer.WIKI_API_URL = server.url
+        store = StateStore(db)
+        paths = _sync(indexer, store, drive)
+        assert len(paths) == 2
+
+        # v3.0 시절 기록처럼 구 해시로 바꾸고, 동기화로 mtime만 바뀐 상황
+        with store.conn:
+            store.conn.executemany('UPDATE indexed_files SET hash = ? WHERE file_path = ?',
+                                   [(legacy_file_hash(p), p) for p in paths])
+        store.close()
+        _bump_mtime(paths)
+        store = StateStore(db)
+        assert all(is_legacy_hash(store.files[p].hash) for p in paths)
+
+        # 구 해시로는 내용이 같은지 확인할 수 없으므로 다시 인덱싱하며 전체 해시를 한 번 계산해 기록
+        hashed.clear()
+        assert _sync(indexer, store, drive) == paths
+        assert sorted(hashed) == paths
+        assert all(store.files[p].hash == file_hash(p) for p in paths)
+        uploaded = dict(server.chunks)
+
+        # 이후에는 stat이 바뀌어도 전체 해시로 내용이 같음을 확인하고 다시 인덱싱하지 않음
+        _bump_mtime(paths)
+        hashed.clear()
+        assert _sync(indexer, store, drive) == []
+        assert sorted(hashed) == paths
+
+        # stat까지 같으면 해시도 계산하지 않음
+        hashed.clear()
+        assert _sync(indexer, store, drive) == []
+        assert hashed == []
+        store.close()
+        assert server.chunks == uploaded
+
+
+def test_moved_file_matches_legacy_hash(indexer_env, drive, tmp_path):
+    indexer = indexer_env
+    indexer.DRIVE_ROOT = drive
+    old_path = os.path.join(drive, 'P01', 'a.csv')
+    store = StateStore(str(tmp_path / 'indexer_state.db'))
+    try:
+        # 기록은 구 해시뿐인데 파일이 다른 폴더로 이동
+        entry = next(e for e in indexer.scan_files(drive) if e.path == old_path)
+        store.mark_indexed(entry, legacy_file_hash(old_path), 1, manifest={}, doc_id='0123456789abcdef')
+        store.flush()
+        os.makedirs(os.path.join(drive, 'P02'))
+        new_path = os.path.join(drive, 'P02', 'a.csv')
+        os.rename(old_path, new_path)
+
+        to_index, renames, gone = indexer.plan_changes(store, indexer.scan_files(drive))
+        assert [(old, entry.path) for old, entry in renames] == [(old_path, new_path)]
+        assert renames[0][1].content_hash == file_hash(new_path)
+        assert gone == []
+        assert [entry.path for entry in to_index] == [os.path.join(drive, 'P01', 'b.csv')]
+    finally:
+        store.close()
@@ -0,0 +1,89 @@
+"""ooxml.pptx_slides: 슬라이드 XML 스트리밍 결과가 python-pptx 경로(_pptx_slides_object_model)와 같은지"""
+
+import random
+
+import pytest
+from pptx import Presentation
+from pptx.util import Inches
+
+from benchmarks.fixtures import TextGenerator, write_pptx
+from ooxml import pptx_slides
+
+
+def _text_box(shapes, text, top=0):
+    box = shapes.add_textbox(Inches(0.5), Inches(top), Inches(4), Inches(1))
+    box.text_frame.text = text
+    return box
+
+
+@pytest.fixture
+def deck(tmp_path):
+    """그룹 도형 / 표 / 노트 / 빈 슬라이드 / sldIdLst 순서가 파트 이름과 다른 발표자료"""
+    prs = Presentation()
+
+    first = prs.slides.add_slide(prs.slide_layouts[1])
+    first.shapes.title.text = '  추진 전략  '
+    body = first.placeholders[1].text_frame
+    body.text = '첫 문단'
+    body.add_paragraph().text = '   '                           # 공백 문단은 빠짐
+    body.add_paragraph().text = '줄바꿈\v이 있는 문단'           # a:br -> '\v'
+    first.notes_slide.notes_text_frame.text = '발표자 노트 (두 경로 모두 읽지 않음)'
+
+    second = prs.slides.add_slide(prs.slide_layouts[6])
+    group = second.shapes.add_group_shape()
+    _text_box(group.shapes, '그룹 안 텍스트 상자')
+    _text_box(second.shapes, '그룹 밖 텍스트 상자', top=2)
+    table = second.shapes.add_table(3, 3, Inches(0.5), Inches(3), Inches(8), Inches(2)).table
+    cells = [['구분', '2023', '2024'], ['예산', '', '120억'], ['', '', '']]
+    for row, values in zip(table.rows, cells):
+        for cell, value in zip(row.cells, values):
+            cell.text = value
+    table.cell(1, 0).text_frame.add_paragraph().text = '(단위: 원)'   # 셀 안 여러 문단
+
+    prs.slides.add_slide(prs.slide_layouts[6])                       # 텍스트 없는 슬라이드
+
+    last = prs.slides.add_slide(prs.slide_layouts[5])
+    last.shapes.title.text = '원래 마지막 슬라이드'
+
+    # 발표 순서를 바꿈: 마지막 슬라이드(slide4.xml)를 맨 앞으로
+    slide_ids = prs.slides._sldIdLst
+    moved = list(slide_ids)[-1]
+    slide_ids.remove(moved)
+    slide_ids.insert(0, moved)
+
+    path = tmp_path / 'deck.pptx'
+    prs.save(str(path))
+    return str(path)
+
+
+def test_matches_python_pptx(indexer_env, deck):
+    assert list(pptx_slides(deck)) == list(indexer_env._pptx_slides_object_model(deck))
+
+
+def test_slide_texts(deck):
+    assert list(pptx_slides(deck)) == [
+        (1, ['원래 마지막 슬라이드']),
+        (2, ['추진 전략', '첫 문단', '줄바꿈\v이 있는 문단']),
+        (3, ['그룹 밖 텍스트 상자', '구분 | 2023 | 2024', '예산\n(단위: 원) | 120억']),
+        (4, []),
+    ]
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_matches_python_pptx_on_fixture_decks(indexer_env, tmp_path, seed):
+    rng = random.Random(seed)
+    path = str(tmp_path / f'fixture-{seed}.pptx')
+    write_pptx(path, TextGenerator(rng), rng)
+    assert list(pptx_slides(path)) == list(indexer_env._pptx_slides_object_model(path))
+
+
+def test_parse_pptx_falls_back_after_partial_read(indexer_env, deck, monkeypatch):
+    # 두 번째 슬라이드에서 구조 오류: 이미 낸 슬라이드는 그대로, 나머지는 python-pptx로
+    def broken(path):
+        slides = pptx_slides(path)
+        yield next(slides)
+        raise KeyError('ppt/slides/slide1.xml')
+    expected = list(indexer_env.parse_pptx(deck))
+    monkeypatch.setattr(indexer_env, 'pptx_slides', broken)
+    assert list(indexer_env.parse_pptx(deck)) == expected
+    assert [c['location_value'] for c in expected] == ['1', '2', '3']
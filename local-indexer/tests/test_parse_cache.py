@@ -0,0 +1,237 @@
+"""파싱 캐시: 내용 해시 적중 / 미적중, 파서 설정 변경 시 무효화, LRU 삭제, 동시 쓰기"""
+
+import gzip
+import multiprocessing
+import os
+import shutil
+import time
+
+import pytest
+
+from parse_cache import INCOMPLETE, SUFFIX, ParseCache, new_cache_stats
+
+CHUNKS = [{'location_type': 'row', 'location_value': str(i), 'text': f'{i}번 행 디지털 전환 과제'} for i in range(50)]
+
+
+class Parser:
+    """호출 횟수를 세는 파서"""
+
+    def __init__(self, chunks=CHUNKS):
+        self.chunks = chunks
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        yield from (dict(c) for c in self.chunks)
+
+
+def _entries(root):
+    return sorted(os.path.relpath(os.path.join(d, f), root) for d, _, files in os.walk(root) for f in files)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ParseCache(str(tmp_path / 'parse_cache'), 1 << 30)
+
+
+# =============================================
+# 적중 / 미적중
+# =============================================
+
+def test_hit_by_content_hash(cache):
+    parser, stats = Parser(), new_cache_stats()
+    key = cache.key('a' * 32, [3, '.csv'])
+    assert list(cache.parse(key, parser, stats)) == CHUNKS
+    assert list(cache.parse(key, parser, stats)) == CHUNKS
+    assert parser.calls == 1
+    assert (stats['hits'], stats['misses']) == (1, 1)
+    assert stats['bytes_written'] > 0 and stats['bytes_read'] == stats['bytes_written']
+    assert _entries(cache.root) == [os.path.join(key[:2], key + SUFFIX)]
+
+    assert list(cache.parse(cache.key('b' * 32, [3, '.csv']), parser, stats)) == CHUNKS
+    assert parser.calls == 2
+
+
+def test_settings_change_key(cache):
+    keys = {cache.key('a' * 32, settings) for settings in ([3, '.csv'], [4, '.csv'], [3, '.csv', 1, 4000, True])}
+    assert len(keys) == 3
+    assert cache.key('a' * 32, {'b': 1, 'a': 2}) == cache.key('a' * 32, {'a': 2, 'b': 1})
+
+
+@pytest.fixture
+def file_cache(indexer_env, monkeypatch, tmp_path):
+    indexer = indexer_env
+    monkeypatch.setattr(indexer, 'PARSE_CACHE_PATH', str(tmp_path / 'parse_cache'))
+    calls = []
+    parse_csv = indexer.PARSERS['.csv']
+
+    def counting(path):
+        calls.append(path)
+        return parse_csv(path)
+    monkeypatch.setitem(indexer.PARSERS, '.csv', counting)
+
+    def parse(path):
+        st = os.stat(path)
+        entry = indexer.FileEntry(str(path), os.path.basename(path), st.st_size, st.st_mtime, st.st_mtime_ns, st.st_ino)
+        stats = new_cache_stats()
+        return list(indexer.parse_file(entry, stats)), stats['hits']
+
+    return indexer, parse, calls
+
+
+def test_parse_file_hits_for_same_content_at_another_path(file_cache, tmp_path):
+    indexer, parse, calls = file_cache
+    original = tmp_path / '과제목록.csv'
+    original.write_text('과제,담당\n' + ''.join(f'과제 {i},김{i}\n' for i in range(30)), encoding='utf-8')
+    chunks, hit = parse(original)
+    assert not hit and chunks
+
+    copy = tmp_path / 'v2_최종' / '과제목록 (1).csv'
+    copy.parent.mkdir()
+    shutil.copy(original, copy)
+    assert parse(copy) == (chunks, 1)
+    assert calls == [str(original)]
+
+    copy.write_text(copy.read_text(encoding='utf-8') + '과제 30,김30\n', encoding='utf-8')
+    assert parse(copy)[1] == 0
+    assert calls == [str(original), str(copy)]
+
+
+def test_parser_settings_invalidate(file_cache, tmp_path, monkeypatch):
+    indexer, parse, calls = file_cache
+    path = tmp_path / 'data.csv'
+    path.write_text('a,b\n' + ''.join(f'{i},{i * 2}\n' for i in range(40)), encoding='utf-8')
+    parse(path)
+    assert parse(path)[1] == 1
+
+    monkeypatch.setattr(indexer, 'PARSER_VERSION', indexer.PARSER_VERSION + 1)
+    assert parse(path)[1] == 0
+    assert parse(path)[1] == 1
+
+    monkeypatch.setattr(indexer, 'ROW_CHUNK_ROWS', indexer.ROW_CHUNK_ROWS + 1)     # 행 묶음 설정도 키에 포함
+    assert parse(path)[1] == 0
+    assert len(calls) == 3
+
+
+# =============================================
+# 저장하지 않는 결과 / 깨진 항목
+# =============================================
+
+def test_incomplete_output_is_not_stored(cache):
+    parser = Parser(CHUNKS[:3] + [{INCOMPLETE: True}] + CHUNKS[3:5])
+    key = cache.key('c' * 32, [])
+    assert list(cache.parse(key, parser, new_cache_stats())) == CHUNKS[:5]
+    assert _entries(cache.root) == []
+
+
+@pytest.mark.parametrize('stop', ['error', 'close'])
+def test_interrupted_parse_leaves_nothing(cache, stop):
+    def parser():
+        yield from CHUNKS[:10]
+        raise RuntimeError('parser crashed')
+    key = cache.key('d' * 32, [])
+    chunks = cache.parse(key, parser if stop == 'error' else Parser(), new_cache_stats())
+    if stop == 'error':
+        with pytest.raises(RuntimeError):
+            list(chunks)
+    else:
+        next(chunks)
+        chunks.close()                          # 소비 측 중단
+    assert _entries(cache.root) == []
+
+
+def test_truncated_entry_falls_back_to_parser(cache):
+    key = cache.key('e' * 32, [])
+    list(cache.parse(key, Parser(), new_cache_stats()))
+    path = cache._path(key)
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        lines = f.readlines()
+    with gzip.open(path, 'wt', encoding='utf-8') as f:
+        f.writelines(lines[:20])                # 완결 표시 없음
+
+    parser, stats = Parser(), new_cache_stats()
+    assert list(cache.parse(key, parser, stats)) == CHUNKS      # 앞 20개는 캐시, 나머지는 파서
+    assert parser.calls == 1 and (stats['hits'], stats['misses']) == (0, 1)
+    assert not os.path.exists(path)
+
+
+# =============================================
+# LRU
+# =============================================
+
+def test_lru_eviction(tmp_path):
+    cache = ParseCache(str(tmp_path / 'parse_cache'), 1 << 30)
+    now = time.time()
+    keys = [cache.key(f'{i:x}' * 32, []) for i in range(5)]
+    for age, key in zip((50, 40, 30, 20, 10), keys):           # keys[0]이 가장 오래됨
+        list(cache.parse(key, Parser(), new_cache_stats()))
+        os.utime(cache._path(key), (now - age, now - age))
+    sizes = [os.path.getsize(cache._path(k)) for k in keys]
+
+    # 적중하면 가장 최근에 쓴 항목이 됨
+    list(cache.parse(keys[0], Parser(), new_cache_stats()))
+    old_tmp = os.path.join(cache.root, keys[1][:2], 'stale.tmp')
+    new_tmp = os.path.join(cache.root, keys[1][:2], 'writing.tmp')
+    for path, age in ((old_tmp, 2 * 86400), (new_tmp, 60)):
+        with open(path, 'wb') as f:
+            f.write(b'x')
+        os.utime(path, (now - age, now - age))
+
+    cache.max_bytes = sum(sizes) - sizes[1] - 1                  # 두 항목을 지워야 상한 아래
+    total, removed = cache.evict()
+    assert removed == 2
+    assert [os.path.exists(cache._path(k)) for k in keys] == [True, False, False, True, True]
+    assert total == sizes[0] + sizes[3] + sizes[4] <= cache.max_bytes
+    assert not os.path.exists(old_tmp) and os.path.exists(new_tmp)
+    assert cache.evict() == (total, 0)
+
+
+def test_evict_missing_root(tmp_path):
+    assert ParseCache(str(tmp_path / 'none'), 0).evict() == (0, 0)
+
+
+# =============================================
+# 동시 쓰기
+# =============================================
+
+def test_interleaved_writers_in_one_process(cache):
+    key = cache.key('f' * 32, [])
+    first, second = cache.parse(key, Parser(), new_cache_stats()), cache.parse(key, Parser(), new_cache_stats())
+    out = [[next(first)], [next(second)]]
+    for a, b in zip(first, second):
+        out[0].append(a)
+        out[1].append(b)
+        assert not os.path.exists(cache._path(key))     # 끝나기 전에는 읽는 쪽에 보이지 않음
+    out[1] += second                                    # zip이 멈춘 쪽도 끝까지 (완결 표시 + 교체)
+    assert out == [CHUNKS, CHUNKS]
+    assert list(cache.parse(key, Parser(), new_cache_stats())) == CHUNKS
+    assert _entries(cache.root) == [os.path.join(key[:2], key + SUFFIX)]
+
+
+def _worker(root, key, barrier, results):
+    cache = ParseCache(root, 1 << 30)
+    barrier.wait()
+    stats = new_cache_stats()
+    chunks = list(cache.parse(key, Parser(CHUNKS * 40), stats))
+    results.put((len(chunks), stats['hits'], stats['misses']))
+
+
+def test_concurrent_workers(cache):
+    # --workers 파싱 프로세스 / 여러 PC가 같은 항목을 동시에 씀: 읽는 쪽에는 완결된 항목만
+    ctx = multiprocessing.get_context('fork' if 'fork' in multiprocessing.get_all_start_methods() else 'spawn')
+    key = cache.key('0' * 32, [])
+    barrier, results = ctx.Barrier(6), ctx.Queue()
+    workers = [ctx.Process(target=_worker, args=(cache.root, key, barrier, results)) for _ in range(6)]
+    for p in workers:
+        p.start()
+    outcomes = [results.get(timeout=60) for _ in workers]
+    for p in workers:
+        p.join(timeout=60)
+        assert p.exitcode == 0
+
+    assert all(count == len(CHUNKS) * 40 for count, _, _ in outcomes)
+    assert sum(hits + misses for _, hits, misses in outcomes) == len(workers)
+    assert _entries(cache.root) == [os.path.join(key[:2], key + SUFFIX)]       # 임시 파일이 남지 않음
+    parser, stats = Parser(), new_cache_stats()
+    assert list(cache.parse(key, parser, stats)) == CHUNKS * 40
+    assert parser.calls == 0 and stats['hits'] == 1
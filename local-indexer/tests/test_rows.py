@@ -0,0 +1,168 @@
+"""XLSX / CSV 행 묶음: group_rows의 ROW_CHUNK_ROWS / ROW_CHUNK_MAX_CHARS 분할, 헤더 반복, ROW_CHUNK_ROWS = 1 (행 단위)"""
+
+import csv
+
+import pytest
+from openpyxl import Workbook
+
+HEADER = '과제 | 담당 | 예산'
+
+
+@pytest.fixture
+def rows_env(indexer_env, monkeypatch):
+    def settings(rows=50, max_chars=4000, repeat_header=True):
+        monkeypatch.setattr(indexer_env, 'ROW_CHUNK_ROWS', rows)
+        monkeypatch.setattr(indexer_env, 'ROW_CHUNK_MAX_CHARS', max_chars)
+        monkeypatch.setattr(indexer_env, 'ROW_CHUNK_REPEAT_HEADER', repeat_header)
+        return indexer_env
+    return settings
+
+
+def _table(n):
+    """(행번호, 텍스트): 2행부터 데이터, 5의 배수 행은 빈 행이라 빠짐"""
+    return [(1, HEADER)] + [(i, f'과제{i} | 김{i} | {i * 10}억') for i in range(2, n + 1) if i % 5]
+
+
+# =============================================
+# group_rows
+# =============================================
+
+def test_groups_by_row_count_with_header_repeat(rows_env):
+    rows = _table(12)
+    chunks = list(rows_env(rows=4).group_rows(iter(rows)))
+    assert [(start, end, n) for start, end, _, n, _ in chunks] == [(1, 4, 4), (6, 9, 4), (11, 12, 2)]
+    texts = dict(rows)
+    for start, end, text, n_rows, row_bytes in chunks:
+        body = [texts[i] for i in range(start, end + 1) if i in texts]
+        # 헤더는 두 번째 청크부터 맨 앞에 붙지만 행 수 / 원본 바이트에는 세지 않음
+        assert text.split('\n') == (body if start == 1 else [HEADER] + body)
+        assert (n_rows, row_bytes) == (len(body), sum(len(t.encode('utf-8')) for t in body))
+
+
+def test_header_repeat_off(rows_env):
+    rows = _table(12)
+    chunks = list(rows_env(rows=4, repeat_header=False).group_rows(iter(rows)))
+    assert '\n'.join(text for _, _, text, _, _ in chunks) == '\n'.join(text for _, text in rows)
+
+
+def test_max_chars_splits_before_row_count(rows_env):
+    rows = [(i, f'{i:02d}' + '가' * 8) for i in range(1, 11)]          # 행마다 10자
+    chunks = list(rows_env(rows=50, max_chars=35).group_rows(iter(rows)))
+    # 첫 청크 3행 (30자), 이후는 반복 헤더 10자 + 2행
+    assert [(start, end) for start, end, *_ in chunks] == [(1, 3), (4, 5), (6, 7), (8, 9), (10, 10)]
+    assert all(len(text.replace('\n', '')) <= 35 for _, _, text, _, _ in chunks)
+    assert [n for *_, n, _ in chunks] == [3, 2, 2, 2, 1]
+
+
+def test_row_longer_than_max_chars_is_kept_whole(rows_env):
+    rows = [(1, 'h'), (2, 'x' * 100), (3, 'y')]
+    chunks = list(rows_env(rows=50, max_chars=20).group_rows(iter(rows)))
+    assert [(start, end, text) for start, end, text, _, _ in chunks] == [(1, 1, 'h'), (2, 2, 'h\n' + 'x' * 100),
+                                                                         (3, 3, 'h\ny')]
+
+
+def test_empty_input(rows_env):
+    assert list(rows_env().group_rows(iter([]))) == []
+
+
+# =============================================
+# parse_csv / parse_xlsx
+# =============================================
+
+def _write_csv(path, n):
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['과제', '담당', '예산'])
+        for i in range(2, n + 1):
+            writer.writerow([f'과제{i}', f'김{i}', f'{i * 10}억'] if i % 5 else ['', ' ', ''])
+    return str(path)
+
+
+def _write_xlsx(path, n):
+    wb = Workbook()
+    for sheet in ('2023', '2024'):
+        ws = wb.create_sheet(sheet)
+        ws.append(['과제', '담당', '예산'])
+        for i in range(2, n + 1):
+            ws.append([f'과제{i}', f'김{i}', i * 10] if i % 5 else [None, '  ', None])
+    wb.remove(wb.worksheets[0])
+    wb.save(path)
+    return str(path)
+
+
+def test_csv_chunk_locations(rows_env, tmp_path):
+    indexer = rows_env(rows=50)
+    chunks = list(indexer.parse_csv(_write_csv(tmp_path / 'data.csv', 120)))
+    # 빈 행(5의 배수)은 행 수에 세지 않고 범위에만 걸침
+    assert [(c['location_value'], c['location_detail'], c['rows']) for c in chunks] == [
+        ('1', 'Rows 1-62', 50), ('63', 'Rows 63-119', 46)]
+    assert all(c['text'].startswith('과제,담당,예산\n') for c in chunks)
+
+
+def test_xlsx_chunk_locations(rows_env, tmp_path):
+    indexer = rows_env(rows=30)
+    chunks = list(indexer.parse_xlsx(_write_xlsx(tmp_path / 'data.xlsx', 60)))
+    assert [(c['location_value'], c['location_detail']) for c in chunks] == [
+        ('2023:1', 'Sheet:2023 Rows:1-37'), ('2023:38', 'Sheet:2023 Rows:38-59'),
+        ('2024:1', 'Sheet:2024 Rows:1-37'), ('2024:38', 'Sheet:2024 Rows:38-59'),
+    ]
+    assert chunks[1]['text'].split('\n')[:2] == ['과제 | 담당 | 예산', '과제38 | 김38 | 380']
+    assert len({c['location_value'] for c in chunks}) == len(chunks)     # chunk_id가 시트 안에서 겹치지 않음
+
+
+# =============================================
+# ROW_CHUNK_ROWS = 1: 기존 행 단위 청크
+# =============================================
+
+def _legacy_csv(path):
+    """행 묶음 이전 parse_csv (utf-8 부분)"""
+    chunks = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for i, row in enumerate(csv.reader(f), 1):
+            cells = [c.strip() for c in row if c.strip()]
+            if cells:
+                chunks.append({'location_type': 'row', 'location_value': str(i),
+                               'location_detail': f'Row {i}', 'text': ','.join(cells)})
+    return chunks
+
+
+def _legacy_xlsx(path):
+    """행 묶음 이전 parse_xlsx"""
+    from openpyxl import load_workbook
+    chunks = []
+    wb = load_workbook(path, read_only=True, data_only=True)
+    for sheet_name in wb.sheetnames:
+        for row_num, row in enumerate(wb[sheet_name].iter_rows(values_only=True), 1):
+            cells = [str(c).strip() for c in row if c is not None and str(c).strip()]
+            if cells:
+                chunks.append({'location_type': 'sheet', 'location_value': sheet_name,
+                               'location_detail': f'Sheet:{sheet_name} Row:{row_num}', 'text': ' | '.join(cells)})
+    wb.close()
+    return chunks
+
+
+def _fields(chunks, keys):
+    return [{k: c[k] for k in keys} for c in chunks]
+
+
+@pytest.mark.parametrize('repeat_header', [True, False])
+def test_one_row_per_chunk_matches_legacy_csv(rows_env, tmp_path, repeat_header):
+    indexer = rows_env(rows=1, repeat_header=repeat_header)
+    path = _write_csv(tmp_path / 'data.csv', 40)
+    chunks = list(indexer.parse_csv(path))
+    keys = ('location_type', 'location_value', 'location_detail', 'text')
+    assert _fields(chunks, keys) == _legacy_csv(path)
+    assert all(c['rows'] == 1 for c in chunks)
+
+
+@pytest.mark.parametrize('repeat_header', [True, False])
+def test_one_row_per_chunk_matches_legacy_xlsx(rows_env, tmp_path, repeat_header):
+    indexer = rows_env(rows=1, repeat_header=repeat_header)
+    path = _write_xlsx(tmp_path / 'data.xlsx', 40)
+    chunks = list(indexer.parse_xlsx(path))
+    legacy = _legacy_xlsx(path)
+    keys = ('location_type', 'location_detail', 'text')
+    assert _fields(chunks, keys) == _fields(legacy, keys)
+    # location_value만 '<시트>' -> '<시트>:<행>' (시트 안 chunk_id 충돌 방지)
+    assert [c['location_value'] for c in chunks] == \
+        [f"{c['location_value']}:{c['location_detail'].rsplit(':', 1)[1]}" for c in legacy]
@@ -0,0 +1,146 @@
+"""scan_files / compile_ignore: name/, /anchored, **, ! 예외, 제외 디렉터리는 내려가지 않음"""
+
+import os
+
+import pytest
+
+TREE = [
+    'P01/보고서.pdf',
+    'P01/~$보고서.pptx',
+    'P01/draft/초안.docx',
+    'P01/archive/old.pdf',
+    'P01/archive/keep.pdf',
+    'P01/node_modules/pkg/readme.pdf',
+    'P02/output/결과.csv',
+    'P02/deep/output/결과.csv',
+    'P02/backup/2023/a.xlsx',
+    'P02/backup/2024/keep.xlsx',
+    'P02/notes_tmp.pdf',
+    'P02/important_tmp.pdf',
+    'output/root.csv',
+    'temp/x.pdf',
+    'P03/temp/y.pdf',
+    'P03/image.png',                    # 지원하지 않는 확장자
+]
+
+
+@pytest.fixture
+def drive(tmp_path):
+    root = tmp_path / 'drive'
+    for rel in TREE:
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(rel, encoding='utf-8')
+    return root
+
+
+@pytest.fixture
+def scan(indexer_env, drive, monkeypatch):
+    """scan_files -> ('/' 구분 상대 경로 목록, 내려간 디렉터리 목록)"""
+    indexer = indexer_env
+    scandir = os.scandir
+    visited = []
+
+    def recording(path):
+        visited.append(os.path.relpath(path, drive).replace(os.sep, '/'))
+        return scandir(path)
+    monkeypatch.setattr(indexer.os, 'scandir', recording)
+
+    def run(exclude, subdir=''):
+        visited.clear()
+        files = indexer.scan_files(str(drive), exclude, subdir)
+        return sorted(e.rel_path.replace(os.sep, '/') for e in files), list(visited)
+    return run
+
+
+def _all_but(*excluded):
+    return sorted(rel for rel in TREE if rel not in excluded and not rel.endswith('.png'))
+
+
+# =============================================
+# compile_ignore
+# =============================================
+
+@pytest.mark.parametrize('patterns, rel, is_dir, ignored', [
+    (['draft/'], 'P01/draft', True, True),
+    (['draft/'], 'P01/draft', False, False),            # name/ 은 디렉터리만
+    (['/output/'], 'output', True, True),
+    (['/output/'], 'P02/output', True, False),          # /path 는 루트 기준
+    (['P02/output/'], 'P02/output', True, True),        # 중간에 / 가 있으면 루트 기준
+    (['P02/output/'], 'X/P02/output', True, False),
+    (['*.tmp'], 'a/b/notes.TMP', False, True),          # 대소문자 무시
+    (['*.tmp'], 'notes.tmp.md', False, False),
+    (['**/backup/2023/'], 'P02/backup/2023', True, True),
+    (['**/backup/2023/'], 'backup/2023', True, True),   # **/ 는 0단계 이상
+    (['P01/**/old.pdf'], 'P01/archive/old.pdf', False, True),
+    (['P01/**/old.pdf'], 'P01/old.pdf', False, True),
+    (['P01/**'], 'P01', True, False),                   # 디렉터리 자체는 아님 (하위만)
+    (['te?p/'], 'temp', True, True),
+    (['# 주석', '', '  *.pdf  '], 'a.pdf', False, True),
+    (['*.pdf', '!keep.pdf'], 'P01/keep.pdf', False, False),
+    (['*.pdf', '!keep.pdf', '*.pdf'], 'P01/keep.pdf', False, True),     # 마지막 규칙이 이김
+])
+def test_compile_ignore(indexer_env, patterns, rel, is_dir, ignored):
+    assert indexer_env.compile_ignore(patterns)(rel, is_dir) is ignored
+
+
+# =============================================
+# scan_files
+# =============================================
+
+def test_default_patterns(scan, indexer_env):
+    files, _ = scan(indexer_env.EXCLUDE_PATTERNS)
+    assert files == _all_but('P01/~$보고서.pptx', 'P01/node_modules/pkg/readme.pdf')
+
+
+def test_dir_pattern_prunes_without_descending(scan):
+    files, visited = scan(['draft/', 'node_modules/'])
+    assert files == _all_but('P01/draft/초안.docx', 'P01/node_modules/pkg/readme.pdf')
+    assert not any(d.startswith(('P01/draft', 'P01/node_modules')) for d in visited)
+    assert 'P01/archive' in visited
+
+
+def test_anchored_pattern(scan):
+    files, visited = scan(['/output/', '/temp/'])
+    assert files == _all_but('output/root.csv', 'temp/x.pdf')
+    assert 'P02/output' in visited and 'P03/temp' in visited
+
+
+def test_double_star(scan):
+    files, _ = scan(['**/output/', 'P02/backup/**/*.xlsx'])
+    assert files == _all_but('P02/output/결과.csv', 'P02/deep/output/결과.csv', 'output/root.csv',
+                             'P02/backup/2023/a.xlsx', 'P02/backup/2024/keep.xlsx')
+
+
+def test_negation_reincludes_file_under_excluded_pattern(scan):
+    files, _ = scan(['*_tmp.pdf', '!important_tmp.pdf', 'P01/archive/**', '!P01/archive/keep.pdf'])
+    assert files == _all_but('P02/notes_tmp.pdf', 'P01/archive/old.pdf')
+
+
+def test_negation_in_nested_folders_needs_folders_reincluded(scan):
+    # 'backup/**'는 하위 폴더에도 일치해 내려가지 않음 (.gitignore와 같음) -> 폴더를 먼저 되살려야 함
+    files, _ = scan(['P02/backup/**', '!**/keep.xlsx'])
+    assert files == _all_but('P02/backup/2023/a.xlsx', 'P02/backup/2024/keep.xlsx')
+    files, _ = scan(['P02/backup/**', '!P02/backup/**/', '!**/keep.xlsx'])
+    assert files == _all_but('P02/backup/2023/a.xlsx')
+
+
+def test_negation_cannot_reinclude_inside_pruned_dir(scan):
+    # .gitignore와 같음: 디렉터리 규칙(name/)으로 잘라낸 폴더 안은 보지 않으므로 ! 로 되살릴 수 없음
+    # (폴더 안 일부를 남기려면 'archive/**' + '!archive/keep.pdf')
+    files, visited = scan(['archive/', '!keep.pdf'])
+    assert files == _all_but('P01/archive/old.pdf', 'P01/archive/keep.pdf')
+    assert 'P01/archive' not in visited
+
+
+def test_negated_dir_rule_restores_folder(scan):
+    files, visited = scan(['backup/', '!P02/backup/'])
+    assert files == _all_but()
+    assert 'P02/backup/2023' in visited
+
+
+def test_subdir_scan_applies_root_relative_patterns(scan, drive):
+    files, visited = scan(['/P02/output/', '/P02/backup/2023/'], subdir='P02')
+    assert files == ['P02/backup/2024/keep.xlsx', 'P02/deep/output/결과.csv', 'P02/important_tmp.pdf',
+                     'P02/notes_tmp.pdf']
+    assert visited[0] == 'P02' and not any(d.startswith('P01') for d in visited)
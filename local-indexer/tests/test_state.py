@@ -0,0 +1,64 @@
+"""StateStore: v1 DB -> 현재 스키마 마이그레이션"""
+
+import sqlite3
+
+import state as state_module
+from state import SCHEMA_VERSION, StateStore
+
+V1_ROWS = [
+    # file_path, mtime, hash (v3.0 구 해시), chunk_count, last_indexed, status
+    ('/drive/P01/a.pdf', 1700000000.0, '0123456789abcdef', 3, '2023-11-14T00:00:00', 'ok'),
+    ('/drive/P01/copy-of-a.pdf', 1700000100.0, '0123456789abcdef', 3, '2023-11-14T00:00:00', 'ok'),
+    ('/drive/P02/b.docx', 1700000200.0, 'fedcba9876543210', 5, '2023-11-14T00:00:00', 'ok'),
+]
+
+
+def _v1_db(path):
+    conn = sqlite3.connect(path)
+    with conn:
+        state_module.MIGRATIONS[0](conn)
+        conn.executemany('INSERT INTO indexed_files VALUES (?, ?, ?, ?, ?, ?)', V1_ROWS)
+        conn.execute('PRAGMA user_version = 1')
+    conn.close()
+
+
+def _tables(conn):
+    return {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+
+
+def test_v1_database_migrates_to_current_schema(tmp_path):
+    db = str(tmp_path / 'indexer_state.db')
+    _v1_db(db)
+
+    store = StateStore(db)
+    try:
+        assert SCHEMA_VERSION == 9
+        assert store.conn.execute('PRAGMA user_version').fetchone()[0] == SCHEMA_VERSION
+        assert {'indexed_files', 'terms', 'file_terms', 'chunk_vectors', 'chunk_sigs', 'lsh_buckets',
+                'pending_events'} <= _tables(store.conn)
+        columns = {row[1] for row in store.conn.execute('PRAGMA table_info(indexed_files)')}
+        assert {'size', 'mtime_ns', 'inode', 'manifest', 'doc_id'} <= columns
+
+        files = store.files
+        assert set(files) == {row[0] for row in V1_ROWS}
+        # _migrate_4: doc_id = 구 해시 (서버에 올라간 chunk_id 접두어 유지)
+        b = files['/drive/P02/b.docx']
+        assert (b.doc_id, b.hash, b.mtime, b.has_manifest) == ('fedcba9876543210', 'fedcba9876543210',
+                                                               1700000200.0, False)
+        # _migrate_8: 구 해시가 겹친 두 파일 중 하나만 doc_id 유지, 둘 다 다시 인덱싱
+        a, copy = files['/drive/P01/a.pdf'], files['/drive/P01/copy-of-a.pdf']
+        assert a.doc_id == '0123456789abcdef' and not a.has_manifest
+        assert copy.doc_id is None and copy.has_manifest
+        assert store.get_manifest(copy.file_path) == {}
+        assert a.mtime is None and copy.mtime is None
+        assert len(store.doc_freq) == 0 and store.doc_freq.n_docs == 0
+    finally:
+        store.close()
+
+    # 다시 열어도 그대로 (마이그레이션은 한 번만)
+    store = StateStore(db)
+    try:
+        assert store.conn.execute('PRAGMA user_version').fetchone()[0] == SCHEMA_VERSION
+        assert store.files == files
+    finally:
+        store.close()
@@ -0,0 +1,49 @@
+"""자동 태깅: tag_text 한 번의 패스로 만든 결과가 v3.0 구현(benchmarks/legacy_tagging)과 같은지"""
+
+import pytest
+
+from benchmarks import legacy_tagging as legacy
+from benchmarks.bench_tagging import CASES
+from benchmarks.corpus import make_chunks
+
+
+@pytest.fixture(scope='module')
+def corpus():
+    return make_chunks(1500, seed=11)
+
+
+@pytest.fixture
+def indexer(monkeypatch):
+    import indexer
+    # v3.0은 단순 빈도 순위 (DF 표 없음)
+    monkeypatch.setattr(indexer, 'DOC_FREQ', None)
+    return indexer
+
+
+@pytest.mark.parametrize('case', list(CASES))
+def test_same_output_as_legacy(indexer, corpus, case):
+    old, new = CASES[case]
+    mismatches = [(path, old(text, path), new(text, path)) for text, path in corpus
+                  if old(text, path) != new(text, path)]
+    assert mismatches == []
+
+
+def test_auto_tag_chunk_keeps_fields_and_order(indexer, corpus):
+    for text, path in corpus[:200]:
+        chunk = {'chunk_id': 'c-1', 'text': text, 'location_detail': 'Slide 1'}
+        expected = legacy.auto_tag_chunk(dict(chunk), path)
+        tagged = indexer.auto_tag_chunk(dict(chunk), path)
+        assert list(tagged.items()) == list(expected.items())
+
+
+def test_precomputed_counts_give_same_result(indexer, corpus):
+    # 인덱서는 DF 갱신용으로 세어 둔 token_counts를 넘김
+    for text, path in corpus[:200]:
+        assert indexer.tag_text(text, path, counts=indexer.token_counts(text)) == indexer.tag_text(text, path)
+
+
+@pytest.mark.parametrize('text', ['', '\n\n  \n', '\r\n\r\n첫 줄 요약\r\n둘째 줄', '전략 KPI 로드맵 ' * 300])
+def test_edge_texts(indexer, text):
+    path = '/drive/P01/03.최종보고/보고서.pptx'
+    assert (list(indexer.auto_tag_chunk({'text': text}, path).items())
+            == list(legacy.auto_tag_chunk({'text': text}, path).items()))
@@ -0,0 +1,82 @@
+"""업로드 경로: 순차 / --workers 인덱싱이 대역 서버에 같은 청크를 올리는지, 413 분할과 429 / 5xx 재시도"""
+
+import pytest
+
+from benchmarks.fixtures import make_drive
+from benchmarks.stub_server import StubServer
+from state import StateStore
+
+
+@pytest.fixture(scope='module')
+def drive(tmp_path_factory):
+    root = tmp_path_factory.mktemp('drive')
+    make_drive(str(root), scale=0.15, seed=3)
+    return str(root)
+
+
+def index_drive(indexer, server, root, db_path, workers=1):
+    """빈 상태 DB로 root 전체를 server에 인덱싱. run 집계 반환"""
+    indexer.WIKI_API_URL = server.url
+    indexer.DRIVE_ROOT = root
+    state = StateStore(str(db_path))
+    try:
+        run = indexer.new_run_stats()
+        to_index, _, _ = indexer.plan_changes(state, indexer.scan_files(root))
+        if workers > 1:
+            indexer.index_files_parallel(state, to_index, workers, run)
+        else:
+            indexer.index_files_serial(state, to_index, run)
+        indexed = len(state.files)
+    finally:
+        state.close()
+    assert indexed == len(to_index)
+    return run
+
+
+@pytest.fixture
+def env(indexer_env, monkeypatch):
+    # 처리 순서 / 업로드 완료 시점에 따라 달라지는 것은 끔: 중복 정리의 대표 청크,
+    # 순차 경로에서 실행 중에 갱신되는 DF 표 (태그 순위는 단순 빈도로)
+    monkeypatch.setattr(indexer_env, 'DEDUP', False)
+    monkeypatch.setattr(indexer_env, 'DOC_FREQ', None)
+    return indexer_env
+
+
+def test_serial_and_workers_upload_same_chunks(env, drive, tmp_path):
+    with StubServer() as serial:
+        run = index_drive(env, serial, drive, tmp_path / 'serial.db')
+    env._client = env._pipeline = None
+    with StubServer() as parallel:
+        index_drive(env, parallel, drive, tmp_path / 'parallel.db', workers=3)
+
+    assert run['errors'] == 0
+    assert run['upload']['failed'] == 0
+    assert len(serial.chunks) == run['upload']['inserted'] > 0
+    assert serial.chunks.keys() == parallel.chunks.keys()
+    for chunk_id, chunk in serial.chunks.items():
+        assert parallel.chunks[chunk_id] == chunk, chunk_id
+
+
+def test_oversized_batches_are_split(env, drive, tmp_path):
+    with StubServer() as reference:
+        index_drive(env, reference, drive, tmp_path / 'reference.db')
+    env._client = env._pipeline = None
+    with StubServer(max_chunks=7) as server:
+        run = index_drive(env, server, drive, tmp_path / 'split.db')
+
+    assert server.statuses[413] > 0
+    assert run['upload']['failed'] == 0
+    assert server.chunks == reference.chunks
+
+
+@pytest.mark.parametrize('errors', [[429, 429], [500, 502, 503, 504]])
+def test_throttled_and_failed_requests_are_retried(env, drive, tmp_path, errors):
+    with StubServer(errors=errors) as server:
+        run = index_drive(env, server, drive, tmp_path / 'retry.db', workers=2)
+
+    assert not server.errors                        # 주입한 오류 응답을 모두 돌려줌
+    assert sum(server.statuses[s] for s in set(errors)) == len(errors)
+    assert run['upload']['retries'] >= len(errors)
+    assert run['upload']['failed'] == 0
+    assert run['errors'] == 0
+    assert len(server.chunks) == run['upload']['inserted']
@@ -0,0 +1,178 @@
+"""vector_index: build_index -> VectorIndex 왕복, 전체 탐색과 같은 top-k, 메타데이터 필터, similar()"""
+
+import numpy as np
+import pytest
+
+from embedding import DIM, encode_vectors, pack_vector, unpack_vector
+from vector_index import VectorIndex, build_index
+
+N = 600
+CATEGORIES = ['전략', '데이터', 'AI', '']
+PROJECTS = ['P01_스마트시티', 'P02_데이터허브', 'P10_AI전환']
+YEARS = ['2022', '2023', '2024', '', '미상']
+FILE_TYPES = ['pptx', 'pdf', 'docx']
+
+
+@pytest.fixture(scope='module')
+def rows():
+    """(chunk_id, file_type, project_path, category, doc_year, embedding) - 희소한 음이 아닌 벡터 (tfidf와 비슷하게)"""
+    rng = np.random.default_rng(7)
+    centers = rng.random((6, DIM)) * (rng.random((6, DIM)) < 0.15)
+    out = []
+    for i in range(N):
+        vec = centers[i % 6] + rng.random(DIM) * (rng.random(DIM) < 0.05)
+        if i == 17:
+            vec[:] = 0                              # 임베딩 단어가 하나도 없는 청크
+        norm = np.linalg.norm(vec)
+        vec = vec / norm if norm else vec
+        out.append((f'doc{i // 10:02d}-청크{i:04d}', FILE_TYPES[i % 3], PROJECTS[i % 3 if i % 7 else 2],
+                    CATEGORIES[i % 4], YEARS[i % 5], pack_vector(vec, 'f16' if i % 2 else 'i8')))
+    return out
+
+
+@pytest.fixture(scope='module', params=[('i8', 0), ('f16', 0), ('i8', 12), ('f16', 12)],
+                ids=['i8', 'f16', 'i8-ivf', 'f16-ivf'])
+def index(request, rows, tmp_path_factory):
+    dtype, n_lists = request.param
+    path = str(tmp_path_factory.mktemp('index') / 'vector_index.kwvi')
+    header = build_index(iter(rows), len(rows), path, dtype=dtype, n_lists=n_lists)
+    assert (header['count'], header['dtype'], header['n_lists']) == (N, dtype, n_lists)
+    with VectorIndex.open(path) as index:
+        yield index
+
+
+def _brute_force(index, query, top_k, keep=lambda row: True):
+    """인덱스에 저장된 벡터로 모든 행의 코사인 점수 계산 -> (chunk_id, 점수) 상위 top_k"""
+    q = query / np.linalg.norm(query)
+    vectors = index.vectors.astype(np.float32)
+    norms = np.linalg.norm(vectors, axis=1)
+    scores = np.divide(vectors @ q, norms, out=np.zeros(len(norms), dtype=np.float32), where=norms > 0)
+    ranked = sorted((row for row in range(index.count) if keep(row)), key=lambda row: (-scores[row], row))
+    return [(index.chunk_id(row), round(float(scores[row]), 4)) for row in ranked[:top_k]]
+
+
+def _hits(hits):
+    return [(hit.chunk_id, hit.score) for hit in hits]
+
+
+def _queries(rows, n=8):
+    return [unpack_vector(rows[i][5]) for i in range(1, N, N // n)]
+
+
+# =============================================
+# 왕복
+# =============================================
+
+def test_rows_round_trip(index, rows):
+    assert len(index) == N
+    by_id = {row[0]: row for row in rows}
+    assert {index.chunk_id(i) for i in range(N)} == set(by_id)
+    for chunk_id, file_type, project, category, year, encoded in rows:
+        row = index.row_of(chunk_id)
+        assert index.chunk_id(row) == chunk_id
+        hit = index._hit(row, 1.0)
+        assert (hit.file_type, hit.project_path, hit.category) == (file_type, project, category)
+        assert hit.doc_year == (year if year.isdigit() else '')
+        # 저장 정밀도 안에서 같은 벡터
+        stored = index.vectors[row].astype(np.float64) / (127 if index.header['dtype'] == 'i8' else 1)
+        assert np.abs(stored - unpack_vector(encoded)).max() <= (0.5 / 127 + 1e-6 if index.header['dtype'] == 'i8'
+                                                                    else 1e-3)
+    assert index.row_of('없는 청크') is None
+
+
+def test_ivf_lists_partition_rows(index):
+    if not index.n_lists:
+        assert index.centroids is None and index.list_offsets is None
+        return
+    offsets = [int(v) for v in index.list_offsets]
+    assert offsets[0] == 0 and offsets[-1] == N and offsets == sorted(offsets)
+    assert index.centroids.shape == (index.n_lists, DIM)
+
+
+# =============================================
+# 검색
+# =============================================
+
+@pytest.mark.parametrize('top_k', [1, 10, 50])
+def test_top_k_equals_brute_force(index, rows, top_k):
+    original = {row[0]: unpack_vector(row[5]) for row in rows}
+    for query in _queries(rows):
+        hits = index.search(query, top_k, n_probe=index.n_lists or 1)
+        assert _hits(hits) == _brute_force(index, query, top_k)
+        # 입력 벡터의 코사인과는 저장 정밀도(i8 / f16) 차이만
+        for hit in hits:
+            vec = original[hit.chunk_id]
+            cosine = vec @ query / (np.linalg.norm(vec) * np.linalg.norm(query))
+            assert abs(hit.score - cosine) < 0.02
+
+
+def test_ivf_probe_searches_nearest_lists_only(index, rows):
+    if not index.n_lists:
+        pytest.skip('IVF 없음')
+    query = _queries(rows)[0]
+    hits = index.search(query, 20, n_probe=2)
+    lists = np.argsort(-(index.centroids @ (query / np.linalg.norm(query)).astype(np.float32)))[:2]
+    allowed = set()
+    for i in lists:
+        allowed.update(range(int(index.list_offsets[i]), int(index.list_offsets[i + 1])))
+    assert hits and {index.row_of(hit.chunk_id) for hit in hits} <= allowed
+    assert _hits(hits) == _brute_force(index, query, 20, lambda row: row in allowed)
+
+
+@pytest.mark.parametrize('filters', [
+    {'category': '데이터'},
+    {'project': 'AI'},                          # 부분 일치
+    {'year': '2024'},
+    {'year': 2023, 'file_type': 'pdf'},
+    {'category': '전략', 'project': 'P01', 'year': '2022'},
+    {'category': '없는 분류'},
+])
+def test_filters_match_brute_force(index, rows, filters):
+    def keep(row):
+        hit = index._hit(row, 0)
+        return ((not filters.get('category') or hit.category == filters['category'])
+                and (not filters.get('project') or filters['project'] in hit.project_path)
+                and (not filters.get('year') or hit.doc_year == str(filters['year']))
+                and (not filters.get('file_type') or hit.file_type == filters['file_type']))
+
+    for query in _queries(rows, 4):
+        hits = index.search(query, 15, n_probe=index.n_lists or 1, **filters)
+        assert _hits(hits) == _brute_force(index, query, 15, keep)
+        assert all(keep(index.row_of(hit.chunk_id)) for hit in hits)
+
+
+def test_threshold_and_empty_queries(index, rows):
+    query = _queries(rows)[0]
+    hits = index.search(query, N, threshold=0.5, n_probe=index.n_lists or 1)
+    assert hits and all(hit.score >= 0.5 for hit in hits)
+    assert index.search(np.zeros(DIM), 10) == []
+    assert index.search('', 10) == []
+
+
+def test_text_query_uses_encode_vectors(index):
+    text = '데이터 거버넌스 strategy roadmap'
+    hits = _hits(index.search(text, 5, n_probe=index.n_lists or 1))
+    assert hits and hits == _hits(index.search(encode_vectors([text])[0], 5, n_probe=index.n_lists or 1))
+
+
+# =============================================
+# similar()
+# =============================================
+
+def test_similar_excludes_itself(index, rows):
+    for chunk_id, *_ in rows[::97]:
+        row = index.row_of(chunk_id)
+        query = index.vectors[row].astype(np.float32)
+        if not np.any(query):
+            assert index.similar(chunk_id, 5) == []
+            continue
+        hits = index.similar(chunk_id, 5, n_probe=index.n_lists or 1)
+        assert chunk_id not in {hit.chunk_id for hit in hits}
+        assert _hits(hits) == _brute_force(index, query, 5, lambda r: r != row)
+    assert index.similar('없는 청크') == []
+
+
+def test_similar_with_filters(index, rows):
+    chunk_id = rows[3][0]
+    hits = index.similar(chunk_id, 10, category='데이터', n_probe=index.n_lists or 1)
+    assert hits and all(hit.category == '데이터' and hit.chunk_id != chunk_id for hit in hits)
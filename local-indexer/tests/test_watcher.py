@@ -0,0 +1,211 @@
+"""--watch 디바운스: EventBuffer -> pending_events -> ready_events (가짜 시계, sleep 없음), 알림 -> 이동 / 삭제"""
+
+import os
+
+import pytest
+
+import watcher
+from benchmarks.stub_server import StubServer
+from state import StateStore
+from watcher import EventBuffer, InotifyWatcher
+
+DEBOUNCE, MAX_DELAY = 3, 60
+
+
+class Clock:
+    """가짜 시계: 테스트가 직접 시간을 넘김"""
+
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def watch_env(indexer_env, monkeypatch, tmp_path):
+    indexer = indexer_env
+    monkeypatch.setattr(indexer, 'WATCH_DEBOUNCE_SECONDS', DEBOUNCE)
+    monkeypatch.setattr(indexer, 'WATCH_MAX_DELAY_SECONDS', MAX_DELAY)
+    monkeypatch.setattr(indexer, 'WATCH_BATCH_FILES', 100)
+    monkeypatch.setattr(indexer, 'DRIVE_ROOT', str(tmp_path / 'drive'))
+    store = StateStore(str(tmp_path / 'indexer_state.db'))
+    clock = Clock()
+    buffer = EventBuffer(50, clock=clock)
+
+    def ready():
+        return indexer.ready_events(store, buffer, clock())
+
+    yield indexer, store, buffer, clock, ready
+    store.close()
+
+
+# =============================================
+# 디바운스
+# =============================================
+
+def test_quiet_period(watch_env):
+    _, _, buffer, clock, ready = watch_env
+    buffer.add('/d/a.pptx')
+    clock.advance(DEBOUNCE - 0.5)
+    assert ready() == []
+    buffer.add('/d/a.pptx')                     # 조용한 시간은 마지막 알림부터 다시
+    clock.advance(DEBOUNCE - 0.5)
+    assert ready() == []
+    clock.advance(0.5)
+    assert ready() == ['/d/a.pptx']
+
+
+def test_paths_become_ready_independently(watch_env):
+    _, store, buffer, clock, ready = watch_env
+    buffer.add('/d/first.pdf')
+    clock.advance(2)
+    buffer.add('/d/second.pdf')
+    clock.advance(DEBOUNCE - 2)
+    assert ready() == ['/d/first.pdf']
+    store.drop_pending(['/d/first.pdf'])
+    clock.advance(2)
+    assert ready() == ['/d/second.pdf']
+
+
+def test_max_delay_caps_a_busy_file(watch_env):
+    # 계속 쓰이는 파일 (동기화 중인 큰 파일 등): 첫 알림 후 MAX_DELAY초가 지나면 처리
+    _, _, buffer, clock, ready = watch_env
+    first = clock()
+    seen = []
+    while not seen:
+        buffer.add('/d/busy.xlsx')
+        clock.advance(1)
+        seen = ready()
+    assert seen == ['/d/busy.xlsx']
+    assert clock() - first == MAX_DELAY
+
+
+def test_ready_oldest_first_up_to_batch(watch_env, monkeypatch):
+    indexer, store, buffer, clock, ready = watch_env
+    monkeypatch.setattr(indexer, 'WATCH_BATCH_FILES', 2)
+    for name in ('c', 'a', 'b'):
+        buffer.add(f'/d/{name}.csv')
+        clock.advance(1)
+    clock.advance(DEBOUNCE)
+    assert ready() == ['/d/c.csv', '/d/a.csv']
+    store.drop_pending(['/d/c.csv', '/d/a.csv'])
+    assert ready() == ['/d/b.csv']
+
+
+def test_pending_survives_restart(watch_env, tmp_path):
+    _, _, buffer, clock, ready = watch_env
+    buffer.add('/d/a.docx')
+    assert ready() == []
+    reopened = StateStore(str(tmp_path / 'indexer_state.db'))
+    try:
+        assert reopened.count_pending() == 1        # 다음 시작 때 이어서 처리
+        assert reopened.ready_pending(clock() + DEBOUNCE, DEBOUNCE, MAX_DELAY, 100) == ['/d/a.docx']
+    finally:
+        reopened.close()
+
+
+def test_buffer_overflow_becomes_full_rescan(watch_env):
+    indexer, store, buffer, clock, ready = watch_env
+    for i in range(buffer.max_paths + 1):
+        buffer.add(f'/d/{i}.pdf')
+    buffer.add('/d/after-overflow.pdf')         # 넘친 뒤의 알림도 재스캔에 포함되므로 모으지 않음
+    assert buffer._paths == {}
+    assert ready() == [indexer.DRIVE_ROOT]      # 조용한 시간을 기다리지 않음
+    assert store.count_pending() == 1
+    assert buffer.drain() == ({}, False)
+
+
+def test_lost_events_become_full_rescan(watch_env):
+    indexer, _, buffer, _, ready = watch_env
+    buffer.add('/d/a.pdf')
+    buffer.overflow()                           # inotify IN_Q_OVERFLOW
+    assert ready() == [indexer.DRIVE_ROOT]
+
+
+# =============================================
+# inotify 알림 -> 버퍼
+# =============================================
+
+@pytest.fixture
+def inotify(tmp_path):
+    """inotify fd 없이 _handle만 쓰는 InotifyWatcher"""
+    inst = InotifyWatcher.__new__(InotifyWatcher)
+    inst.buffer = EventBuffer(50, clock=Clock())
+    inst.accept = lambda path, is_dir: is_dir or path.endswith('.pptx')
+    inst.wds = {1: str(tmp_path / 'P01'), 2: str(tmp_path / 'P02')}
+    inst.added = []
+    inst._add_tree = inst.added.append
+    return inst
+
+
+def test_inotify_events_map_to_paths(inotify, tmp_path):
+    P01, P02 = str(tmp_path / 'P01'), str(tmp_path / 'P02')
+    inotify._handle(1, watcher.IN_MOVED_FROM, 'old.pptx')     # 이동: 양쪽 경로 모두
+    inotify._handle(2, watcher.IN_MOVED_TO, 'new.pptx')
+    inotify._handle(1, watcher.IN_DELETE, 'gone.pptx')
+    inotify._handle(1, watcher.IN_CLOSE_WRITE, 'saved.pptx')
+    inotify._handle(1, watcher.IN_CLOSE_WRITE, '~$saved.tmp')  # accept에서 제외
+    inotify._handle(3, watcher.IN_CREATE, 'unknown-wd.pptx')   # 이미 지운 watch
+    paths, overflow = inotify.buffer.drain()
+    assert not overflow
+    assert list(paths) == [os.path.join(P01, 'old.pptx'), os.path.join(P02, 'new.pptx'),
+                           os.path.join(P01, 'gone.pptx'), os.path.join(P01, 'saved.pptx')]
+
+
+def test_inotify_new_folder_is_watched_and_rescanned(inotify, tmp_path):
+    inotify._handle(1, watcher.IN_CREATE | watcher.IN_ISDIR, '새 폴더')
+    inotify._handle(2, watcher.IN_MOVED_TO | watcher.IN_ISDIR, '옮겨온 폴더')
+    folders = [os.path.join(str(tmp_path / 'P01'), '새 폴더'), os.path.join(str(tmp_path / 'P02'), '옮겨온 폴더')]
+    assert inotify.added == folders
+    assert list(inotify.buffer.drain()[0]) == folders
+
+
+def test_inotify_overflow_and_ignored(inotify):
+    inotify._handle(1, watcher.IN_IGNORED, '')
+    assert 1 not in inotify.wds
+    inotify._handle(-1, watcher.IN_Q_OVERFLOW, '')
+    assert inotify.buffer.drain() == ({}, True)
+
+
+# =============================================
+# 알림 경로 -> 이동 / 삭제
+# =============================================
+
+def test_rename_and_delete_events(watch_env, tmp_path):
+    indexer, store, buffer, clock, ready = watch_env
+    root = tmp_path / 'drive'
+    for name in ('a', 'b'):
+        (root / 'P01').mkdir(parents=True, exist_ok=True)
+        (root / 'P01' / f'{name}.csv').write_text(f'항목,값\n{name}-1,1\n{name}-2,2\n', encoding='utf-8')
+    with StubServer() as server:
+        indexer.WIKI_API_URL = server.url
+        to_index, _, _ = indexer.plan_changes(store, indexer.scan_files(str(root)))
+        indexer.index_files_serial(store, to_index, indexer.new_run_stats())
+
+        old, new, gone = root / 'P01' / 'a.csv', root / 'P02' / 'a-최종.csv', root / 'P01' / 'b.csv'
+        new.parent.mkdir()
+        os.rename(old, new)
+        gone.unlink()
+        for path in (old, new, gone):           # IN_MOVED_FROM / IN_MOVED_TO / IN_DELETE
+            buffer.add(str(path))
+        clock.advance(DEBOUNCE)
+        paths = ready()
+        assert sorted(paths) == sorted(map(str, (old, new, gone)))
+
+        files, removed = indexer.collect_changes(store, paths, indexer._watch_filter())
+        assert [entry.path for entry in files] == [str(new)]
+        assert sorted(removed) == sorted([str(old), str(gone)])
+        to_index, renames, deleted = indexer.plan_changes(store, files, removed)
+        assert to_index == []
+        assert [(old_path, entry.path) for old_path, entry in renames] == [(str(old), str(new))]
+        assert deleted == [str(gone)]
+
+        assert indexer.process_changes(store, paths, indexer._watch_filter(), 1)
+        store.drop_pending(paths)
+    assert set(store.files) == {str(new)}
+    assert {c['file_path'] for c in server.chunks.values()} == {'P02/a-최종.csv'}
+    assert store.count_pending() == 0
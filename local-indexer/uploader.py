@@ -0,0 +1,242 @@
+"""
+Knowledge Wiki - Upload Client
+===============================
+/api/* 호출용 HTTP 클라이언트.
+
+  - requests.Session 연결 풀 (HTTP keep-alive, 업로드 스레드 간 공유)
+  - gzip 압축 요청 본문 (Content-Encoding: gzip)
+  - 청크 수 + 바이트 크기 기준 배치 분할 (413 응답 시 배치를 반으로 나눠 재전송)
+  - 5xx / 429 / 타임아웃 / 연결 오류에 지수 백오프 + 지터 재시도
+  - 배치별 inserted / error 집계
+  - delta sync: chunk_id / file_path 기준 삭제, 파일 이동 시 경로 갱신
+
+WikiClient(api_url)만 있으면 되므로 로컬 테스트 서버를 띄워 그대로 검증할 수 있습니다.
+"""
+
+import gzip
+import json
+import random
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config import (
+    BATCH_SIZE, UPLOAD_IN_FLIGHT, UPLOAD_MAX_BATCH_BYTES, UPLOAD_GZIP,
+    UPLOAD_RETRIES, UPLOAD_TIMEOUT,
+)
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+class UploadError(Exception):
+    """재시도 후에도 실패한 요청"""
+
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        self.status = status
+
+
+def new_upload_stats():
+    return {'inserted': 0, 'failed': 0, 'batches': 0, 'retries': 0, 'bytes_sent': 0, 'errors': []}
+
+
+def merge_upload_stats(total, stats):
+    for key, value in stats.items():
+        if key == 'errors':
+            total['errors'].extend(value)
+        else:
+            total[key] += value
+    return total
+
+
+def backoff_delay(attempt):
+    """지수 백오프 + full jitter (최대 30초)"""
+    return random.uniform(0, min(30.0, 0.5 * (2 ** attempt)))
+
+
+def retry_after(resp):
+    """429 / 503 응답의 Retry-After(초, 최대 60). 없으면 0"""
+    value = resp.headers.get('Retry-After', '')
+    return min(int(value), 60) if value.isdigit() else 0
+
+
+def parse_response(resp):
+    """재시도 대상이 아닌 응답 -> JSON (4xx / 5xx / 잘못된 JSON은 UploadError)"""
+    if resp.status_code >= 400:
+        raise UploadError(f'HTTP {resp.status_code}: {resp.text[:200]}', resp.status_code)
+    try:
+        return resp.json()
+    except ValueError:
+        raise UploadError(f'Invalid JSON response: {resp.text[:200]}', resp.status_code)
+
+
+class WikiClient:
+    """Knowledge Wiki API 클라이언트 (연결 재사용 + gzip + 재시도)"""
+
+    def __init__(self, api_url, session=None, max_batch_chunks=BATCH_SIZE,
+                 max_batch_bytes=UPLOAD_MAX_BATCH_BYTES, compress=UPLOAD_GZIP,
+                 retries=UPLOAD_RETRIES, timeout=UPLOAD_TIMEOUT):
+        self.api_url = api_url.rstrip('/')
+        self.max_batch_chunks = max_batch_chunks
+        self.max_batch_bytes = max_batch_bytes
+        self.compress = compress
+        self.retries = retries
+        self.timeout = timeout
+        # on_response(method, path, status, 초): 응답마다 호출 (연결 오류 / 시간 초과는 status None). 계측용
+        self.on_response = None
+
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=2, pool_maxsize=max(UPLOAD_IN_FLIGHT, 4))
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+        self.session = session
+
+    # ---------- low level ----------
+
+    def _backoff(self, attempt):
+        time.sleep(backoff_delay(attempt))
+
+    def observe(self, method, path, status, t0):
+        if self.on_response is not None:
+            self.on_response(method, path, status, time.perf_counter() - t0)
+
+    def encode(self, body):
+        """요청 본문 -> (bytes 또는 None, 헤더). body는 dict 또는 이미 직렬화된 bytes"""
+        headers = {'Accept-Encoding': 'gzip'}
+        if body is None:
+            return None, headers
+        data = body if isinstance(body, bytes) else json.dumps(body, ensure_ascii=False).encode('utf-8')
+        headers['Content-Type'] = 'application/json'
+        if self.compress:
+            data = gzip.compress(data, compresslevel=5)
+            headers['Content-Encoding'] = 'gzip'
+        return data, headers
+
+    def request(self, method, path, body=None, timeout=None, stats=None):
+        """JSON 요청 + 재시도. body는 dict 또는 이미 직렬화된 bytes."""
+        url = f'{self.api_url}{path}'
+        data, headers = self.encode(body)
+
+        last_error = None
+        for attempt in range(self.retries + 1):
+            if attempt:
+                if stats is not None:
+                    stats['retries'] += 1
+                self._backoff(attempt)
+            t0 = time.perf_counter()
+            try:
+                resp = self.session.request(method, url, data=data, headers=headers,
+                                            timeout=timeout or self.timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                self.observe(method, path, None, t0)
+                last_error = UploadError(f'{type(e).__name__}: {e}')
+                continue
+            self.observe(method, path, resp.status_code, t0)
+
+            if stats is not None and data is not None:
+                stats['bytes_sent'] += len(data)
+            if resp.status_code in RETRY_STATUS:
+                last_error = UploadError(f'HTTP {resp.status_code}', resp.status_code)
+                delay = retry_after(resp)
+                if delay:
+                    time.sleep(delay)
+                continue
+            return parse_response(resp)
+
+        raise last_error
+
+    def post(self, path, body=None, timeout=None, stats=None):
+        return self.request('POST', path, body, timeout, stats)
+
+    def get(self, path, timeout=None):
+        return self.request('GET', path, timeout=timeout)
+
+    # ---------- chunk upload ----------
+
+    def iter_batches(self, chunks):
+        """청크를 한 번만 직렬화하면서 청크 수/바이트 기준으로 배치 분할
+
+        yield 직렬화된 청크(bytes) 리스트
+        """
+        parts = []
+        size = 0
+        for chunk in chunks:
+            part = json.dumps(chunk, ensure_ascii=False).encode('utf-8')
+            if parts and (len(parts) >= self.max_batch_chunks
+                          or size + len(part) > self.max_batch_bytes):
+                yield parts
+                parts = []
+                size = 0
+            parts.append(part)
+            size += len(part) + 1
+        if parts:
+            yield parts
+
+    @staticmethod
+    def batch_body(parts):
+        return b'{"chunks":[' + b','.join(parts) + b']}'
+
+    def split_batch(self, parts):
+        """413 (요청 크기 초과): 이후 배치 상한을 줄이고 반으로 나눈 두 배치 반환"""
+        self.max_batch_bytes = max(64 * 1024, self.max_batch_bytes // 2)
+        mid = len(parts) // 2
+        return parts[:mid], parts[mid:]
+
+    @staticmethod
+    def count_batch(parts, stats, data=None, error=None):
+        """배치 결과를 집계에 반영 (error가 있으면 전체 실패)"""
+        stats['batches'] += 1
+        if error is not None:
+            stats['failed'] += len(parts)
+            stats['errors'].append(str(error))
+            return
+        inserted = data.get('inserted', 0)
+        stats['inserted'] += inserted
+        stats['failed'] += max(0, len(parts) - inserted)
+        stats['errors'].extend(data.get('errors') or [])
+
+    def _post_batch(self, parts, stats):
+        try:
+            data = self.post('/api/chunks', self.batch_body(parts), stats=stats)
+        except UploadError as e:
+            if e.status == 413 and len(parts) > 1:
+                for half in self.split_batch(parts):
+                    self._post_batch(half, stats)
+                return
+            self.count_batch(parts, stats, error=e)
+            return
+        self.count_batch(parts, stats, data)
+
+    # ---------- delta sync ----------
+
+    def _check_errors(self, data):
+        if data.get('errors'):
+            raise UploadError('; '.join(str(e) for e in data['errors'][:3]))
+        return data
+
+    def delete_chunks(self, chunk_ids=(), file_paths=(), batch=500):
+        """chunk_id 또는 file_path 기준으로 서버 청크 삭제. 삭제된 행 수 반환"""
+        deleted = 0
+        for key, values in (('chunk_ids', list(chunk_ids)), ('file_paths', list(file_paths))):
+            for i in range(0, len(values), batch):
+                data = self._check_errors(self.post('/api/chunks/delete', {key: values[i:i + batch]}))
+                deleted += data.get('deleted', 0)
+        return deleted
+
+    def rename_files(self, renames, batch=200):
+        """[{'from', 'to', 'doc_title', 'project_path'}] - 재파싱 없이 서버 청크의 경로만 갱신"""
+        updated = 0
+        for i in range(0, len(renames), batch):
+            data = self._check_errors(self.post('/api/chunks/rename', {'renames': renames[i:i + batch]}))
+            updated += data.get('updated', 0)
+        return updated
+
+    def upload_chunks(self, chunks, stats=None):
+        """청크 전체를 배치로 나눠 /api/chunks에 업로드하고 집계를 반환"""
+        if stats is None:
+            stats = new_upload_stats()
+        for parts in self.iter_batches(chunks):
+            self._post_batch(parts, stats)
+        return stats
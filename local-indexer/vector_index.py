@@ -0,0 +1,360 @@
+"""
+Knowledge Wiki - Offline Vector Index
+======================================
+--embed-local로 계산한 청크 임베딩을 파일 하나로 묶은 사전 구축 인덱스와 검색 API.
+
+  - 연속 배열: 벡터 (int8 또는 float16, 행 x 차원) + 행별 노름(float32)
+  - chunk_id 표 (UTF-8 바이트 + 오프셋) + 필터용 메타데이터 코드 (category, project, file_type, year)
+  - 선택적 IVF: k-means 중심점으로 행을 목록별로 정렬해 두고 검색 시 가까운 목록만 탐색
+  - mmap으로 열어 필요한 부분만 읽음 (파일 전체를 메모리에 올리지 않음)
+
+파일 형식:
+  [0:8)   MAGIC
+  [8:16)  헤더 JSON 오프셋 (uint64 LE)
+  [16:24) 헤더 JSON 길이 (uint64 LE)
+  [64:..) 섹션 (64바이트 정렬), 마지막에 헤더 JSON
+          헤더: dim, count, dtype, n_lists, 문자열 표(categories, projects, file_types),
+                sections {이름: {offset, dtype, shape}}
+
+사용 예:
+  from vector_index import VectorIndex
+  index = VectorIndex.open('vector_index.kwvi')
+  index.search('데이터 거버넌스 전략', top_k=10, category='데이터', project='P1', year='2024')
+  index.similar(chunk_id, top_k=5)
+
+  python vector_index.py "데이터 거버넌스" --top-k 10 --category 데이터
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+from collections import namedtuple
+
+MAGIC = b'KWVI\x00\x00\x01\x00'
+ALIGN = 64
+# IVF 목록 수 자동 결정: 이 행 수 미만이면 전체 탐색
+IVF_MIN_ROWS = 50_000
+# 전체 탐색 시 한 번에 점수를 계산하는 행 수 (메모리 상한)
+SCAN_BLOCK = 65_536
+
+SearchHit = namedtuple('SearchHit', 'chunk_id score category project_path file_type doc_year')
+
+
+def _codes(values):
+    """문자열 목록 -> (코드 배열용 list, 문자열 표)"""
+    table = {}
+    codes = [table.setdefault(v or '', len(table)) for v in values]
+    return codes, list(table)
+
+
+def _year(value):
+    value = (value or '').strip()
+    return int(value) if value.isdigit() and len(value) == 4 else 0
+
+
+def _kmeans(vectors, n_lists, iters=10, seed=0, sample=256):
+    """구면 k-means (코사인). vectors: 정규화된 float32 행렬. 중심점 반환"""
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    n = len(vectors)
+    train = vectors[rng.choice(n, min(n, n_lists * sample), replace=False)]
+    centroids = train[rng.choice(len(train), n_lists, replace=False)].copy()
+    for _ in range(iters):
+        assign = np.argmax(train @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, train)
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        empty = norms[:, 0] == 0
+        # 빈 목록은 무작위 행으로 다시 시작
+        sums[empty] = train[rng.choice(len(train), int(empty.sum()))]
+        norms[empty] = np.linalg.norm(sums[empty], axis=1, keepdims=True)
+        centroids = sums / np.maximum(norms, 1e-12)
+    return centroids
+
+
+def build_index(rows, count, path, dtype='i8', n_lists=0, seed=0):
+    """state.iter_vectors() 행으로 인덱스 파일 작성 (임시 파일에 쓴 뒤 교체)
+
+    rows: (chunk_id, file_type, project_path, category, doc_year, embedding 문자열)
+    n_lists: IVF 목록 수. 0이면 행 수에 따라 자동 (IVF_MIN_ROWS 미만은 IVF 없음)
+    반환: 헤더 dict
+    """
+    import numpy as np
+    from embedding import DIM, EMBED_MODEL, unpack_vector
+
+    if dtype not in ('i8', 'f16'):
+        raise ValueError(f'Unknown index dtype: {dtype}')
+    vectors = np.zeros((count, DIM), dtype='i1' if dtype == 'i8' else '<f2')
+    ids, file_types, projects, categories, years = [], [], [], [], []
+    n = 0
+    for chunk_id, file_type, project, category, doc_year, encoded in rows:
+        if n >= count:
+            break
+        vec = unpack_vector(encoded)
+        vectors[n] = np.rint(vec * 127) if dtype == 'i8' else vec
+        ids.append(chunk_id.encode('utf-8'))
+        file_types.append(file_type)
+        projects.append(project)
+        categories.append(category)
+        years.append(_year(doc_year))
+        n += 1
+    vectors = vectors[:n]
+
+    norms = np.linalg.norm(vectors.astype(np.float32), axis=1).astype(np.float32)
+    if not n_lists:
+        n_lists = int(np.sqrt(n)) if n >= IVF_MIN_ROWS else 0
+    n_lists = min(n_lists, n)
+
+    order = np.arange(n)
+    centroids = list_offsets = None
+    if n_lists > 1:
+        unit = vectors.astype(np.float32) / np.maximum(norms, 1e-12)[:, None]
+        centroids = _kmeans(unit, n_lists, seed=seed).astype(np.float32)
+        assign = np.empty(n, dtype=np.int64)
+        for start in range(0, n, SCAN_BLOCK):
+            assign[start:start + SCAN_BLOCK] = np.argmax(unit[start:start + SCAN_BLOCK] @ centroids.T, axis=1)
+        del unit
+        order = np.argsort(assign, kind='stable')
+        list_offsets = np.searchsorted(assign[order], np.arange(n_lists + 1)).astype(np.uint64)
+    else:
+        n_lists = 0
+
+    cat_codes, cat_table = _codes(categories)
+    proj_codes, proj_table = _codes(projects)
+    type_codes, type_table = _codes(file_types)
+    id_lengths = np.array([len(ids[i]) for i in order], dtype=np.uint64)
+    id_offsets = np.zeros(n + 1, dtype=np.uint64)
+    np.cumsum(id_lengths, out=id_offsets[1:])
+
+    sections = {
+        'vectors': vectors[order],
+        'norms': norms[order],
+        'category': np.array(cat_codes, dtype=np.uint32)[order],
+        'project': np.array(proj_codes, dtype=np.uint32)[order],
+        'file_type': np.array(type_codes, dtype=np.uint16)[order],
+        'year': np.array(years, dtype=np.uint16)[order],
+        'id_offsets': id_offsets,
+        'id_bytes': np.frombuffer(b''.join(ids[i] for i in order), dtype=np.uint8),
+    }
+    if n_lists:
+        sections['centroids'] = centroids
+        sections['list_offsets'] = list_offsets
+
+    header = {
+        'version': 1, 'model': EMBED_MODEL, 'dim': DIM, 'count': n, 'dtype': dtype,
+        'n_lists': n_lists, 'categories': cat_table, 'projects': proj_table,
+        'file_types': type_table, 'sections': {},
+    }
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(MAGIC + b'\0' * (ALIGN - len(MAGIC)))
+        for name, array in sections.items():
+            offset = f.tell()
+            f.write(np.ascontiguousarray(array).tobytes())
+            header['sections'][name] = {'offset': offset, 'dtype': array.dtype.str, 'shape': list(array.shape)}
+            f.write(b'\0' * (-f.tell() % ALIGN))
+        header_offset = f.tell()
+        header_bytes = json.dumps(header, ensure_ascii=False).encode('utf-8')
+        f.write(header_bytes)
+        f.seek(len(MAGIC))
+        f.write(struct.pack('<QQ', header_offset, len(header_bytes)))
+    os.replace(tmp, path)
+    return header
+
+
+class VectorIndex:
+    """mmap 기반 읽기 전용 벡터 인덱스"""
+
+    def __init__(self, path):
+        import numpy as np
+
+        self.path = path
+        self._file = open(path, 'rb')
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[:len(MAGIC)] != MAGIC:
+            raise ValueError(f'Not a vector index file: {path}')
+        header_offset, header_len = struct.unpack_from('<QQ', self._mmap, len(MAGIC))
+        self.header = json.loads(self._mmap[header_offset:header_offset + header_len].decode('utf-8'))
+        self.count = self.header['count']
+        self.dim = self.header['dim']
+        self.n_lists = self.header['n_lists']
+        self.categories = self.header['categories']
+        self.projects = self.header['projects']
+        self.file_types = self.header['file_types']
+
+        def section(name):
+            info = self.header['sections'].get(name)
+            if info is None:
+                return None
+            dtype = np.dtype(info['dtype'])
+            size = int(np.prod(info['shape'])) if info['shape'] else 1
+            return np.frombuffer(self._mmap, dtype=dtype, count=size,
+                                 offset=info['offset']).reshape(info['shape'])
+
+        self.vectors = section('vectors')
+        self.norms = section('norms')
+        self.category = section('category')
+        self.project = section('project')
+        self.file_type = section('file_type')
+        self.year = section('year')
+        self.id_offsets = section('id_offsets')
+        self.id_bytes = section('id_bytes')
+        self.centroids = section('centroids')
+        self.list_offsets = section('list_offsets')
+        self._rows = None
+
+    @classmethod
+    def open(cls, path):
+        return cls(path)
+
+    def __len__(self):
+        return self.count
+
+    def close(self):
+        # numpy 뷰가 남아 있으면 mmap을 닫을 수 없으므로 참조를 먼저 해제
+        for name in ('vectors', 'norms', 'category', 'project', 'file_type', 'year',
+                     'id_offsets', 'id_bytes', 'centroids', 'list_offsets'):
+            setattr(self, name, None)
+        self._mmap.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ---------- lookup ----------
+
+    def chunk_id(self, row):
+        start, end = int(self.id_offsets[row]), int(self.id_offsets[row + 1])
+        return self.id_bytes[start:end].tobytes().decode('utf-8')
+
+    def row_of(self, chunk_id):
+        if self._rows is None:
+            self._rows = {self.chunk_id(i): i for i in range(self.count)}
+        return self._rows.get(chunk_id)
+
+    def _hit(self, row, score):
+        year = int(self.year[row])
+        return SearchHit(self.chunk_id(row), round(float(score), 4),
+                         self.categories[self.category[row]], self.projects[self.project[row]],
+                         self.file_types[self.file_type[row]], str(year) if year else '')
+
+    # ---------- search ----------
+
+    def _filter(self, rows, category=None, project=None, year=None, file_type=None):
+        """후보 행 배열에 메타데이터 필터 적용 (서버와 같은 규칙: project는 부분 일치)"""
+        import numpy as np
+
+        mask = np.ones(len(rows), dtype=bool)
+        if category:
+            code = self.categories.index(category) if category in self.categories else -1
+            mask &= self.category[rows] == code
+        if project:
+            codes = [i for i, p in enumerate(self.projects) if project in p]
+            mask &= np.isin(self.project[rows], codes)
+        if file_type:
+            code = self.file_types.index(file_type) if file_type in self.file_types else -1
+            mask &= self.file_type[rows] == code
+        if year:
+            mask &= self.year[rows] == _year(str(year))
+        return rows[mask]
+
+    def _candidate_rows(self, query, n_probe):
+        import numpy as np
+
+        if not self.n_lists or n_probe >= self.n_lists:
+            return np.arange(self.count)
+        nearest = np.argsort(-(self.centroids @ query))[:n_probe]
+        return np.concatenate([np.arange(int(self.list_offsets[i]), int(self.list_offsets[i + 1]))
+                               for i in nearest])
+
+    def query_vector(self, query):
+        """텍스트면 서버 textToVector와 같은 벡터로 변환"""
+        import numpy as np
+
+        if isinstance(query, str):
+            from embedding import encode_vectors
+            query = encode_vectors([query])[0]
+        return np.asarray(query, dtype=np.float32)
+
+    def search(self, query, top_k=10, category=None, project=None, year=None, file_type=None,
+               threshold=0.0, n_probe=8, exclude=None):
+        """코사인 유사도 상위 top_k [SearchHit]. query는 텍스트 또는 벡터
+
+        n_probe: IVF 인덱스에서 탐색할 목록 수 (n_lists 이상이면 전체 탐색)
+        """
+        import numpy as np
+
+        q = self.query_vector(query)
+        q_norm = float(np.linalg.norm(q))
+        if q_norm == 0 or not self.count:
+            return []
+        q = q / q_norm
+
+        rows = self._filter(self._candidate_rows(q, n_probe), category, project, year, file_type)
+        if exclude is not None:
+            rows = rows[rows != exclude]
+        if not len(rows):
+            return []
+
+        scores = np.empty(len(rows), dtype=np.float32)
+        for start in range(0, len(rows), SCAN_BLOCK):
+            block = rows[start:start + SCAN_BLOCK]
+            scores[start:start + SCAN_BLOCK] = self.vectors[block].astype(np.float32) @ q
+        norms = self.norms[rows]
+        scores = np.divide(scores, norms, out=np.zeros_like(scores), where=norms > 0)
+
+        keep = scores >= threshold
+        rows, scores = rows[keep], scores[keep]
+        if len(rows) > top_k:
+            top = np.argpartition(-scores, top_k)[:top_k]
+            rows, scores = rows[top], scores[top]
+        order = np.argsort(-scores, kind='stable')
+        return [self._hit(rows[i], scores[i]) for i in order]
+
+    def similar(self, chunk_id, top_k=10, **filters):
+        """chunk_id와 비슷한 청크 (자기 자신 제외)"""
+        row = self.row_of(chunk_id)
+        if row is None:
+            return []
+        return self.search(self.vectors[row], top_k, exclude=row, **filters)
+
+
+def main(argv=None):
+    import argparse
+
+    ap = argparse.ArgumentParser(description='Knowledge Wiki - offline vector index search')
+    ap.add_argument('query', help='검색어 (또는 --similar 시 chunk_id)')
+    ap.add_argument('--index', default=os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                    'vector_index.kwvi'))
+    ap.add_argument('--top-k', type=int, default=10)
+    ap.add_argument('--category')
+    ap.add_argument('--project')
+    ap.add_argument('--year')
+    ap.add_argument('--type', dest='file_type')
+    ap.add_argument('--n-probe', type=int, default=8)
+    ap.add_argument('--similar', action='store_true', help='query를 chunk_id로 보고 비슷한 청크 검색')
+    args = ap.parse_args(argv)
+
+    if not os.path.exists(args.index):
+        print(f"[ERROR] Index not found: {args.index} (run: python indexer.py --embed-local)")
+        sys.exit(1)
+    filters = dict(category=args.category, project=args.project, year=args.year, file_type=args.file_type)
+    with VectorIndex.open(args.index) as index:
+        print(f"[INDEX] {index.count:,} vectors, dim {index.dim}, {index.header['dtype']}, "
+              f"IVF lists: {index.n_lists or 'none'}")
+        if args.similar:
+            hits = index.similar(args.query, args.top_k, **filters)
+        else:
+            hits = index.search(args.query, args.top_k, n_probe=args.n_probe, **filters)
+        for hit in hits:
+            print(f"  {hit.score:.4f}  {hit.chunk_id}  [{hit.category or '-'}] {hit.project_path} {hit.doc_year}")
+
+
+if __name__ == '__main__':
+    main()
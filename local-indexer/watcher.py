@@ -0,0 +1,235 @@
+"""
+Knowledge Wiki - Drive Folder Watcher
+======================================
+--watch 모드의 파일 변경 알림 수집 (무엇을 인덱싱할지는 indexer.watch_drive가 결정).
+
+  - Linux: inotify (ctypes, 추가 패키지 없음). 하위 폴더마다 watch를 걸고 새 폴더는 생길 때 추가
+  - 그 밖의 OS: watchdog 패키지가 있으면 사용 (Windows ReadDirectoryChangesW, macOS FSEvents)
+  - 둘 다 안 되면 (watch 수 한도 초과 등) 주기적 stat 스냅샷 비교 (폴링)
+
+알림 스레드는 EventBuffer에 경로만 모읍니다. 같은 경로의 연속 알림은 마지막 시각으로 합쳐지고,
+서로 다른 경로가 상한을 넘으면 모두 버리고 "전체 재스캔 1번"으로 바꿔 메모리가 늘지 않게 합니다.
+"""
+
+import ctypes
+import ctypes.util
+import errno
+import os
+import struct
+import sys
+import threading
+import time
+
+# inotify(7)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_EXCL_UNLINK = 0x04000000
+IN_ISDIR = 0x40000000
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_ONLYDIR | IN_EXCL_UNLINK
+
+_EVENT = struct.Struct('iIII')
+
+
+class EventBuffer:
+    """알림 스레드 -> 메인 루프 사이의 경로 버퍼 (경로별로 합침, 크기 제한). clock은 알림 시각 함수"""
+
+    def __init__(self, max_paths, clock=time.time):
+        self.max_paths = max_paths
+        self.clock = clock
+        self._paths = {}
+        self._overflow = False
+        self._cond = threading.Condition()
+
+    def add(self, path):
+        with self._cond:
+            if not self._overflow:
+                self._paths[path] = self.clock()
+                if len(self._paths) > self.max_paths:
+                    self._set_overflow()
+            self._cond.notify()
+
+    def overflow(self):
+        """알림 유실 (inotify 대기열 초과 등): 전체 재스캔 필요"""
+        with self._cond:
+            self._set_overflow()
+            self._cond.notify()
+
+    def _set_overflow(self):
+        self._overflow = True
+        self._paths = {}
+
+    def drain(self):
+        """(모인 {경로: 마지막 알림 시각}, 재스캔 필요 여부) 반환 후 비움"""
+        with self._cond:
+            paths, overflow = self._paths, self._overflow
+            self._paths, self._overflow = {}, False
+        return paths, overflow
+
+    def wait(self, timeout):
+        with self._cond:
+            if not self._paths and not self._overflow:
+                self._cond.wait(timeout)
+
+
+class InotifyWatcher:
+    """Linux inotify 기반 재귀 감시"""
+
+    name = 'inotify'
+
+    def __init__(self, root, buffer, accept):
+        self.buffer = buffer
+        self.accept = accept
+        self._libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        self.fd = self._libc.inotify_init1(os.O_CLOEXEC)
+        if self.fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        self.wds = {}
+        try:
+            self._add_tree(root)
+        except OSError:
+            os.close(self.fd)
+            raise
+        self._thread = threading.Thread(target=self._run, name='inotify', daemon=True)
+        self._thread.start()
+
+    def _add_tree(self, top):
+        stack = [top]
+        while stack:
+            path = stack.pop()
+            wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), WATCH_MASK)
+            if wd < 0:
+                err = ctypes.get_errno()
+                if err == errno.ENOSPC:
+                    raise OSError(err, 'inotify watch limit reached (sysctl fs.inotify.max_user_watches)')
+                continue
+            self.wds[wd] = path
+            try:
+                with os.scandir(path) as it:
+                    for entry in it:
+                        if entry.is_dir(follow_symlinks=False) and self.accept(entry.path, True):
+                            stack.append(entry.path)
+            except OSError:
+                continue
+
+    def _run(self):
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except OSError:
+                return
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = _EVENT.unpack_from(data, offset)
+                name = data[offset + _EVENT.size:offset + _EVENT.size + length].rstrip(b'\0')
+                offset += _EVENT.size + length
+                self._handle(wd, mask, os.fsdecode(name))
+
+    def _handle(self, wd, mask, name):
+        if mask & IN_Q_OVERFLOW:
+            self.buffer.overflow()
+            return
+        if mask & IN_IGNORED:
+            self.wds.pop(wd, None)
+            return
+        parent = self.wds.get(wd)
+        if parent is None or not name:
+            return
+        path = os.path.join(parent, name)
+        is_dir = bool(mask & IN_ISDIR)
+        if not self.accept(path, is_dir):
+            return
+        if is_dir and mask & (IN_CREATE | IN_MOVED_TO):
+            # 새 폴더: watch를 걸기 전에 생긴 파일이 있을 수 있으므로 폴더 자체도 재스캔 대상으로
+            try:
+                self._add_tree(path)
+            except OSError:
+                self.buffer.overflow()
+                return
+        self.buffer.add(path)
+
+    def stop(self):
+        try:
+            os.close(self.fd)
+        except OSError:
+            pass
+
+
+class WatchdogWatcher:
+    """watchdog 패키지 기반 감시 (Windows / macOS)"""
+
+    name = 'watchdog'
+
+    def __init__(self, root, buffer, accept):
+        from watchdog.events import FileSystemEventHandler
+        from watchdog.observers import Observer
+
+        class Handler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                if event.event_type not in ('created', 'modified', 'moved', 'deleted', 'closed'):
+                    return
+                if event.is_directory and event.event_type == 'modified':
+                    return      # 안의 파일이 바뀔 때마다 오는 폴더 mtime 변경
+                for path in (event.src_path, getattr(event, 'dest_path', '')):
+                    if path and accept(path, event.is_directory):
+                        buffer.add(path)
+
+        self._observer = Observer()
+        self._observer.schedule(Handler(), root, recursive=True)
+        self._observer.start()
+
+    def stop(self):
+        self._observer.stop()
+        self._observer.join()
+
+
+class PollingWatcher:
+    """주기적 stat 스냅샷 비교. snapshot()은 {경로: (size, mtime_ns)} 반환"""
+
+    def __init__(self, snapshot, buffer, interval):
+        self.snapshot = snapshot
+        self.buffer = buffer
+        self.interval = interval
+        self.name = f'polling every {interval}s'
+        self._stop = threading.Event()
+        self._last = snapshot()
+        self._thread = threading.Thread(target=self._run, name='poll', daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                current = self.snapshot()
+            except OSError:
+                continue
+            for path, stat in current.items():
+                if self._last.get(path) != stat:
+                    self.buffer.add(path)
+            for path in self._last.keys() - current.keys():
+                self.buffer.add(path)
+            self._last = current
+
+    def stop(self):
+        self._stop.set()
+
+
+def start_watcher(root, buffer, accept, snapshot, poll_seconds):
+    """사용 가능한 가장 좋은 감시 방식 시작. 실패하면 다음 방식으로 (마지막은 폴링)"""
+    if sys.platform.startswith('linux'):
+        try:
+            return InotifyWatcher(root, buffer, accept)
+        except (OSError, AttributeError) as e:
+            print(f"  [WARN] inotify unavailable ({e}), falling back")
+    try:
+        return WatchdogWatcher(root, buffer, accept)
+    except ImportError:
+        pass
+    except OSError as e:
+        print(f"  [WARN] watchdog unavailable ({e}), falling back")
+    return PollingWatcher(snapshot, buffer, poll_seconds)
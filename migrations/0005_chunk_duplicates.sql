@@ -0,0 +1,7 @@
+-- Near-duplicate chunks (local indexer dedup)
+-- 복사본(v1/v2/최종 등)의 청크는 본문 없이 대표 청크를 가리키는 참조로 저장
+
+-- Canonical chunk_id ('' = 본문을 가진 일반 청크)
+ALTER TABLE chunks ADD COLUMN duplicate_of TEXT DEFAULT '';
+
+CREATE INDEX IF NOT EXISTS idx_chunks_duplicate_of ON chunks(duplicate_of);
@@ -7,6 +7,27 @@ type Bindings = {
 
 export const apiRoutes = new Hono<{ Bindings: Bindings }>()
 
+// 요청 본문 JSON 파싱 (인덱서의 gzip 압축 업로드 지원: Content-Encoding: gzip)
+async function readJsonBody<T>(c: any): Promise<T> {
+  const encoding = (c.req.header('Content-Encoding') || '').toLowerCase()
+  if (encoding === 'gzip' && c.req.raw.body) {
+    const stream = c.req.raw.body.pipeThrough(new DecompressionStream('gzip'))
+    return await new Response(stream).json() as T
+  }
+  return await c.req.json<T>()
+}
+
+// 참조 청크(duplicate_of) 본문 복원: 대표 청크가 바뀌거나 삭제되기 전에 본문을 복사해 일반 청크로 전환
+// (임베딩은 비워 두어 다음 생성 때 자기 메타데이터로 다시 계산)
+function materializeDuplicates(db: D1Database, where: string, ...params: any[]) {
+  return db.prepare(`
+    UPDATE chunks SET
+      text = COALESCE((SELECT c.text FROM chunks c WHERE c.chunk_id = chunks.duplicate_of), ''),
+      embedding = '', embed_model = '', duplicate_of = ''
+    WHERE ${where}
+  `).bind(...params)
+}
+
 // =============================================
 // GET /api/search - Full Text Search (Enhanced)
 // =============================================
@@ -37,6 +58,7 @@ apiRoutes.get('/search', async (c) => {
       snippet(chunks_fts, 0, '<mark>', '</mark>', '...', 40) as snippet,
       c.mtime, c.tags, c.category, c.sub_category, c.author, c.org,
       c.doc_stage, c.doc_year, c.importance, c.view_count,
+      (SELECT COUNT(*) FROM chunks d WHERE d.duplicate_of = c.chunk_id) as duplicate_count,
       rank
     FROM chunks_fts
     JOIN chunks c ON chunks_fts.rowid = c.rowid
@@ -125,8 +147,10 @@ apiRoutes.get('/browse', async (c) => {
   try {
     const sql = `SELECT chunk_id, file_path, file_type, project_path, doc_title,
       location_type, location_value, location_detail, 
-      substr(text, 1, 200) as snippet, mtime, tags, category, sub_category,
-      author, org, doc_stage, doc_year, importance, view_count
+      substr(CASE WHEN duplicate_of != '' THEN
+        (SELECT d.text FROM chunks d WHERE d.chunk_id = chunks.duplicate_of) ELSE text END, 1, 200) as snippet,
+      mtime, tags, category, sub_category,
+      author, org, doc_stage, doc_year, importance, view_count, duplicate_of
       FROM chunks ${where} ${orderBy} LIMIT ? OFFSET ?`
     const results = await db.prepare(sql).bind(...params, limit, offset).all()
 
@@ -153,6 +177,19 @@ apiRoutes.get('/doc/:chunk_id', async (c) => {
     const result = await db.prepare(`SELECT * FROM chunks WHERE chunk_id = ?`).bind(chunkId).first()
     if (!result) return c.json({ error: 'Chunk not found' }, 404)
 
+    // Near-duplicate reference: show the canonical chunk's text
+    const canonicalId = (result.duplicate_of as string) || chunkId
+    if (result.duplicate_of) {
+      const canonical = await db.prepare(`SELECT text FROM chunks WHERE chunk_id = ?`).bind(canonicalId).first<{ text: string }>()
+      result.text = canonical?.text || ''
+    }
+
+    // Other copies of the same content (v1/v2/최종 ...)
+    const duplicates = await db.prepare(`
+      SELECT chunk_id, file_path, doc_title, location_detail
+      FROM chunks WHERE (duplicate_of = ? OR chunk_id = ?) AND chunk_id != ? ORDER BY file_path LIMIT 20
+    `).bind(canonicalId, canonicalId, chunkId).all()
+
     // Get related chunks from same file
     const related = await db.prepare(`
       SELECT chunk_id, doc_title, location_detail, substr(text, 1, 100) as snippet
@@ -163,11 +200,11 @@ apiRoutes.get('/doc/:chunk_id', async (c) => {
     const similar = await db.prepare(`
       SELECT chunk_id, doc_title, file_path, location_detail, category, 
         substr(text, 1, 100) as snippet
-      FROM chunks WHERE category = ? AND chunk_id != ? AND category != ''
+      FROM chunks WHERE category = ? AND chunk_id != ? AND category != '' AND duplicate_of = ''
       ORDER BY importance DESC LIMIT 5
     `).bind(result.category as string, chunkId).all()
 
-    return c.json({ ...result, related: related.results, similar: similar.results })
+    return c.json({ ...result, related: related.results, similar: similar.results, duplicates: duplicates.results })
   } catch (e: any) {
     return c.json({ error: e.message }, 500)
   }
@@ -357,7 +394,7 @@ apiRoutes.get('/trending', async (c) => {
 // =============================================
 apiRoutes.post('/chunks', async (c) => {
   const db = c.env.DB
-  const body = await c.req.json<{ chunks: any[] }>()
+  const body = await readJsonBody<{ chunks: any[] }>(c)
 
   if (!body.chunks || !Array.isArray(body.chunks) || body.chunks.length === 0) {
     return c.json({ error: 'No chunks provided' }, 400)
@@ -369,14 +406,27 @@ apiRoutes.post('/chunks', async (c) => {
   const batchSize = 50
   for (let i = 0; i < body.chunks.length; i += batchSize) {
     const batch = body.chunks.slice(i, i + batchSize)
-    const statements = batch.map(chunk => {
+    // Near-duplicate from the local indexer: stored as a reference to the canonical chunk, without text
+    const duplicateOf = (chunk: any) => typeof chunk.duplicate_of === 'string' ? chunk.duplicate_of : ''
+    const texts: Record<string, string> = {}
+    for (const chunk of batch) texts[chunk.chunk_id] = duplicateOf(chunk) ? '' : (chunk.text || '')
+    // Chunks referencing a chunk of this batch keep its previous text if the text changes.
+    // One statement per batch: json_each lists the uploaded texts, and only referrers of stored
+    // chunks whose text differs are touched (idx_chunks_duplicate_of)
+    const materialize = materializeDuplicates(db, `duplicate_of IN (
+        SELECT j.key FROM json_each(?) j JOIN chunks c ON c.chunk_id = j.key
+        WHERE COALESCE(c.text, '') != j.value)`, JSON.stringify(texts))
+    const statements = [materialize, ...batch.map(chunk => {
+      const text = texts[chunk.chunk_id]
+      // Precomputed embedding from the local indexer (--embed-local), stored as-is
+      const embedding = !duplicateOf(chunk) && isEncodedEmbedding(chunk.embedding) ? chunk.embedding : ''
       return db.prepare(`
         INSERT OR REPLACE INTO chunks 
         (chunk_id, file_path, file_type, project_path, doc_title, 
          location_type, location_value, location_detail, text, mtime, hash,
          tags, category, sub_category, author, org, doc_stage, doc_year,
-         summary, importance, indexed_at)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, datetime('now'))
+         summary, importance, embedding, embed_model, duplicate_of, indexed_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, datetime('now'))
       `).bind(
         chunk.chunk_id,
         chunk.file_path,
@@ -386,7 +436,7 @@ apiRoutes.post('/chunks', async (c) => {
         chunk.location_type || '',
         chunk.location_value || '',
         chunk.location_detail || '',
-        chunk.text || '',
+        text,
         chunk.mtime || '',
         chunk.hash || '',
         JSON.stringify(chunk.tags || []),
@@ -397,9 +447,12 @@ apiRoutes.post('/chunks', async (c) => {
         chunk.doc_stage || '',
         chunk.doc_year || '',
         chunk.summary || '',
-        chunk.importance || 50
+        chunk.importance || 50,
+        embedding,
+        embedding ? (chunk.embed_model || 'tfidf-256') : '',
+        duplicateOf(chunk)
       )
-    })
+    })]
 
     try {
       await db.batch(statements)
@@ -412,6 +465,78 @@ apiRoutes.post('/chunks', async (c) => {
   return c.json({ inserted, errors, total_sent: body.chunks.length })
 })
 
+// =============================================
+// POST /api/chunks/delete - Delete by chunk_id or file_path (indexer delta sync)
+// =============================================
+apiRoutes.post('/chunks/delete', async (c) => {
+  const db = c.env.DB
+  const body = await readJsonBody<{ chunk_ids?: string[], file_paths?: string[] }>(c)
+  const chunkIds = Array.isArray(body.chunk_ids) ? body.chunk_ids : []
+  const filePaths = Array.isArray(body.file_paths) ? body.file_paths : []
+
+  if (chunkIds.length === 0 && filePaths.length === 0) {
+    return c.json({ error: 'No chunk_ids or file_paths provided' }, 400)
+  }
+
+  // (참조 청크 본문 복원, 삭제) 쌍. batchSize가 짝수라 쌍이 배치 경계에서 나뉘지 않음
+  const statements = [
+    ...chunkIds.flatMap(id => [
+      materializeDuplicates(db, `duplicate_of = ?`, id),
+      db.prepare(`DELETE FROM chunks WHERE chunk_id = ?`).bind(id),
+    ]),
+    ...filePaths.flatMap(fp => [
+      materializeDuplicates(db, `duplicate_of IN (SELECT chunk_id FROM chunks WHERE file_path = ?)`, fp),
+      db.prepare(`DELETE FROM chunks WHERE file_path = ?`).bind(fp),
+    ]),
+  ]
+
+  let deleted = 0
+  const errors: string[] = []
+  const batchSize = 50
+  for (let i = 0; i < statements.length; i += batchSize) {
+    try {
+      const results = await db.batch(statements.slice(i, i + batchSize))
+      deleted += results.reduce((n, r, j) => n + (j % 2 ? (r.meta?.changes || 0) : 0), 0)
+    } catch (e: any) {
+      errors.push(`Batch ${i}-${i + batchSize}: ${e.message}`)
+    }
+  }
+
+  return c.json({ deleted, errors })
+})
+
+// =============================================
+// POST /api/chunks/rename - Move chunks to a new file path (no re-parse / re-embed)
+// =============================================
+apiRoutes.post('/chunks/rename', async (c) => {
+  const db = c.env.DB
+  const body = await readJsonBody<{ renames: { from: string, to: string, doc_title?: string, project_path?: string }[] }>(c)
+
+  if (!body.renames || !Array.isArray(body.renames) || body.renames.length === 0) {
+    return c.json({ error: 'No renames provided' }, 400)
+  }
+
+  const statements = body.renames.map(r => db.prepare(`
+    UPDATE chunks SET file_path = ?, doc_title = COALESCE(?, doc_title),
+      project_path = COALESCE(?, project_path)
+    WHERE file_path = ?
+  `).bind(r.to, r.doc_title ?? null, r.project_path ?? null, r.from))
+
+  let updated = 0
+  const errors: string[] = []
+  const batchSize = 50
+  for (let i = 0; i < statements.length; i += batchSize) {
+    try {
+      const results = await db.batch(statements.slice(i, i + batchSize))
+      updated += results.reduce((n, r) => n + (r.meta?.changes || 0), 0)
+    } catch (e: any) {
+      errors.push(`Batch ${i}-${i + batchSize}: ${e.message}`)
+    }
+  }
+
+  return c.json({ updated, errors })
+})
+
 // =============================================
 // DELETE /api/chunks - Clear all
 // =============================================
@@ -905,6 +1030,50 @@ function textToVector(text: string): number[] {
   return vec;
 }
 
+// Embedding column formats:
+//   JSON array            - generated here by /embeddings/generate
+//   f16:<base64>          - float16 little-endian, one per VOCAB term (local indexer --embed-local)
+//   i8:<base64>           - int8 (value * 127), one per VOCAB term
+//   f16s:/i8s:<base64>    - sparse: uint16 little-endian indices, then the same number of values
+const EMBEDDING_PREFIX = /^(f16|i8)(s?):/;
+
+function isEncodedEmbedding(value: unknown): value is string {
+  return typeof value === 'string' && EMBEDDING_PREFIX.test(value);
+}
+
+function halfToFloat(h: number): number {
+  const sign = h & 0x8000 ? -1 : 1;
+  const exp = (h >> 10) & 0x1f;
+  const frac = h & 0x3ff;
+  if (exp === 0) return sign * Math.pow(2, -14) * (frac / 1024);
+  if (exp === 31) return frac ? NaN : sign * Infinity;
+  return sign * Math.pow(2, exp - 15) * (1 + frac / 1024);
+}
+
+function decodeEmbedding(stored: string): number[] {
+  const m = EMBEDDING_PREFIX.exec(stored);
+  if (!m) return JSON.parse(stored);
+
+  const raw = atob(stored.slice(m[0].length));
+  const view = new DataView(new ArrayBuffer(raw.length));
+  for (let i = 0; i < raw.length; i++) view.setUint8(i, raw.charCodeAt(i));
+
+  const half = m[1] === 'f16';
+  const width = half ? 2 : 1;
+  const read = (offset: number) => half ? halfToFloat(view.getUint16(offset, true)) : view.getInt8(offset) / 127;
+
+  const vec = new Array(VOCAB.length).fill(0);
+  if (m[2]) {
+    const n = raw.length / (2 + width);
+    for (let i = 0; i < n; i++) {
+      vec[view.getUint16(i * 2, true)] = read(n * 2 + i * width);
+    }
+  } else {
+    for (let i = 0; i < vec.length && i * width < raw.length; i++) vec[i] = read(i * width);
+  }
+  return vec;
+}
+
 function cosineSimilarity(a: number[], b: number[]): number {
   if (a.length !== b.length || a.length === 0) return 0;
   let dot = 0;
@@ -920,20 +1089,27 @@ function cosineSimilarity(a: number[], b: number[]): number {
 }
 
 // =============================================
-// POST /api/embeddings/generate - Generate embeddings for all chunks
+// POST /api/embeddings/generate - Generate embeddings for chunks without one
+// ?limit=N (or {"limit": N}): at most N chunks per request; the indexer calls
+// repeatedly until `remaining` is 0 instead of one long request
 // =============================================
 apiRoutes.post('/embeddings/generate', async (c) => {
   const db = c.env.DB;
+  let limit = parseInt(c.req.query('limit') || '0');
+  if (!limit) {
+    try { limit = parseInt((await c.req.json()).limit) || 0; } catch { limit = 0; }
+  }
+  const missing = `(embedding = '' OR embedding IS NULL) AND duplicate_of = ''`;
   
   try {
-    // Get all chunks without embeddings
+    // Get chunks without embeddings (LIMIT -1 = all)
     const chunks = await db.prepare(`
       SELECT rowid, chunk_id, text, tags, category, doc_title, project_path
-      FROM chunks WHERE embedding = '' OR embedding IS NULL
-    `).all();
+      FROM chunks WHERE ${missing} ORDER BY rowid LIMIT ?
+    `).bind(limit > 0 ? limit : -1).all();
     
     if (!chunks.results || chunks.results.length === 0) {
-      return c.json({ message: 'All chunks already have embeddings', count: 0 });
+      return c.json({ message: 'All chunks already have embeddings', count: 0, remaining: 0 });
     }
     
     let updated = 0;
@@ -956,7 +1132,13 @@ apiRoutes.post('/embeddings/generate', async (c) => {
       updated += batch.length;
     }
     
-    return c.json({ message: `Generated embeddings for ${updated} chunks`, count: updated, model: 'tfidf-256', dimensions: VOCAB.length });
+    const rest = limit > 0
+      ? await db.prepare(`SELECT COUNT(*) as count FROM chunks WHERE ${missing}`).first<{ count: number }>()
+      : null;
+    return c.json({
+      message: `Generated embeddings for ${updated} chunks`, count: updated, remaining: rest?.count || 0,
+      model: 'tfidf-256', dimensions: VOCAB.length
+    });
   } catch (e: any) {
     return c.json({ error: e.message }, 500);
   }
@@ -1003,7 +1185,7 @@ apiRoutes.get('/semantic-search', async (c) => {
     // Calculate cosine similarity for each
     const scored = results.results.map(row => {
       let embedding: number[] = [];
-      try { embedding = JSON.parse(row.embedding as string); } catch { return null; }
+      try { embedding = decodeEmbedding(row.embedding as string); } catch { return null; }
       
       const similarity = cosineSimilarity(queryVec, embedding);
       const { embedding: _emb, ...rest } = row;
@@ -1043,7 +1225,7 @@ apiRoutes.get('/similar/:chunk_id', async (c) => {
       return c.json({ error: 'Chunk not found or no embedding', results: [] }, 404);
     }
     
-    const sourceVec: number[] = JSON.parse(source.embedding);
+    const sourceVec: number[] = decodeEmbedding(source.embedding);
     
     // Get all other chunks with embeddings
     const others = await db.prepare(`
@@ -1055,7 +1237,7 @@ apiRoutes.get('/similar/:chunk_id', async (c) => {
     
     const scored = others.results.map(row => {
       let embedding: number[] = [];
-      try { embedding = JSON.parse(row.embedding as string); } catch { return null; }
+      try { embedding = decodeEmbedding(row.embedding as string); } catch { return null; }
       const similarity = cosineSimilarity(sourceVec, embedding);
       const { embedding: _emb, ...rest } = row;
       return { ...rest, similarity: Math.round(similarity * 10000) / 10000 };
@@ -1108,7 +1290,7 @@ apiRoutes.post('/ask', async (c) => {
     
     const semanticScored = allChunks.results.map(row => {
       let embedding: number[] = [];
-      try { embedding = JSON.parse(row.embedding as string); } catch { return null; }
+      try { embedding = decodeEmbedding(row.embedding as string); } catch { return null; }
       const similarity = cosineSimilarity(queryVec, embedding);
       return { ...row, similarity };
     }).filter(r => r !== null && r.similarity > 0.1);
@@ -1225,7 +1407,8 @@ apiRoutes.post('/ask', async (c) => {
 apiRoutes.get('/embedding-stats', async (c) => {
   const db = c.env.DB;
   try {
-    const total = await db.prepare(`SELECT COUNT(*) as count FROM chunks`).first<{ count: number }>();
+    const total = await db.prepare(`SELECT COUNT(*) as count FROM chunks WHERE duplicate_of = ''`).first<{ count: number }>();
+    const duplicates = await db.prepare(`SELECT COUNT(*) as count FROM chunks WHERE duplicate_of != ''`).first<{ count: number }>();
     const withEmbed = await db.prepare(`SELECT COUNT(*) as count FROM chunks WHERE embedding != '' AND embedding IS NOT NULL`).first<{ count: number }>();
     const models = await db.prepare(`SELECT embed_model, COUNT(*) as count FROM chunks WHERE embed_model != '' GROUP BY embed_model`).all();
     
@@ -1233,6 +1416,7 @@ apiRoutes.get('/embedding-stats', async (c) => {
       total_chunks: total?.count || 0,
       with_embeddings: withEmbed?.count || 0,
       coverage: total?.count ? Math.round((withEmbed?.count || 0) / total.count * 100) : 0,
+      duplicate_chunks: duplicates?.count || 0,
       models: models.results
     });
   } catch (e: any) {